@@ -7,7 +7,7 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import pandas as pd
 import numpy as np
-from openai import AsyncOpenAI
+from services.llm_gateway import LLMGateway, get_llm_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -68,8 +68,9 @@ class Report:
     executive_summary: str = ""
 
 class AnalyticsAgent:
-    def __init__(self, openai_api_key: str, supabase_client=None):
-        self.openai_client = AsyncOpenAI(api_key=openai_api_key)
+    def __init__(self, openai_api_key: str, supabase_client=None, llm_gateway: Optional[LLMGateway] = None):
+        self.llm_gateway = llm_gateway or get_llm_gateway(openai_api_key)
+        self.openai_client = self.llm_gateway.for_agent("analytics")
         self.supabase = supabase_client
         self.reports_store: Dict[str, Report] = {}
         self.insights_store: Dict[str, Insight] = {}
@@ -7,7 +7,7 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from enum import Enum
-from openai import AsyncOpenAI
+from services.llm_gateway import LLMGateway, get_llm_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -64,8 +64,9 @@ class GeneratedContent:
     engagement_prediction: float = 0.0
 
 class ContentCreationAgent:
-    def __init__(self, openai_api_key: str, supabase_client=None):
-        self.openai_client = AsyncOpenAI(api_key=openai_api_key)
+    def __init__(self, openai_api_key: str, supabase_client=None, llm_gateway: Optional[LLMGateway] = None):
+        self.llm_gateway = llm_gateway or get_llm_gateway(openai_api_key)
+        self.openai_client = self.llm_gateway.for_agent("content")
         self.supabase = supabase_client
         self.content_store: Dict[str, GeneratedContent] = {}
         
@@ -1,15 +1,32 @@
 import asyncio
 import json
 import logging
+import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Set, Tuple
+from dataclasses import dataclass, asdict, replace
 from enum import Enum
-import httpx
-from openai import AsyncOpenAI
+import numpy as np
+from services.llm_gateway import LLMGateway, Priority, get_llm_gateway, set_priority
+from services.sendgrid_bulk import SendGridBulkSender, BulkRecipient
+from services.template_renderer import TemplateRenderer
+from services.job_scheduler import JobScheduler, ScheduledJob, get_job_scheduler
+from services.message_index import IndexedMessageStore
+from services.contact_index import IndexedContactStore
+from services.engagement_store import EngagementStore
+from services.experiments import ExperimentEngine, ExperimentConfig, create_experiment_store, stratified_assignment, SENT, OPENED, CLICKED
+from services.trigger_index import IndexedSequenceStore
+from services.contact_import import ContactImportConfig, ImportJob, normalized_chunks
+from services.http_transport import create_http_client
 
 logger = logging.getLogger(__name__)
 
+# Contacts per SendGrid marketing contacts upsert, and members per Mailchimp batch subscribe
+SENDGRID_CONTACTS_PER_UPSERT = 30000
+MAILCHIMP_MEMBERS_PER_BATCH = 500
+
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
 class EmailType(Enum):
     WELCOME = "welcome"
     NURTURE = "nurture"
@@ -42,6 +59,35 @@ class EmailStatus(Enum):
     BOUNCED = "bounced"
     UNSUBSCRIBED = "unsubscribed"
 
+# SendGrid event types that move a message to a new status
+SENDGRID_EVENT_STATUS = {
+    "delivered": EmailStatus.DELIVERED,
+    "open": EmailStatus.OPENED,
+    "click": EmailStatus.CLICKED,
+    "bounce": EmailStatus.BOUNCED,
+    "dropped": EmailStatus.BOUNCED
+}
+SENDGRID_UNSUBSCRIBE_EVENTS = {"unsubscribe", "group_unsubscribe", "spamreport"}
+
+# Events arrive out of order and more than once; a message's status only moves forward
+STATUS_RANK = {
+    EmailStatus.SCHEDULED: 0,
+    EmailStatus.SENT: 1,
+    EmailStatus.BOUNCED: 2,
+    EmailStatus.DELIVERED: 3,
+    EmailStatus.OPENED: 4,
+    EmailStatus.CLICKED: 5,
+    EmailStatus.UNSUBSCRIBED: 5
+}
+
+# Message statuses that advance an A/B test variant's counters
+AB_TEST_MILESTONES = {
+    EmailStatus.SENT: SENT,
+    EmailStatus.DELIVERED: SENT,
+    EmailStatus.OPENED: OPENED,
+    EmailStatus.CLICKED: CLICKED
+}
+
 @dataclass
 class EmailTemplate:
     id: str
@@ -106,18 +152,30 @@ class AutomationSequence:
     updated_at: datetime
 
 class EmailAutomationAgent:
-    def __init__(self, openai_api_key: str, email_service_credentials: Dict[str, str], supabase_client=None):
-        self.openai_client = AsyncOpenAI(api_key=openai_api_key)
+    def __init__(self, openai_api_key: str, email_service_credentials: Dict[str, str], supabase_client=None,
+                 llm_gateway: Optional[LLMGateway] = None, scheduler: Optional[JobScheduler] = None):
+        self.llm_gateway = llm_gateway or get_llm_gateway(openai_api_key)
+        self.openai_client = self.llm_gateway.for_agent("email")
         self.credentials = email_service_credentials
         self.supabase = supabase_client
-        self.http_client = httpx.AsyncClient()
+        # Per-host pools, keepalive, DNS cache and timeouts are shared with the other agents
+        self.http_client = create_http_client()
         
         # Data stores
         self.templates_store: Dict[str, EmailTemplate] = {}
-        self.contacts_store: Dict[str, Contact] = {}
+        # Tag/company/subscribed bitsets and a created_at index answer audience filters
+        self.contacts_store: IndexedContactStore = IndexedContactStore()
         self.campaigns_store: Dict[str, EmailCampaign] = {}
-        self.messages_store: Dict[str, EmailMessage] = {}
-        self.sequences_store: Dict[str, AutomationSequence] = {}
+        # Indexed by contact and campaign, with per-contact status counters for segmentation
+        self.messages_store: IndexedMessageStore = IndexedMessageStore()
+        # Columnar copy of message state that analytics aggregate over
+        self.engagement_store = EngagementStore()
+        self.messages_store.engagement = self.engagement_store
+        self.messages_store.status_listeners.append(self._on_message_status)
+        # Once sent, a message lives on as its id, counters and engagement row; subject and body are dropped
+        self.messages_store.evict_statuses = {status for status in EmailStatus if status != EmailStatus.SCHEDULED}
+        # Indexed by trigger event and tag so an event only reaches the sequences listening for it
+        self.sequences_store: IndexedSequenceStore = IndexedSequenceStore(self._trigger_keys)
         
         # Email service API endpoints
         self.email_apis = {
@@ -125,6 +183,33 @@ class EmailAutomationAgent:
             "mailchimp": "https://us1.api.mailchimp.com/3.0",
             "constant_contact": "https://api.cc.email/v3"
         }
+        
+        # Future sends are durable scheduler jobs rather than sleeping tasks
+        self.scheduler = scheduler or get_job_scheduler(supabase_client)
+        self.scheduler.register("email.send", self._run_scheduled_email)
+        self.scheduler.register("email.sequence", self._run_sequence_email)
+        self.scheduler.register("email.ab_test", self._run_ab_test_deadline)
+        
+        # Bulk contact imports, with progress kept per job
+        self.import_config = ContactImportConfig.from_env()
+        self.import_jobs: Dict[str, ImportJob] = {}
+        
+        # Subject line tests stop as soon as the tracked engagement picks a winner; their
+        # state is persisted so a deadline that falls after a restart still mails the holdout
+        experiment_config = ExperimentConfig.from_env()
+        # Tasks started from synchronous callbacks, referenced until they finish
+        self._background_tasks: Set[asyncio.Task] = set()
+        self.experiments = ExperimentEngine(experiment_config, store=create_experiment_store(supabase_client, experiment_config))
+        
+        # {{var}} templates are parsed once and rendered with a single join per contact
+        self.template_renderer = TemplateRenderer()
+        
+        # Campaign sends go out as multi-personalization SendGrid requests
+        self.bulk_sender = SendGridBulkSender(
+            self.http_client,
+            self.credentials.get("sendgrid_api_key"),
+            base_url=self.email_apis["sendgrid"]
+        )
 
     async def create_email_template(self, 
                                   name: str,
@@ -431,16 +516,7 @@ class EmailAutomationAgent:
                 "Content-Type": "application/json"
             }
             
-            payload = {
-                "contacts": [
-                    {
-                        "email": contact.email,
-                        "first_name": contact.first_name,
-                        "last_name": contact.last_name,
-                        "custom_fields": contact.custom_fields
-                    }
-                ]
-            }
+            payload = {"contacts": [self._sendgrid_contact(contact)]}
             
             response = await self.http_client.put(
                 f"{self.email_apis['sendgrid']}/marketing/contacts",
@@ -465,15 +541,7 @@ class EmailAutomationAgent:
                 "Content-Type": "application/json"
             }
             
-            payload = {
-                "email_address": contact.email,
-                "status": "subscribed",
-                "merge_fields": {
-                    "FNAME": contact.first_name,
-                    "LNAME": contact.last_name,
-                    "COMPANY": contact.company
-                }
-            }
+            payload = self._mailchimp_member(contact)
             
             response = await self.http_client.post(
                 f"{self.email_apis['mailchimp']}/lists/{list_id}/members",
@@ -487,6 +555,175 @@ class EmailAutomationAgent:
         except Exception as e:
             logger.error(f"Error adding contact to Mailchimp: {str(e)}")
 
+    def _sendgrid_contact(self, contact: Contact) -> Dict[str, Any]:
+        return {
+            "email": contact.email,
+            "first_name": contact.first_name,
+            "last_name": contact.last_name,
+            "custom_fields": contact.custom_fields
+        }
+
+    def _mailchimp_member(self, contact: Contact) -> Dict[str, Any]:
+        return {
+            "email_address": contact.email,
+            "status": "subscribed",
+            "merge_fields": {
+                "FNAME": contact.first_name,
+                "LNAME": contact.last_name,
+                "COMPANY": contact.company
+            }
+        }
+
+    def create_import_job(self, source: str) -> ImportJob:
+        """Register a contact import so its progress can be polled"""
+        
+        job = ImportJob(id=f"import_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}", source=source)
+        self.import_jobs[job.id] = job
+        return job
+
+    def get_import_job(self, job_id: str) -> Optional[ImportJob]:
+        return self.import_jobs.get(job_id)
+
+    async def import_contacts(self,
+                              source: Any,
+                              fmt: str = "csv",
+                              job: ImportJob = None,
+                              track_contacts: bool = False) -> ImportJob:
+        """Import contacts from a CSV/NDJSON path or file object, or a list of dicts
+        
+        Rows are read, validated and deduplicated a chunk at a time off the event loop.
+        Each chunk's new contacts go to the email service in bulk upserts and to the
+        database in batched writes before the next chunk is read, so memory stays flat
+        for imports of any size.
+        """
+        
+        job = job or self.create_import_job(fmt)
+        job.status = "running"
+        job.started_at = datetime.now()
+        if track_contacts:
+            job.contacts = []
+        
+        seen = {contact.email.strip().lower() for contact in self.contacts_store.values() if contact.email}
+        chunks = normalized_chunks(source, fmt, seen, self.import_config.chunk_rows)
+        
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
+                rows, records, invalid, duplicates = chunk
+                job.rows += rows
+                job.invalid += invalid
+                job.duplicates += duplicates
+                if not records:
+                    continue
+                
+                now = datetime.now()
+                stamp = now.strftime('%Y%m%d_%H%M%S')
+                contacts = [
+                    Contact(id=f"contact_{stamp}_{uuid.uuid4().hex[:8]}", subscribed=True,
+                            created_at=now, last_activity=now, **record)
+                    for record in records
+                ]
+                for contact in contacts:
+                    self.contacts_store[contact.id] = contact
+                job.imported += len(contacts)
+                if track_contacts:
+                    job.contacts.extend({"contact_id": c.id, "email": c.email} for c in contacts)
+                
+                synced = await self._upsert_contacts_to_service(contacts, job)
+                job.esp_synced += synced
+                job.esp_failed += len(contacts) - synced
+                
+                if self.supabase:
+                    batch_size = self.import_config.db_batch_size
+                    for start in range(0, len(contacts), batch_size):
+                        batch = contacts[start:start + batch_size]
+                        if await self._save_rows_to_db('email_contacts', [self._contact_row(c) for c in batch]):
+                            job.db_written += len(batch)
+                
+                await self.emit("contact_added", [contact.id for contact in contacts])
+            
+            job.status = "completed"
+            logger.info(f"Contact import {job.id}: {job.imported} imported from {job.rows} rows")
+        except Exception as e:
+            job.status = "failed"
+            job.add_error(str(e), self.import_config.max_errors)
+            logger.error(f"Contact import {job.id} failed: {str(e)}")
+        finally:
+            job.finished_at = datetime.now()
+        
+        return job
+
+    async def _upsert_contacts_to_service(self, contacts: List[Contact], job: ImportJob = None) -> int:
+        """Bulk add or update contacts at the email service provider; returns how many were accepted"""
+        
+        service = self.credentials.get("email_service", "sendgrid")
+        
+        if service == "sendgrid":
+            chunk_size, upsert = SENDGRID_CONTACTS_PER_UPSERT, self._upsert_to_sendgrid
+        elif service == "mailchimp":
+            chunk_size, upsert = MAILCHIMP_MEMBERS_PER_BATCH, self._batch_subscribe_mailchimp
+        else:
+            logger.warning(f"Email service {service} not implemented")
+            return 0
+        
+        accepted = 0
+        for start in range(0, len(contacts), chunk_size):
+            chunk = contacts[start:start + chunk_size]
+            try:
+                accepted += await upsert(chunk)
+            except Exception as e:
+                logger.error(f"Error syncing {len(chunk)} contacts to {service}: {str(e)}")
+                if job:
+                    job.add_error(f"{service}: {str(e)}", self.import_config.max_errors)
+        return accepted
+
+    async def _upsert_to_sendgrid(self, contacts: List[Contact]) -> int:
+        """One marketing contacts upsert; SendGrid processes it as an async job"""
+        
+        headers = {
+            "Authorization": f"Bearer {self.credentials.get('sendgrid_api_key')}",
+            "Content-Type": "application/json"
+        }
+        payload = {"contacts": [self._sendgrid_contact(contact) for contact in contacts]}
+        
+        for attempt in range(3):
+            response = await self.http_client.put(
+                f"{self.email_apis['sendgrid']}/marketing/contacts",
+                headers=headers,
+                json=payload
+            )
+            if response.status_code != 429:
+                break
+            await asyncio.sleep(float(response.headers.get("retry-after", 2 ** attempt)))
+        
+        if response.status_code not in [200, 202]:
+            raise RuntimeError(f"SendGrid contact upsert failed ({response.status_code}): {response.text[:200]}")
+        return len(contacts)
+
+    async def _batch_subscribe_mailchimp(self, contacts: List[Contact]) -> int:
+        """One Mailchimp batch subscribe; per-member failures come back in the response"""
+        
+        headers = {
+            "Authorization": f"Bearer {self.credentials.get('mailchimp_api_key')}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "members": [self._mailchimp_member(contact) for contact in contacts],
+            "update_existing": True
+        }
+        
+        response = await self.http_client.post(
+            f"{self.email_apis['mailchimp']}/lists/{self.credentials.get('mailchimp_list_id')}",
+            headers=headers,
+            json=payload
+        )
+        
+        if response.status_code != 200:
+            raise RuntimeError(f"Mailchimp batch subscribe failed ({response.status_code}): {response.text[:200]}")
+        return len(contacts) - int(response.json().get("error_count", 0))
+
     async def send_campaign(self,
                           campaign_name: str,
                           template_id: str,
@@ -537,34 +774,13 @@ class EmailAutomationAgent:
     def _filter_contacts(self, filter_criteria: Dict[str, Any]) -> List[Contact]:
         """Filter contacts based on criteria"""
         
-        contacts = list(self.contacts_store.values())
-        filtered = []
-        
-        for contact in contacts:
-            if not contact.subscribed:
-                continue
-            
-            # Check filter criteria
-            match = True
-            
-            if "tags" in filter_criteria:
-                required_tags = filter_criteria["tags"]
-                if not any(tag in contact.tags for tag in required_tags):
-                    match = False
-            
-            if "company" in filter_criteria and filter_criteria["company"]:
-                if filter_criteria["company"].lower() not in contact.company.lower():
-                    match = False
-            
-            if "created_after" in filter_criteria:
-                after_date = datetime.fromisoformat(filter_criteria["created_after"])
-                if contact.created_at < after_date:
-                    match = False
-            
-            if match:
-                filtered.append(contact)
-        
-        return filtered
+        # Subscribed contacts having any of the tags, a matching company and a recent enough signup
+        return self.contacts_store.query(
+            tags=filter_criteria.get("tags"),
+            company=filter_criteria.get("company"),
+            created_after=filter_criteria.get("created_after"),
+            subscribed_only=True
+        )
 
     async def _send_campaign_emails(self,
                                   campaign: EmailCampaign,
@@ -573,11 +789,15 @@ class EmailAutomationAgent:
                                   send_time: datetime):
         """Send emails for campaign"""
         
-        for contact in contacts:
+        send_now = []
+        send_later = []
+        
+        # Personalize content for every contact in one pass over the compiled template
+        values = [self._personalization_values(contact) for contact in contacts]
+        rendered = self.template_renderer.render_many(template, values)
+        
+        for contact, contact_values, personalized_content in zip(contacts, values, rendered):
             try:
-                # Personalize content
-                personalized_content = await self._personalize_email(template, contact)
-                
                 # Create email message
                 message = EmailMessage(
                     id=f"msg_{campaign.id}_{contact.id}",
@@ -596,17 +816,82 @@ class EmailAutomationAgent:
                 
                 # Send email
                 if send_time <= datetime.now():
-                    await self._send_email_message(message)
+                    send_now.append((message, contact, contact_values))
                 else:
                     # Schedule for later
-                    asyncio.create_task(self._schedule_email_send(message, send_time))
+                    send_later.append(self._email_job("email.send", message, send_time, contact))
                 
             except Exception as e:
                 logger.error(f"Error sending email to {contact.email}: {str(e)}")
+        
+        if send_later:
+            await self.scheduler.schedule_many(send_later)
+        
+        if not send_now:
+            return
+        
+        if self.credentials.get("email_service", "sendgrid") == "sendgrid":
+            await self._send_bulk_via_sendgrid(template, send_now)
+        else:
+            for message, _, _ in send_now:
+                await self._send_email_message(message)
+
+    async def _send_bulk_via_sendgrid(self,
+                                      template: EmailTemplate,
+                                      messages: List[Tuple[EmailMessage, Contact, Dict[str, str]]]):
+        """Send already personalized messages that share a template in batched SendGrid requests"""
+        
+        # Only variables the template uses travel as substitutions
+        variables = self.template_renderer.variables(template)
+        recipients = [
+            BulkRecipient(
+                message_id=message.id,
+                email=contact.email,
+                name=f"{contact.first_name} {contact.last_name}".strip(),
+                subject=message.subject_line,
+                substitutions={
+                    f"{{{{{var_name}}}}}": values[var_name]
+                    for var_name in variables if var_name in values
+                }
+            )
+            for message, contact, values in messages
+        ]
+        
+        try:
+            results = await self.bulk_sender.send(
+                recipients,
+                html=template.html_content,
+                from_email=self.credentials.get("from_email", "noreply@example.com"),
+                from_name=self.credentials.get("from_name", "Marketing Team"),
+                subject=template.subject_line
+            )
+        except Exception as e:
+            logger.error(f"Bulk SendGrid send error: {str(e)}")
+            results = {}
+        
+        sent_at = datetime.now()
+        for message, _, _ in messages:
+            result = results.get(message.id)
+            if result and result.accepted:
+                message.sent_at = sent_at
+                self.messages_store.set_status(message, EmailStatus.SENT)
+                message.tracking_data["sendgrid_message_id"] = result.sendgrid_message_id
+                
+                # Update campaign metrics
+                campaign = self.campaigns_store.get(message.campaign_id)
+                if campaign:
+                    campaign.metrics["sent"] = campaign.metrics.get("sent", 0) + 1
+            else:
+                self.messages_store.set_status(message, EmailStatus.BOUNCED)
 
     async def _personalize_email(self, template: EmailTemplate, contact: Contact) -> Dict[str, str]:
         """Personalize email content for contact"""
         
+        return self.template_renderer.render(template, self._personalization_values(contact))
+
+    def _personalization_values(self, contact: Contact) -> Dict[str, str]:
+        """Template variable values for a contact"""
+        
         # Create personalization map
         personalization = {
             "first_name": contact.first_name or "there",
@@ -619,28 +904,16 @@ class EmailAutomationAgent:
         if contact.custom_fields:
             personalization.update(contact.custom_fields)
         
-        # Replace variables in template
-        personalized_subject = template.subject_line
-        personalized_html = template.html_content
-        
-        for var_name, var_value in personalization.items():
-            placeholder = f"{{{{{var_name}}}}}"
-            personalized_subject = personalized_subject.replace(placeholder, str(var_value))
-            personalized_html = personalized_html.replace(placeholder, str(var_value))
-        
-        return {
-            "subject": personalized_subject,
-            "html": personalized_html
-        }
+        return {var_name: str(var_value) for var_name, var_value in personalization.items()}
 
-    async def _send_email_message(self, message: EmailMessage):
-        """Send individual email message"""
+    async def _send_email_message(self, message: EmailMessage, recipient: Optional[Dict[str, str]] = None):
+        """Send individual email message (to `recipient` when the contact is not in the store)"""
         
         service = self.credentials.get("email_service", "sendgrid")
         
         try:
             if service == "sendgrid":
-                success = await self._send_via_sendgrid(message)
+                success = await self._send_via_sendgrid(message, recipient)
             elif service == "mailchimp":
                 success = await self._send_via_mailchimp(message)
             else:
@@ -648,25 +921,27 @@ class EmailAutomationAgent:
                 success = False
             
             if success:
-                message.status = EmailStatus.SENT
                 message.sent_at = datetime.now()
+                self.messages_store.set_status(message, EmailStatus.SENT)
                 
                 # Update campaign metrics
                 campaign = self.campaigns_store.get(message.campaign_id)
                 if campaign:
                     campaign.metrics["sent"] = campaign.metrics.get("sent", 0) + 1
             else:
-                message.status = EmailStatus.BOUNCED
+                self.messages_store.set_status(message, EmailStatus.BOUNCED)
                 
         except Exception as e:
             logger.error(f"Error sending message {message.id}: {str(e)}")
-            message.status = EmailStatus.BOUNCED
+            self.messages_store.set_status(message, EmailStatus.BOUNCED)
 
-    async def _send_via_sendgrid(self, message: EmailMessage) -> bool:
+    async def _send_via_sendgrid(self, message: EmailMessage, recipient: Optional[Dict[str, str]] = None) -> bool:
         """Send email via SendGrid"""
         try:
             contact = self.contacts_store.get(message.contact_id)
-            if not contact:
+            if contact:
+                recipient = self._recipient(contact)
+            if not recipient:
                 return False
             
             headers = {
@@ -677,8 +952,9 @@ class EmailAutomationAgent:
             payload = {
                 "personalizations": [
                     {
-                        "to": [{"email": contact.email, "name": f"{contact.first_name} {contact.last_name}".strip()}],
-                        "subject": message.subject_line
+                        "to": [recipient],
+                        "subject": message.subject_line,
+                        "custom_args": {"message_id": message.id}
                     }
                 ],
                 "from": {
@@ -721,24 +997,209 @@ class EmailAutomationAgent:
             logger.error(f"Mailchimp send error: {str(e)}")
             return False
 
+    def _email_job(self, kind: str, message: EmailMessage, send_time: datetime,
+                   contact: Optional[Contact] = None) -> ScheduledJob:
+        """Scheduler job for a message
+        
+        The payload carries the rendered message and its recipient, so a job that comes
+        due after a restart can be sent without the contact or template stores.
+        """
+        
+        # Shallow copy: asdict() deep-copies every field, which dominates bulk scheduling
+        message_data = dict(vars(message))
+        message_data["tracking_data"] = dict(message.tracking_data or {})
+        message_data["status"] = message.status.value
+        message_data["scheduled_at"] = message.scheduled_at.isoformat()
+        message_data["sent_at"] = message.sent_at.isoformat() if message.sent_at else None
+        
+        contact = contact or self.contacts_store.get(message.contact_id)
+        payload = {"message": message_data}
+        if contact:
+            payload["recipient"] = self._recipient(contact)
+        
+        return ScheduledJob(
+            id=f"email:{message.id}",
+            kind=kind,
+            run_at=send_time.timestamp(),
+            payload=payload
+        )
+
+    @staticmethod
+    def _recipient(contact: Contact) -> Dict[str, str]:
+        return {"email": contact.email, "name": f"{contact.first_name} {contact.last_name}".strip()}
+
+    def _message_from_job(self, payload: Dict[str, Any]) -> EmailMessage:
+        """Message for a scheduler job, restoring it into the store after a restart"""
+        
+        message_data = dict(payload["message"])
+        # An evicted (already sent) message comes back as a record, so a replayed job is not sent twice
+        message = self.messages_store.record(message_data["id"])
+        if message is None:
+            message_data["status"] = EmailStatus(message_data["status"])
+            message_data["scheduled_at"] = datetime.fromisoformat(message_data["scheduled_at"])
+            message_data["sent_at"] = datetime.fromisoformat(message_data["sent_at"]) if message_data["sent_at"] else None
+            message = EmailMessage(**message_data)
+            self.messages_store[message.id] = message
+        return message
+
     async def _schedule_email_send(self, message: EmailMessage, send_time: datetime):
         """Schedule email for future sending"""
-        delay = (send_time - datetime.now()).total_seconds()
+        await self.scheduler.schedule_many([self._email_job("email.send", message, send_time)])
+
+    async def _run_scheduled_email(self, payload: Dict[str, Any]):
+        """Scheduler handler: send a campaign email that has come due"""
+        set_priority(Priority.BACKGROUND)
+        message = self._message_from_job(payload)
+        
+        if message.status == EmailStatus.SCHEDULED:
+            await self._send_email_message(message, payload.get("recipient"))
+
+    async def cancel_scheduled_email(self, message_id: str) -> bool:
+        """Cancel a scheduled email that has not been sent yet"""
+        
+        if not await self.scheduler.cancel(f"email:{message_id}"):
+            return False
+        self.messages_store.pop(message_id, None)
+        return True
+
+    async def reschedule_email(self, message_id: str, send_time: datetime) -> bool:
+        """Move a scheduled email to a new send time"""
+        
+        if not await self.scheduler.reschedule(f"email:{message_id}", send_time):
+            return False
+        message = self.messages_store.get(message_id)
+        if message:
+            message.scheduled_at = send_time
+        return True
+
+    async def apply_email_events(self, events: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Apply a batch of SendGrid webhook events
+        
+        Message statuses, campaign counters and contact activity are folded per message
+        and per contact first, so each touched object is updated (and persisted) once.
+        """
+        
+        new_status: Dict[str, EmailStatus] = {}
+        activity: Dict[str, datetime] = {}
+        unsubscribed = set()
+        unmatched = 0
+        
+        for event in events:
+            message = self.messages_store.record(event.get("message_id"))
+            if message is None:
+                unmatched += 1
+                continue
+            
+            event_type = event.get("event")
+            if event_type in SENDGRID_UNSUBSCRIBE_EVENTS:
+                unsubscribed.add(message.contact_id)
+                continue
+            
+            status = SENDGRID_EVENT_STATUS.get(event_type)
+            if status is None:
+                continue
+            current = new_status.get(message.id, message.status)
+            if STATUS_RANK[status] > STATUS_RANK[current]:
+                new_status[message.id] = status
+            
+            if status in (EmailStatus.OPENED, EmailStatus.CLICKED):
+                try:
+                    moment = datetime.fromtimestamp(int(event["timestamp"]))
+                except (KeyError, TypeError, ValueError):
+                    moment = datetime.now()
+                if moment > activity.get(message.contact_id, datetime.min):
+                    activity[message.contact_id] = moment
+        
+        touched_campaigns = {}
+        for message_id, status in new_status.items():
+            message = self.messages_store.record(message_id)
+            old_rank, new_rank = STATUS_RANK[message.status], STATUS_RANK[status]
+            self.messages_store.set_status(message, status)
+            
+            campaign = self.campaigns_store.get(message.campaign_id)
+            if campaign is None:
+                continue
+            if campaign.metrics is None:
+                campaign.metrics = {}
+            if status == EmailStatus.BOUNCED:
+                campaign.metrics["bounced"] = campaign.metrics.get("bounced", 0) + 1
+            else:
+                # An open implies delivery and a click implies an open, even when those events were missed
+                for name, reached in (("delivered", EmailStatus.DELIVERED),
+                                      ("opened", EmailStatus.OPENED),
+                                      ("clicked", EmailStatus.CLICKED)):
+                    if old_rank < STATUS_RANK[reached] <= new_rank:
+                        campaign.metrics[name] = campaign.metrics.get(name, 0) + 1
+            touched_campaigns[campaign.id] = campaign
+        
+        touched_contacts = {}
+        for contact_id, moment in activity.items():
+            contact = self.contacts_store.get(contact_id)
+            if contact and (contact.last_activity is None or moment > contact.last_activity):
+                contact.last_activity = moment
+                touched_contacts[contact_id] = contact
+        for contact_id in unsubscribed:
+            contact = self.contacts_store.get(contact_id)
+            if contact and contact.subscribed:
+                contact.subscribed = False
+                self.contacts_store.reindex(contact)
+                touched_contacts[contact_id] = contact
+        
+        if self.supabase:
+            await self._save_rows_to_db('email_campaigns', [self._campaign_row(c) for c in touched_campaigns.values()])
+            await self._save_rows_to_db('email_contacts', [self._contact_row(c) for c in touched_contacts.values()])
         
-        if delay > 0:
-            await asyncio.sleep(delay)
-            await self._send_email_message(message)
+        return {
+            "events": len(events),
+            "messages_updated": len(new_status),
+            "contacts_updated": len(touched_contacts),
+            "unsubscribed": len(unsubscribed),
+            "unmatched": unmatched
+        }
 
     async def _trigger_automation_sequences(self, contact: Contact, trigger_event: str):
         """Trigger relevant automation sequences for contact"""
+        await self.emit(trigger_event, [contact.id])
+
+    async def emit(self, event: str, contact_ids: List[str]) -> Dict[str, int]:
+        """Fire an event for many contacts; returns contacts started per sequence
+        
+        The sequence store's trigger index narrows the event to the sequences listening
+        for it (and, for tagged triggers, to contacts carrying one of the tags); only those
+        pairs have their conditions checked, and each sequence schedules its emails in bulk.
+        """
         
-        for sequence in self.sequences_store.values():
+        contacts = [self.contacts_store[cid] for cid in contact_ids if cid in self.contacts_store]
+        started = {}
+        
+        for sequence_id, candidates in self.sequences_store.dispatch(event, contacts).items():
+            sequence = self.sequences_store[sequence_id]
             if not sequence.active:
                 continue
             
             # Check trigger conditions
-            if self._check_trigger_conditions(sequence, contact, trigger_event):
-                await self._start_sequence_for_contact(sequence, contact)
+            matched = [c for c in candidates if self._check_trigger_conditions(sequence, c, event)]
+            if matched:
+                await self._start_sequence_for_contacts(sequence, matched)
+                started[sequence_id] = len(matched)
+        
+        return started
+
+    @staticmethod
+    def _trigger_keys(sequence: AutomationSequence) -> Tuple[List[Optional[str]], List[str]]:
+        """Events a sequence listens to (None: any event) and the contact tags it requires"""
+        
+        conditions = sequence.trigger_conditions or {}
+        
+        if sequence.trigger_type == TriggerType.EVENT_BASED:
+            return [conditions.get("event")], []
+        elif sequence.trigger_type == TriggerType.BEHAVIOR_BASED:
+            if not conditions.get("tags"):
+                return [], []
+            return [conditions.get("event")], conditions["tags"]
+        elif sequence.trigger_type == TriggerType.TIME_BASED:
+            return [conditions.get("event", "contact_added")], conditions.get("tags") or []
+        return [], []
 
     def _check_trigger_conditions(self, 
                                  sequence: AutomationSequence, 
@@ -746,7 +1207,7 @@ class EmailAutomationAgent:
                                  trigger_event: str) -> bool:
         """Check if sequence should trigger for contact"""
         
-        conditions = sequence.trigger_conditions
+        conditions = sequence.trigger_conditions or {}
         
         # Event-based triggers
         if sequence.trigger_type == TriggerType.EVENT_BASED:
@@ -754,37 +1215,58 @@ class EmailAutomationAgent:
         
         # Behavior-based triggers
         elif sequence.trigger_type == TriggerType.BEHAVIOR_BASED:
-            # Check contact behavior (simplified)
+            if conditions.get("event") not in (None, trigger_event):
+                return False
             if "tags" in conditions:
-                return any(tag in contact.tags for tag in conditions["tags"])
+                return any(tag in (contact.tags or []) for tag in conditions["tags"])
         
-        # Time-based triggers
+        # Time-based triggers: start a delay after an anchor event, optionally only for tagged contacts
         elif sequence.trigger_type == TriggerType.TIME_BASED:
-            # Check timing conditions (simplified)
+            if conditions.get("event", "contact_added") != trigger_event:
+                return False
+            if conditions.get("tags"):
+                return any(tag in (contact.tags or []) for tag in conditions["tags"])
             return True
         
         return False
 
-    async def _start_sequence_for_contact(self, sequence: AutomationSequence, contact: Contact):
-        """Start automation sequence for specific contact"""
+    def _sequence_start_delay(self, sequence: AutomationSequence) -> timedelta:
+        """How long after the trigger a sequence's first email is due"""
+        
+        if sequence.trigger_type != TriggerType.TIME_BASED:
+            return timedelta()
+        conditions = sequence.trigger_conditions or {}
+        return timedelta(days=float(conditions.get("delay_days", 0)), hours=float(conditions.get("delay_hours", 0)))
+
+    async def _start_sequence_for_contacts(self, sequence: AutomationSequence, contacts: List[Contact]):
+        """Start automation sequence for a batch of contacts"""
         
-        logger.info(f"Starting sequence {sequence.id} for contact {contact.email}")
+        logger.info(f"Starting sequence {sequence.id} for {len(contacts)} contacts")
+        
+        start_time = datetime.now() + self._sequence_start_delay(sequence)
+        steps = [
+            (i, self.templates_store[email_config["template_id"]], start_time + timedelta(days=email_config.get("delay_days", 0)))
+            for i, email_config in enumerate(sequence.emails)
+            if email_config.get("template_id") in self.templates_store
+        ]
+        
+        # Rendered now so the job can be sent as-is after a restart; re-rendered at send time when possible
+        values = [self._personalization_values(contact) for contact in contacts]
+        rendered = {i: self.template_renderer.render_many(template, values) for i, template, _ in steps}
         
         # Schedule each email in the sequence
-        for i, email_config in enumerate(sequence.emails):
-            delay_days = email_config.get("delay_days", 0)
-            send_time = datetime.now() + timedelta(days=delay_days)
-            
-            template_id = email_config.get("template_id")
-            if template_id and template_id in self.templates_store:
+        jobs = []
+        for position, contact in enumerate(contacts):
+            for i, template, send_time in steps:
+                personalized = rendered[i][position]
                 # Create and schedule message
                 message = EmailMessage(
                     id=f"seq_{sequence.id}_{contact.id}_{i}",
                     campaign_id=f"auto_{sequence.id}",
                     contact_id=contact.id,
-                    template_id=template_id,
-                    subject_line="",  # Will be set during personalization
-                    content="",
+                    template_id=template.id,
+                    subject_line=personalized["subject"],
+                    content=personalized["html"],
                     scheduled_at=send_time,
                     sent_at=None,
                     status=EmailStatus.SCHEDULED,
@@ -792,28 +1274,36 @@ class EmailAutomationAgent:
                 )
                 
                 self.messages_store[message.id] = message
-                
-                # Schedule the email
-                asyncio.create_task(self._schedule_sequence_email(message, send_time))
+                jobs.append(self._email_job("email.sequence", message, send_time, contact))
+        
+        await self.scheduler.schedule_many(jobs)
 
     async def _schedule_sequence_email(self, message: EmailMessage, send_time: datetime):
         """Schedule individual sequence email"""
-        delay = (send_time - datetime.now()).total_seconds()
+        await self.scheduler.schedule_many([self._email_job("email.sequence", message, send_time)])
+
+    async def _run_sequence_email(self, payload: Dict[str, Any]):
+        """Scheduler handler: personalize and send a sequence email that has come due"""
+        set_priority(Priority.BACKGROUND)
+        message = self._message_from_job(payload)
         
-        if delay > 0:
-            await asyncio.sleep(delay)
+        if message.status != EmailStatus.SCHEDULED:
+            return
         
         # Get template and contact
         template = self.templates_store.get(message.template_id)
         contact = self.contacts_store.get(message.contact_id)
         
         if template and contact:
-            # Personalize and send
+            # Personalize with the current template and contact details
             personalized = await self._personalize_email(template, contact)
             message.subject_line = personalized["subject"]
             message.content = personalized["html"]
-            
-            await self._send_email_message(message)
+        elif not (message.content and payload.get("recipient")):
+            logger.error(f"Sequence email {message.id} has no template or recipient to send with")
+            return
+        
+        await self._send_email_message(message, payload.get("recipient"))
 
     async def get_campaign_analytics(self, campaign_id: str = None) -> Dict[str, Any]:
         """Get email campaign analytics"""
@@ -828,10 +1318,11 @@ class EmailAutomationAgent:
             return {"error": "No campaigns found"}
         
         # Calculate aggregate metrics
-        total_sent = sum(c.metrics.get("sent", 0) for c in campaigns)
-        total_delivered = sum(c.metrics.get("delivered", 0) for c in campaigns)
-        total_opened = sum(c.metrics.get("opened", 0) for c in campaigns)
-        total_clicked = sum(c.metrics.get("clicked", 0) for c in campaigns)
+        campaign_metrics = self._campaign_metrics(campaigns)
+        total_sent = sum(m["sent"] for m in campaign_metrics.values())
+        total_delivered = sum(m["delivered"] for m in campaign_metrics.values())
+        total_opened = sum(m["opened"] for m in campaign_metrics.values())
+        total_clicked = sum(m["clicked"] for m in campaign_metrics.values())
         
         # Calculate rates
         delivery_rate = (total_delivered / total_sent * 100) if total_sent > 0 else 0
@@ -856,36 +1347,56 @@ class EmailAutomationAgent:
         """Get top performing campaigns"""
         
         # Calculate performance scores
+        campaign_metrics = self._campaign_metrics(campaigns)
+        sent = np.array([campaign_metrics[c.id]["sent"] for c in campaigns], dtype=np.float64)
+        opened = np.array([campaign_metrics[c.id]["opened"] for c in campaigns], dtype=np.float64)
+        clicked = np.array([campaign_metrics[c.id]["clicked"] for c in campaigns], dtype=np.float64)
+        
+        # Performance score based on engagement
+        safe_sent = np.where(sent > 0, sent, 1)
+        open_rates = np.where(sent > 0, opened / safe_sent, 0)
+        click_rates = np.where(sent > 0, clicked / safe_sent, 0)
+        scores = np.round(((open_rates * 0.6) + (click_rates * 0.4)) * 100, 2)
+        
+        # Sort by performance score
         scored_campaigns = []
-        for campaign in campaigns:
-            metrics = campaign.metrics or {}
-            sent = metrics.get("sent", 0)
-            opened = metrics.get("opened", 0)
-            clicked = metrics.get("clicked", 0)
-            
-            # Performance score based on engagement
-            score = 0
-            if sent > 0:
-                open_rate = opened / sent
-                click_rate = clicked / sent
-                score = (open_rate * 0.6) + (click_rate * 0.4)
-            
+        for i in np.argsort(-scores, kind="stable")[:limit]:
+            campaign = campaigns[i]
             scored_campaigns.append({
                 "id": campaign.id,
                 "name": campaign.name,
                 "type": campaign.email_type.value,
-                "sent": sent,
-                "opened": opened,
-                "clicked": clicked,
-                "open_rate": round((opened / sent * 100) if sent > 0 else 0, 2),
-                "click_rate": round((clicked / sent * 100) if sent > 0 else 0, 2),
-                "performance_score": round(score * 100, 2),
+                "sent": int(sent[i]),
+                "opened": int(opened[i]),
+                "clicked": int(clicked[i]),
+                "open_rate": round(float(open_rates[i]) * 100, 2),
+                "click_rate": round(float(click_rates[i]) * 100, 2),
+                "performance_score": float(scores[i]),
                 "created_at": campaign.created_at.isoformat()
             })
         
-        # Sort by performance score
-        scored_campaigns.sort(key=lambda x: x['performance_score'], reverse=True)
-        return scored_campaigns[:limit]
+        return scored_campaigns
+
+    def _campaign_metrics(self, campaigns: List[EmailCampaign]) -> Dict[str, Dict[str, int]]:
+        """sent/delivered/opened/clicked per campaign from one group-by over the engagement columns"""
+        
+        counts = self.engagement_store.campaign_counts({
+            "delivered": [EmailStatus.DELIVERED, EmailStatus.OPENED, EmailStatus.CLICKED],
+            "opened": [EmailStatus.OPENED, EmailStatus.CLICKED],
+            "clicked": [EmailStatus.CLICKED]
+        })
+        
+        campaign_metrics = {}
+        for campaign in campaigns:
+            if campaign.id in counts:
+                campaign_metrics[campaign.id] = counts[campaign.id]
+            else:
+                # Messages sent before this process started only survive in the stored metrics
+                metrics = campaign.metrics or {}
+                campaign_metrics[campaign.id] = {
+                    name: metrics.get(name, 0) for name in ("sent", "delivered", "opened", "clicked")
+                }
+        return campaign_metrics
 
     async def optimize_send_times(self, contact_ids: List[str] = None) -> Dict[str, Any]:
         """Analyze and recommend optimal send times"""
@@ -953,27 +1464,20 @@ class EmailAutomationAgent:
     async def _analyze_engagement_patterns(self, contacts: List[Contact]) -> Dict[str, Any]:
         """Analyze engagement patterns from email messages"""
         
-        # Get all messages for these contacts
-        contact_ids = {c.id for c in contacts}
-        messages = [m for m in self.messages_store.values() if m.contact_id in contact_ids]
+        # Day-of-week and hour histograms of opened/clicked messages for these contacts
+        total_messages, days, hours = self.engagement_store.engagement_histograms(
+            [EmailStatus.OPENED, EmailStatus.CLICKED],
+            contact_ids={c.id for c in contacts}
+        )
         
-        if not messages:
+        if not total_messages:
             return {"message": "No email data available for analysis"}
         
-        # Analyze by day of week
-        day_engagement = {}
-        time_engagement = {}
-        
-        for message in messages:
-            if message.sent_at and message.status in [EmailStatus.OPENED, EmailStatus.CLICKED]:
-                day = message.sent_at.strftime("%A")
-                hour = message.sent_at.hour
-                
-                day_engagement[day] = day_engagement.get(day, 0) + 1
-                time_engagement[hour] = time_engagement.get(hour, 0) + 1
+        day_engagement = {DAY_NAMES[day]: int(count) for day, count in enumerate(days) if count}
+        time_engagement = {hour: int(count) for hour, count in enumerate(hours) if count}
         
         return {
-            "total_messages": len(messages),
+            "total_messages": total_messages,
             "engagement_by_day": day_engagement,
             "engagement_by_hour": time_engagement,
             "top_performing_days": sorted(day_engagement.items(), key=lambda x: x[1], reverse=True)[:3],
@@ -1013,17 +1517,16 @@ class EmailAutomationAgent:
         low_engagement = []
         
         for contact in contacts:
-            # Calculate engagement score based on email interactions
-            contact_messages = [m for m in self.messages_store.values() if m.contact_id == contact.id]
+            # Calculate engagement score from the running per-contact counters
+            total_sent = self.messages_store.contact_message_count(contact.id)
             
-            if not contact_messages:
+            if not total_sent:
                 low_engagement.append(contact)
                 continue
             
             # Calculate engagement metrics
-            total_sent = len(contact_messages)
-            opened = len([m for m in contact_messages if m.status in [EmailStatus.OPENED, EmailStatus.CLICKED]])
-            clicked = len([m for m in contact_messages if m.status == EmailStatus.CLICKED])
+            opened = self.messages_store.contact_status_count(contact.id, [EmailStatus.OPENED, EmailStatus.CLICKED])
+            clicked = self.messages_store.contact_status_count(contact.id, [EmailStatus.CLICKED])
             
             open_rate = opened / total_sent if total_sent > 0 else 0
             click_rate = clicked / total_sent if total_sent > 0 else 0
@@ -1089,13 +1592,11 @@ class EmailAutomationAgent:
         # Prepare contact data for AI analysis
         contact_data = []
         for contact in contacts[:50]:  # Limit for API efficiency
-            messages = [m for m in self.messages_store.values() if m.contact_id == contact.id]
-            
             contact_summary = {
                 "email": contact.email,
                 "company": contact.company,
                 "tags": contact.tags,
-                "email_count": len(messages),
+                "email_count": self.messages_store.contact_message_count(contact.id),
                 "last_activity": contact.last_activity.isoformat() if contact.last_activity else None,
                 "custom_fields": contact.custom_fields or {}
             }
@@ -1241,29 +1742,33 @@ class EmailAutomationAgent:
                                    template_id: str,
                                    test_variants: List[str],
                                    test_percentage: float = 0.2) -> Dict[str, Any]:
-        """A/B test different subject lines"""
+        """A/B test different subject lines
+        
+        A stratified random sample gets the variants; the rest of the audience is held
+        back and receives the winning subject line once the sequential test stops (or
+        the best one so far when the test deadline passes).
+        """
         
         template = self.templates_store.get(template_id)
         if not template:
             raise ValueError(f"Template {template_id} not found")
         
         # Get contacts for testing
-        all_contacts = [c for c in self.contacts_store.values() if c.subscribed]
+        all_contacts = self.contacts_store.query(subscribed_only=True)
         if len(all_contacts) < 100:
             return {"error": "Need at least 100 contacts for meaningful A/B test"}
         
-        # Calculate test group sizes
-        test_size = int(len(all_contacts) * test_percentage)
-        variant_size = test_size // len(test_variants)
+        # Randomize within each mailbox domain so every variant sees the same provider mix
+        groups, holdout = stratified_assignment(
+            all_contacts, len(test_variants), test_percentage, stratum=self._ab_test_stratum
+        )
         
         test_results = {}
         test_id = f"abtest_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        experiment = self.experiments.create(test_id, test_variants)
+        experiment.holdout = holdout
         
-        for i, variant in enumerate(test_variants):
-            start_idx = i * variant_size
-            end_idx = start_idx + variant_size
-            test_contacts = all_contacts[start_idx:end_idx]
-            
+        for i, (variant, test_contacts) in enumerate(zip(test_variants, groups)):
             # Create test campaign
             test_campaign = EmailCampaign(
                 id=f"{test_id}_variant_{i}",
@@ -1280,42 +1785,194 @@ class EmailAutomationAgent:
             )
             
             self.campaigns_store[test_campaign.id] = test_campaign
+            self.experiments.bind(test_campaign.id, test_id, i)
             
             # Send test emails with variant subject line
-            for contact in test_contacts:
-                personalized = await self._personalize_email(template, contact)
-                
-                message = EmailMessage(
-                    id=f"abtest_{test_campaign.id}_{contact.id}",
-                    campaign_id=test_campaign.id,
-                    contact_id=contact.id,
-                    template_id=template_id,
-                    subject_line=variant,  # Use test variant
-                    content=personalized["html"],
-                    scheduled_at=datetime.now(),
-                    sent_at=None,
-                    status=EmailStatus.SCHEDULED,
-                    tracking_data={"ab_test_variant": i}
-                )
-                
-                self.messages_store[message.id] = message
-                await self._send_email_message(message)
+            variant_template = replace(template, id=f"{template.id}_{test_campaign.id}", subject_line=variant)
+            await self._send_campaign_emails(test_campaign, test_contacts, variant_template, datetime.now())
             
             test_results[f"variant_{i}"] = {
                 "subject_line": variant,
                 "contacts_tested": len(test_contacts),
                 "campaign_id": test_campaign.id
             }
+        self.experiments.save(experiment)
+        
+        # Fall back to the leader if the test has not stopped by the deadline
+        deadline = datetime.now() + timedelta(hours=experiment.config.max_duration_hours)
+        await self.scheduler.schedule_many([ScheduledJob(
+            id=f"abtest:{test_id}",
+            kind="email.ab_test",
+            run_at=deadline.timestamp(),
+            payload={"test_id": test_id, "template_id": template_id}
+        )])
         
         return {
             "test_id": test_id,
             "variants": test_results,
             "test_percentage": test_percentage,
-            "total_contacts_tested": test_size,
+            "total_contacts_tested": sum(len(group) for group in groups),
+            "holdout_contacts": len(holdout),
+            "decision_deadline": deadline.isoformat(),
             "status": "running",
             "created_at": datetime.now().isoformat()
         }
 
+    @staticmethod
+    def _ab_test_stratum(contact: Contact) -> str:
+        return contact.email.rsplit("@", 1)[-1].lower()
+
+    def _on_message_status(self, message: EmailMessage):
+        """Status listener: feed A/B test counters and stop tests that have a winner"""
+        
+        milestone = AB_TEST_MILESTONES.get(message.status)
+        if milestone is None:
+            return
+        
+        experiment = self.experiments.record(message.id, message.campaign_id, milestone)
+        if experiment is None:
+            return
+        
+        self.experiments.evaluate(experiment)
+        self.experiments.save(experiment)
+        if experiment.status == "decided":
+            task = asyncio.create_task(self._promote_ab_test(experiment.id, message.campaign_id))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
+    async def _promote_ab_test(self, test_id: str, campaign_id: str):
+        """Bring a decided test's deadline job forward, so sending the winner is a durable scheduler job"""
+        
+        try:
+            if await self.scheduler.reschedule(f"abtest:{test_id}", datetime.now()):
+                return
+            # No pending deadline job in this process (e.g. it is already running): schedule one
+            campaign = self.campaigns_store.get(campaign_id)
+            if campaign is None:
+                logger.error(f"A/B test {test_id} decided but campaign {campaign_id} is unknown; left to its deadline")
+                return
+            await self.scheduler.schedule_many([ScheduledJob(
+                id=f"abtest:{test_id}",
+                kind="email.ab_test",
+                run_at=datetime.now().timestamp(),
+                payload={"test_id": test_id, "template_id": campaign.template_id}
+            )])
+        except Exception as e:
+            logger.error(f"Error scheduling A/B test {test_id} winner: {str(e)}")
+
+    async def _run_ab_test_deadline(self, payload: Dict[str, Any]):
+        """Scheduler handler: the A/B test was decided or ran out of time"""
+        set_priority(Priority.BACKGROUND)
+        await self._finish_ab_test(payload["test_id"], payload["template_id"])
+
+    async def _finish_ab_test(self, test_id: str, template_id: str):
+        """Send the winning subject line to the contacts held out of the test"""
+        
+        experiment = self.experiments.get(test_id)
+        if experiment is None:
+            logger.error(f"A/B test {test_id} is not known to this process")
+            return
+        if experiment.status == "completed":
+            return
+        
+        if experiment.status == "running":
+            # Deadline reached without a decision: go with the best variant so far
+            evaluation = self.experiments.evaluate(experiment)
+            if experiment.status == "running":
+                self.experiments.decide(experiment, evaluation["leader"], "deadline")
+        experiment.status = "completed"
+        await self.scheduler.cancel(f"abtest:{test_id}")
+        
+        # After a restart the holdout is contact ids and the template may only be in the database
+        template = await self._load_template(template_id)
+        holdout = await self._load_contacts(experiment.holdout)
+        experiment.holdout = []
+        self.experiments.save(experiment)
+        if not template:
+            logger.error(f"Template {template_id} for A/B test {test_id} not found")
+            return
+        
+        winner = experiment.variants[experiment.winner]
+        holdout = [contact for contact in holdout if contact.subscribed]
+        
+        campaign = EmailCampaign(
+            id=f"{test_id}_winner",
+            name=f"A/B Test Winner: {winner[:30]}...",
+            email_type=template.email_type,
+            template_id=template_id,
+            status=CampaignStatus.ACTIVE,
+            trigger={"type": "ab_test_winner", "test_id": test_id, "decided_by": experiment.decided_by},
+            target_audience={"ab_test_holdout": test_id},
+            schedule={"send_time": datetime.now().isoformat()},
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+            metrics={"sent": 0, "opened": 0, "clicked": 0}
+        )
+        self.campaigns_store[campaign.id] = campaign
+        
+        winner_template = replace(template, id=f"{template.id}_{campaign.id}", subject_line=winner)
+        await self._send_campaign_emails(campaign, holdout, winner_template, datetime.now())
+        logger.info(f"A/B test {test_id}: sent variant {experiment.winner} to {len(holdout)} held-out contacts")
+
+    def get_ab_test_results(self, test_id: str) -> Optional[Dict[str, Any]]:
+        """Per-variant counters, posterior summary and decision for an A/B test"""
+        return self.experiments.summary(test_id)
+
+    async def _load_template(self, template_id: str) -> Optional[EmailTemplate]:
+        """Template from the store, or from the database when this process has not seen it"""
+        
+        template = self.templates_store.get(template_id)
+        if template or not self.supabase:
+            return template
+        
+        try:
+            response = self.supabase.table('email_templates').select("*").eq("id", template_id).execute()
+        except Exception as e:
+            logger.error(f"Error loading template {template_id}: {str(e)}")
+            return None
+        if not response.data:
+            return None
+        
+        template_data = dict(response.data[0])
+        template_data["email_type"] = EmailType(template_data["email_type"])
+        template_data["created_at"] = datetime.fromisoformat(template_data["created_at"])
+        template_data["updated_at"] = datetime.fromisoformat(template_data["updated_at"])
+        template = EmailTemplate(**{name: template_data.get(name) for name in EmailTemplate.__dataclass_fields__})
+        self.templates_store[template.id] = template
+        return template
+
+    async def _load_contacts(self, contacts: List[Any], chunk_size: int = 500) -> List[Contact]:
+        """Contacts for a mix of Contact objects and contact ids, loading unknown ids from the database"""
+        
+        loaded = [contact for contact in contacts if isinstance(contact, Contact)]
+        missing = []
+        for contact_id in (contact for contact in contacts if not isinstance(contact, Contact)):
+            contact = self.contacts_store.get(contact_id)
+            if contact:
+                loaded.append(contact)
+            else:
+                missing.append(contact_id)
+        if not missing or not self.supabase:
+            if missing:
+                logger.error(f"{len(missing)} contacts are not known to this process")
+            return loaded
+        
+        for start in range(0, len(missing), chunk_size):
+            try:
+                response = self.supabase.table('email_contacts').select("*").in_("id", missing[start:start + chunk_size]).execute()
+            except Exception as e:
+                logger.error(f"Error loading contacts: {str(e)}")
+                continue
+            for row in response.data or []:
+                contact_data = {name: row.get(name) for name in Contact.__dataclass_fields__}
+                contact_data["subscribed"] = row.get("subscribed", True)
+                for name in ("created_at", "last_activity"):
+                    contact_data[name] = datetime.fromisoformat(row[name]) if row.get(name) else None
+                contact = Contact(**contact_data)
+                self.contacts_store[contact.id] = contact
+                loaded.append(contact)
+        return loaded
+
     async def _save_template_to_db(self, template: EmailTemplate):
         """Save template to database"""
         if not self.supabase:
@@ -1338,32 +1995,50 @@ class EmailAutomationAgent:
             return
         
         try:
-            contact_data = asdict(contact)
-            contact_data["created_at"] = contact.created_at.isoformat() if contact.created_at else None
-            contact_data["last_activity"] = contact.last_activity.isoformat() if contact.last_activity else None
-            
-            self.supabase.table('email_contacts').upsert(contact_data).execute()
+            self.supabase.table('email_contacts').upsert(self._contact_row(contact)).execute()
             
         except Exception as e:
             logger.error(f"Error saving contact to database: {str(e)}")
 
+    def _contact_row(self, contact: Contact) -> Dict[str, Any]:
+        # Shallow copy: asdict() deep-copies tags and custom fields, which dominates bulk imports
+        contact_data = dict(vars(contact))
+        contact_data["created_at"] = contact.created_at.isoformat() if contact.created_at else None
+        contact_data["last_activity"] = contact.last_activity.isoformat() if contact.last_activity else None
+        return contact_data
+
     async def _save_campaign_to_db(self, campaign: EmailCampaign):
         """Save campaign to database"""
         if not self.supabase:
             return
         
         try:
-            campaign_data = asdict(campaign)
-            campaign_data["email_type"] = campaign.email_type.value
-            campaign_data["status"] = campaign.status.value
-            campaign_data["created_at"] = campaign.created_at.isoformat()
-            campaign_data["updated_at"] = campaign.updated_at.isoformat()
-            
-            self.supabase.table('email_campaigns').upsert(campaign_data).execute()
+            self.supabase.table('email_campaigns').upsert(self._campaign_row(campaign)).execute()
             
         except Exception as e:
             logger.error(f"Error saving campaign to database: {str(e)}")
 
+    def _campaign_row(self, campaign: EmailCampaign) -> Dict[str, Any]:
+        campaign_data = asdict(campaign)
+        campaign_data["email_type"] = campaign.email_type.value
+        campaign_data["status"] = campaign.status.value
+        campaign_data["created_at"] = campaign.created_at.isoformat()
+        campaign_data["updated_at"] = campaign.updated_at.isoformat()
+        return campaign_data
+
+    async def _save_rows_to_db(self, table: str, rows: List[Dict[str, Any]]) -> bool:
+        """Upsert many rows in one request"""
+        if not self.supabase or not rows:
+            return False
+        
+        try:
+            self.supabase.table(table).upsert(rows).execute()
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error saving {len(rows)} rows to {table}: {str(e)}")
+            return False
+
     async def _save_sequence_to_db(self, sequence: AutomationSequence):
         """Save automation sequence to database"""
         if not self.supabase:
@@ -1400,10 +2075,7 @@ class EmailAutomationAgent:
 
     def list_contacts(self, subscribed_only: bool = True, limit: int = 100) -> List[Contact]:
         """List contacts with optional filtering"""
-        contacts = list(self.contacts_store.values())
-        
-        if subscribed_only:
-            contacts = [c for c in contacts if c.subscribed]
+        contacts = self.contacts_store.query(subscribed_only=subscribed_only)
         
         contacts.sort(key=lambda x: x.created_at or datetime.min, reverse=True)
         return contacts[:limit]
@@ -1423,13 +2095,6 @@ class EmailAutomationAgent:
         return campaigns
 
     async def close(self):
-        """Close HTTP client"""
-        await self.http_client.aclose()import asyncio
-import json
-import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
-from enum import Enum
-import httpx
-from openai import AsyncOpenAI
+        """Close HTTP client and the experiment store"""
+        await self.http_client.aclose()
+        self.experiments.close()
@@ -1,15 +1,30 @@
 import asyncio
-import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import httpx
-from openai import AsyncOpenAI
+from services.llm_gateway import LLMGateway, Priority, get_llm_gateway, set_priority
+from services.job_scheduler import JobScheduler, get_job_scheduler
+from services.engagement_poller import EngagementPoller, EngagementPollConfig
+from services.engagement_cursors import create_engagement_cursors
+from services.engagement_classifier import EngagementClassifier, EngagementClassifierConfig
+from services.rate_limiter import PlatformRateLimiter, RateLimitConfig, CallPriority
+from services.http_transport import create_http_client
 
 logger = logging.getLogger(__name__)
 
+# Credential naming the account a platform's rate limit and engagement cursor belong to
+PLATFORM_ACCOUNT_CREDENTIALS = {
+    "twitter": "twitter_username",
+    "linkedin": "linkedin_person_id",
+    "facebook": "facebook_page_id",
+    "instagram": "instagram_user_id"
+}
+# Pages read per platform in one poll; a longer backlog resumes from the stored paging cursor
+ENGAGEMENT_MAX_PAGES = 5
+
 class SocialPlatform(Enum):
     LINKEDIN = "linkedin"
     TWITTER = "twitter"
@@ -70,13 +85,20 @@ class SocialAnalytics:
     best_posting_times: List[str]
 
 class SocialMediaAgent:
-    def __init__(self, openai_api_key: str, platform_credentials: Dict[str, str], supabase_client=None):
-        self.openai_client = AsyncOpenAI(api_key=openai_api_key)
+    def __init__(self, openai_api_key: str, platform_credentials: Dict[str, str], supabase_client=None,
+                 llm_gateway: Optional[LLMGateway] = None, scheduler: Optional[JobScheduler] = None):
+        self.llm_gateway = llm_gateway or get_llm_gateway(openai_api_key)
+        self.openai_client = self.llm_gateway.for_agent("social")
         self.credentials = platform_credentials
         self.supabase = supabase_client
         self.posts_store: Dict[str, SocialPost] = {}
         self.engagement_store: Dict[str, EngagementItem] = {}
-        self.http_client = httpx.AsyncClient()
+        # Per-host pools, keepalive, DNS cache and timeouts are shared with the other agents
+        self.http_client = create_http_client()
+        
+        # Scheduled posts are durable scheduler jobs rather than sleeping tasks
+        self.scheduler = scheduler or get_job_scheduler(supabase_client)
+        self.scheduler.register("social.publish", self._publish_scheduled_post)
         
         # Platform API endpoints
         self.api_endpoints = {
@@ -86,6 +108,28 @@ class SocialMediaAgent:
             SocialPlatform.INSTAGRAM: "https://graph.instagram.com",
             SocialPlatform.YOUTUBE: "https://www.googleapis.com/youtube/v3"
         }
+        
+        # Every platform call takes a token from its account's bucket; publishes go before replies
+        self.rate_limiter = PlatformRateLimiter(RateLimitConfig.from_env())
+        
+        # High-water marks and seen ids, so a poll only downloads and analyzes new activity
+        self.engagement_cursors = create_engagement_cursors(supabase_client)
+        
+        # Sentiment / needs-reply labels come from a lexicon pre-filter, then batched model requests
+        self.engagement_classifier = EngagementClassifier(self.openai_client, EngagementClassifierConfig.from_env())
+        
+        # Platforms are fetched concurrently, classified in batches and saved in one upsert
+        self.engagement_poller = EngagementPoller(
+            {
+                SocialPlatform.LINKEDIN.value: self._fetch_linkedin_engagement,
+                SocialPlatform.TWITTER.value: self._fetch_twitter_engagement,
+                SocialPlatform.FACEBOOK.value: self._fetch_facebook_engagement,
+                SocialPlatform.INSTAGRAM.value: self._fetch_instagram_engagement
+            },
+            self._analyze_engagement_items,
+            self._store_engagement_items,
+            EngagementPollConfig.from_env()
+        )
 
     async def schedule_post(self, 
                           platform: SocialPlatform,
@@ -159,7 +203,8 @@ class SocialMediaAgent:
                     {"role": "user", "content": optimization_prompt}
                 ],
                 temperature=0.7,
-                max_tokens=500
+                max_tokens=500,
+                cache_ttl=24 * 3600  # same text + platform -> same rewrite
             )
             
             optimized = response.choices[0].message.content.strip()
@@ -181,16 +226,59 @@ class SocialMediaAgent:
         delay = (post.scheduled_time - datetime.now()).total_seconds()
         
         if delay > 0:
-            # Schedule background task
-            asyncio.create_task(self._publish_post_delayed(post, delay))
+            # The payload carries the post so it can be published after a restart
+            post_data = asdict(post)
+            post_data["platform"] = post.platform.value
+            post_data["status"] = post.status.value
+            post_data["scheduled_time"] = post.scheduled_time.isoformat()
+            post_data["created_at"] = post.created_at.isoformat()
+            post_data["published_at"] = None
+            
+            await self.scheduler.schedule(f"post:{post.id}", "social.publish", post.scheduled_time, {"post": post_data})
         else:
             # Publish immediately if scheduled time has passed
             await self.publish_post(post.id)
 
-    async def _publish_post_delayed(self, post: SocialPost, delay: float):
-        """Publish post after delay"""
-        await asyncio.sleep(delay)
-        await self.publish_post(post.id)
+    async def _publish_scheduled_post(self, payload: Dict[str, Any]):
+        """Scheduler handler: publish a post that has come due"""
+        set_priority(Priority.BACKGROUND)
+        
+        post_data = dict(payload["post"])
+        post = self.posts_store.get(post_data["id"])
+        if post is None:
+            post_data["platform"] = SocialPlatform(post_data["platform"])
+            post_data["status"] = PostStatus(post_data["status"])
+            post_data["scheduled_time"] = datetime.fromisoformat(post_data["scheduled_time"])
+            post_data["created_at"] = datetime.fromisoformat(post_data["created_at"])
+            post = SocialPost(**post_data)
+            self.posts_store[post.id] = post
+        
+        if post.status == PostStatus.SCHEDULED:
+            await self.publish_post(post.id)
+
+    async def cancel_scheduled_post(self, post_id: str) -> bool:
+        """Cancel a scheduled post before it is published"""
+        
+        if not await self.scheduler.cancel(f"post:{post_id}"):
+            return False
+        post = self.posts_store.get(post_id)
+        if post:
+            post.status = PostStatus.DRAFT
+            if self.supabase:
+                await self._save_post_to_db(post)
+        return True
+
+    async def reschedule_post(self, post_id: str, scheduled_time: datetime) -> bool:
+        """Move a scheduled post to a new publishing time"""
+        
+        if not await self.scheduler.reschedule(f"post:{post_id}", scheduled_time):
+            return False
+        post = self.posts_store.get(post_id)
+        if post:
+            post.scheduled_time = scheduled_time
+            if self.supabase:
+                await self._save_post_to_db(post)
+        return True
 
     async def publish_post(self, post_id: str) -> bool:
         """Publish a scheduled post"""
@@ -266,7 +354,8 @@ class SocialMediaAgent:
                 }
             }
             
-            response = await self.http_client.post(
+            response = await self._platform_request(
+                SocialPlatform.LINKEDIN, CallPriority.PUBLISH, "POST",
                 f"{self.api_endpoints[SocialPlatform.LINKEDIN]}/ugcPosts",
                 headers=headers,
                 json=payload
@@ -294,7 +383,8 @@ class SocialMediaAgent:
             
             payload = {"text": post.content}
             
-            response = await self.http_client.post(
+            response = await self._platform_request(
+                SocialPlatform.TWITTER, CallPriority.PUBLISH, "POST",
                 f"{self.api_endpoints[SocialPlatform.TWITTER]}/tweets",
                 headers=headers,
                 json=payload
@@ -324,7 +414,8 @@ class SocialMediaAgent:
                 "access_token": access_token
             }
             
-            response = await self.http_client.post(
+            response = await self._platform_request(
+                SocialPlatform.FACEBOOK, CallPriority.PUBLISH, "POST",
                 f"{self.api_endpoints[SocialPlatform.FACEBOOK]}/{page_id}/feed",
                 data=payload
             )
@@ -360,7 +451,8 @@ class SocialMediaAgent:
                 "access_token": access_token
             }
             
-            container_response = await self.http_client.post(
+            container_response = await self._platform_request(
+                SocialPlatform.INSTAGRAM, CallPriority.PUBLISH, "POST",
                 f"{self.api_endpoints[SocialPlatform.INSTAGRAM]}/{user_id}/media",
                 data=container_payload
             )
@@ -374,7 +466,8 @@ class SocialMediaAgent:
                     "access_token": access_token
                 }
                 
-                publish_response = await self.http_client.post(
+                publish_response = await self._platform_request(
+                    SocialPlatform.INSTAGRAM, CallPriority.PUBLISH, "POST",
                     f"{self.api_endpoints[SocialPlatform.INSTAGRAM]}/{user_id}/media_publish",
                     data=publish_payload
                 )
@@ -408,75 +501,138 @@ class SocialMediaAgent:
             logger.error(f"YouTube publish error: {str(e)}")
             return False, None
 
+    async def _platform_request(self,
+                                platform: SocialPlatform,
+                                priority: CallPriority,
+                                method: str,
+                                url: str,
+                                **kwargs) -> httpx.Response:
+        """Send a platform API call under the account's rate limit"""
+        return await self.rate_limiter.send(
+            platform.value,
+            self._account(platform.value),
+            priority,
+            lambda: self.http_client.request(method, url, **kwargs)
+        )
+
     async def monitor_engagement(self) -> List[EngagementItem]:
-        """Monitor and collect engagement across platforms"""
+        """Monitor and collect engagement across platforms
         
-        engagement_items = []
+        A poll takes as long as the slowest platform (capped by the fetch timeout)
+        rather than the sum of every platform's fetch and per-item analysis.
+        """
         
-        for platform in SocialPlatform:
-            try:
-                items = await self._fetch_platform_engagement(platform)
-                engagement_items.extend(items)
-            except Exception as e:
-                logger.error(f"Error monitoring {platform.value} engagement: {str(e)}")
+        return await self.engagement_poller.poll()
+
+    async def _store_engagement_items(self, items: List[EngagementItem]):
+        """Keep analyzed items, save them with a single upsert and move the cursors past them"""
         
-        # Analyze sentiment and determine response requirements
-        for item in engagement_items:
-            await self._analyze_engagement_item(item)
+        processed: Dict[str, List[str]] = {}
+        for item in items:
             self.engagement_store[item.id] = item
+            processed.setdefault(self._cursor_key(item.platform.value), []).append(item.id)
         
-        # Save to database
         if self.supabase:
-            for item in engagement_items:
-                await self._save_engagement_to_db(item)
+            await self._save_engagement_items_to_db(items)
         
-        return engagement_items
+        self.engagement_cursors.commit(processed)
 
-    async def _fetch_platform_engagement(self, platform: SocialPlatform) -> List[EngagementItem]:
-        """Fetch engagement from specific platform"""
-        
-        platform_fetchers = {
-            SocialPlatform.LINKEDIN: self._fetch_linkedin_engagement,
-            SocialPlatform.TWITTER: self._fetch_twitter_engagement,
-            SocialPlatform.FACEBOOK: self._fetch_facebook_engagement,
-            SocialPlatform.INSTAGRAM: self._fetch_instagram_engagement
-        }
+    def _account(self, platform: str) -> str:
+        return self.credentials.get(PLATFORM_ACCOUNT_CREDENTIALS.get(platform, ''), '')
+
+    def _cursor_key(self, platform: str) -> str:
+        """Cursors are kept per platform and account"""
+        return f"{platform}:{self._account(platform)}"
+
+    async def _fetch_graph_edge(self,
+                                platform: SocialPlatform,
+                                url: str,
+                                params: Dict[str, Any],
+                                after: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str], bool]:
+        """(objects, cursor to resume after, whether every page loaded) for up to ENGAGEMENT_MAX_PAGES pages of a Graph API edge"""
+        
+        objects = []
+        for _ in range(ENGAGEMENT_MAX_PAGES):
+            page_params = dict(params, after=after) if after else params
+            response = await self._platform_request(platform, CallPriority.FETCH, "GET", url, params=page_params)
+            if response.status_code != 200:
+                logger.error(f"Graph API request failed: {response.text}")
+                return objects, after, False
+            
+            data = response.json()
+            objects.extend(data.get("data", []))
+            paging = data.get("paging", {})
+            after = paging.get("cursors", {}).get("after") if paging.get("next") else None
+            if not after:
+                break
+        
+        return objects, after, True
+
+    def _advance_graph_cursor(self, key: str, cursor: Dict[str, Any], after: Optional[str], newest: float):
+        """Resume from `after` next poll, or once the backlog is read, only ask for comments newer than `newest`"""
         
-        fetcher = platform_fetchers.get(platform)
-        if fetcher:
-            return await fetcher()
+        if after:
+            self.engagement_cursors.advance(key, after=after, newest=newest)
         else:
-            return []
+            self.engagement_cursors.advance(key, since=int(newest) or cursor.get("since"), after=None, newest=None)
 
     async def _fetch_twitter_engagement(self) -> List[EngagementItem]:
-        """Fetch Twitter engagement"""
+        """Fetch Twitter mentions newer than the stored since_id"""
         try:
+            key = self._cursor_key(SocialPlatform.TWITTER.value)
+            cursor = self.engagement_cursors.get(key)
             headers = {
                 "Authorization": f"Bearer {self.credentials.get('twitter_bearer_token')}"
             }
-            
-            # Fetch mentions and replies
-            response = await self.http_client.get(
-                f"{self.api_endpoints[SocialPlatform.TWITTER]}/users/by/username/{self.credentials.get('twitter_username')}/mentions",
-                headers=headers,
-                params={"tweet.fields": "created_at,author_id,in_reply_to_user_id"}
-            )
-            
-            items = []
-            if response.status_code == 200:
+            params = {"tweet.fields": "created_at,author_id,in_reply_to_user_id", "max_results": 100}
+            if cursor.get("since_id"):
+                params["since_id"] = cursor["since_id"]
+            
+            # Pages run newest to oldest; a backlog longer than one poll resumes from next_token
+            next_token = cursor.get("next_token")
+            newest_id = cursor.get("newest_id")
+            tweets = []
+            complete = True
+            for _ in range(ENGAGEMENT_MAX_PAGES):
+                if next_token:
+                    params["pagination_token"] = next_token
+                response = await self._platform_request(
+                    SocialPlatform.TWITTER, CallPriority.FETCH, "GET",
+                    f"{self.api_endpoints[SocialPlatform.TWITTER]}/users/by/username/{self.credentials.get('twitter_username')}/mentions",
+                    headers=headers,
+                    params=params
+                )
+                if response.status_code != 200:
+                    logger.error(f"Twitter mentions request failed: {response.text}")
+                    complete = False
+                    break
+                
                 data = response.json()
-                for tweet in data.get("data", []):
-                    item = EngagementItem(
-                        id=f"twitter_{tweet['id']}",
-                        platform=SocialPlatform.TWITTER,
-                        type=EngagementType.MENTION,
-                        author=tweet.get("author_id", ""),
-                        content=tweet.get("text", ""),
-                        timestamp=datetime.fromisoformat(tweet["created_at"].replace("Z", "+00:00"))
-                    )
-                    items.append(item)
-            
-            return items
+                meta = data.get("meta", {})
+                newest_id = newest_id or meta.get("newest_id")
+                tweets.extend(data.get("data", []))
+                next_token = meta.get("next_token")
+                if not next_token:
+                    break
+            
+            if complete and next_token:
+                self.engagement_cursors.advance(key, next_token=next_token, newest_id=newest_id)
+            elif complete:
+                self.engagement_cursors.advance(key, since_id=newest_id or cursor.get("since_id"), next_token=None, newest_id=None)
+            
+            items = [
+                EngagementItem(
+                    id=f"twitter_{tweet['id']}",
+                    platform=SocialPlatform.TWITTER,
+                    type=EngagementType.MENTION,
+                    author=tweet.get("author_id", ""),
+                    content=tweet.get("text", ""),
+                    post_id=None,
+                    timestamp=datetime.fromisoformat(tweet["created_at"].replace("Z", "+00:00"))
+                )
+                for tweet in tweets
+            ]
+            return self.engagement_cursors.unseen(key, items, lambda item: item.id)
             
         except Exception as e:
             logger.error(f"Error fetching Twitter engagement: {str(e)}")
@@ -490,7 +646,8 @@ class SocialMediaAgent:
             }
             
             # Fetch social actions (likes, comments, shares)
-            response = await self.http_client.get(
+            response = await self._platform_request(
+                SocialPlatform.LINKEDIN, CallPriority.FETCH, "GET",
                 f"{self.api_endpoints[SocialPlatform.LINKEDIN]}/socialActions",
                 headers=headers,
                 params={"q": "actor", "actor": f"urn:li:person:{self.credentials.get('linkedin_person_id')}"}
@@ -506,126 +663,122 @@ class SocialMediaAgent:
                         type=EngagementType.LIKE,  # Simplified
                         author=action.get("actor", ""),
                         content="",
+                        post_id=None,
                         timestamp=datetime.now()  # Would parse from action data
                     )
                     items.append(item)
             
-            return items
+            # socialActions has no since filter; already processed actions are dropped here
+            key = self._cursor_key(SocialPlatform.LINKEDIN.value)
+            return self.engagement_cursors.unseen(key, items, lambda item: item.id)
             
         except Exception as e:
             logger.error(f"Error fetching LinkedIn engagement: {str(e)}")
             return []
 
     async def _fetch_facebook_engagement(self) -> List[EngagementItem]:
-        """Fetch Facebook engagement"""
+        """Fetch Facebook comments newer than the stored since timestamp"""
         try:
+            key = self._cursor_key(SocialPlatform.FACEBOOK.value)
+            cursor = self.engagement_cursors.get(key)
             page_id = self.credentials.get('facebook_page_id')
             access_token = self.credentials.get('facebook_access_token')
             
-            # Fetch page feed with comments
-            response = await self.http_client.get(
+            # Fetch page feed with only the comments posted since the last complete poll
+            comments_field = "comments"
+            if cursor.get("since"):
+                comments_field = f"comments.since({cursor['since']})"
+            posts, after, complete = await self._fetch_graph_edge(
+                SocialPlatform.FACEBOOK,
                 f"{self.api_endpoints[SocialPlatform.FACEBOOK]}/{page_id}/feed",
-                params={
-                    "fields": "comments{message,from,created_time},likes.summary(true)",
+                {
+                    "fields": f"{comments_field}{{message,from,created_time}},likes.summary(true)",
                     "access_token": access_token
-                }
+                },
+                cursor.get("after")
             )
             
             items = []
-            if response.status_code == 200:
-                data = response.json()
-                for post in data.get("data", []):
-                    for comment in post.get("comments", {}).get("data", []):
-                        item = EngagementItem(
-                            id=f"facebook_{comment['id']}",
-                            platform=SocialPlatform.FACEBOOK,
-                            type=EngagementType.COMMENT,
-                            author=comment.get("from", {}).get("name", ""),
-                            content=comment.get("message", ""),
-                            post_id=post["id"],
-                            timestamp=datetime.fromisoformat(comment["created_time"].replace("+0000", "+00:00"))
-                        )
-                        items.append(item)
-            
-            return items
+            newest = cursor.get("newest") or 0
+            for post in posts:
+                for comment in post.get("comments", {}).get("data", []):
+                    item = EngagementItem(
+                        id=f"facebook_{comment['id']}",
+                        platform=SocialPlatform.FACEBOOK,
+                        type=EngagementType.COMMENT,
+                        author=comment.get("from", {}).get("name", ""),
+                        content=comment.get("message", ""),
+                        post_id=post["id"],
+                        timestamp=datetime.fromisoformat(comment["created_time"].replace("+0000", "+00:00"))
+                    )
+                    newest = max(newest, item.timestamp.timestamp())
+                    items.append(item)
+            
+            if complete:
+                self._advance_graph_cursor(key, cursor, after, newest)
+            return self.engagement_cursors.unseen(key, items, lambda item: item.id)
             
         except Exception as e:
             logger.error(f"Error fetching Facebook engagement: {str(e)}")
             return []
 
     async def _fetch_instagram_engagement(self) -> List[EngagementItem]:
-        """Fetch Instagram engagement"""
+        """Fetch Instagram comments, skipping those older than the stored since timestamp"""
         try:
+            key = self._cursor_key(SocialPlatform.INSTAGRAM.value)
+            cursor = self.engagement_cursors.get(key)
             user_id = self.credentials.get('instagram_user_id')
             access_token = self.credentials.get('instagram_access_token')
             
-            # Fetch media comments
-            media_response = await self.http_client.get(
+            # Fetch media comments; the comments edge has no since filter, so older ones are dropped here
+            media_list, after, complete = await self._fetch_graph_edge(
+                SocialPlatform.INSTAGRAM,
                 f"{self.api_endpoints[SocialPlatform.INSTAGRAM]}/{user_id}/media",
-                params={
+                {
                     "fields": "id,comments{text,username,timestamp}",
                     "access_token": access_token
-                }
+                },
+                cursor.get("after")
             )
             
             items = []
-            if media_response.status_code == 200:
-                data = media_response.json()
-                for media in data.get("data", []):
-                    for comment in media.get("comments", {}).get("data", []):
-                        item = EngagementItem(
-                            id=f"instagram_{comment['id']}",
-                            platform=SocialPlatform.INSTAGRAM,
-                            type=EngagementType.COMMENT,
-                            author=comment.get("username", ""),
-                            content=comment.get("text", ""),
-                            post_id=media["id"],
-                            timestamp=datetime.fromisoformat(comment["timestamp"].replace("+0000", "+00:00"))
-                        )
-                        items.append(item)
-            
-            return items
+            since = cursor.get("since") or 0
+            newest = cursor.get("newest") or 0
+            for media in media_list:
+                for comment in media.get("comments", {}).get("data", []):
+                    timestamp = datetime.fromisoformat(comment["timestamp"].replace("+0000", "+00:00"))
+                    newest = max(newest, timestamp.timestamp())
+                    if timestamp.timestamp() < since:
+                        continue
+                    item = EngagementItem(
+                        id=f"instagram_{comment['id']}",
+                        platform=SocialPlatform.INSTAGRAM,
+                        type=EngagementType.COMMENT,
+                        author=comment.get("username", ""),
+                        content=comment.get("text", ""),
+                        post_id=media["id"],
+                        timestamp=timestamp
+                    )
+                    items.append(item)
+            
+            if complete:
+                self._advance_graph_cursor(key, cursor, after, newest)
+            return self.engagement_cursors.unseen(key, items, lambda item: item.id)
             
         except Exception as e:
             logger.error(f"Error fetching Instagram engagement: {str(e)}")
             return []
 
-    async def _analyze_engagement_item(self, item: EngagementItem):
-        """Analyze engagement for sentiment and response requirements"""
-        
-        analysis_prompt = f"""
-        Analyze this social media engagement:
-        Platform: {item.platform.value}
-        Type: {item.type.value}
-        Author: {item.author}
-        Content: {item.content}
-        
-        Determine:
-        1. Sentiment (positive/negative/neutral)
-        2. Whether it requires a response (true/false)
-        
-        Respond with JSON: {{"sentiment": "positive/negative/neutral", "requires_response": true/false}}
-        """
-        
-        try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a social media engagement analyst. Always respond with valid JSON."},
-                    {"role": "user", "content": analysis_prompt}
-                ],
-                temperature=0.3,
-                max_tokens=100
-            )
-            
-            analysis = json.loads(response.choices[0].message.content)
-            item.sentiment = analysis.get("sentiment", "neutral")
-            item.requires_response = analysis.get("requires_response", False)
-            
-        except Exception as e:
-            logger.error(f"Error analyzing engagement: {str(e)}")
-            item.sentiment = "neutral"
-            item.requires_response = False
+    async def _analyze_engagement_items(self, items: List[EngagementItem]):
+        """Label engagement items with sentiment and whether they need a reply"""
+        
+        labels = await self.engagement_classifier.classify([
+            {"id": item.id, "text": item.content, "kind": item.type.value} for item in items
+        ])
+        for item in items:
+            label = labels.get(item.id, {})
+            item.sentiment = label.get("sentiment", "neutral")
+            item.requires_response = label.get("requires_response", False)
 
     async def respond_to_engagement(self, engagement_id: str, custom_response: str = None) -> bool:
         """Respond to an engagement item"""
@@ -720,7 +873,8 @@ class SocialMediaAgent:
                 "reply": {"in_reply_to_tweet_id": tweet_id}
             }
             
-            response = await self.http_client.post(
+            response = await self._platform_request(
+                SocialPlatform.TWITTER, CallPriority.REPLY, "POST",
                 f"{self.api_endpoints[SocialPlatform.TWITTER]}/tweets",
                 headers=headers,
                 json=payload
@@ -765,7 +919,8 @@ class SocialMediaAgent:
                 "access_token": access_token
             }
             
-            response = await self.http_client.post(
+            response = await self._platform_request(
+                SocialPlatform.FACEBOOK, CallPriority.REPLY, "POST",
                 f"{self.api_endpoints[SocialPlatform.FACEBOOK]}/{comment_id}/comments",
                 data=payload
             )
@@ -787,7 +942,8 @@ class SocialMediaAgent:
                 "access_token": access_token
             }
             
-            response = await self.http_client.post(
+            response = await self._platform_request(
+                SocialPlatform.INSTAGRAM, CallPriority.REPLY, "POST",
                 f"{self.api_endpoints[SocialPlatform.INSTAGRAM]}/{comment_id}/replies",
                 data=payload
             )
@@ -875,25 +1031,28 @@ class SocialMediaAgent:
     async def auto_engage(self, hours_lookback: int = 24) -> Dict[str, int]:
         """Automatically engage with relevant content"""
         
-        # Fetch recent mentions and engagement opportunities
-        recent_engagement = await self.monitor_engagement()
+        # Fetch new mentions and engagement opportunities
+        await self.monitor_engagement()
         
-        # Filter for items requiring response from last N hours
-        cutoff_time = datetime.now() - timedelta(hours=hours_lookback)
+        # Filter for items requiring response from last N hours; polls only return new
+        # items, so anything still unanswered from earlier polls comes from the store
+        # (platform timestamps are timezone-aware, LinkedIn's are local, so compare as aware)
+        cutoff_time = datetime.now().astimezone() - timedelta(hours=hours_lookback)
         pending_responses = [
-            item for item in recent_engagement
-            if item.requires_response and not item.responded and item.timestamp >= cutoff_time
+            item for item in self.engagement_store.values()
+            if item.requires_response and not item.responded and item.timestamp.astimezone() >= cutoff_time
         ]
         
-        # Auto-respond to high-priority items
-        responses_sent = 0
-        for item in pending_responses:
+        # Auto-respond to high-priority items; replies queue behind publishes in the
+        # rate limiter, so they can all be started at once
+        async def respond(item: EngagementItem) -> bool:
             try:
-                success = await self.respond_to_engagement(item.id)
-                if success:
-                    responses_sent += 1
+                return await self.respond_to_engagement(item.id)
             except Exception as e:
                 logger.error(f"Error auto-responding to {item.id}: {str(e)}")
+                return False
+        
+        responses_sent = sum(await asyncio.gather(*[respond(item) for item in pending_responses]))
         
         return {
             "pending_responses": len(pending_responses),
@@ -927,16 +1086,29 @@ class SocialMediaAgent:
             return
         
         try:
-            engagement_data = asdict(engagement)
-            engagement_data["platform"] = engagement.platform.value
-            engagement_data["type"] = engagement.type.value
-            engagement_data["timestamp"] = engagement.timestamp.isoformat()
-            
-            self.supabase.table('social_engagement').upsert(engagement_data).execute()
+            self.supabase.table('social_engagement').upsert(self._engagement_row(engagement)).execute()
             
         except Exception as e:
             logger.error(f"Error saving engagement to database: {str(e)}")
 
+    async def _save_engagement_items_to_db(self, items: List[EngagementItem]):
+        """Upsert many engagement items in one request"""
+        if not self.supabase or not items:
+            return
+        
+        try:
+            self.supabase.table('social_engagement').upsert([self._engagement_row(item) for item in items]).execute()
+            
+        except Exception as e:
+            logger.error(f"Error saving {len(items)} engagement items to database: {str(e)}")
+
+    def _engagement_row(self, engagement: EngagementItem) -> Dict[str, Any]:
+        engagement_data = dict(vars(engagement))
+        engagement_data["platform"] = engagement.platform.value
+        engagement_data["type"] = engagement.type.value
+        engagement_data["timestamp"] = engagement.timestamp.isoformat()
+        return engagement_data
+
     def get_post(self, post_id: str) -> Optional[SocialPost]:
         """Get specific post by ID"""
         return self.posts_store.get(post_id)
@@ -959,5 +1131,7 @@ class SocialMediaAgent:
         return posts[:limit]
 
     async def close(self):
-        """Close HTTP client"""
+        """Close HTTP client, classifier workers and the cursor store"""
         await self.http_client.aclose()
+        await self.engagement_classifier.close()
+        self.engagement_cursors.close()
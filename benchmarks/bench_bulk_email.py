@@ -0,0 +1,84 @@
+# benchmarks/bench_bulk_email.py
+#
+# Compares the previous one-request-per-contact SendGrid sending with
+# services.sendgrid_bulk against the in-process fake SendGrid server
+# (benchmarks/fake_sendgrid.py), with simulated network latency.
+#
+#   python benchmarks/bench_bulk_email.py [--contacts N] [--latency-ms MS]
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+
+from benchmarks.fake_sendgrid import create_app
+from services.sendgrid_bulk import SendGridBulkSender, BulkRecipient
+
+BASE_URL = "http://fake-sendgrid/v3"
+HTML = "<p>Hi {{first_name}}, here is what's new at {{company}}.</p>"
+
+def make_recipients(count: int):
+    return [
+        BulkRecipient(
+            message_id=f"msg_bench_{i}",
+            email=f"contact{i}@example.com",
+            name=f"Contact {i}",
+            substitutions={"{{first_name}}": f"Contact{i}", "{{company}}": f"Company {i % 50}"}
+        )
+        for i in range(count)
+    ]
+
+async def send_sequential(client: httpx.AsyncClient, recipients) -> int:
+    """EmailAutomationAgent's original path: one personalized request per contact, awaited in turn"""
+    sent = 0
+    for recipient in recipients:
+        html = HTML
+        for tag, value in recipient.substitutions.items():
+            html = html.replace(tag, value)
+        response = await client.post(f"{BASE_URL}/mail/send", json={
+            "personalizations": [{"to": [{"email": recipient.email}], "subject": "News"}],
+            "from": {"email": "noreply@example.com", "name": "Marketing Team"},
+            "content": [{"type": "text/html", "value": html}]
+        })
+        sent += response.status_code == 202
+    return sent
+
+async def send_bulk(client: httpx.AsyncClient, recipients) -> int:
+    sender = SendGridBulkSender(client, "bench", base_url=BASE_URL, requests_per_minute=0)
+    results = await sender.send(recipients, HTML, "noreply@example.com", "Marketing Team", subject="News")
+    return sum(result.accepted for result in results.values())
+
+async def run(contacts: int, latency_ms: float, sequential_cap: int):
+    recipients = make_recipients(contacts)
+    print(f"{'mode':<12}{'contacts':>10}{'requests':>10}{'sent':>8}{'seconds':>10}{'contacts/s':>12}")
+
+    for mode, func, subset in (
+        ("sequential", send_sequential, recipients[:sequential_cap]),
+        ("bulk", send_bulk, recipients),
+    ):
+        app = create_app(latency_ms=latency_ms)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as client:
+            start = time.perf_counter()
+            sent = await func(client, subset)
+            elapsed = time.perf_counter() - start
+        print(
+            f"{mode:<12}{len(subset):>10}{app.state.counters['requests']:>10}{sent:>8}"
+            f"{elapsed:>10.2f}{len(subset) / elapsed:>12.0f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contacts", type=int, default=10000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--sequential-cap", type=int, default=500,
+                        help="contacts sent on the sequential path (it is slow by design)")
+    args = parser.parse_args()
+    asyncio.run(run(args.contacts, args.latency_ms, args.sequential_cap))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/bench_contact_extraction.py
+#
+# Compares the previous BeautifulSoup contact extraction with services.contact_extraction
+# on the saved HTML fixtures in tests/fixtures/html.
+#
+#   python benchmarks/bench_contact_extraction.py [--repeat N]
+
+import argparse
+import os
+import re
+import sys
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bs4 import BeautifulSoup
+
+from services.contact_extraction import extract_contacts, SelectolaxParser, lxml_html
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures", "html")
+
+def legacy_extract(html: bytes) -> List[Dict]:
+    """WebScraper's original extraction: full soup, soup.text regex, per-email tree search"""
+    soup = BeautifulSoup(html, 'html.parser')
+    emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', soup.text)
+
+    contacts = []
+    for email in emails:
+        contact = {'email': email}
+        email_element = soup.find(string=re.compile(email))
+        if email_element:
+            parent = email_element.parent
+            for text in parent.find_all_next(string=True, limit=10):
+                text = text.strip()
+                if len(text) > 2 and text not in email:
+                    if any(title in text.lower() for title in ['ceo', 'president', 'director', 'manager', 'head']):
+                        contact['job_title'] = text
+                    elif len(text.split()) == 2 and text[0].isupper():
+                        contact['name'] = text
+        contacts.append(contact)
+    return contacts
+
+def best_of(func: Callable[[bytes], list], html: bytes, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(html)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engines: Dict[str, Callable[[bytes], list]] = {"bs4 (legacy)": legacy_extract}
+    engines["stdlib"] = lambda html: extract_contacts(html, backend="stdlib")
+    if lxml_html is not None:
+        engines["lxml"] = lambda html: extract_contacts(html, backend="lxml")
+    if SelectolaxParser is not None:
+        engines["selectolax"] = lambda html: extract_contacts(html, backend="selectolax")
+
+    print(f"{'fixture':<20}{'size':>10}  {'engine':<14}{'contacts':>9}{'best ms':>11}{'speedup':>9}")
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+            html = f.read()
+
+        baseline = None
+        for engine, func in engines.items():
+            elapsed = best_of(func, html, args.repeat)
+            baseline = baseline or elapsed
+            print(
+                f"{name:<20}{len(html):>10}  {engine:<14}{len(func(html)):>9}"
+                f"{elapsed * 1000:>11.2f}{baseline / elapsed:>8.1f}x"
+            )
+
+if __name__ == "__main__":
+    main()
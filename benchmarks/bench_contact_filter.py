@@ -0,0 +1,94 @@
+# benchmarks/bench_contact_filter.py
+#
+# Compares EmailAutomationAgent's previous full-scan _filter_contacts with
+# services.contact_index on a synthetic contact list.
+#
+#   python benchmarks/bench_contact_filter.py [--contacts N] [--repeat N]
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.contact_index import IndexedContactStore
+
+TAGS = [f"tag{i}" for i in range(50)]
+BASE = datetime(2024, 1, 1)
+
+def legacy_filter(contacts: Dict[str, Any], filter_criteria: Dict[str, Any]) -> List[Any]:
+    """The original _filter_contacts: one pass over every contact per campaign"""
+    filtered = []
+    for contact in list(contacts.values()):
+        if not contact.subscribed:
+            continue
+        match = True
+        if "tags" in filter_criteria:
+            if not any(tag in contact.tags for tag in filter_criteria["tags"]):
+                match = False
+        if "company" in filter_criteria and filter_criteria["company"]:
+            if filter_criteria["company"].lower() not in contact.company.lower():
+                match = False
+        if "created_after" in filter_criteria:
+            if contact.created_at < datetime.fromisoformat(filter_criteria["created_after"]):
+                match = False
+        if match:
+            filtered.append(contact)
+    return filtered
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contacts", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    store = IndexedContactStore()
+    start = time.perf_counter()
+    for i in range(args.contacts):
+        store[f"c{i}"] = SimpleNamespace(
+            id=f"c{i}",
+            tags=rng.sample(TAGS, 3),
+            company=f"Company {i % 5000}",
+            subscribed=i % 10 != 0,
+            created_at=BASE + timedelta(minutes=i)
+        )
+    print(f"indexed {args.contacts} contacts in {time.perf_counter() - start:.1f}s")
+
+    filters = {
+        "tags": {"tags": ["tag1", "tag2"]},
+        "tags+recent": {"tags": ["tag1"], "created_after": (BASE + timedelta(minutes=args.contacts // 2)).isoformat()},
+        "tags+company+recent": {
+            "tags": ["tag1", "tag2"],
+            "company": "company 12",
+            "created_after": (BASE + timedelta(minutes=args.contacts // 2)).isoformat()
+        },
+    }
+
+    print(f"{'filter':<22}{'matches':>9}{'scan ms':>10}{'index ms':>10}{'speedup':>9}")
+    for name, criteria in filters.items():
+        start = time.perf_counter()
+        expected = legacy_filter(store, criteria)
+        scan = time.perf_counter() - start
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = store.query(
+                tags=criteria.get("tags"),
+                company=criteria.get("company"),
+                created_after=criteria.get("created_after")
+            )
+            timings.append(time.perf_counter() - start)
+        assert [c.id for c in result] == [c.id for c in expected]
+
+        indexed = min(timings)
+        print(f"{name:<22}{len(result):>9}{scan * 1000:>10.1f}{indexed * 1000:>10.1f}{scan / indexed:>8.0f}x")
+
+if __name__ == "__main__":
+    main()
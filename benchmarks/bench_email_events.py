@@ -0,0 +1,114 @@
+# benchmarks/bench_email_events.py
+#
+# Posts SendGrid-style event batches to a webhook endpoint backed by
+# services.email_events and reports request latency and end-to-end event throughput.
+# The handler folds events into an IndexedMessageStore, as the email agent does.
+#
+#   python benchmarks/bench_email_events.py [--events N] [--batch N] [--concurrency N]
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.email_events import EmailEventPipeline, EmailEventConfig, SIGNATURE_HEADER, TIMESTAMP_HEADER
+from services.engagement_store import EngagementStore
+from services.message_index import IndexedMessageStore
+
+RANK = {"sent": 0, "delivered": 1, "opened": 2, "clicked": 3}
+EVENT_STATUS = {"delivered": "delivered", "open": "opened", "click": "clicked"}
+
+def make_store(messages: int) -> IndexedMessageStore:
+    store = IndexedMessageStore()
+    store.engagement = EngagementStore()
+    for i in range(messages):
+        store[f"m{i}"] = SimpleNamespace(id=f"m{i}", campaign_id=f"camp{i % 50}", contact_id=f"c{i}", status="sent", sent_at=None)
+    return store
+
+def make_handler(store: IndexedMessageStore):
+    async def apply(events):
+        latest = {}
+        for event in events:
+            message = store.get(event.get("message_id"))
+            status = EVENT_STATUS.get(event.get("event"))
+            if message is None or status is None:
+                continue
+            if RANK[status] > RANK[latest.get(message.id, message.status)]:
+                latest[message.id] = status
+        for message_id, status in latest.items():
+            store.set_status(store[message_id], status)
+    return apply
+
+def create_app(pipeline: EmailEventPipeline) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/events", status_code=202)
+    async def events(request: Request):
+        payload = await request.body()
+        if not pipeline.verify(payload, request.headers.get(SIGNATURE_HEADER), request.headers.get(TIMESTAMP_HEADER)):
+            raise HTTPException(status_code=403)
+        if not pipeline.submit(payload):
+            raise HTTPException(status_code=503)
+        return {"status": "queued"}
+
+    return app
+
+def make_bodies(events: int, messages: int, batch: int):
+    rng = random.Random(0)
+    kinds = ["delivered"] * 5 + ["open"] * 3 + ["click"]
+    stream = [
+        {"event": rng.choice(kinds), "message_id": f"m{rng.randrange(messages)}", "timestamp": 1700000000 + i}
+        for i in range(events)
+    ]
+    return [json.dumps(stream[i:i + batch]).encode() for i in range(0, events, batch)]
+
+async def run(args):
+    store = make_store(args.messages)
+    pipeline = EmailEventPipeline(make_handler(store), EmailEventConfig(allow_unsigned=True))
+    bodies = make_bodies(args.events, args.messages, args.batch)
+    latencies = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(pipeline)), base_url="http://bench") as client:
+        pending = iter(bodies)
+
+        async def sender():
+            for payload in pending:
+                started = time.perf_counter()
+                response = await client.post("/events", content=payload)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 202, response.status_code
+
+        started = time.perf_counter()
+        await asyncio.gather(*[sender() for _ in range(args.concurrency)])
+        accepted = time.perf_counter() - started
+        await pipeline.drain()
+        applied = time.perf_counter() - started
+
+    await pipeline.close()
+    latencies.sort()
+    stats = pipeline.get_stats()
+    print(f"{args.events} events in {len(bodies)} requests of {args.batch}, {args.concurrency} concurrent senders")
+    print(f"request latency: p50 {latencies[len(latencies) // 2] * 1000:.2f} ms   "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+    print(f"accepted: {args.events / accepted:,.0f} events/s   applied: {args.events / applied:,.0f} events/s   "
+          f"({stats['batches']} handler batches)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--messages", type=int, default=50_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# benchmarks/bench_engagement_analytics.py
+#
+# Compares per-message-object analytics (the previous EmailAutomationAgent approach)
+# with services.engagement_store group-bys, and the memory each keeps per message.
+#
+#   python benchmarks/bench_engagement_analytics.py [--messages N] [--campaigns N]
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.engagement_store import EngagementStore
+
+STATUSES = ["scheduled", "sent", "delivered", "opened", "clicked", "bounced"]
+ENGAGED = ["opened", "clicked"]
+
+@dataclass
+class Message:
+    """Shape of EmailAutomationAgent.EmailMessage"""
+    id: str
+    campaign_id: str
+    contact_id: str
+    template_id: str
+    subject_line: str
+    content: str
+    scheduled_at: datetime
+    sent_at: Optional[datetime]
+    status: str
+    tracking_data: Dict[str, Any] = None
+
+def make_messages(count: int, campaigns: int, contacts: int):
+    rng = random.Random(0)
+    base = datetime(2024, 1, 1)
+    content = "<p>Hi there, here is this week's update.</p>" * 40
+    for i in range(count):
+        status = rng.choice(STATUSES)
+        sent_at = None if status == "scheduled" else base + timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+        yield Message(
+            id=f"msg_{i}",
+            campaign_id=f"campaign_{i % campaigns}",
+            contact_id=f"contact_{rng.randrange(contacts)}",
+            template_id="template_1",
+            subject_line=f"Update for contact {i}",
+            content=content + str(i),
+            scheduled_at=base,
+            sent_at=sent_at,
+            status=status,
+            tracking_data={"sendgrid_message_id": f"sg{i}"}
+        )
+
+def legacy_campaign_counts(messages):
+    counts: Dict[str, Dict[str, int]] = {}
+    for m in messages:
+        c = counts.setdefault(m.campaign_id, {"sent": 0, "delivered": 0, "opened": 0, "clicked": 0})
+        c["sent"] += m.sent_at is not None
+        c["delivered"] += m.status in ("delivered", "opened", "clicked")
+        c["opened"] += m.status in ENGAGED
+        c["clicked"] += m.status == "clicked"
+    return counts
+
+def legacy_histograms(messages, contact_ids):
+    selected = [m for m in messages if m.contact_id in contact_ids]
+    days, hours = {}, {}
+    for m in selected:
+        if m.sent_at and m.status in ENGAGED:
+            day = m.sent_at.strftime("%A")
+            days[day] = days.get(day, 0) + 1
+            hours[m.sent_at.hour] = hours.get(m.sent_at.hour, 0) + 1
+    return len(selected), days, hours
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--campaigns", type=int, default=500)
+    parser.add_argument("--contacts", type=int, default=50_000)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    messages = list(make_messages(args.messages, args.campaigns, args.contacts))
+    object_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    store = EngagementStore()
+    tracemalloc.start()
+    for m in messages:
+        store.record(m.id, m.campaign_id, m.contact_id, m.status, m.sent_at)
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{args.messages} messages")
+    print(f"memory: objects {object_bytes / args.messages:,.0f} B/message, "
+          f"columns {store.column_bytes() / args.messages:,.1f} B/message, "
+          f"columns + id index {store.memory_bytes() / args.messages:,.0f} B/message "
+          f"(tracemalloc: {store_bytes / args.messages:,.0f} B/message)")
+
+    groups = {"delivered": ["delivered", "opened", "clicked"], "opened": ENGAGED, "clicked": ["clicked"]}
+    legacy_counts, legacy_time = timed(lambda: legacy_campaign_counts(messages))
+    counts, store_time = timed(lambda: store.campaign_counts(groups))
+    assert all(counts[c][k] == v for c, metrics in legacy_counts.items() for k, v in metrics.items())
+    print(f"campaign group-by:   objects {legacy_time * 1000:8.1f} ms   columns {store_time * 1000:8.1f} ms")
+
+    contact_ids = {f"contact_{i}" for i in range(0, args.contacts, 3)}
+    (legacy_total, legacy_days, _), legacy_time = timed(lambda: legacy_histograms(messages, contact_ids))
+    (total, days, _), store_time = timed(lambda: store.engagement_histograms(ENGAGED, contact_ids))
+    assert total == legacy_total and sum(days) == sum(legacy_days.values())
+    print(f"day/hour histograms: objects {legacy_time * 1000:8.1f} ms   columns {store_time * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
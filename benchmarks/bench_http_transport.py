@@ -0,0 +1,122 @@
+# benchmarks/bench_http_transport.py
+#
+# Sends GET requests to a local keep-alive HTTP server (a stand-in for a provider
+# API) and reports p50/p99 latency for three client setups: a new AsyncClient per
+# request, one default httpx.AsyncClient, and clients from
+# services.http_transport.create_http_client sharing the per-host pools.
+# The server is addressed as "localhost" so name resolution is part of the cost.
+#
+#   python benchmarks/bench_http_transport.py [--requests N] [--concurrency N] [--delay MS]
+
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.http_transport import PooledTransport, TransportConfig, _SharedTransport
+
+BODY = b'{"status": "ok"}'
+
+class LocalServer:
+    """Keep-alive HTTP/1.1 server answering every request after `delay` seconds"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.connections = 0
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0, backlog=1024)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n%s" % (len(BODY), BODY))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+async def measure(send, requests: int, concurrency: int):
+    latencies = []
+    pending = iter(range(requests))
+
+    async def sender():
+        for _ in pending:
+            started = time.perf_counter()
+            response = await send()
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.status_code
+
+    started = time.perf_counter()
+    await asyncio.gather(*[sender() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return latencies, elapsed
+
+async def run(args):
+    async with LocalServer(args.delay / 1000) as server:
+        url = f"http://localhost:{server.port}/v1/ping"
+
+        async def fresh_client():
+            async with httpx.AsyncClient() as client:
+                return await client.get(url)
+
+        default_client = httpx.AsyncClient()
+        transport = PooledTransport(TransportConfig(max_connections_per_host=args.concurrency,
+                                                    max_keepalive_per_host=args.concurrency))
+        # Two agents' clients over the same pools, as the email and social agents run
+        shared_clients = [httpx.AsyncClient(transport=_SharedTransport(transport), timeout=transport.config.timeout())
+                          for _ in range(2)]
+        turn = itertools.count()
+
+        async def shared_client():
+            return await shared_clients[next(turn) % 2].get(url)
+
+        setups = [
+            ("client per request", fresh_client),
+            ("one default AsyncClient", lambda: default_client.get(url)),
+            ("shared per-host pools", shared_client),
+        ]
+        print(f"{args.requests} requests, {args.concurrency} concurrent, server delay {args.delay} ms")
+        for name, send in setups:
+            await measure(send, min(args.requests, 200), args.concurrency)  # warm up
+            connections = server.connections
+            latencies, elapsed = await measure(send, args.requests, args.concurrency)
+            print(f"{name:<26} p50 {latencies[len(latencies) // 2] * 1000:7.2f} ms   "
+                  f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.2f} ms   "
+                  f"{args.requests / elapsed:8,.0f} req/s   {server.connections - connections} new connections")
+
+        stats = transport.get_stats()
+        print(f"shared transport: {stats['pools']} pool(s), dns {stats['dns']}")
+        await default_client.aclose()
+        for client in shared_clients:
+            await client.aclose()
+        await transport.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=0.0, help="server think time per request in ms")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_template_render.py
+#
+# Compares EmailAutomationAgent's previous str.replace personalization loop with
+# services.template_renderer on a newsletter-sized template.
+#
+#   python benchmarks/bench_template_render.py [--contacts N] [--repeat N]
+
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from services.template_renderer import TemplateRenderer
+
+SECTION = (
+    "<tr><td style=\"padding:24px;font-family:Arial,sans-serif\">"
+    "<h2>What's new for {{company}}</h2>"
+    "<p>Hi {{first_name}}, teams like yours at {{company}} are shipping faster with our latest release. "
+    "Here is a short tour of the features we think you'll like, {{first_name}}.</p>"
+    "<p>Questions? Reply to this email or reach your account manager, {{account_manager}}.</p>"
+    "</td></tr>"
+)
+TEMPLATE = SimpleNamespace(
+    id="template_bench",
+    subject_line="{{first_name}}, your {{plan}} update for {{company}}",
+    html_content="<html><body><table>" + SECTION * 12 + "<p>Sent to {{email}}</p></table></body></html>",
+)
+
+def contact_values(count: int) -> List[Dict[str, str]]:
+    return [
+        {
+            "first_name": f"Contact{i}",
+            "last_name": f"Last{i}",
+            "company": f"Company {i % 500}",
+            "email": f"contact{i}@example.com",
+            "plan": "Growth",
+            "account_manager": "Sam",
+            "region": "EMEA",
+            "signup_source": "webinar",
+        }
+        for i in range(count)
+    ]
+
+def legacy_render_all(rows: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """The original _personalize_email: one str.replace per variable over subject and body"""
+    rendered = []
+    for personalization in rows:
+        personalized_subject = TEMPLATE.subject_line
+        personalized_html = TEMPLATE.html_content
+        for var_name, var_value in personalization.items():
+            placeholder = f"{{{{{var_name}}}}}"
+            personalized_subject = personalized_subject.replace(placeholder, str(var_value))
+            personalized_html = personalized_html.replace(placeholder, str(var_value))
+        rendered.append({"subject": personalized_subject, "html": personalized_html})
+    return rendered
+
+def best_of(func: Callable[[], list], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contacts", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = contact_values(args.contacts)
+    renderer = TemplateRenderer()
+    assert renderer.render_many(TEMPLATE, rows) == legacy_render_all(rows)
+
+    engines = {
+        "str.replace (legacy)": lambda: legacy_render_all(rows),
+        "compiled render": lambda: [renderer.render(TEMPLATE, values) for values in rows],
+        "compiled render_many": lambda: renderer.render_many(TEMPLATE, rows),
+    }
+
+    print(f"template: {len(TEMPLATE.html_content)} bytes, {len(renderer.variables(TEMPLATE))} variables, "
+          f"{args.contacts} contacts")
+    print(f"{'engine':<24}{'best ms':>10}{'us/contact':>12}{'speedup':>9}")
+    baseline = None
+    for engine, func in engines.items():
+        elapsed = best_of(func, args.repeat)
+        baseline = baseline or elapsed
+        print(f"{engine:<24}{elapsed * 1000:>10.1f}{elapsed / args.contacts * 1e6:>12.2f}{baseline / elapsed:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
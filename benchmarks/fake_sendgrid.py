@@ -0,0 +1,93 @@
+# benchmarks/fake_sendgrid.py
+#
+# Local stand-in for SendGrid's v3 /mail/send and /marketing/contacts endpoints, for
+# offline benchmarks and tests. It validates the personalization and contacts-per-upsert
+# limits, simulates per-request latency and optional 429 throttling, and counts the
+# recipients and contacts it accepted.
+#
+#   uvicorn benchmarks.fake_sendgrid:app --port 8025
+#   FAKE_SENDGRID_LATENCY_MS=80 FAKE_SENDGRID_THROTTLE_EVERY=10 uvicorn benchmarks.fake_sendgrid:app
+
+import asyncio
+import os
+import uuid
+from typing import Any, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+MAX_PERSONALIZATIONS = 1000
+MAX_CONTACTS_PER_UPSERT = 30000
+
+def create_app(latency_ms: float = 0.0, throttle_every: int = 0) -> FastAPI:
+    """Fake SendGrid app; every `throttle_every`-th request gets a 429 when set"""
+
+    app = FastAPI(title="Fake SendGrid")
+    app.state.counters = {"requests": 0, "accepted_requests": 0, "recipients": 0, "throttled": 0,
+                          "contact_upserts": 0, "contacts": 0}
+
+    @app.post("/v3/mail/send")
+    async def mail_send(request: Request):
+        counters: Dict[str, int] = app.state.counters
+        counters["requests"] += 1
+
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+        if throttle_every and counters["requests"] % throttle_every == 0:
+            counters["throttled"] += 1
+            return JSONResponse(
+                status_code=429,
+                content={"errors": [{"message": "Too many requests"}]},
+                headers={"Retry-After": "0"}
+            )
+
+        payload: Dict[str, Any] = await request.json()
+        personalizations = payload.get("personalizations") or []
+        if not personalizations or len(personalizations) > MAX_PERSONALIZATIONS:
+            return JSONResponse(
+                status_code=400,
+                content={"errors": [{
+                    "field": "personalizations",
+                    "message": f"must contain between 1 and {MAX_PERSONALIZATIONS} items"
+                }]}
+            )
+        if any(not p.get("to") for p in personalizations):
+            return JSONResponse(status_code=400, content={"errors": [{"field": "personalizations.to"}]})
+
+        counters["accepted_requests"] += 1
+        counters["recipients"] += sum(len(p["to"]) for p in personalizations)
+        return Response(status_code=202, headers={"X-Message-Id": uuid.uuid4().hex[:22]})
+
+    @app.put("/v3/marketing/contacts")
+    async def upsert_contacts(request: Request):
+        counters: Dict[str, int] = app.state.counters
+        counters["requests"] += 1
+
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+        contacts = (await request.json()).get("contacts") or []
+        if not contacts or len(contacts) > MAX_CONTACTS_PER_UPSERT or any(not c.get("email") for c in contacts):
+            return JSONResponse(
+                status_code=400,
+                content={"errors": [{
+                    "field": "contacts",
+                    "message": f"must contain between 1 and {MAX_CONTACTS_PER_UPSERT} contacts with an email"
+                }]}
+            )
+
+        counters["contact_upserts"] += 1
+        counters["contacts"] += len(contacts)
+        return JSONResponse(status_code=202, content={"job_id": uuid.uuid4().hex})
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.counters
+
+    return app
+
+app = create_app(
+    latency_ms=float(os.getenv("FAKE_SENDGRID_LATENCY_MS", "0")),
+    throttle_every=int(os.getenv("FAKE_SENDGRID_THROTTLE_EVERY", "0"))
+)
@@ -5,7 +5,8 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from enum import Enum
 import httpx
-from openai import AsyncOpenAI
+from services.llm_gateway import LLMGateway, Priority, get_llm_gateway, set_priority
+from services.http_transport import create_http_client
 import logging
 
 class CampaignStatus(Enum):
@@ -56,18 +57,20 @@ class Campaign:
     updated_at: datetime
 
 class CampaignAgent:
-    def __init__(self, openai_api_key: str, integrations: Dict[str, str]):
-        self.openai_client = AsyncOpenAI(api_key=openai_api_key)
+    def __init__(self, openai_api_key: str, integrations: Dict[str, str], llm_gateway: Optional[LLMGateway] = None):
+        self.llm_gateway = llm_gateway or get_llm_gateway(openai_api_key)
+        self.openai_client = self.llm_gateway.for_agent("campaign")
         self.integrations = integrations  # API keys for various platforms
         self.campaigns: Dict[str, Campaign] = {}
         self.logger = logging.getLogger(__name__)
         
-        # Platform clients
-        self.email_client = EmailPlatformClient(integrations.get('sendgrid_api_key'))
-        self.linkedin_client = LinkedInClient(integrations.get('linkedin_api_key'))
-        self.facebook_client = FacebookClient(integrations.get('facebook_api_key'))
-        self.google_ads_client = GoogleAdsClient(integrations.get('google_ads_api_key'))
-        self.twitter_client = TwitterClient(integrations.get('twitter_api_key'))
+        # Platform clients, all on one client over the shared per-host connection pools
+        self.http_client = create_http_client()
+        self.email_client = EmailPlatformClient(integrations.get('sendgrid_api_key'), self.http_client)
+        self.linkedin_client = LinkedInClient(integrations.get('linkedin_api_key'), self.http_client)
+        self.facebook_client = FacebookClient(integrations.get('facebook_api_key'), self.http_client)
+        self.google_ads_client = GoogleAdsClient(integrations.get('google_ads_api_key'), self.http_client)
+        self.twitter_client = TwitterClient(integrations.get('twitter_api_key'), self.http_client)
 
     async def create_campaign(self, 
                             name: str,
@@ -285,6 +288,7 @@ class CampaignAgent:
     async def _monitor_campaign(self, campaign_id: str):
         """Continuous campaign monitoring and optimization"""
         
+        set_priority(Priority.BACKGROUND)
         campaign = self.campaigns[campaign_id]
         
         while campaign.status == CampaignStatus.ACTIVE:
@@ -497,8 +501,9 @@ class CampaignAgent:
 # Platform Integration Classes (These would connect to real APIs)
 
 class EmailPlatformClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key
+        self.http_client = http_client or create_http_client()
         self.base_url = "https://api.sendgrid.com/v3"
     
     async def create_campaign(self, campaign: Campaign, content: List[Dict]):
@@ -516,8 +521,9 @@ class EmailPlatformClient:
         }
 
 class LinkedInClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key
+        self.http_client = http_client or create_http_client()
         self.base_url = "https://api.linkedin.com/v2"
     
     async def create_campaign(self, campaign: Campaign, content: List[Dict]):
@@ -534,8 +540,9 @@ class LinkedInClient:
         }
 
 class FacebookClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key
+        self.http_client = http_client or create_http_client()
         self.base_url = "https://graph.facebook.com/v18.0"
     
     async def create_campaign(self, campaign: Campaign, content: List[Dict]):
@@ -552,8 +559,9 @@ class FacebookClient:
         }
 
 class GoogleAdsClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key
+        self.http_client = http_client or create_http_client()
     
     async def create_campaign(self, campaign: Campaign, content: List[Dict]):
         # Real Google Ads API integration
@@ -569,8 +577,9 @@ class GoogleAdsClient:
         }
 
 class TwitterClient:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = api_key
+        self.http_client = http_client or create_http_client()
         self.base_url = "https://ads-api.twitter.com/12"
     
     async def create_campaign(self, campaign: Campaign, content: List[Dict]):
@@ -2,17 +2,22 @@ import asyncio
 import json
 import re
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Union, AsyncIterator
+from dataclasses import dataclass, asdict, field
 from enum import Enum
-import httpx
-from openai import AsyncOpenAI
+from services.llm_gateway import LLMGateway, Priority, get_llm_gateway, set_priority
+from services.lead_scoring import RuleBasedLeadScorer
+from services.lead_dedup import LeadDedupIndex
+from services.crawler import CrawlScheduler, CrawlConfig
+from services.contact_extraction import Contact
+from services.parse_pool import ParsePool, ParseConfig
+from services.http_transport import create_http_client
 import logging
-from bs4 import BeautifulSoup
 import csv
 import io
 from urllib.parse import urljoin, urlparse
 import time
+import os
 
 class LeadStatus(Enum):
     NEW = "new"
@@ -87,11 +92,72 @@ class SearchTask:
     completed_at: Optional[datetime]
     results_summary: Dict[str, Any]
 
+@dataclass
+class LeadScoringConfig:
+    batch_size: int = 20          # leads packed into one scoring prompt; 1 disables batching
+    batch_concurrency: int = 4    # scoring prompts in flight per search task
+    prescore: bool = True         # score with local rules first, use the LLM only when ambiguous
+    llm_band_low: float = 30.0    # local scores in [llm_band_low, llm_band_high) go to the LLM
+    llm_band_high: float = 80.0
+
+    @classmethod
+    def from_env(cls) -> "LeadScoringConfig":
+        """Build config from LEAD_SCORING_* environment variables"""
+        defaults = cls()
+        return cls(
+            batch_size=int(os.getenv("LEAD_SCORING_BATCH_SIZE", defaults.batch_size)),
+            batch_concurrency=int(os.getenv("LEAD_SCORING_BATCH_CONCURRENCY", defaults.batch_concurrency)),
+            prescore=os.getenv("LEAD_SCORING_PRESCORE", "true").lower() in ("1", "true", "yes"),
+            llm_band_low=float(os.getenv("LEAD_SCORING_LLM_BAND_LOW", defaults.llm_band_low)),
+            llm_band_high=float(os.getenv("LEAD_SCORING_LLM_BAND_HIGH", defaults.llm_band_high)),
+        )
+
+@dataclass
+class SourceSearchConfig:
+    timeout: float = 90.0         # seconds before a source is abandoned; other sources keep their results
+    timeouts: Dict[str, float] = field(default_factory=dict)  # per-source overrides, keyed by DataSource value
+    quotas: Dict[str, int] = field(default_factory=dict)      # per-source result caps; default is an even share
+
+    @classmethod
+    def from_env(cls) -> "SourceSearchConfig":
+        """Build config from LEAD_SOURCE_* environment variables"""
+        defaults = cls()
+        timeouts = {}
+        quotas = {}
+        for source in DataSource:
+            name = source.value.upper()
+            if os.getenv(f"LEAD_SOURCE_{name}_TIMEOUT"):
+                timeouts[source.value] = float(os.getenv(f"LEAD_SOURCE_{name}_TIMEOUT"))
+            if os.getenv(f"LEAD_SOURCE_{name}_QUOTA"):
+                quotas[source.value] = int(os.getenv(f"LEAD_SOURCE_{name}_QUOTA"))
+        return cls(
+            timeout=float(os.getenv("LEAD_SOURCE_TIMEOUT", defaults.timeout)),
+            timeouts=timeouts,
+            quotas=quotas
+        )
+
+    def timeout_for(self, source: DataSource) -> float:
+        return self.timeouts.get(source.value, self.timeout)
+
+    def quota_for(self, source: DataSource, default: int) -> int:
+        return self.quotas.get(source.value, default)
+
 class LeadGenerationAgent:
-    def __init__(self, openai_api_key: str, integrations: Dict[str, str]):
-        self.openai_client = AsyncOpenAI(api_key=openai_api_key)
+    def __init__(self,
+                 openai_api_key: str,
+                 integrations: Dict[str, str],
+                 llm_gateway: Optional[LLMGateway] = None,
+                 scoring_config: Optional[LeadScoringConfig] = None,
+                 source_config: Optional[SourceSearchConfig] = None,
+                 dedup_index: Optional[LeadDedupIndex] = None):
+        self.llm_gateway = llm_gateway or get_llm_gateway(openai_api_key)
+        self.openai_client = self.llm_gateway.for_agent("lead_generation")
+        self.scoring_config = scoring_config or LeadScoringConfig.from_env()
+        self.source_config = source_config or SourceSearchConfig.from_env()
         self.integrations = integrations
         self.leads: Dict[str, Lead] = {}
+        # Every stored lead, across tasks and restarts when LEAD_DEDUP_PATH is set
+        self.dedup_index = dedup_index or LeadDedupIndex(sqlite_path=os.getenv("LEAD_DEDUP_PATH"))
         self.search_tasks: Dict[str, SearchTask] = {}
         self.logger = logging.getLogger(__name__)
         
@@ -136,45 +202,50 @@ class LeadGenerationAgent:
     async def _execute_search_task(self, task_id: str):
         """Execute lead generation search task"""
         
+        set_priority(Priority.BACKGROUND)
         task = self.search_tasks[task_id]
         task.status = "running"
         
         try:
-            all_leads = []
             total_sources = len(task.sources)
+            default_quota = task.max_leads // total_sources if total_sources else 0
             
-            for i, source in enumerate(task.sources):
-                self.logger.info(f"Searching {source.value} for leads...")
-                
-                # Update progress
-                task.progress = (i / total_sources) * 100
-                
-                try:
-                    source_leads = await self._search_source(source, task.criteria, task.max_leads // total_sources)
-                    all_leads.extend(source_leads)
-                    
-                    self.logger.info(f"Found {len(source_leads)} leads from {source.value}")
-                    
-                except Exception as e:
-                    self.logger.error(f"Error searching {source.value}: {str(e)}")
-                    continue
+            # Search all sources at once; dedup each source's leads as it finishes
+            searches = [
+                asyncio.create_task(self._run_source_search(source, task.criteria, default_quota))
+                for source in task.sources
+            ]
             
-            # Deduplicate leads
-            unique_leads = await self._deduplicate_leads(all_leads)
+            task_index = LeadDedupIndex()
+            unique_leads = []
+            source_stats = {}
+            duplicates_dropped = 0
+            
+            for finished, next_search in enumerate(asyncio.as_completed(searches), start=1):
+                source, source_leads, stats = await next_search
+                new_leads = await self._deduplicate_leads(source_leads, task_index)
+                duplicates_dropped += len(source_leads) - len(new_leads)
+                unique_leads.extend(new_leads)
+                source_stats[source.value] = stats
+                
+                # Update progress (scoring takes the remainder)
+                task.progress = (finished / total_sources) * 90
+                task.leads_found = len(unique_leads)
             
             # Score and qualify leads
+            candidate_leads = unique_leads[:task.max_leads]
+            scoring_stats: Dict[str, int] = {}
+            scores = await self._score_leads(candidate_leads, task.criteria, scoring_stats)
+            
             qualified_leads = []
-            for lead in unique_leads:
-                if len(qualified_leads) >= task.max_leads:
-                    break
-                    
-                # AI-powered lead scoring
-                score = await self._score_lead(lead, task.criteria)
+            for lead in candidate_leads:
+                score = scores[lead.id]
                 lead.quality_score = score
                 lead.quality_level = self._get_quality_level(score)
                 
                 # Store lead
                 self.leads[lead.id] = lead
+                self.dedup_index.add(lead)
                 qualified_leads.append(lead)
             
             # Update task completion
@@ -183,14 +254,51 @@ class LeadGenerationAgent:
             task.leads_found = len(qualified_leads)
             task.completed_at = datetime.now()
             task.results_summary = await self._generate_results_summary(qualified_leads, task.criteria)
+            task.results_summary["scoring"] = scoring_stats
+            task.results_summary["sources"] = source_stats
+            task.results_summary["duplicates_dropped"] = duplicates_dropped
             
-            self.logger.info(f"Completed search task {task_id}: {len(qualified_leads)} qualified leads")
+            self.logger.info(
+                f"Completed search task {task_id}: {len(qualified_leads)} qualified leads, "
+                f"{scoring_stats.get('llm_calls_avoided', 0)} LLM scoring calls avoided"
+            )
             
         except Exception as e:
             task.status = "failed"
             task.results_summary = {"error": str(e)}
             self.logger.error(f"Search task {task_id} failed: {str(e)}")
 
+    async def _run_source_search(self, source: DataSource, criteria: LeadCriteria, default_quota: int):
+        """Search one source under its own timeout and quota, never raising"""
+        
+        quota = self.source_config.quota_for(source, default_quota)
+        timeout = self.source_config.timeout_for(source)
+        started = time.monotonic()
+        self.logger.info(f"Searching {source.value} for leads...")
+        
+        try:
+            source_leads = await asyncio.wait_for(self._search_source(source, criteria, quota), timeout=timeout)
+            source_leads = source_leads[:quota]
+            status = "completed"
+            self.logger.info(f"Found {len(source_leads)} leads from {source.value}")
+            
+        except asyncio.TimeoutError:
+            source_leads = []
+            status = "timeout"
+            self.logger.warning(f"Search of {source.value} timed out after {timeout}s")
+            
+        except Exception as e:
+            source_leads = []
+            status = "failed"
+            self.logger.error(f"Error searching {source.value}: {str(e)}")
+        
+        stats = {
+            "status": status,
+            "leads": len(source_leads),
+            "elapsed": round(time.monotonic() - started, 2)
+        }
+        return source, source_leads, stats
+
     async def _search_source(self, source: DataSource, criteria: LeadCriteria, max_results: int) -> List[Lead]:
         """Search a specific data source for leads"""
         
@@ -213,20 +321,16 @@ class LeadGenerationAgent:
         # Generate target websites based on criteria
         target_websites = await self._find_target_websites(criteria)
         
-        for website in target_websites[:10]:  # Limit to 10 websites
-            try:
-                website_leads = await self.web_scraper.scrape_website(website, criteria)
-                leads.extend(website_leads)
+        # Domains are crawled in parallel; politeness is enforced per host by the crawler
+        try:
+            async for page_leads in self.web_scraper.stream_leads(target_websites[:10], criteria):
+                leads.extend(page_leads)
                 
                 if len(leads) >= max_results:
                     break
                     
-                # Rate limiting
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                self.logger.error(f"Error scraping {website}: {str(e)}")
-                continue
+        except Exception as e:
+            self.logger.error(f"Error scraping websites: {str(e)}")
         
         return leads[:max_results]
 
@@ -264,23 +368,25 @@ class LeadGenerationAgent:
     async def _search_databases(self, criteria: LeadCriteria, max_results: int) -> List[Lead]:
         """Search commercial lead databases"""
         
-        leads = []
+        searches = []
         
         # Apollo.io search
         if self.apollo_client.api_key:
-            try:
-                apollo_leads = await self.apollo_client.search_people(criteria, max_results // 2)
-                leads.extend(apollo_leads)
-            except Exception as e:
-                self.logger.error(f"Apollo search error: {str(e)}")
+            searches.append(("Apollo", self.apollo_client.search_people(criteria, max_results // 2)))
         
         # ZoomInfo search
         if self.zoominfo_client.api_key:
-            try:
-                zoominfo_leads = await self.zoominfo_client.search_contacts(criteria, max_results // 2)
-                leads.extend(zoominfo_leads)
-            except Exception as e:
-                self.logger.error(f"ZoomInfo search error: {str(e)}")
+            searches.append(("ZoomInfo", self.zoominfo_client.search_contacts(criteria, max_results // 2)))
+        
+        # Both databases are queried concurrently
+        results = await asyncio.gather(*[search for _, search in searches], return_exceptions=True)
+        
+        leads = []
+        for (name, _), result in zip(searches, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"{name} search error: {str(result)}")
+            else:
+                leads.extend(result)
         
         return leads[:max_results]
 
@@ -359,22 +465,149 @@ class LeadGenerationAgent:
         
         return leads
 
-    async def _deduplicate_leads(self, leads: List[Lead]) -> List[Lead]:
-        """Remove duplicate leads based on email and company"""
+    async def _deduplicate_leads(self, leads: List[Lead], task_index: Optional[LeadDedupIndex] = None) -> List[Lead]:
+        """Drop leads already stored or already seen in this task (email, company/name, fuzzy match)"""
         
-        seen = set()
+        # Pass the same task index across calls to dedup a stream of batches
+        task_index = task_index or LeadDedupIndex()
         unique_leads = []
         
         for lead in leads:
-            # Create a unique identifier
-            identifier = f"{lead.email}:{lead.company}".lower()
-            
-            if identifier not in seen:
-                seen.add(identifier)
+            if self.dedup_index.find_duplicate(lead) is not None:
+                continue
+            if task_index.check_and_add(lead) is None:
                 unique_leads.append(lead)
         
         return unique_leads
 
+    async def _score_leads(self,
+                           leads: List[Lead],
+                           criteria: LeadCriteria,
+                           stats: Optional[Dict[str, int]] = None) -> Dict[str, float]:
+        """Score leads locally where the rubric is clear-cut, the rest in batched LLM prompts"""
+        
+        scores: Dict[str, float] = {}
+        ambiguous_leads = leads
+        
+        if self.scoring_config.prescore:
+            scorer = RuleBasedLeadScorer(criteria)
+            ambiguous_leads = []
+            for lead in leads:
+                local_score = scorer.score(lead)
+                if self.scoring_config.llm_band_low <= local_score < self.scoring_config.llm_band_high:
+                    ambiguous_leads.append(lead)
+                else:
+                    scores[lead.id] = local_score
+        
+        if stats is not None:
+            stats["leads_scored_locally"] = len(leads) - len(ambiguous_leads)
+            stats["leads_scored_by_llm"] = len(ambiguous_leads)
+            # Each locally scored lead is a per-lead scoring call that never happened
+            stats["llm_calls_avoided"] = len(leads) - len(ambiguous_leads)
+        
+        scores.update(await self._score_leads_with_llm(ambiguous_leads, criteria))
+        return scores
+
+    async def _score_leads_with_llm(self, leads: List[Lead], criteria: LeadCriteria) -> Dict[str, float]:
+        """Score leads in batched prompts, several batches at a time"""
+        
+        batch_size = max(self.scoring_config.batch_size, 1)
+        semaphore = asyncio.Semaphore(max(self.scoring_config.batch_concurrency, 1))
+        
+        async def score_batch(batch: List[Lead]) -> Dict[str, float]:
+            async with semaphore:
+                if len(batch) == 1:
+                    return {batch[0].id: await self._score_lead(batch[0], criteria)}
+                return await self._score_lead_batch(batch, criteria)
+        
+        batches = [leads[i:i + batch_size] for i in range(0, len(leads), batch_size)]
+        scores: Dict[str, float] = {}
+        for batch_scores in await asyncio.gather(*[score_batch(batch) for batch in batches]):
+            scores.update(batch_scores)
+        
+        return scores
+
+    async def _score_lead_batch(self, leads: List[Lead], criteria: LeadCriteria) -> Dict[str, float]:
+        """Score several leads with one prompt, falling back to per-lead scoring"""
+        
+        lead_lines = "\n".join(
+            f"- id: {lead.id} | Name: {lead.first_name} {lead.last_name} | Job Title: {lead.job_title} | "
+            f"Company: {lead.company} | Industry: {lead.industry} | Company Size: {lead.company_size} | "
+            f"Location: {lead.location}"
+            for lead in leads
+        )
+        
+        prompt = f"""
+        Score each lead from 0-100 based on how well they match the ideal customer criteria:
+        
+        Leads:
+        {lead_lines}
+        
+        Target Criteria:
+        - Industry: {criteria.industry}
+        - Company Size: {criteria.company_size}
+        - Location: {criteria.location}
+        - Job Titles: {criteria.job_titles}
+        - Keywords: {criteria.keywords}
+        - Technologies: {criteria.technologies}
+        
+        Consider:
+        1. Job title match (40 points)
+        2. Industry match (25 points)
+        3. Company size match (15 points)
+        4. Location match (10 points)
+        5. Technology/keyword relevance (10 points)
+        
+        Return only a JSON array with one entry per lead: [{{"id": "<lead id>", "score": <0-100>}}]
+        """
+        
+        scores: Dict[str, float] = {}
+        try:
+            response = await self.openai_client.chat.completions.create(
+                model="gpt-4",
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.3,
+                max_tokens=30 * len(leads),
+                cache_ttl=7 * 24 * 3600
+            )
+            
+            scores = self._parse_batch_scores(response.choices[0].message.content, leads)
+            
+        except Exception as e:
+            self.logger.error(f"Error scoring lead batch: {str(e)}")
+        
+        missing = [lead for lead in leads if lead.id not in scores]
+        if missing:
+            self.logger.warning(f"Batch scoring returned no score for {len(missing)} leads, scoring individually")
+            fallback_scores = await asyncio.gather(*[self._score_lead(lead, criteria) for lead in missing])
+            scores.update({lead.id: score for lead, score in zip(missing, fallback_scores)})
+        
+        return scores
+
+    def _parse_batch_scores(self, content: str, leads: List[Lead]) -> Dict[str, float]:
+        """Extract {lead id: score} from a batch scoring response"""
+        
+        match = re.search(r'\[.*\]', content or "", re.DOTALL)
+        if not match:
+            return {}
+        
+        try:
+            entries = json.loads(match.group())
+        except json.JSONDecodeError:
+            return {}
+        
+        lead_ids = {lead.id for lead in leads}
+        scores = {}
+        for entry in entries if isinstance(entries, list) else []:
+            if not isinstance(entry, dict):
+                continue
+            lead_id = str(entry.get("id"))
+            score = entry.get("score")
+            if lead_id in lead_ids and isinstance(score, (int, float)) and not isinstance(score, bool):
+                scores[lead_id] = min(max(float(score), 0), 100)
+        
+        return scores
+
     async def _score_lead(self, lead: Lead, criteria: LeadCriteria) -> float:
         """AI-powered lead scoring based on criteria match"""
         
@@ -412,7 +645,8 @@ class LeadGenerationAgent:
                 model="gpt-4",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
-                max_tokens=10
+                max_tokens=10,
+                cache_ttl=7 * 24 * 3600
             )
             
             score_text = response.choices[0].message.content.strip()
@@ -555,8 +789,8 @@ class LeadGenerationAgent:
         for lead in leads:
             lead_dict = asdict(lead)
             row = []
-            for field in include_fields:
-                value = lead_dict.get(field, '')
+            for field_name in include_fields:
+                value = lead_dict.get(field_name, '')
                 if isinstance(value, (list, dict)):
                     value = json.dumps(value)
                 elif isinstance(value, datetime):
@@ -591,95 +825,118 @@ class LeadGenerationAgent:
         
         return json.dumps(export_data, indent=2)
 
+    async def close(self):
+        """Close scraper clients and worker pools"""
+        await self.web_scraper.close()
+
 # Data Source Client Classes
 
 class WebScraper:
-    def __init__(self):
-        self.session = httpx.AsyncClient(
-            timeout=30.0,
+    # Common contact pages
+    CONTACT_PATHS = ["/contact", "/contact-us", "/about", "/team", "/leadership"]
+
+    def __init__(self, crawl_config: Optional[CrawlConfig] = None, parse_config: Optional[ParseConfig] = None):
+        crawl_config = crawl_config or CrawlConfig.from_env()
+        # Connections come from the shared per-host pools; the crawler caps how many it uses
+        self.session = create_http_client(
             headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+                'User-Agent': crawl_config.user_agent
             }
         )
+        self.crawler = CrawlScheduler(self.session, crawl_config)
+        self.parse_pool = ParsePool(parse_config or ParseConfig.from_env())
+        self.logger = logging.getLogger(__name__)
 
     async def scrape_website(self, domain: str, criteria: LeadCriteria) -> List[Lead]:
         """Scrape a website for contact information"""
         
         leads = []
+        async for page_leads in self.stream_leads([domain], criteria):
+            leads.extend(page_leads)
+        
+        return leads
+
+    async def stream_leads(self, domains: List[str], criteria: LeadCriteria) -> AsyncIterator[List[Lead]]:
+        """Crawl the contact pages of several domains at once, yielding leads page by page"""
+        
+        urls = [f"https://{domain}{path}" for domain in domains for path in self.CONTACT_PATHS]
         
-        # Common contact pages
-        contact_pages = [
-            f"https://{domain}/contact",
-            f"https://{domain}/contact-us",
-            f"https://{domain}/about",
-            f"https://{domain}/team",
-            f"https://{domain}/leadership"
-        ]
+        # fetch -> bounded page queue -> parse workers -> leads queue
+        pages: asyncio.Queue = asyncio.Queue(maxsize=self.parse_pool.config.queue_size)
+        found: asyncio.Queue = asyncio.Queue()
+        parser_count = self.parse_pool.config.workers
         
-        for url in contact_pages:
+        async def fetch_pages():
             try:
-                page_leads = await self.extract_contacts_from_url(url, criteria)
-                leads.extend(page_leads)
+                async for result in self.crawler.crawl(urls):
+                    if result.ok:
+                        await pages.put(result)
             except Exception as e:
-                continue
+                self.logger.error(f"Error crawling contact pages: {str(e)}")
+            for _ in range(parser_count):
+                await pages.put(None)
+        
+        async def parse_pages():
+            while True:
+                result = await pages.get()
+                if result is None:
+                    break
+                try:
+                    contacts = await self.parse_pool.parse(result.content)
+                    page_leads = self._leads_from_contacts(contacts, result.url, criteria)
+                except Exception as e:
+                    self.logger.error(f"Error parsing {result.url}: {str(e)}")
+                    continue
+                if page_leads:
+                    await found.put(page_leads)
+            await found.put(None)
         
-        return leads
+        workers = [asyncio.create_task(fetch_pages())]
+        workers.extend(asyncio.create_task(parse_pages()) for _ in range(parser_count))
+        
+        try:
+            remaining = parser_count
+            while remaining:
+                page_leads = await found.get()
+                if page_leads is None:
+                    remaining -= 1
+                else:
+                    yield page_leads
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
     async def extract_contacts_from_url(self, url: str, criteria: LeadCriteria) -> List[Lead]:
         """Extract contact information from a specific URL"""
         
+        result = await self.crawler.fetch(url)
+        if not result.ok:
+            raise Exception(f"Error scraping {url}: {result.error or result.status_code}")
+        
         try:
-            response = await self.session.get(url)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract emails
-            emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', soup.text)
-            
-            # Extract names and titles from common patterns
-            contacts = self._extract_contact_info(soup, emails)
-            
-            # Convert to Lead objects
-            leads = []
-            for contact in contacts:
-                lead = self._create_lead_from_contact(contact, url, criteria)
-                if lead:
-                    leads.append(lead)
-            
-            return leads
-            
+            contacts = await self.parse_pool.parse(result.content)
+            return self._leads_from_contacts(contacts, url, criteria)
         except Exception as e:
             raise Exception(f"Error scraping {url}: {str(e)}")
 
-    def _extract_contact_info(self, soup: BeautifulSoup, emails: List[str]) -> List[Dict]:
-        """Extract structured contact information from HTML"""
-        
-        contacts = []
+    async def close(self):
+        """Close HTTP client, cache and parse workers"""
+        await self.session.aclose()
+        self.crawler.close()
+        self.parse_pool.close()
+
+    def _leads_from_contacts(self, contacts: List[Contact], source_url: str, criteria: LeadCriteria) -> List[Lead]:
+        """Turn (email, name, job_title) tuples from a page into leads"""
         
-        # Look for structured contact information
-        for email in emails:
-            contact = {'email': email}
-            
-            # Try to find name and title near email
-            email_element = soup.find(string=re.compile(email))
-            if email_element:
-                parent = email_element.parent
-                siblings = parent.find_all_next(string=True, limit=10)
-                
-                # Extract potential names and titles
-                for text in siblings:
-                    text = text.strip()
-                    if len(text) > 2 and text not in email:
-                        # Simple heuristics for names and titles
-                        if any(title in text.lower() for title in ['ceo', 'president', 'director', 'manager', 'head']):
-                            contact['job_title'] = text
-                        elif len(text.split()) == 2 and text[0].isupper():
-                            contact['name'] = text
-            
-            contacts.append(contact)
+        leads = []
+        for email, name, job_title in contacts:
+            contact = {'email': email, 'name': name, 'job_title': job_title}
+            lead = self._create_lead_from_contact(contact, source_url, criteria)
+            if lead:
+                leads.append(lead)
         
-        return contacts
+        return leads
 
     def _create_lead_from_contact(self, contact: Dict, source_url: str, criteria: LeadCriteria) -> Optional[Lead]:
         """Create Lead object from extracted contact info"""
@@ -1,11 +1,13 @@
 # main.py - Complete AI Marketing Automation System with ALL APIs
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 from datetime import datetime, timedelta
+import asyncio
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Import all agents
@@ -25,6 +27,10 @@ from agents.email_automation_agent import EmailType, TriggerType, CampaignStatus
 from agents.analytics_agent import ReportType
 
 from supabase import create_client, Client
+from services.llm_gateway import Priority, set_priority, close_llm_gateways
+from services.job_scheduler import get_job_scheduler, close_job_scheduler
+from services.email_events import EmailEventPipeline, EmailEventConfig, SIGNATURE_HEADER, TIMESTAMP_HEADER
+from services.http_transport import close_http_transport
 
 load_dotenv()
 
@@ -66,6 +72,12 @@ async def log_requests(request, call_next):
     response = await call_next(request)
     return response
 
+# LLM calls made while serving an API request jump ahead of background agent work
+@app.middleware("http")
+async def interactive_llm_priority(request, call_next):
+    set_priority(Priority.INTERACTIVE)
+    return await call_next(request)
+
 # Initialize Supabase
 supabase: Client = create_client(
     os.getenv("SUPABASE_URL"),
@@ -118,6 +130,13 @@ email_agent = EmailAutomationAgent(
     supabase_client=supabase
 )
 
+# SendGrid webhook bodies are queued as-is and applied to the email agent in batches
+email_events = EmailEventPipeline(email_agent.apply_email_events, EmailEventConfig.from_env())
+
+# Background contact imports; the loop only holds weak references to tasks
+import_tasks: Set[asyncio.Task] = set()
+UPLOAD_WRITE_SIZE = 1024 * 1024  # request chunks are buffered to this size before each disk write
+
 # =============================================================================
 # PYDANTIC MODELS FOR ALL ENDPOINTS
 # =============================================================================
@@ -222,8 +241,11 @@ async def get_system_stats():
             },
             "email_contacts": {
                 "total": len(email_agent.contacts_store),
-                "subscribed": len([c for c in email_agent.contacts_store.values() if c.subscribed])
+                "subscribed": email_agent.contacts_store.count(subscribed_only=True)
             },
+            "email_events": email_events.get_stats(),
+            "social_engagement_polls": social_agent.engagement_poller.get_stats(),
+            "social_rate_limits": social_agent.rate_limiter.get_stats(),
             "reports": {
                 "total": len(analytics_agent.reports_store)
             }
@@ -780,6 +802,18 @@ async def get_email_analytics(campaign_id: Optional[str] = None):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/email/events/sendgrid", status_code=202)
+async def receive_sendgrid_events(request: Request):
+    """SendGrid event webhook: verify the signature and queue the batch"""
+    payload = await request.body()
+    if not email_events.verify(payload, request.headers.get(SIGNATURE_HEADER), request.headers.get(TIMESTAMP_HEADER)):
+        raise HTTPException(status_code=403, detail="Invalid webhook signature")
+    
+    # 503 makes SendGrid retry the batch later
+    if not email_events.submit(payload):
+        raise HTTPException(status_code=503, detail="Event queue is full")
+    return {"status": "queued"}
+
 # =============================================================================
 # ANALYTICS AGENT ENDPOINTS
 # =============================================================================
@@ -1082,26 +1116,69 @@ async def bulk_schedule_social_posts(social_requests: List[SocialPostRequest]):
 async def bulk_add_email_contacts(contacts: List[Dict[str, Any]]):
     """Bulk add email contacts"""
     try:
-        results = []
-        for contact_data in contacts:
-            contact = await email_agent.add_contact(
-                email=contact_data["email"],
-                first_name=contact_data.get("first_name", ""),
-                last_name=contact_data.get("last_name", ""),
-                company=contact_data.get("company", ""),
-                tags=contact_data.get("tags", []),
-                custom_fields=contact_data.get("custom_fields", {})
-            )
-            
-            results.append({
-                "contact_id": contact.id,
-                "email": contact.email
-            })
+        job = await email_agent.import_contacts(contacts, fmt="records", track_contacts=True)
+        if job.status == "failed":
+            raise HTTPException(status_code=500, detail="; ".join(job.errors))
         
-        return {"added": len(results), "contacts": results}
+        return {
+            "added": job.imported,
+            "invalid": job.invalid,
+            "duplicates": job.duplicates,
+            "contacts": job.contacts
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/bulk/email/contacts/import", status_code=202)
+async def import_email_contacts(request: Request, format: str = "csv"):
+    """Import a CSV or NDJSON request body of any size as a background job"""
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+    
+    # Spool the upload to disk so the import can stream it in chunks; writes run off the event loop
+    upload = tempfile.NamedTemporaryFile(suffix=f".{format}", delete=False)
+    try:
+        with upload:
+            buffer = bytearray()
+            async for chunk in request.stream():
+                buffer += chunk
+                if len(buffer) >= UPLOAD_WRITE_SIZE:
+                    await asyncio.to_thread(upload.write, bytes(buffer))
+                    buffer.clear()
+            if buffer:
+                await asyncio.to_thread(upload.write, bytes(buffer))
+    except Exception as e:
+        os.unlink(upload.name)
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    job = email_agent.create_import_job(format)
+    
+    async def run_import():
+        try:
+            await email_agent.import_contacts(upload.name, fmt=format, job=job)
+        except Exception as e:
+            # Failures outside the import's own handling still end up on the job
+            job.status = "failed"
+            job.add_error(str(e))
+            job.finished_at = datetime.now()
+        finally:
+            os.unlink(upload.name)
+    
+    task = asyncio.create_task(run_import())
+    import_tasks.add(task)
+    task.add_done_callback(import_tasks.discard)
+    return job.to_dict()
+
+@app.get("/api/bulk/email/contacts/import/{job_id}")
+async def get_email_contact_import(job_id: str):
+    """Progress of a contact import job"""
+    job = email_agent.get_import_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.to_dict()
+
 # =============================================================================
 # EXPORT ENDPOINTS
 # =============================================================================
@@ -1276,8 +1353,22 @@ async def startup_event():
     print("✅ Analytics Agent initialized")
     print("✅ Email Automation Agent initialized")
     print("🎯 All 6 agents are ready!")
+    # Resume emails and posts scheduled before the last restart
+    await get_job_scheduler(supabase).start()
+    email_events.start()
     print(f"📌 CORS enabled for: {', '.join(origins)}")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release shared clients on shutdown"""
+    await email_events.close()
+    await email_agent.close()
+    await social_agent.close()
+    await lead_agent.close()
+    await close_llm_gateways()
+    await close_job_scheduler()
+    await close_http_transport()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,85 @@
+# services/__init__.py
+
+from .llm_gateway import (
+    LLMGateway,
+    GatewayConfig,
+    Priority,
+    get_llm_gateway,
+    close_llm_gateways
+)
+from .llm_cache import LLMCache
+from .lead_scoring import RuleBasedLeadScorer
+from .crawler import CrawlScheduler, CrawlConfig
+from .http_cache import HTTPCache
+from .contact_extraction import extract_contacts
+from .parse_pool import ParsePool, ParseConfig
+from .lead_dedup import LeadDedupIndex
+from .sendgrid_bulk import SendGridBulkSender, BulkRecipient
+from .template_renderer import TemplateRenderer, CompiledTemplate
+from .job_scheduler import JobScheduler, SchedulerConfig, get_job_scheduler, close_job_scheduler
+from .message_index import IndexedMessageStore
+from .contact_index import IndexedContactStore
+from .engagement_store import EngagementStore
+from .experiments import ExperimentEngine, ExperimentConfig, create_experiment_store, stratified_assignment
+from .email_events import EmailEventPipeline, EmailEventConfig
+from .contact_import import ContactImportConfig, ImportJob
+from .trigger_index import IndexedSequenceStore
+from .engagement_poller import EngagementPoller, EngagementPollConfig
+from .engagement_cursors import EngagementCursors, EngagementCursorConfig, SeenSet, create_engagement_cursors
+from .engagement_classifier import EngagementClassifier, EngagementClassifierConfig
+from .rate_limiter import PlatformRateLimiter, RateLimitConfig, CallPriority, Quota
+from .http_transport import PooledTransport, TransportConfig, create_http_client, get_http_transport, close_http_transport
+
+__all__ = [
+    'LLMGateway',
+    'GatewayConfig',
+    'Priority',
+    'get_llm_gateway',
+    'close_llm_gateways',
+    'LLMCache',
+    'RuleBasedLeadScorer',
+    'CrawlScheduler',
+    'CrawlConfig',
+    'HTTPCache',
+    'extract_contacts',
+    'ParsePool',
+    'ParseConfig',
+    'LeadDedupIndex',
+    'SendGridBulkSender',
+    'BulkRecipient',
+    'TemplateRenderer',
+    'CompiledTemplate',
+    'JobScheduler',
+    'SchedulerConfig',
+    'get_job_scheduler',
+    'close_job_scheduler',
+    'IndexedMessageStore',
+    'IndexedContactStore',
+    'EngagementStore',
+    'ExperimentEngine',
+    'ExperimentConfig',
+    'create_experiment_store',
+    'stratified_assignment',
+    'EmailEventPipeline',
+    'EmailEventConfig',
+    'ContactImportConfig',
+    'ImportJob',
+    'IndexedSequenceStore',
+    'EngagementPoller',
+    'EngagementPollConfig',
+    'EngagementCursors',
+    'EngagementCursorConfig',
+    'SeenSet',
+    'create_engagement_cursors',
+    'EngagementClassifier',
+    'EngagementClassifierConfig',
+    'PlatformRateLimiter',
+    'RateLimitConfig',
+    'CallPriority',
+    'Quota',
+    'PooledTransport',
+    'TransportConfig',
+    'create_http_client',
+    'get_http_transport',
+    'close_http_transport'
+]
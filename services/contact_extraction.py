@@ -0,0 +1,143 @@
+# services/contact_extraction.py
+
+import logging
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Optional fast parsers, in order of preference; the stdlib parser is always available
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+try:
+    import lxml.html as lxml_html
+except ImportError:
+    lxml_html = None
+
+if SelectolaxParser is not None:
+    DEFAULT_BACKEND = "selectolax"
+elif lxml_html is not None:
+    DEFAULT_BACKEND = "lxml"
+else:
+    DEFAULT_BACKEND = "stdlib"
+
+# (email, name, job_title)
+Contact = Tuple[str, Optional[str], Optional[str]]
+
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+NAME_RE = re.compile(r"^[A-Z][\w'’.-]+\s[A-Z][\w'’.-]+$")
+TITLE_RE = re.compile(
+    r'\b(ceo|cto|cmo|cfo|coo|cio|founder|co-founder|owner|partner|president|vp|chief|officer|director|'
+    r'head|manager|lead|principal|engineer|developer|designer|analyst|specialist|consultant|'
+    r'coordinator|executive|associate|representative|advisor|architect|strategist)\b',
+    re.IGNORECASE
+)
+
+SKIPPED_TAGS = frozenset({"script", "style", "noscript", "template"})
+
+# Text nodes inspected on each side of an email for its owner's name and title
+NEIGHBOURHOOD = 6
+MAX_FIELD_LENGTH = 80
+
+class _TextCollector(HTMLParser):
+    """Stdlib fallback: collect visible text nodes in document order"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.texts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.texts.append(data)
+
+def _decode(html: bytes) -> str:
+    try:
+        return html.decode("utf-8")
+    except UnicodeDecodeError:
+        return html.decode("latin-1")
+
+def text_nodes(html: bytes, backend: Optional[str] = None) -> List[str]:
+    """Visible, non-empty text nodes of a page in document order"""
+    backend = backend or DEFAULT_BACKEND
+
+    if backend == "selectolax":
+        tree = SelectolaxParser(html)
+        tree.strip_tags(list(SKIPPED_TAGS))
+        raw = [node.text(deep=False) for node in tree.root.traverse(include_text=True) if node.tag == "-text"] if tree.root else []
+
+    elif backend == "lxml":
+        raw = []
+        try:
+            root = lxml_html.fromstring(html)
+        except Exception:
+            return []
+        for element in root.iter():
+            if isinstance(element.tag, str) and element.tag not in SKIPPED_TAGS and element.text:
+                raw.append(element.text)
+            if element.tail:
+                raw.append(element.tail)
+
+    else:
+        collector = _TextCollector()
+        collector.feed(_decode(html))
+        collector.close()
+        raw = collector.texts
+
+    return [text for text in (t.strip() for t in raw) if text]
+
+def extract_contacts(html: bytes, backend: Optional[str] = None) -> List[Contact]:
+    """Find emails on a page and the name/title printed around each one, in a single pass"""
+
+    texts = text_nodes(html, backend)
+
+    hits: List[Tuple[int, str]] = []
+    for index, text in enumerate(texts):
+        if "@" in text:
+            hits.extend((index, email) for email in EMAIL_RE.findall(text))
+
+    email_nodes = {index for index, _ in hits}
+    contacts: List[Contact] = []
+    seen = set()
+
+    for index, email in hits:
+        if email in seen:
+            continue
+        seen.add(email)
+
+        name = None
+        job_title = None
+
+        # Nearest text first, looking back before forward; another contact's email ends the window.
+        # Looking forward only helps email-first layouts, elsewhere it steals the next card's fields.
+        for direction in (-1, 1):
+            step = index + direction
+            while 0 <= step < len(texts) and abs(step - index) <= NEIGHBOURHOOD and step not in email_nodes:
+                text = texts[step]
+                step += direction
+                if len(text) <= 2 or len(text) > MAX_FIELD_LENGTH:
+                    continue
+                if job_title is None and TITLE_RE.search(text):
+                    job_title = text
+                elif name is None and NAME_RE.match(text) and not TITLE_RE.search(text):
+                    name = text
+                if name and job_title:
+                    break
+            if name or job_title:
+                break
+
+        contacts.append((email, name, job_title))
+
+    return contacts
@@ -0,0 +1,160 @@
+# services/contact_import.py
+
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# A whole cell must be one address (compare EMAIL_RE in contact_extraction, which searches text)
+VALID_EMAIL = r"[a-z0-9._%+-]+@[a-z0-9-]+(?:\.[a-z0-9-]+)*\.[a-z]{2,}"
+NAME_COLUMNS = ["first_name", "last_name", "company"]
+STANDARD_COLUMNS = {"email", "tags", "custom_fields", *NAME_COLUMNS}
+TAG_SEPARATOR_RE = re.compile(r"[;|,]")
+
+@dataclass
+class ContactImportConfig:
+    chunk_rows: int = 30000     # rows validated and synced together; one SendGrid upsert takes up to 30k contacts
+    db_batch_size: int = 1000   # rows per Supabase insert request
+    max_errors: int = 20        # error messages kept on a job
+
+    @classmethod
+    def from_env(cls) -> "ContactImportConfig":
+        """Build config from CONTACT_IMPORT_* environment variables"""
+        defaults = cls()
+        return cls(
+            chunk_rows=int(os.getenv("CONTACT_IMPORT_CHUNK_ROWS", defaults.chunk_rows)),
+            db_batch_size=int(os.getenv("CONTACT_IMPORT_DB_BATCH_SIZE", defaults.db_batch_size)),
+        )
+
+@dataclass
+class ImportJob:
+    """Progress of one contact import, updated after every chunk"""
+    id: str
+    source: str                         # "csv", "ndjson" or "records"
+    status: str = "queued"              # queued -> running -> completed | failed
+    rows: int = 0
+    imported: int = 0
+    invalid: int = 0
+    duplicates: int = 0
+    esp_synced: int = 0
+    esp_failed: int = 0
+    db_written: int = 0
+    errors: List[str] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    contacts: Optional[List[Dict[str, str]]] = None   # {"contact_id", "email"} per imported contact, when tracked
+
+    def add_error(self, message: str, limit: int = 20):
+        if len(self.errors) < limit:
+            self.errors.append(message)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "source": self.source,
+            "status": self.status,
+            "rows": self.rows,
+            "imported": self.imported,
+            "invalid": self.invalid,
+            "duplicates": self.duplicates,
+            "esp_synced": self.esp_synced,
+            "esp_failed": self.esp_failed,
+            "db_written": self.db_written,
+            "errors": list(self.errors),
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+def read_contact_frames(source: Any, fmt: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """DataFrames of up to `chunk_rows` rows from a CSV/NDJSON path or file object, or a list of dicts"""
+
+    if fmt == "records":
+        for start in range(0, len(source), chunk_rows):
+            yield pd.DataFrame.from_records(source[start:start + chunk_rows])
+    elif fmt == "csv":
+        yield from pd.read_csv(source, chunksize=chunk_rows, dtype=str, keep_default_na=False, skipinitialspace=True)
+    elif fmt == "ndjson":
+        with pd.read_json(source, lines=True, chunksize=chunk_rows, dtype=False) as reader:
+            yield from reader
+    else:
+        raise ValueError(f"Unsupported contact import format: {fmt}")
+
+def normalize_contacts(frame: pd.DataFrame, seen: Set[str]) -> Tuple[pd.DataFrame, int, int]:
+    """(new contact rows, invalid rows, duplicate rows) for one chunk
+
+    Emails are trimmed, lower-cased and checked with vectorized string operations.
+    Rows whose email is already in `seen` or earlier in the chunk are dropped, and
+    the emails kept are added to `seen`, so later chunks dedupe against them too.
+    """
+
+    frame = frame.rename(columns=lambda column: str(column).strip().lower().replace(" ", "_"))
+    if "email" not in frame.columns:
+        return frame.iloc[0:0], len(frame), 0
+
+    emails = frame["email"].fillna("").astype(str).str.strip().str.lower()
+    valid = emails.str.fullmatch(VALID_EMAIL).fillna(False).to_numpy(dtype=bool)
+    known = np.fromiter(map(seen.__contains__, emails), dtype=bool, count=len(emails))
+    fresh = valid & ~known & ~emails.duplicated().to_numpy()
+
+    frame = frame.assign(email=emails)[fresh].copy()
+    for column in NAME_COLUMNS:
+        frame[column] = frame[column].fillna("").astype(str).str.strip() if column in frame.columns else ""
+
+    seen.update(frame["email"])
+    invalid = int((~valid).sum())
+    return frame, invalid, int(valid.sum()) - len(frame)
+
+def _tag_list(value: Any) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        return [str(tag).strip() for tag in value if str(tag).strip()]
+    if isinstance(value, str):
+        return [tag.strip() for tag in TAG_SEPARATOR_RE.split(value) if tag.strip()]
+    return []
+
+def contact_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Contact fields per normalized row; columns outside the standard set become custom fields"""
+
+    extra = [column for column in frame.columns if column not in STANDARD_COLUMNS]
+    tags = frame["tags"].map(_tag_list).tolist() if "tags" in frame.columns else [[] for _ in range(len(frame))]
+    given = frame["custom_fields"].tolist() if "custom_fields" in frame.columns else [None] * len(frame)
+    extras = frame[extra].to_dict("records") if extra else [{} for _ in range(len(frame))]
+
+    records = []
+    for row, row_tags, row_fields, row_extra in zip(frame[["email", *NAME_COLUMNS]].itertuples(index=False),
+                                                    tags, given, extras):
+        custom_fields = dict(row_fields) if isinstance(row_fields, dict) else {}
+        custom_fields.update({key: value for key, value in row_extra.items() if not _blank(value)})
+        records.append({
+            "email": row.email,
+            "first_name": row.first_name,
+            "last_name": row.last_name,
+            "company": row.company,
+            "tags": row_tags,
+            "custom_fields": custom_fields,
+        })
+    return records
+
+def _blank(value: Any) -> bool:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return True
+    return isinstance(value, float) and np.isnan(value)
+
+def normalized_chunks(source: Any,
+                      fmt: str,
+                      seen: Set[str],
+                      chunk_rows: int = 30000) -> Iterator[Tuple[int, List[Dict[str, Any]], int, int]]:
+    """(rows read, new contact records, invalid, duplicates) per chunk of the source"""
+
+    for frame in read_contact_frames(source, fmt, chunk_rows):
+        rows = len(frame)
+        frame, invalid, duplicates = normalize_contacts(frame, seen)
+        yield rows, contact_records(frame), invalid, duplicates
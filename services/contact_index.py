@@ -0,0 +1,251 @@
+# services/contact_index.py
+
+import bisect
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def _bitmap(ordinals: Iterable[int], size: int) -> int:
+    """Python int with the given bit positions set"""
+    bits = np.zeros(max(size, 1), dtype=bool)
+    if not isinstance(ordinals, np.ndarray):
+        ordinals = np.fromiter(ordinals, dtype=np.int64)
+    bits[ordinals] = True
+    return int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little")
+
+def _ordinals(bitmap: int) -> np.ndarray:
+    """Set bit positions of a Python int, ascending"""
+    if not bitmap:
+        return np.empty(0, dtype=np.int64)
+    raw = np.frombuffer(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little"), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(raw, bitorder="little"))
+
+class IndexedContactStore(dict):
+    """contact id -> contact dict that answers audience filters with set algebra.
+
+    Every contact gets a stable ordinal (its insertion position). Tags, lowercased
+    company names and the subscribed flag map to sets of ordinals, updated in O(1)
+    per contact, and are materialized as Python-int bitsets on first use; created_at
+    is kept in a sorted index. A filter becomes a few big-integer ANDs/ORs plus one
+    bisect. Cached bitsets are dropped only for the keys a write touches. Results come
+    back in insertion order, like iterating the dict. Contacts are duck-typed (id,
+    tags, company, subscribed, created_at); call `reindex` after changing one of
+    those fields in place.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._ids: List[Optional[str]] = []                 # ordinal -> contact id (None once removed)
+        self._ordinal: Dict[str, int] = {}
+        self._indexed: Dict[str, tuple] = {}                # contact id -> (tags, company, subscribed, created) as indexed
+        self._tags: Dict[str, Set[int]] = defaultdict(set)
+        self._companies: Dict[str, Set[int]] = defaultdict(set)
+        self._subscribed: Set[int] = set()
+        self._bitmaps: Dict[tuple, int] = {}                # ("tag", name) / ("company", name) / ("subscribed",) / ("alive",)
+        self._company_searches: Dict[str, int] = {}         # substring -> bitmap, dropped on any company change
+        self._created_keys: List[float] = []                # sorted created_at timestamps
+        self._created_ords: List[int] = []                  # ordinals in the same order
+        self._created_array: Optional[np.ndarray] = None    # _created_ords as an array, rebuilt after writes
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, contact_id: str, contact: Any):
+        if contact_id in self:
+            self._unindex(contact_id)
+        super().__setitem__(contact_id, contact)
+        self._index(contact_id, contact)
+
+    def __delitem__(self, contact_id: str):
+        super().__delitem__(contact_id)
+        self._unindex(contact_id)
+
+    def pop(self, contact_id: str, *default):
+        if contact_id not in self:
+            return super().pop(contact_id, *default)
+        contact = super().pop(contact_id)
+        self._unindex(contact_id)
+        return contact
+
+    def popitem(self):
+        contact_id, contact = super().popitem()
+        self._unindex(contact_id)
+        return contact_id, contact
+
+    def setdefault(self, contact_id: str, default: Any = None):
+        if contact_id not in self:
+            self[contact_id] = default
+        return self[contact_id]
+
+    def update(self, *args, **kwargs):
+        for contact_id, contact in dict(*args, **kwargs).items():
+            self[contact_id] = contact
+
+    def clear(self):
+        super().clear()
+        self._ids.clear()
+        self._ordinal.clear()
+        self._indexed.clear()
+        self._tags.clear()
+        self._companies.clear()
+        self._subscribed.clear()
+        self._bitmaps.clear()
+        self._company_searches.clear()
+        self._created_keys.clear()
+        self._created_ords.clear()
+        self._created_array = None
+
+    @staticmethod
+    def _fields(contact: Any) -> tuple:
+        created = contact.created_at.timestamp() if contact.created_at else None
+        return (tuple(contact.tags or ()), (contact.company or "").lower(), bool(contact.subscribed), created)
+
+    def _index(self, contact_id: str, contact: Any):
+        ordinal = self._ordinal.get(contact_id)
+        if ordinal is None:
+            ordinal = len(self._ids)
+            self._ids.append(contact_id)
+            self._ordinal[contact_id] = ordinal
+            self._bitmaps.pop(("alive",), None)
+
+        tags, company, subscribed, created = fields = self._fields(contact)
+        for tag in set(tags):
+            self._tags[tag].add(ordinal)
+            self._bitmaps.pop(("tag", tag), None)
+        self._companies[company].add(ordinal)
+        self._bitmaps.pop(("company", company), None)
+        self._company_searches.clear()
+        if subscribed:
+            self._subscribed.add(ordinal)
+            self._bitmaps.pop(("subscribed",), None)
+        if created is not None:
+            position = bisect.bisect_right(self._created_keys, created)
+            self._created_keys.insert(position, created)
+            self._created_ords.insert(position, ordinal)
+            self._created_array = None
+        self._indexed[contact_id] = fields
+
+    def _unindex(self, contact_id: str):
+        ordinal = self._ordinal[contact_id]
+
+        tags, company, subscribed, created = self._indexed.pop(contact_id)
+        for tag in set(tags):
+            self._discard(self._tags, tag, ordinal)
+            self._bitmaps.pop(("tag", tag), None)
+        self._discard(self._companies, company, ordinal)
+        self._bitmaps.pop(("company", company), None)
+        self._company_searches.clear()
+        if subscribed:
+            self._subscribed.discard(ordinal)
+            self._bitmaps.pop(("subscribed",), None)
+        if created is not None:
+            position = bisect.bisect_left(self._created_keys, created)
+            while self._created_ords[position] != ordinal:
+                position += 1
+            del self._created_keys[position]
+            del self._created_ords[position]
+            self._created_array = None
+
+        if contact_id not in self:
+            # Removed for good: free the id but keep ordinals stable
+            self._ids[ordinal] = None
+            del self._ordinal[contact_id]
+            self._bitmaps.pop(("alive",), None)
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[int]], key: str, ordinal: int):
+        ordinals = index.get(key)
+        if ordinals is not None:
+            ordinals.discard(ordinal)
+            if not ordinals:
+                del index[key]
+
+    def reindex(self, contact: Any):
+        """Re-index a stored contact after its fields were changed in place"""
+        if self._indexed.get(contact.id) != self._fields(contact):
+            self._unindex(contact.id)
+            self._index(contact.id, contact)
+
+    # Bitmaps
+
+    def _cached_bitmap(self, key: tuple, ordinals: Iterable[int]) -> int:
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            bitmap = self._bitmaps[key] = _bitmap(ordinals, len(self._ids))
+        return bitmap
+
+    def tags_bitmap(self, tags: Iterable[str]) -> int:
+        """Contacts carrying any of the tags"""
+        bitmap = 0
+        for tag in tags:
+            if tag in self._tags:
+                bitmap |= self._cached_bitmap(("tag", tag), self._tags[tag])
+        return bitmap
+
+    def company_bitmap(self, needle: str) -> int:
+        """Contacts whose company contains `needle`, case-insensitively (checked once per distinct company)"""
+        needle = needle.lower()
+        bitmap = self._company_searches.get(needle)
+        if bitmap is None:
+            matches = [company for company in self._companies if needle in company]
+            if len(matches) == 1:
+                bitmap = self._cached_bitmap(("company", matches[0]), self._companies[matches[0]])
+            else:
+                bitmap = _bitmap((ordinal for company in matches for ordinal in self._companies[company]), len(self._ids))
+            if len(self._company_searches) >= 256:
+                self._company_searches.clear()
+            self._company_searches[needle] = bitmap
+        return bitmap
+
+    def created_after_bitmap(self, after: datetime) -> int:
+        """Contacts created at or after `after`"""
+        if self._created_array is None:
+            self._created_array = np.array(self._created_ords, dtype=np.int64)
+        position = bisect.bisect_left(self._created_keys, after.timestamp())
+        return _bitmap(self._created_array[position:], len(self._ids))
+
+    def subscribed_bitmap(self) -> int:
+        return self._cached_bitmap(("subscribed",), self._subscribed)
+
+    def alive_bitmap(self) -> int:
+        return self._cached_bitmap(("alive",), self._ordinal.values())
+
+    def contacts_for(self, bitmap: int) -> List[Any]:
+        """Contacts behind a bitmap, in insertion order"""
+        ids = self._ids
+        return [self[ids[ordinal]] for ordinal in _ordinals(bitmap & self.alive_bitmap()).tolist()]
+
+    # Queries
+
+    def query(self,
+              tags: Optional[Iterable[str]] = None,
+              company: Optional[str] = None,
+              created_after: Optional[Union[datetime, str]] = None,
+              subscribed_only: bool = True) -> List[Any]:
+        """Contacts matching every given condition (tags match when any tag is present)"""
+
+        bitmap = self.subscribed_bitmap() if subscribed_only else self.alive_bitmap()
+        if tags is not None:
+            bitmap &= self.tags_bitmap(tags)
+        if company:
+            bitmap &= self.company_bitmap(company)
+        if created_after is not None:
+            if isinstance(created_after, str):
+                created_after = datetime.fromisoformat(created_after)
+            bitmap &= self.created_after_bitmap(created_after)
+        return self.contacts_for(bitmap)
+
+    def count(self, subscribed_only: bool = False) -> int:
+        return len(self._subscribed) if subscribed_only else len(self)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "contacts": len(self),
+            "subscribed": len(self._subscribed),
+            "tags": len(self._tags),
+            "companies": len(self._companies),
+            "ordinals": len(self._ids),
+        }
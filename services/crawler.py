@@ -0,0 +1,237 @@
+# services/crawler.py
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from .http_cache import HTTPCache, CacheEntry, NEGATIVE_STATUSES
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CrawlConfig:
+    max_connections: int = 20         # requests in flight across all hosts
+    per_host_concurrency: int = 1     # requests in flight per host
+    per_host_delay: float = 1.0       # minimum seconds between request starts on one host
+    robots_ttl: float = 3600.0        # seconds a parsed robots.txt stays valid
+    respect_robots: bool = True
+    user_agent: str = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    cache_dir: Optional[str] = None   # enables the persistent HTTP cache
+    cache_freshness: float = 86400.0  # seconds before a cached page is revalidated
+    negative_ttl: float = 86400.0     # seconds a 404/410 is remembered
+    error_ttl: float = 3600.0         # seconds a timeout/connection error is remembered
+
+    @classmethod
+    def from_env(cls) -> "CrawlConfig":
+        """Build config from SCRAPER_* environment variables"""
+        defaults = cls()
+        return cls(
+            max_connections=int(os.getenv("SCRAPER_MAX_CONNECTIONS", defaults.max_connections)),
+            per_host_delay=float(os.getenv("SCRAPER_PER_HOST_DELAY", defaults.per_host_delay)),
+            cache_dir=os.getenv("SCRAPER_CACHE_DIR") or None,
+            cache_freshness=float(os.getenv("SCRAPER_CACHE_FRESHNESS", defaults.cache_freshness)),
+            negative_ttl=float(os.getenv("SCRAPER_NEGATIVE_TTL", defaults.negative_ttl)),
+            error_ttl=float(os.getenv("SCRAPER_ERROR_TTL", defaults.error_ttl)),
+        )
+
+@dataclass
+class CrawlResult:
+    url: str
+    status_code: Optional[int] = None
+    content: bytes = b""
+    headers: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+    from_cache: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status_code is not None and 200 <= self.status_code < 300
+
+class _HostState:
+    """Politeness bookkeeping for one host"""
+
+    def __init__(self, concurrency: int):
+        self.slots = asyncio.Semaphore(concurrency)
+        self.next_start = 0.0
+        self.robots: Optional[RobotFileParser] = None
+        self.robots_expires = 0.0
+        self.robots_lock = asyncio.Lock()
+
+class CrawlScheduler:
+    """Polite concurrent fetcher: global connection cap, per-host slots and delay, cached robots.txt"""
+
+    def __init__(self,
+                 client: httpx.AsyncClient,
+                 config: Optional[CrawlConfig] = None,
+                 cache: Optional[HTTPCache] = None):
+        self.client = client
+        self.config = config or CrawlConfig()
+        self.cache = cache
+        if self.cache is None and self.config.cache_dir:
+            self.cache = HTTPCache(
+                self.config.cache_dir,
+                freshness=self.config.cache_freshness,
+                negative_ttl=self.config.negative_ttl,
+                error_ttl=self.config.error_ttl
+            )
+        self._connections = asyncio.Semaphore(self.config.max_connections)
+        self._hosts: Dict[str, _HostState] = {}
+        self.stats: Dict[str, int] = {
+            "fetched": 0,
+            "errors": 0,
+            "robots_blocked": 0,
+            "robots_fetched": 0
+        }
+
+    def _host(self, url: str) -> _HostState:
+        host = urlparse(url).netloc.lower()
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(self.config.per_host_concurrency)
+            self._hosts[host] = state
+        return state
+
+    async def fetch(self, url: str) -> CrawlResult:
+        """Fetch one URL, waiting for the host's politeness window"""
+
+        entry, cached_body = await asyncio.to_thread(self._read_cache, url) if self.cache else (None, None)
+
+        if entry and entry.fresh and (entry.negative or cached_body is not None):
+            return self._cached_result(entry, cached_body)
+
+        state = self._host(url)
+
+        if self.config.respect_robots and not await self._allowed(url, state):
+            self.stats["robots_blocked"] += 1
+            return CrawlResult(url=url, error="disallowed by robots.txt")
+
+        # Revalidate stale pages instead of downloading them again
+        headers = {}
+        if cached_body is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        async with state.slots:
+            await self._wait_for_turn(state)
+            try:
+                async with self._connections:
+                    response = await self.client.get(url, headers=headers)
+                self.stats["fetched"] += 1
+            except Exception as e:
+                self.stats["errors"] += 1
+                error = f"{type(e).__name__}: {str(e)}"
+                if cached_body is not None:
+                    # A transient failure must not replace a page we still have; serve it stale and retry later
+                    logger.warning(f"Revalidating {url} failed, serving cached copy: {error}")
+                    return self._cached_result(await asyncio.to_thread(self.cache.defer, entry), cached_body)
+                if self.cache:
+                    await asyncio.to_thread(self.cache.store_negative, url, error=error)
+                return CrawlResult(url=url, error=error)
+
+        if response.status_code == 304 and cached_body is not None:
+            return self._cached_result(await asyncio.to_thread(self.cache.refresh, entry), cached_body)
+
+        # Compression, the body write and the SQLite commit run off the event loop
+        if self.cache:
+            if 200 <= response.status_code < 300:
+                await asyncio.to_thread(self.cache.store, url, response.status_code, response.content, dict(response.headers))
+            elif response.status_code in NEGATIVE_STATUSES:
+                await asyncio.to_thread(self.cache.store_negative, url, status_code=response.status_code)
+
+        return CrawlResult(
+            url=url,
+            status_code=response.status_code,
+            content=response.content,
+            headers=dict(response.headers)
+        )
+
+    def _read_cache(self, url: str) -> Tuple[Optional[CacheEntry], Optional[bytes]]:
+        entry = self.cache.lookup(url)
+        return entry, self.cache.load_body(entry) if entry and not entry.negative else None
+
+    def _cached_result(self, entry: CacheEntry, body: Optional[bytes]) -> CrawlResult:
+        return CrawlResult(
+            url=entry.url,
+            status_code=entry.status_code,
+            content=body or b"",
+            headers=entry.headers,
+            error=entry.error,
+            from_cache=True
+        )
+
+    async def crawl(self, urls: Iterable[str]) -> AsyncIterator[CrawlResult]:
+        """Fetch URLs concurrently and yield results in completion order.
+
+        Closing the iterator early cancels fetches that have not finished.
+        """
+        tasks = [asyncio.create_task(self.fetch(url)) for url in dict.fromkeys(urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _wait_for_turn(self, state: _HostState):
+        delay = self.config.per_host_delay
+        if state.robots is not None:
+            crawl_delay = state.robots.crawl_delay(self.config.user_agent)
+            if crawl_delay:
+                delay = max(delay, float(crawl_delay))
+
+        now = time.monotonic()
+        start = max(now, state.next_start)
+        state.next_start = start + delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _allowed(self, url: str, state: _HostState) -> bool:
+        async with state.robots_lock:
+            if state.robots is None or state.robots_expires <= time.monotonic():
+                state.robots = await self._fetch_robots(url, state)
+                state.robots_expires = time.monotonic() + self.config.robots_ttl
+        return state.robots.can_fetch(self.config.user_agent, url)
+
+    async def _fetch_robots(self, url: str, state: _HostState) -> RobotFileParser:
+        parsed = urlparse(url)
+        parser = RobotFileParser(f"{parsed.scheme}://{parsed.netloc}/robots.txt")
+
+        try:
+            async with state.slots:
+                await self._wait_for_turn(state)
+                async with self._connections:
+                    response = await self.client.get(parser.url)
+            self.stats["robots_fetched"] += 1
+
+            if response.status_code in (401, 403):
+                parser.disallow_all = True
+            elif 200 <= response.status_code < 300:
+                parser.parse(response.text.splitlines())
+            else:
+                parser.allow_all = True
+
+        except Exception as e:
+            logger.warning(f"Could not fetch {parser.url}: {str(e)}")
+            parser.allow_all = True
+
+        return parser
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {**self.stats, "hosts": len(self._hosts)}
+        if self.cache:
+            stats["cache"] = self.cache.get_stats()
+        return stats
+
+    def close(self):
+        if self.cache:
+            self.cache.close()
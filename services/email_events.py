@@ -0,0 +1,202 @@
+# services/email_events.py
+
+import asyncio
+import base64
+import binascii
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Signed event webhooks are ECDSA (P-256, SHA-256); verification needs `cryptography`
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+except ImportError:
+    ec = None
+
+SIGNATURE_HEADER = "X-Twilio-Email-Event-Webhook-Signature"
+TIMESTAMP_HEADER = "X-Twilio-Email-Event-Webhook-Timestamp"
+
+@dataclass
+class EmailEventConfig:
+    public_key: Optional[str] = None   # SendGrid verification key (base64 DER); every request is rejected when unset...
+    allow_unsigned: bool = False        # ...unless unsigned requests are explicitly allowed (local development only)
+    max_skew: float = 600.0             # reject signatures whose timestamp is further than this from now
+    queue_size: int = 10000             # webhook request bodies waiting for the consumer
+    batch_size: int = 5000              # events handed to the handler at once
+    flush_interval: float = 0.05        # wait this long for a small batch to fill up
+
+    @classmethod
+    def from_env(cls) -> "EmailEventConfig":
+        """Build config from SENDGRID_WEBHOOK_* and EMAIL_EVENTS_* environment variables"""
+        defaults = cls()
+        return cls(
+            public_key=os.getenv("SENDGRID_WEBHOOK_PUBLIC_KEY") or None,
+            allow_unsigned=os.getenv("SENDGRID_WEBHOOK_ALLOW_UNSIGNED", "false").lower() in ("1", "true", "yes"),
+            max_skew=float(os.getenv("EMAIL_EVENTS_MAX_SKEW", defaults.max_skew)),
+            queue_size=int(os.getenv("EMAIL_EVENTS_QUEUE_SIZE", defaults.queue_size)),
+            batch_size=int(os.getenv("EMAIL_EVENTS_BATCH_SIZE", defaults.batch_size)),
+            flush_interval=float(os.getenv("EMAIL_EVENTS_FLUSH_INTERVAL", defaults.flush_interval)),
+        )
+
+class SignatureVerifier:
+    """Checks SendGrid's signature over timestamp + raw request body"""
+
+    def __init__(self, public_key: str):
+        self._key = None
+        if ec is None:
+            logger.error("cryptography is not installed; signed email event webhooks will be rejected")
+            return
+        try:
+            self._key = serialization.load_der_public_key(base64.b64decode(public_key))
+        except (ValueError, binascii.Error) as e:
+            logger.error(f"Invalid SendGrid webhook public key: {str(e)}")
+
+    def verify(self, payload: bytes, signature: str, timestamp: str) -> bool:
+        if self._key is None:
+            return False
+        try:
+            self._key.verify(base64.b64decode(signature), timestamp.encode() + payload, ec.ECDSA(hashes.SHA256()))
+            return True
+        except (InvalidSignature, ValueError, binascii.Error):
+            return False
+
+class EmailEventPipeline:
+    """In-process queue between the event webhook and the code that applies events.
+
+    The endpoint only verifies the signature and queues the raw body, so a request
+    costs a signature check and an enqueue on the API loop. A single consumer task
+    decodes queued bodies and hands events to `handler` in batches of up to
+    `batch_size`, letting the handler apply a whole batch in one pass. A full queue
+    is reported back so the endpoint can answer 503 and SendGrid retries later.
+    """
+
+    def __init__(self,
+                 handler: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+                 config: Optional[EmailEventConfig] = None):
+        self.handler = handler
+        self.config = config or EmailEventConfig()
+        self.verifier = SignatureVerifier(self.config.public_key) if self.config.public_key else None
+        if self.verifier is None and not self.config.allow_unsigned:
+            logger.warning("SENDGRID_WEBHOOK_PUBLIC_KEY is not set; email event webhooks will be rejected")
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop = None
+        self.stats = {
+            "requests": 0,
+            "rejected": 0,
+            "queue_full": 0,
+            "events": 0,
+            "malformed": 0,
+            "batches": 0,
+            "handler_errors": 0,
+        }
+
+    def start(self):
+        """Start the consumer on the running loop (again if the loop changed)"""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.config.queue_size)
+        self._task = loop.create_task(self._consume())
+
+    def verify(self, payload: bytes, signature: Optional[str], timestamp: Optional[str]) -> bool:
+        """True when the request is signed by SendGrid, or when unsigned requests are allowed and no key is set"""
+
+        if self.verifier is None:
+            if self.config.allow_unsigned:
+                return True
+            self.stats["rejected"] += 1
+            return False
+        try:
+            fresh = abs(time.time() - float(timestamp)) <= self.config.max_skew
+        except (TypeError, ValueError):
+            fresh = False
+        if not signature or not fresh or not self.verifier.verify(payload, signature, timestamp):
+            self.stats["rejected"] += 1
+            return False
+        return True
+
+    def submit(self, payload: bytes) -> bool:
+        """Queue a raw webhook body; False when the queue is full and the sender should retry"""
+
+        self.start()
+        self.stats["requests"] += 1
+        try:
+            self._queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.stats["queue_full"] += 1
+            return False
+        return True
+
+    def _decode(self, payload: bytes) -> List[Dict[str, Any]]:
+        try:
+            events = json.loads(payload)
+        except ValueError:
+            self.stats["malformed"] += 1
+            return []
+        if isinstance(events, dict):
+            events = [events]
+        if not isinstance(events, list):
+            self.stats["malformed"] += 1
+            return []
+        return [event for event in events if isinstance(event, dict)]
+
+    async def _consume(self):
+        queue = self._queue
+        while True:
+            events = self._decode(await queue.get())
+            taken = 1
+
+            # Let a small batch fill up, then take whatever else is already waiting
+            if len(events) < self.config.batch_size and queue.empty() and self.config.flush_interval > 0:
+                await asyncio.sleep(self.config.flush_interval)
+            while len(events) < self.config.batch_size and not queue.empty():
+                events.extend(self._decode(queue.get_nowait()))
+                taken += 1
+
+            try:
+                for start in range(0, len(events), self.config.batch_size):
+                    batch = events[start:start + self.config.batch_size]
+                    self.stats["events"] += len(batch)
+                    self.stats["batches"] += 1
+                    await self.handler(batch)
+            except Exception as e:
+                self.stats["handler_errors"] += 1
+                logger.error(f"Email event handler error: {str(e)}")
+            finally:
+                for _ in range(taken):
+                    queue.task_done()
+
+    async def drain(self):
+        """Wait until every queued body has been handled"""
+        if self._queue is not None and self._task is not None and not self._task.done():
+            await self._queue.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "queued": self._queue.qsize() if self._queue is not None else 0}
+
+    async def close(self, timeout: float = 5.0):
+        """Apply what is already queued (up to `timeout` seconds), then stop the consumer"""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.drain(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Dropping {self._queue.qsize()} queued email event payloads on shutdown")
+        except RuntimeError:
+            # Queue bound to a loop that is gone
+            pass
+        self._task.cancel()
+        try:
+            await self._task
+        except (asyncio.CancelledError, RuntimeError):
+            pass
+        self._task = None
@@ -0,0 +1,250 @@
+# services/engagement_classifier.py
+
+import asyncio
+import json
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SENTIMENTS = ("positive", "negative", "neutral")
+DEFAULT_LABEL = {"sentiment": "neutral", "requires_response": False}
+
+# Engagement kinds that carry no text worth reading
+SILENT_KINDS = {"like", "share"}
+
+# Short texts made only of these words (plus emoji/punctuation) are taken as plain praise
+POSITIVE_TERMS = {
+    "amazing", "awesome", "beautiful", "best", "brilliant", "congrats", "congratulations", "cool", "excellent",
+    "fantastic", "good", "great", "love", "loved", "lovely", "nice", "perfect", "thank", "thanks", "thx", "wow", "yay"
+}
+# Any of these sends a text to the model: complaints, negation and question words
+REVIEW_TERMS = {
+    "angry", "bad", "broken", "bug", "can't", "cancel", "cannot", "didn't", "disappointed", "doesn't", "don't",
+    "error", "fail", "failed", "hate", "help", "how", "issue", "never", "no", "not", "problem", "refund", "scam",
+    "slow", "terrible", "awful", "what", "when", "where", "why", "won't", "worst", "wrong"
+}
+POSITIVE_EMOJI = set("😀😁😂🤣😃😄😅😊😍🥰😘😎🤩👍👏🙌🙏💯🔥🎉❤💙💚💛💜🧡🖤♥✨⭐🌟💪")
+NEGATIVE_EMOJI = set("😡😠🤬👎💩😤😒🙄😞😢😭😩😫🤮")
+WORD_RE = re.compile(r"[a-z']+")
+SHORT_TEXT_WORDS = 6
+
+LABELS_SCHEMA = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "engagement_labels",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "labels": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string"},
+                            "sentiment": {"type": "string", "enum": list(SENTIMENTS)},
+                            "requires_response": {"type": "boolean"}
+                        },
+                        "required": ["id", "sentiment", "requires_response"],
+                        "additionalProperties": False
+                    }
+                }
+            },
+            "required": ["labels"],
+            "additionalProperties": False
+        }
+    }
+}
+
+@dataclass
+class EngagementClassifierConfig:
+    model: str = "gpt-4o-mini"    # must support json_schema response formats
+    batch_size: int = 40          # items packed into one request
+    max_wait: float = 0.05        # wait this long for a partial batch to fill up
+    queue_size: int = 2000        # items waiting for a batch; submitters wait while it is full
+    workers: int = 4              # batch requests in flight
+    max_text_chars: int = 500     # longer texts are truncated in the prompt
+
+    @classmethod
+    def from_env(cls) -> "EngagementClassifierConfig":
+        """Build config from ENGAGEMENT_CLASSIFIER_* environment variables"""
+        defaults = cls()
+        return cls(
+            model=os.getenv("ENGAGEMENT_CLASSIFIER_MODEL", defaults.model),
+            batch_size=int(os.getenv("ENGAGEMENT_CLASSIFIER_BATCH_SIZE", defaults.batch_size)),
+            max_wait=float(os.getenv("ENGAGEMENT_CLASSIFIER_MAX_WAIT", defaults.max_wait)),
+            queue_size=int(os.getenv("ENGAGEMENT_CLASSIFIER_QUEUE_SIZE", defaults.queue_size)),
+            workers=int(os.getenv("ENGAGEMENT_CLASSIFIER_WORKERS", defaults.workers)),
+        )
+
+def prefilter(text: str, kind: str = "comment") -> Optional[Dict[str, Any]]:
+    """Label for an item that plainly needs no model (likes, emoji-only or short praise), else None"""
+
+    if kind in SILENT_KINDS:
+        return {"sentiment": "positive", "requires_response": False}
+    text = (text or "").strip()
+    if not text:
+        return dict(DEFAULT_LABEL)
+
+    if any(char in NEGATIVE_EMOJI for char in text):
+        return None
+    words = WORD_RE.findall(text.lower())
+    positive_emoji = any(char in POSITIVE_EMOJI for char in text)
+    if not words and not any(char.isdigit() for char in text):
+        return {"sentiment": "positive" if positive_emoji else "neutral", "requires_response": False}
+
+    if len(words) > SHORT_TEXT_WORDS or "?" in text or any(word in REVIEW_TERMS for word in words):
+        return None
+    if any(word in POSITIVE_TERMS for word in words):
+        return {"sentiment": "positive", "requires_response": False}
+    return None
+
+class EngagementClassifier:
+    """Sentiment and needs-a-reply labels for engagement items, many per model request.
+
+    `classify` answers what the lexicon `prefilter` can settle locally and puts the
+    rest on a bounded queue. One collector drains the queue in batches of up to
+    `batch_size` (waiting at most `max_wait` for a batch to fill), and each batch is
+    labelled by one structured-output request, at most `workers` at a time. A post
+    with thousands of comments therefore costs thousands / `batch_size` requests.
+    Items the model skips, and whole batches that fail, get the neutral default.
+    """
+
+    def __init__(self, client, config: Optional[EngagementClassifierConfig] = None):
+        self.client = client
+        self.config = config or EngagementClassifierConfig()
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats: Dict[str, int] = {"items": 0, "prefiltered": 0, "classified": 0, "requests": 0, "failed_batches": 0}
+
+    def start(self):
+        """Start the batch collector on the running loop (again, if a previous loop has gone away)"""
+
+        loop = asyncio.get_running_loop()
+        if self._collector is not None and self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.config.queue_size)
+        self._slots = asyncio.Semaphore(self.config.workers)
+        self._inflight = set()
+        self._collector = asyncio.create_task(self._collect())
+
+    async def classify(self, items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """item id -> {"sentiment", "requires_response"} for items of {"id", "text", "kind"}"""
+
+        self.start()
+        labels: Dict[str, Dict[str, Any]] = {}
+        pending: List[Tuple[str, asyncio.Future]] = []
+        for item in items:
+            self.stats["items"] += 1
+            label = prefilter(item.get("text", ""), item.get("kind", "comment"))
+            if label is not None:
+                self.stats["prefiltered"] += 1
+                labels[item["id"]] = label
+                continue
+            future = self._loop.create_future()
+            await self._queue.put((item, future))
+            pending.append((item["id"], future))
+
+        for item_id, future in pending:
+            labels[item_id] = await future
+        return labels
+
+    async def _collect(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.config.max_wait
+            while len(batch) < self.config.batch_size:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._slots.acquire()
+            task = asyncio.create_task(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        labels = {}
+        try:
+            labels = await self._classify_batch([item for item, _ in batch])
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            logger.error(f"Error classifying {len(batch)} engagement items: {str(e)}")
+        finally:
+            self._slots.release()
+            # Also runs when the request is cancelled, so no caller waits forever
+            for item, future in batch:
+                if not future.done():
+                    future.set_result(labels.get(item["id"], dict(DEFAULT_LABEL)))
+
+    async def _classify_batch(self, items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        # Positions stand in for platform ids in the prompt; they are shorter and cannot collide
+        lines = "\n".join(
+            json.dumps({"id": str(position), "kind": item.get("kind", "comment"),
+                        "text": (item.get("text") or "")[:self.config.max_text_chars]}, ensure_ascii=False)
+            for position, item in enumerate(items)
+        )
+        prompt = f"""
+        Label each social media engagement item below.
+        sentiment: positive, negative or neutral.
+        requires_response: true for questions, complaints, requests and anything a brand should answer.
+
+        Items (one JSON object per line):
+        {lines}
+
+        Return one label per item id.
+        """
+
+        self.stats["requests"] += 1
+        response = await self.client.chat.completions.create(
+            model=self.config.model,
+            messages=[
+                {"role": "system", "content": "You are a social media engagement analyst."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0,
+            max_tokens=30 * len(items) + 50,
+            response_format=LABELS_SCHEMA
+        )
+
+        labels = {}
+        for label in json.loads(response.choices[0].message.content).get("labels", []):
+            try:
+                item = items[int(label["id"])]
+            except (KeyError, ValueError, IndexError):
+                continue
+            sentiment = label.get("sentiment")
+            labels[item["id"]] = {
+                "sentiment": sentiment if sentiment in SENTIMENTS else "neutral",
+                "requires_response": bool(label.get("requires_response", False))
+            }
+        self.stats["classified"] += len(labels)
+        return labels
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "queued": self._queue.qsize() if self._queue else 0}
+
+    async def close(self):
+        """Stop batching; requests in flight are cancelled and items still queued get the neutral default"""
+
+        tasks = [task for task in [self._collector, *self._inflight] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._collector = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_result(dict(DEFAULT_LABEL))
@@ -0,0 +1,255 @@
+# services/engagement_cursors.py
+
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+@dataclass
+class EngagementCursorConfig:
+    store: str = "auto"               # "sqlite", "supabase" or "auto" (Supabase when a client is given)
+    sqlite_path: Optional[str] = None # None keeps cursors in memory only
+    table: str = "social_engagement_cursors"
+    bloom_capacity: int = 200000      # ids per Bloom filter generation, per platform
+    bloom_error_rate: float = 1e-6    # chance a never-seen id is taken for a seen one
+    recent_ids: int = 5000            # newest ids kept exactly, and persisted to rebuild the filter on restart
+
+    @classmethod
+    def from_env(cls) -> "EngagementCursorConfig":
+        """Build config from ENGAGEMENT_CURSORS_* environment variables"""
+        defaults = cls()
+        return cls(
+            store=os.getenv("ENGAGEMENT_CURSORS_STORE", defaults.store),
+            sqlite_path=os.getenv("ENGAGEMENT_CURSORS_DB_PATH") or None,
+            table=os.getenv("ENGAGEMENT_CURSORS_TABLE", defaults.table),
+            bloom_capacity=int(os.getenv("ENGAGEMENT_CURSORS_BLOOM_CAPACITY", defaults.bloom_capacity)),
+            recent_ids=int(os.getenv("ENGAGEMENT_CURSORS_RECENT_IDS", defaults.recent_ids)),
+        )
+
+class BloomFilter:
+    """Fixed-size Bloom filter over string keys (double hashing of one blake2b digest)"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+class SeenSet:
+    """Compact membership for engagement ids already processed.
+
+    The newest `recent` ids are kept exactly (and are what gets persisted); every
+    id also goes into a Bloom filter. When a filter generation reaches capacity a
+    fresh one is started and the previous one is still consulted, so memory stays
+    bounded at two filters while ids from the last generation are remembered.
+    """
+
+    def __init__(self, capacity: int = 200000, error_rate: float = 1e-6, recent: int = 5000):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.recent_size = recent
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous: Optional[BloomFilter] = None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._recent or key in self._current or (self._previous is not None and key in self._previous)
+
+    def __len__(self) -> int:
+        return self._current.count + (self._previous.count if self._previous else 0)
+
+    def add(self, key: str):
+        if key in self._recent:
+            self._recent.move_to_end(key)
+            return
+        self._recent[key] = None
+        if len(self._recent) > self.recent_size:
+            self._recent.popitem(last=False)
+        self._current.add(key)
+        if self._current.count >= self.capacity:
+            self._previous, self._current = self._current, BloomFilter(self.capacity, self.error_rate)
+
+    def update(self, keys: Iterable[str]):
+        for key in keys:
+            self.add(key)
+
+    def recent(self) -> List[str]:
+        """Exactly-kept ids, oldest first"""
+        return list(self._recent)
+
+class SQLiteCursorStore:
+    """Cursor rows in a local SQLite file (or in memory)"""
+
+    def __init__(self, path: Optional[str] = None, table: str = "social_engagement_cursors"):
+        self.table = table
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, cursor TEXT, recent_ids TEXT, updated_at REAL)")
+        self._db.commit()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            key: {"cursor": json.loads(cursor), "recent_ids": json.loads(recent_ids)}
+            for key, cursor, recent_ids in self._db.execute(f"SELECT key, cursor, recent_ids FROM {self.table}")
+        }
+
+    def save(self, rows: Dict[str, Dict[str, Any]]):
+        self._db.executemany(
+            f"INSERT OR REPLACE INTO {self.table} (key, cursor, recent_ids, updated_at) VALUES (?, ?, ?, ?)",
+            [(key, json.dumps(row["cursor"]), json.dumps(row["recent_ids"]), time.time()) for key, row in rows.items()]
+        )
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+class SupabaseCursorStore:
+    """Cursor rows in Supabase, so high-water marks survive redeploys"""
+
+    def __init__(self, supabase_client, table: str = "social_engagement_cursors"):
+        self.supabase = supabase_client
+        self.table = table
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        response = self.supabase.table(self.table).select("*").execute()
+        return {
+            row["key"]: {"cursor": row.get("cursor") or {}, "recent_ids": row.get("recent_ids") or []}
+            for row in response.data or []
+        }
+
+    def save(self, rows: Dict[str, Dict[str, Any]]):
+        self.supabase.table(self.table).upsert([
+            {"key": key, "cursor": row["cursor"], "recent_ids": row["recent_ids"], "updated_at": time.time()}
+            for key, row in rows.items()
+        ]).execute()
+
+    def close(self):
+        pass
+
+class EngagementCursors:
+    """Per-platform high-water marks and seen ids for incremental engagement polling.
+
+    A fetcher reads its cursor (`since_id`, `since`, paging tokens - whatever the
+    platform paginates by), drops ids it has already processed with `unseen`, and
+    stages the cursor it reached with `advance`. `commit` then marks the new items
+    seen and persists staged cursors, so a cursor only moves past items once they
+    have been stored; a poll that fails before then re-reads the same window.
+    """
+
+    def __init__(self, store=None, config: Optional[EngagementCursorConfig] = None):
+        self.config = config or EngagementCursorConfig()
+        self.store = store or SQLiteCursorStore(self.config.sqlite_path, self.config.table)
+        self._cursors: Dict[str, Dict[str, Any]] = {}
+        self._seen: Dict[str, SeenSet] = {}
+        self._staged: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self.stats: Dict[str, int] = {"fetched": 0, "skipped": 0, "new": 0, "commits": 0}
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            rows = self.store.load()
+        except Exception as e:
+            logger.error(f"Error loading engagement cursors: {str(e)}")
+            return
+        for key, row in rows.items():
+            self._cursors[key] = dict(row["cursor"])
+            self.seen(key).update(row["recent_ids"])
+
+    def seen(self, key: str) -> SeenSet:
+        if key not in self._seen:
+            self._seen[key] = SeenSet(self.config.bloom_capacity, self.config.bloom_error_rate, self.config.recent_ids)
+        return self._seen[key]
+
+    def get(self, key: str) -> Dict[str, Any]:
+        """Cursor for a platform/account, including changes staged but not yet committed"""
+        self._load()
+        return {**self._cursors.get(key, {}), **self._staged.get(key, {})}
+
+    def unseen(self, key: str, items: Iterable[T], item_id: Callable[[T], str]) -> List[T]:
+        """Items whose id has not been committed before (and is not repeated within `items`)"""
+
+        self._load()
+        seen = self.seen(key)
+        fresh, ids = [], set()
+        for item in items:
+            self.stats["fetched"] += 1
+            identifier = item_id(item)
+            if identifier in seen or identifier in ids:
+                self.stats["skipped"] += 1
+                continue
+            ids.add(identifier)
+            fresh.append(item)
+        self.stats["new"] += len(fresh)
+        return fresh
+
+    def advance(self, key: str, **fields):
+        """Stage cursor fields reached by a fetch; a None value clears the field"""
+        self._staged.setdefault(key, {}).update(fields)
+
+    def commit(self, processed: Dict[str, Iterable[str]]):
+        """Mark `processed` ids (key -> ids) seen and persist every staged cursor"""
+
+        self._load()
+        keys = set(self._staged)
+        for key, ids in processed.items():
+            self.seen(key).update(ids)
+            keys.add(key)
+        for key, fields in self._staged.items():
+            cursor = self._cursors.setdefault(key, {})
+            cursor.update(fields)
+            for field_name in [name for name, value in cursor.items() if value is None]:
+                del cursor[field_name]
+        self._staged.clear()
+        if not keys:
+            return
+
+        rows = {key: {"cursor": self._cursors.get(key, {}), "recent_ids": self.seen(key).recent()} for key in keys}
+        try:
+            self.store.save(rows)
+            self.stats["commits"] += 1
+        except Exception as e:
+            logger.error(f"Error saving engagement cursors: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "cursors": {key: dict(cursor) for key, cursor in self._cursors.items()},
+            "seen": {key: len(seen) for key, seen in self._seen.items()},
+        }
+
+    def close(self):
+        self.store.close()
+
+def create_engagement_cursors(supabase_client=None, config: Optional[EngagementCursorConfig] = None) -> EngagementCursors:
+    """Cursors backed by Supabase when a client is given (or configured), else SQLite"""
+    config = config or EngagementCursorConfig.from_env()
+    use_supabase = config.store == "supabase" or (config.store == "auto" and supabase_client is not None)
+    store = SupabaseCursorStore(supabase_client, config.table) if use_supabase else None
+    return EngagementCursors(store=store, config=config)
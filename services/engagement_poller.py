@@ -0,0 +1,87 @@
+# services/engagement_poller.py
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class EngagementPollConfig:
+    fetch_timeout: float = 20.0        # seconds one platform's fetch may take before the poll moves on without it
+
+    @classmethod
+    def from_env(cls) -> "EngagementPollConfig":
+        """Build config from ENGAGEMENT_POLL_* environment variables"""
+        defaults = cls()
+        return cls(
+            fetch_timeout=float(os.getenv("ENGAGEMENT_POLL_FETCH_TIMEOUT", defaults.fetch_timeout)),
+        )
+
+class EngagementPoller:
+    """Polls every platform at once and pipes each platform's items into analysis.
+
+    Each fetcher runs as its own task under `fetch_timeout`, and its items are
+    handed to `analyze` as one list as soon as it returns, so a slow platform
+    neither delays the analysis of the others nor adds to their latency; `analyze`
+    is expected to bound its own concurrency. Once every platform is done, all
+    analyzed items are handed to `save` in one call, even when there are none.
+    Items are duck-typed.
+    """
+
+    def __init__(self,
+                 fetchers: Dict[str, Callable[[], Awaitable[List[Any]]]],
+                 analyze: Callable[[List[Any]], Awaitable[Any]],
+                 save: Callable[[List[Any]], Awaitable[Any]],
+                 config: Optional[EngagementPollConfig] = None):
+        self.fetchers = fetchers
+        self.analyze = analyze
+        self.save = save
+        self.config = config or EngagementPollConfig()
+        self.stats: Dict[str, Dict[str, Any]] = {
+            name: {"polls": 0, "items": 0, "timeouts": 0, "errors": 0, "last_fetch_seconds": None}
+            for name in fetchers
+        }
+
+    async def poll(self) -> List[Any]:
+        """Fetch, analyze and save one round of engagement; platforms that fail or time out contribute nothing"""
+
+        results = await asyncio.gather(*[self._poll_platform(name) for name in self.fetchers])
+        items = [item for platform_items in results for item in platform_items]
+        try:
+            # Called even for an empty round so the caller can record how far each fetcher got
+            await self.save(items)
+        except Exception as e:
+            logger.error(f"Error saving {len(items)} engagement items: {str(e)}")
+        return items
+
+    async def _poll_platform(self, name: str) -> List[Any]:
+        stats = self.stats[name]
+        stats["polls"] += 1
+        started = time.monotonic()
+        try:
+            items = await asyncio.wait_for(self.fetchers[name](), self.config.fetch_timeout)
+        except asyncio.TimeoutError:
+            stats["timeouts"] += 1
+            logger.error(f"Fetching {name} engagement timed out after {self.config.fetch_timeout}s")
+            return []
+        except Exception as e:
+            stats["errors"] += 1
+            logger.error(f"Error monitoring {name} engagement: {str(e)}")
+            return []
+        finally:
+            stats["last_fetch_seconds"] = round(time.monotonic() - started, 3)
+
+        stats["items"] += len(items)
+        if items:
+            try:
+                await self.analyze(items)
+            except Exception as e:
+                logger.error(f"Error analyzing {len(items)} {name} engagement items: {str(e)}")
+        return items
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(stats) for name, stats in self.stats.items()}
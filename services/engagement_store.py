@@ -0,0 +1,180 @@
+# services/engagement_store.py
+
+import logging
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NOT_SENT = np.iinfo(np.int64).min
+_EPOCH = datetime(1970, 1, 1)
+
+def wall_clock_seconds(moment: Optional[datetime]) -> int:
+    """Seconds since 1970-01-01 of the datetime's own wall-clock reading (timezone ignored).
+
+    Day-of-week and hour then come straight from integer division, matching
+    strftime("%A") / .hour on the original datetime.
+    """
+    if moment is None:
+        return NOT_SENT
+    return int((moment.replace(tzinfo=None) - _EPOCH).total_seconds())
+
+class _Interner:
+    """Stable small-integer codes for hashable keys"""
+
+    def __init__(self):
+        self.codes: Dict[Hashable, int] = {}
+        self.keys: List[Hashable] = []
+
+    def code(self, key: Hashable) -> int:
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.keys)
+            self.keys.append(key)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+class EngagementStore:
+    """Array-backed message state for analytics.
+
+    One row per message with int32 campaign and contact codes, an int8 status code
+    and int64 sent_at seconds, appended in fixed-size NumPy chunks. Writes upsert a
+    message's row in place; aggregates are bincount group-bys over the chunks, so
+    analytics never touch the message objects. Statuses, campaign ids and contact
+    ids are interned once.
+    """
+
+    def __init__(self, chunk_size: int = 65536):
+        self.chunk_size = chunk_size
+        self._rows: Dict[str, int] = {}  # message id -> row
+        self._campaigns = _Interner()
+        self._contacts = _Interner()
+        self._statuses = _Interner()
+        self._chunks: List[Dict[str, np.ndarray]] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _new_chunk(self) -> Dict[str, np.ndarray]:
+        return {
+            "campaign": np.zeros(self.chunk_size, dtype=np.int32),
+            "contact": np.zeros(self.chunk_size, dtype=np.int32),
+            "status": np.zeros(self.chunk_size, dtype=np.int8),
+            "sent_at": np.full(self.chunk_size, NOT_SENT, dtype=np.int64),
+        }
+
+    def record(self, message_id: str, campaign_id: str, contact_id: str, status: Hashable, sent_at: Optional[datetime]):
+        """Insert or update a message's row"""
+
+        row = self._rows.get(message_id)
+        if row is None:
+            row = self._rows[message_id] = self._size
+            if row // self.chunk_size == len(self._chunks):
+                self._chunks.append(self._new_chunk())
+            self._size += 1
+
+        chunk = self._chunks[row // self.chunk_size]
+        offset = row % self.chunk_size
+        chunk["campaign"][offset] = self._campaigns.code(campaign_id)
+        chunk["contact"][offset] = self._contacts.code(contact_id)
+        chunk["status"][offset] = self._statuses.code(status)
+        chunk["sent_at"][offset] = wall_clock_seconds(sent_at)
+
+    def sent_at(self, message_id: str) -> Optional[datetime]:
+        """A recorded message's sent_at (wall-clock, naive), or None if unsent or unknown"""
+        row = self._rows.get(message_id)
+        if row is None:
+            return None
+        seconds = int(self._chunks[row // self.chunk_size]["sent_at"][row % self.chunk_size])
+        return None if seconds == NOT_SENT else _EPOCH + timedelta(seconds=seconds)
+
+    def record_message(self, message: Any):
+        self.record(message.id, message.campaign_id, message.contact_id, message.status, message.sent_at)
+
+    def _columns(self):
+        """(campaign, contact, status, sent_at) views over the filled part of each chunk"""
+        for index, chunk in enumerate(self._chunks):
+            filled = min(self._size - index * self.chunk_size, self.chunk_size)
+            yield chunk["campaign"][:filled], chunk["contact"][:filled], chunk["status"][:filled], chunk["sent_at"][:filled]
+
+    def _status_mask(self, statuses: Iterable[Hashable]) -> np.ndarray:
+        """Lookup table: status code -> member of `statuses`"""
+        mask = np.zeros(max(len(self._statuses), 1), dtype=bool)
+        for status in statuses:
+            code = self._statuses.codes.get(status)
+            if code is not None:
+                mask[code] = True
+        return mask
+
+    def has_campaign(self, campaign_id: str) -> bool:
+        return campaign_id in self._campaigns.codes
+
+    def campaign_counts(self, status_groups: Dict[str, Iterable[Hashable]]) -> Dict[str, Dict[str, int]]:
+        """Per campaign: total messages, messages sent, and messages in each named status group"""
+
+        n = len(self._campaigns)
+        masks = {name: self._status_mask(statuses) for name, statuses in status_groups.items()}
+        totals = {name: np.zeros(n, dtype=np.int64) for name in ("messages", "sent", *masks)}
+
+        for campaign, _, status, sent_at in self._columns():
+            totals["messages"] += np.bincount(campaign, minlength=n)
+            totals["sent"] += np.bincount(campaign, weights=sent_at != NOT_SENT, minlength=n).astype(np.int64)
+            for name, mask in masks.items():
+                totals[name] += np.bincount(campaign, weights=mask[status], minlength=n).astype(np.int64)
+
+        return {
+            campaign_id: {name: int(values[code]) for name, values in totals.items()}
+            for code, campaign_id in enumerate(self._campaigns.keys)
+        }
+
+    def engagement_histograms(self,
+                              statuses: Iterable[Hashable],
+                              contact_ids: Optional[Iterable[str]] = None) -> Tuple[int, np.ndarray, np.ndarray]:
+        """(messages, counts by weekday Monday..Sunday, counts by hour) for sent messages in `statuses`
+
+        Restricted to the given contacts when `contact_ids` is not None.
+        """
+
+        contact_mask = None
+        if contact_ids is not None:
+            contact_mask = np.zeros(max(len(self._contacts), 1), dtype=bool)
+            codes = [self._contacts.codes[c] for c in contact_ids if c in self._contacts.codes]
+            contact_mask[codes] = True
+
+        status_mask = self._status_mask(statuses)
+        messages = 0
+        days = np.zeros(7, dtype=np.int64)
+        hours = np.zeros(24, dtype=np.int64)
+
+        for _, contact, status, sent_at in self._columns():
+            selected = np.ones(len(contact), dtype=bool) if contact_mask is None else contact_mask[contact]
+            messages += int(selected.sum())
+            engaged = selected & status_mask[status] & (sent_at != NOT_SENT)
+            seconds = sent_at[engaged]
+            # 1970-01-01 was a Thursday (weekday 3)
+            days += np.bincount((seconds // 86400 + 3) % 7, minlength=7)
+            hours += np.bincount((seconds // 3600) % 24, minlength=24)
+
+        return messages, days, hours
+
+    def column_bytes(self) -> int:
+        """Bytes held by the column chunks"""
+        return sum(column.nbytes for chunk in self._chunks for column in chunk.values())
+
+    def index_bytes(self) -> int:
+        """Bytes held by the message id -> row dict and the interners, counting key strings as owned by the store"""
+        total = sys.getsizeof(self._rows) + sum(sys.getsizeof(key) + sys.getsizeof(row) for key, row in self._rows.items())
+        for interner in (self._campaigns, self._contacts, self._statuses):
+            total += sys.getsizeof(interner.codes) + sys.getsizeof(interner.keys)
+            total += sum(sys.getsizeof(key) + sys.getsizeof(code) for key, code in interner.codes.items())
+        return total
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the store: columns plus the id index and interners"""
+        return self.column_bytes() + self.index_bytes()
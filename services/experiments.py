@@ -0,0 +1,373 @@
+# services/experiments.py
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Engagement milestones a message can reach, counted once each
+SENT, OPENED, CLICKED = 1, 2, 4
+
+@dataclass
+class ExperimentConfig:
+    metric: str = "opened"              # "opened" or "clicked": the rate variants compete on
+    min_sends_per_variant: int = 100    # no decision before every variant has this many sends
+    min_conversions: int = 30           # ...and the variants have this many successes between them
+    prob_best_threshold: float = 0.95   # stop when one variant is best with this posterior probability
+    max_expected_loss: float = 0.002    # ...or when choosing the leader costs less than this rate, in expectation
+    evaluate_every: int = 25            # opens/clicks between sequential checks
+    samples: int = 20000                # posterior draws per check
+    max_duration_hours: float = 24.0    # send the leader to the holdout if still undecided by then
+    store: str = "auto"                 # "sqlite", "supabase" or "auto" (Supabase when a client is given)
+    sqlite_path: Optional[str] = None   # None keeps experiment state in memory only
+    table: str = "ab_experiments"
+
+    @classmethod
+    def from_env(cls) -> "ExperimentConfig":
+        """Build config from AB_TEST_* environment variables"""
+        defaults = cls()
+        return cls(
+            metric=os.getenv("AB_TEST_METRIC", defaults.metric),
+            min_sends_per_variant=int(os.getenv("AB_TEST_MIN_SENDS", defaults.min_sends_per_variant)),
+            min_conversions=int(os.getenv("AB_TEST_MIN_CONVERSIONS", defaults.min_conversions)),
+            prob_best_threshold=float(os.getenv("AB_TEST_PROB_BEST", defaults.prob_best_threshold)),
+            max_expected_loss=float(os.getenv("AB_TEST_MAX_EXPECTED_LOSS", defaults.max_expected_loss)),
+            max_duration_hours=float(os.getenv("AB_TEST_MAX_HOURS", defaults.max_duration_hours)),
+            store=os.getenv("AB_TEST_STORE", defaults.store),
+            sqlite_path=os.getenv("AB_TEST_DB_PATH") or None,
+            table=os.getenv("AB_TEST_TABLE", defaults.table),
+        )
+
+def stratified_assignment(items: Sequence[Any],
+                          variants: int,
+                          test_fraction: float,
+                          stratum: Callable[[Any], Hashable],
+                          seed: Optional[int] = None) -> Tuple[List[List[Any]], List[Any]]:
+    """Randomly split items into equal-sized variant groups plus a holdout.
+
+    `test_fraction` of all items is sampled, shared out across strata by largest
+    remainder: each stratum gets the whole part of its proportional share, and the
+    leftover slots go to the strata with the largest fractional parts (ties drawn
+    at random). Many tiny strata, such as one-contact domains, therefore still
+    contribute their share instead of each rounding down to nothing. Each stratum
+    is shuffled on its own and its sample dealt round-robin across variants, so
+    every variant sees the same mix of strata.
+    """
+
+    rng = random.Random(seed)
+    strata: Dict[Hashable, List[Any]] = defaultdict(list)
+    for item in items:
+        strata[stratum(item)].append(item)
+
+    keys = sorted(strata, key=str)
+    shares = {key: len(strata[key]) * test_fraction for key in keys}
+    takes = {key: int(share) for key, share in shares.items()}
+    leftover = int(round(len(items) * test_fraction)) - sum(takes.values())
+    tie_break = {key: rng.random() for key in keys}
+    for key in sorted(keys, key=lambda key: (takes[key] - shares[key], tie_break[key]))[:max(0, leftover)]:
+        takes[key] += 1
+
+    groups: List[List[Any]] = [[] for _ in range(variants)]
+    holdout: List[Any] = []
+    offset = 0
+    for key in keys:
+        members = strata[key]
+        rng.shuffle(members)
+        take = takes[key]
+        for position, item in enumerate(members[:take]):
+            # Rotating the starting variant keeps group sizes within one of each other
+            groups[(offset + position) % variants].append(item)
+        offset += take
+        holdout.extend(members[take:])
+    return groups, holdout
+
+@dataclass
+class Experiment:
+    id: str
+    variants: List[str]
+    config: ExperimentConfig
+    created_at: datetime = field(default_factory=datetime.now)
+    sent: np.ndarray = None
+    opened: np.ndarray = None
+    clicked: np.ndarray = None
+    status: str = "running"             # running -> decided -> completed
+    winner: Optional[int] = None
+    decided_by: Optional[str] = None    # "probability", "expected_loss", "deadline"
+    holdout: List[Any] = field(default_factory=list)
+    events_since_check: int = 0
+    last_evaluation: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        size = len(self.variants)
+        self.sent = np.zeros(size, dtype=np.int64) if self.sent is None else self.sent
+        self.opened = np.zeros(size, dtype=np.int64) if self.opened is None else self.opened
+        self.clicked = np.zeros(size, dtype=np.int64) if self.clicked is None else self.clicked
+
+    @property
+    def successes(self) -> np.ndarray:
+        return self.clicked if self.config.metric == "clicked" else self.opened
+
+class SQLiteExperimentStore:
+    """Experiment state rows in a local SQLite file (or in memory)"""
+
+    def __init__(self, path: Optional[str] = None, table: str = "ab_experiments"):
+        self.table = table
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute(f"CREATE TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY, state TEXT, updated_at REAL)")
+        self._db.commit()
+
+    def load(self) -> List[Dict[str, Any]]:
+        return [json.loads(state) for state, in self._db.execute(f"SELECT state FROM {self.table}")]
+
+    def save(self, states: List[Dict[str, Any]]):
+        self._db.executemany(
+            f"INSERT OR REPLACE INTO {self.table} (id, state, updated_at) VALUES (?, ?, ?)",
+            [(state["id"], json.dumps(state), time.time()) for state in states]
+        )
+        self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+class SupabaseExperimentStore:
+    """Experiment state rows in Supabase, so running tests survive redeploys"""
+
+    def __init__(self, supabase_client, table: str = "ab_experiments"):
+        self.supabase = supabase_client
+        self.table = table
+
+    def load(self) -> List[Dict[str, Any]]:
+        response = self.supabase.table(self.table).select("*").execute()
+        return [row["state"] for row in response.data or [] if row.get("state")]
+
+    def save(self, states: List[Dict[str, Any]]):
+        self.supabase.table(self.table).upsert([
+            {"id": state["id"], "state": state, "updated_at": time.time()} for state in states
+        ]).execute()
+
+    def close(self):
+        pass
+
+def create_experiment_store(supabase_client=None, config: Optional[ExperimentConfig] = None):
+    """Experiment store backed by Supabase when a client is given (or configured), else SQLite"""
+    config = config or ExperimentConfig.from_env()
+    use_supabase = config.store == "supabase" or (config.store == "auto" and supabase_client is not None)
+    if use_supabase:
+        return SupabaseExperimentStore(supabase_client, config.table)
+    return SQLiteExperimentStore(config.sqlite_path, config.table)
+
+class ExperimentEngine:
+    """Tracks A/B experiments and decides them with Bayesian sequential testing.
+
+    Each variant's success rate gets a Beta(1 + successes, 1 + failures) posterior.
+    After every `evaluate_every` opens or clicks the engine estimates, from posterior draws,
+    the probability that each variant is best and the expected rate lost by picking
+    the current leader; the test stops as soon as either crosses its threshold.
+    Counters are incremental: each message counts at most once per milestone.
+
+    With a `store`, `save` persists an experiment's counters, decision, variant
+    bindings and holdout (as item ids), and a restarted engine reloads them on first
+    use, so a test whose deadline falls after a restart still reaches its holdout.
+    Which milestones each message has already counted is kept in memory only.
+    """
+
+    def __init__(self, config: Optional[ExperimentConfig] = None, seed: Optional[int] = None, store=None):
+        self.config = config or ExperimentConfig()
+        self.store = store
+        self.experiments: Dict[str, Experiment] = {}
+        self._variant_of: Dict[str, Tuple[str, int]] = {}   # message group key (campaign id) -> (experiment, variant)
+        self._milestones: Dict[str, int] = {}               # message id -> milestones already counted
+        self._rng = np.random.default_rng(seed)
+        self._loaded = store is None
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            states = self.store.load()
+        except Exception as e:
+            logger.error(f"Error loading experiments: {str(e)}")
+            return
+        for state in states:
+            if state["id"] not in self.experiments:
+                self._restore(state)
+
+    def _restore(self, state: Dict[str, Any]) -> Experiment:
+        experiment = Experiment(
+            id=state["id"],
+            variants=list(state["variants"]),
+            config=ExperimentConfig(**state["config"]),
+            created_at=datetime.fromisoformat(state["created_at"]),
+            sent=np.array(state["sent"], dtype=np.int64),
+            opened=np.array(state["opened"], dtype=np.int64),
+            clicked=np.array(state["clicked"], dtype=np.int64),
+            status=state["status"],
+            winner=state["winner"],
+            decided_by=state["decided_by"],
+            holdout=list(state["holdout"]),
+            last_evaluation=state.get("last_evaluation") or {}
+        )
+        self.experiments[experiment.id] = experiment
+        for group_key, variant in state["bindings"].items():
+            self._variant_of[group_key] = (experiment.id, variant)
+        return experiment
+
+    def _state(self, experiment: Experiment) -> Dict[str, Any]:
+        return {
+            "id": experiment.id,
+            "variants": experiment.variants,
+            "config": asdict(experiment.config),
+            "created_at": experiment.created_at.isoformat(),
+            "sent": experiment.sent.tolist(),
+            "opened": experiment.opened.tolist(),
+            "clicked": experiment.clicked.tolist(),
+            "status": experiment.status,
+            "winner": experiment.winner,
+            "decided_by": experiment.decided_by,
+            "holdout": [getattr(item, "id", item) for item in experiment.holdout],
+            "bindings": {
+                group_key: variant for group_key, (experiment_id, variant) in self._variant_of.items()
+                if experiment_id == experiment.id
+            },
+            "last_evaluation": experiment.last_evaluation,
+        }
+
+    def save(self, experiment: Experiment):
+        """Persist an experiment's current state (a no-op without a store)"""
+        if self.store is None:
+            return
+        try:
+            self.store.save([self._state(experiment)])
+        except Exception as e:
+            logger.error(f"Error saving experiment {experiment.id}: {str(e)}")
+
+    def get(self, experiment_id: str) -> Optional[Experiment]:
+        self._load()
+        return self.experiments.get(experiment_id)
+
+    def create(self, experiment_id: str, variants: List[str], config: Optional[ExperimentConfig] = None) -> Experiment:
+        self._load()
+        experiment = Experiment(id=experiment_id, variants=list(variants), config=config or self.config)
+        self.experiments[experiment_id] = experiment
+        return experiment
+
+    def bind(self, group_key: str, experiment_id: str, variant: int):
+        """Route messages of a group (the variant's campaign) to an experiment variant"""
+        self._variant_of[group_key] = (experiment_id, variant)
+
+    def variant_for(self, group_key: str) -> Optional[Tuple[str, int]]:
+        self._load()
+        return self._variant_of.get(group_key)
+
+    def record(self, message_id: str, group_key: str, milestone: int) -> Optional[Experiment]:
+        """Count a message reaching SENT/OPENED/CLICKED; returns the experiment when it should be re-evaluated"""
+
+        self._load()
+        binding = self._variant_of.get(group_key)
+        if binding is None:
+            return None
+        experiment = self.experiments.get(binding[0])
+        if experiment is None:
+            return None
+
+        # A click implies an open, and both imply a send
+        reached = {SENT: SENT, OPENED: SENT | OPENED, CLICKED: SENT | OPENED | CLICKED}[milestone]
+        seen = self._milestones.get(message_id, 0)
+        new = reached & ~seen
+        if not new:
+            return None
+        self._milestones[message_id] = seen | new
+
+        variant = binding[1]
+        if new & SENT:
+            experiment.sent[variant] += 1
+        if new & OPENED:
+            experiment.opened[variant] += 1
+        if new & CLICKED:
+            experiment.clicked[variant] += 1
+
+        # Sends alone carry no evidence; only engagement triggers a check
+        if not new & (OPENED | CLICKED):
+            return None
+        experiment.events_since_check += 1
+        if experiment.status == "running" and experiment.events_since_check >= experiment.config.evaluate_every:
+            return experiment
+        return None
+
+    def evaluate(self, experiment: Experiment) -> Dict[str, Any]:
+        """Posterior summary; marks the experiment decided when a stopping rule fires"""
+
+        experiment.events_since_check = 0
+        config = experiment.config
+        sent = experiment.sent
+        successes = np.minimum(experiment.successes, sent)
+
+        draws = self._rng.beta(1 + successes, 1 + sent - successes, size=(config.samples, len(sent)))
+        best = draws.argmax(axis=1)
+        prob_best = np.bincount(best, minlength=len(sent)) / config.samples
+        leader = int(prob_best.argmax())
+        expected_loss = float(np.mean(draws.max(axis=1) - draws[:, leader]))
+
+        evaluation = {
+            "rates": [float(s / n) if n else 0.0 for s, n in zip(successes, sent)],
+            "sent": sent.tolist(),
+            "successes": successes.tolist(),
+            "prob_best": [round(float(p), 4) for p in prob_best],
+            "leader": leader,
+            "expected_loss": round(expected_loss, 6),
+        }
+        experiment.last_evaluation = evaluation
+
+        if (experiment.status == "running"
+                and sent.min() >= config.min_sends_per_variant
+                and successes.sum() >= config.min_conversions):
+            if prob_best[leader] >= config.prob_best_threshold:
+                self.decide(experiment, leader, "probability")
+            elif expected_loss <= config.max_expected_loss:
+                self.decide(experiment, leader, "expected_loss")
+        return evaluation
+
+    def decide(self, experiment: Experiment, winner: int, reason: str):
+        experiment.status = "decided"
+        experiment.winner = winner
+        experiment.decided_by = reason
+        logger.info(f"Experiment {experiment.id} decided by {reason}: variant {winner}")
+
+    def summary(self, experiment_id: str) -> Optional[Dict[str, Any]]:
+        experiment = self.get(experiment_id)
+        if experiment is None:
+            return None
+        return {
+            "test_id": experiment.id,
+            "status": experiment.status,
+            "metric": experiment.config.metric,
+            "winner": experiment.winner,
+            "winning_subject_line": experiment.variants[experiment.winner] if experiment.winner is not None else None,
+            "decided_by": experiment.decided_by,
+            "variants": [
+                {
+                    "subject_line": variant,
+                    "sent": int(experiment.sent[i]),
+                    "opened": int(experiment.opened[i]),
+                    "clicked": int(experiment.clicked[i]),
+                }
+                for i, variant in enumerate(experiment.variants)
+            ],
+            "holdout_contacts": len(experiment.holdout),
+            "evaluation": experiment.last_evaluation,
+        }
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
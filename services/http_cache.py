@@ -0,0 +1,209 @@
+# services/http_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+NEGATIVE_STATUSES = (404, 410)
+
+@dataclass
+class CacheEntry:
+    url: str
+    status_code: Optional[int]
+    body_hash: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    error: Optional[str]
+    headers: Dict[str, str] = field(default_factory=dict)
+    expires_at: float = 0.0
+
+    @property
+    def fresh(self) -> bool:
+        return self.expires_at > time.time()
+
+    @property
+    def negative(self) -> bool:
+        return self.body_hash is None
+
+class HTTPCache:
+    """Persistent scraper cache: zlib-compressed, content-addressed bodies on disk, metadata in SQLite.
+
+    Successful pages stay fresh for `freshness` seconds and are then revalidated with
+    their ETag/Last-Modified. 404/410 responses and transport errors are cached as
+    negative entries so dead pages are not refetched on every search; a page that
+    is cached but fails to revalidate keeps its body and is only retried later.
+    Methods block on disk and SQLite, so async callers run them in a thread; the
+    connection is shared between those threads under a lock.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 freshness: float = 86400.0,
+                 negative_ttl: float = 86400.0,
+                 error_ttl: float = 3600.0):
+        self.directory = directory
+        self.freshness = freshness
+        self.negative_ttl = negative_ttl
+        self.error_ttl = error_ttl
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "negative_hits": 0,
+            "revalidated": 0,
+            "revalidation_errors": 0,
+            "misses": 0,
+            "stores": 0
+        }
+
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, "bodies"), exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directory, "http_cache.sqlite"), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS http_cache ("
+            "url TEXT PRIMARY KEY, status_code INTEGER, body_hash TEXT, etag TEXT, last_modified TEXT, "
+            "error TEXT, headers TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """Return the stored entry for a URL, fresh or stale"""
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT url, status_code, body_hash, etag, last_modified, error, headers, expires_at "
+                    "FROM http_cache WHERE url = ?", (url,)
+                ).fetchone()
+        except Exception as e:
+            logger.error(f"Error reading HTTP cache entry: {str(e)}")
+            return None
+
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+
+        entry = CacheEntry(
+            url=row[0], status_code=row[1], body_hash=row[2], etag=row[3], last_modified=row[4],
+            error=row[5], headers=json.loads(row[6]), expires_at=row[7]
+        )
+        if entry.fresh:
+            self.stats["negative_hits" if entry.negative else "hits"] += 1
+        else:
+            self.stats["misses"] += 1
+        return entry
+
+    def load_body(self, entry: CacheEntry) -> Optional[bytes]:
+        """Read and decompress a cached body, None if the blob is gone"""
+        if entry.body_hash is None:
+            return None
+        try:
+            with open(self._body_path(entry.body_hash), "rb") as f:
+                return zlib.decompress(f.read())
+        except Exception as e:
+            logger.warning(f"Missing HTTP cache body for {entry.url}: {str(e)}")
+            return None
+
+    def store(self, url: str, status_code: int, content: bytes, headers: Dict[str, str]) -> CacheEntry:
+        """Store a successful response"""
+        body_hash = hashlib.sha256(content).hexdigest()
+        path = self._body_path(body_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(content, 6))
+            os.replace(tmp_path, path)
+
+        headers = {k.lower(): v for k, v in headers.items()}
+        entry = CacheEntry(
+            url=url,
+            status_code=status_code,
+            body_hash=body_hash,
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            error=None,
+            headers={k: v for k, v in headers.items() if k in ("content-type", "etag", "last-modified")},
+            expires_at=time.time() + self.freshness
+        )
+        self._write(entry)
+        return entry
+
+    def store_negative(self, url: str, status_code: Optional[int] = None, error: Optional[str] = None) -> CacheEntry:
+        """Remember that a URL is missing (status_code) or unreachable (error)"""
+        ttl = self.negative_ttl if status_code in NEGATIVE_STATUSES else self.error_ttl
+        entry = CacheEntry(
+            url=url, status_code=status_code, body_hash=None, etag=None, last_modified=None,
+            error=error, headers={}, expires_at=time.time() + ttl
+        )
+        self._write(entry)
+        return entry
+
+    def refresh(self, entry: CacheEntry) -> CacheEntry:
+        """Extend a revalidated (304) entry for another freshness period"""
+        entry.expires_at = time.time() + self.freshness
+        self.stats["revalidated"] += 1
+        try:
+            with self._lock:
+                self._db.execute("UPDATE http_cache SET expires_at = ? WHERE url = ?", (entry.expires_at, entry.url))
+                self._db.commit()
+        except Exception as e:
+            logger.error(f"Error refreshing HTTP cache entry: {str(e)}")
+        return entry
+
+    def defer(self, entry: CacheEntry) -> CacheEntry:
+        """Keep serving a stale entry whose revalidation failed, retrying after `error_ttl`"""
+        entry.expires_at = time.time() + self.error_ttl
+        self.stats["revalidation_errors"] += 1
+        try:
+            with self._lock:
+                self._db.execute("UPDATE http_cache SET expires_at = ? WHERE url = ?", (entry.expires_at, entry.url))
+                self._db.commit()
+        except Exception as e:
+            logger.error(f"Error deferring HTTP cache entry: {str(e)}")
+        return entry
+
+    def purge(self, max_age: float = 30 * 86400.0):
+        """Drop entries expired for longer than max_age and bodies nothing points at"""
+        with self._lock:
+            self._db.execute("DELETE FROM http_cache WHERE expires_at <= ?", (time.time() - max_age,))
+            self._db.commit()
+            referenced = {row[0] for row in self._db.execute("SELECT DISTINCT body_hash FROM http_cache WHERE body_hash IS NOT NULL")}
+        bodies_dir = os.path.join(self.directory, "bodies")
+        for prefix in os.listdir(bodies_dir):
+            for name in os.listdir(os.path.join(bodies_dir, prefix)):
+                if name not in referenced:
+                    os.remove(os.path.join(bodies_dir, prefix, name))
+
+    def _write(self, entry: CacheEntry):
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO http_cache "
+                    "(url, status_code, body_hash, etag, last_modified, error, headers, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (entry.url, entry.status_code, entry.body_hash, entry.etag, entry.last_modified,
+                     entry.error, json.dumps(entry.headers), entry.expires_at)
+                )
+                self._db.commit()
+            self.stats["stores"] += 1
+        except Exception as e:
+            logger.error(f"Error writing HTTP cache entry: {str(e)}")
+
+    def _body_path(self, body_hash: str) -> str:
+        return os.path.join(self.directory, "bodies", body_hash[:2], body_hash)
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
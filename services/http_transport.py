@@ -0,0 +1,221 @@
+# services/http_transport.py
+
+import asyncio
+import ipaddress
+import logging
+import os
+import socket
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# httpx negotiates HTTP/2 through ALPN when `h2` is installed; without it every pool speaks HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+@dataclass
+class TransportConfig:
+    max_connections_per_host: int = 20   # HTTP/1.1 connections one host may hold
+    max_keepalive_per_host: int = 10     # idle connections kept open per host
+    keepalive_expiry: float = 90.0       # seconds an idle connection is kept for reuse
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    write_timeout: float = 30.0
+    pool_timeout: float = 10.0           # wait for a free connection before failing
+    http2: bool = True                   # offer HTTP/2 to HTTPS hosts (used when the server accepts it)
+    dns_ttl: float = 300.0               # seconds a resolved address is reused
+    retries: int = 1                     # connect retries (never re-sends a request)
+
+    @classmethod
+    def from_env(cls) -> "TransportConfig":
+        """Build config from HTTP_* environment variables"""
+        defaults = cls()
+        return cls(
+            max_connections_per_host=int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", defaults.max_connections_per_host)),
+            max_keepalive_per_host=int(os.getenv("HTTP_MAX_KEEPALIVE_PER_HOST", defaults.max_keepalive_per_host)),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", defaults.keepalive_expiry)),
+            connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", defaults.connect_timeout)),
+            read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", defaults.read_timeout)),
+            http2=os.getenv("HTTP_HTTP2", "true").lower() in ("1", "true", "yes"),
+            dns_ttl=float(os.getenv("HTTP_DNS_TTL", defaults.dns_ttl)),
+        )
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout
+        )
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that resolves each host once per `ttl` and connects to the cached addresses.
+
+    TLS still verifies and sends SNI for the original host name; only the lookup
+    is cached. An address that refuses the connection is skipped, and a host whose
+    cached addresses all fail is resolved again on the next connect.
+    """
+
+    def __init__(self, ttl: float = 300.0, backend: Optional[httpcore.AsyncNetworkBackend] = None):
+        self.ttl = ttl
+        self._backend = backend or httpcore.AnyIOBackend()
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+
+        cached = self._cache.get((host, port))
+        if cached and cached[0] > time.monotonic():
+            self.stats["hits"] += 1
+            return cached[1]
+
+        self.stats["misses"] += 1
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    async def connect_tcp(self, host: str, port: int, timeout: Optional[float] = None,
+                          local_address: Optional[str] = None, socket_options=None) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await self._resolve(host, port)
+        except OSError as e:
+            raise httpcore.ConnectError(str(e)) from e
+
+        error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        self._cache.pop((host, port), None)
+        raise error
+
+    async def connect_unix_socket(self, path: str, timeout: Optional[float] = None,
+                                  socket_options=None) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float):
+        await self._backend.sleep(seconds)
+
+class PooledTransport(httpx.AsyncBaseTransport):
+    """One connection pool per origin, created on first use, with a shared DNS cache.
+
+    Per-host pools keep one slow or busy provider from taking every connection
+    another needs, and let HTTPS origins use HTTP/2 (one multiplexed connection)
+    while plain-HTTP origins keep HTTP/1.1 keepalive pools. Pools are tied to the
+    event loop that opened them and are rebuilt when a new loop starts using the
+    transport.
+    """
+
+    def __init__(self, config: Optional[TransportConfig] = None):
+        self.config = config or TransportConfig()
+        self.dns = CachingNetworkBackend(self.config.dns_ttl)
+        self._pools: Dict[Tuple[bytes, bytes, Optional[int]], httpx.AsyncHTTPTransport] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats: Dict[str, int] = {}
+
+    def _pool(self, url: httpx.URL) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._pools = {}
+            self._loop = loop
+
+        key = (url.raw_scheme, url.raw_host, url.port)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = httpx.AsyncHTTPTransport(
+                http2=self.config.http2 and HTTP2_AVAILABLE and url.scheme == "https",
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections_per_host,
+                    max_keepalive_connections=self.config.max_keepalive_per_host,
+                    keepalive_expiry=self.config.keepalive_expiry
+                ),
+                retries=self.config.retries
+            )
+            # httpx 0.24 does not take a network backend, so the DNS cache is set on its httpcore pool
+            pool._pool._network_backend = self.dns
+            self._pools[key] = pool
+        return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.stats[host] = self.stats.get(host, 0) + 1
+        return await self._pool(request.url).handle_async_request(request)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "http2": self.config.http2 and HTTP2_AVAILABLE,
+            "pools": len(self._pools),
+            "requests": dict(self.stats),
+            "dns": dict(self.dns.stats),
+        }
+
+    async def close(self):
+        """Close every pool (the transport can still be used afterwards; pools reopen on demand)"""
+        pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            try:
+                await pool.aclose()
+            except Exception as e:
+                logger.error(f"Error closing connection pool: {str(e)}")
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """A client's view of the shared transport; closing the client leaves the pools to other clients"""
+
+    def __init__(self, transport: PooledTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self):
+        pass
+
+_transport: Optional[PooledTransport] = None
+
+def get_http_transport(config: Optional[TransportConfig] = None) -> PooledTransport:
+    """Return the process-wide pooled transport, creating it on first use"""
+    global _transport
+    if _transport is None:
+        _transport = PooledTransport(config or TransportConfig.from_env())
+    return _transport
+
+def create_http_client(headers: Optional[Dict[str, str]] = None,
+                       timeout: Optional[httpx.Timeout] = None,
+                       transport: Optional[httpx.AsyncBaseTransport] = None,
+                       **kwargs) -> httpx.AsyncClient:
+    """AsyncClient over the shared per-host pools with the configured timeouts
+
+    Clients are cheap: each one only carries its default headers and timeouts, and
+    closing it does not close the shared connections (`close_http_transport` does).
+    """
+    shared = get_http_transport()
+    return httpx.AsyncClient(
+        transport=transport or _SharedTransport(shared),
+        headers=headers,
+        timeout=timeout or shared.config.timeout(),
+        **kwargs
+    )
+
+async def close_http_transport():
+    """Close the shared connection pools (call on application shutdown)"""
+    global _transport
+    if _transport is not None:
+        await _transport.close()
+        _transport = None
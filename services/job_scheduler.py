@@ -0,0 +1,423 @@
+# services/job_scheduler.py
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+@dataclass
+class SchedulerConfig:
+    store: str = "auto"               # "sqlite", "supabase" or "auto" (Supabase when a client is given)
+    sqlite_path: Optional[str] = None # None keeps jobs in memory only
+    table: str = "scheduled_jobs"
+    batch_size: int = 200             # due jobs popped per dispatcher pass
+    workers: int = 8
+    max_attempts: int = 3
+    retry_delay: float = 60.0         # seconds, multiplied by the attempt number
+    max_idle: float = 30.0            # longest dispatcher sleep between store checks
+    lease_seconds: float = 600.0      # a claimed job is not run elsewhere for this long (longer than any handler)
+
+    @classmethod
+    def from_env(cls) -> "SchedulerConfig":
+        """Build config from SCHEDULER_* environment variables"""
+        defaults = cls()
+        return cls(
+            store=os.getenv("SCHEDULER_STORE", defaults.store),
+            sqlite_path=os.getenv("SCHEDULER_DB_PATH") or None,
+            table=os.getenv("SCHEDULER_TABLE", defaults.table),
+            batch_size=int(os.getenv("SCHEDULER_BATCH_SIZE", defaults.batch_size)),
+            workers=int(os.getenv("SCHEDULER_WORKERS", defaults.workers)),
+            max_attempts=int(os.getenv("SCHEDULER_MAX_ATTEMPTS", defaults.max_attempts)),
+            retry_delay=float(os.getenv("SCHEDULER_RETRY_DELAY", defaults.retry_delay)),
+            lease_seconds=float(os.getenv("SCHEDULER_LEASE_SECONDS", defaults.lease_seconds)),
+        )
+
+@dataclass
+class ScheduledJob:
+    id: str
+    kind: str                         # selects the registered handler
+    run_at: float                     # epoch seconds
+    payload: Dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+
+class SQLiteJobStore:
+    """Durable job table in a local SQLite file (or in memory)"""
+
+    def __init__(self, path: Optional[str] = None, table: str = "scheduled_jobs"):
+        self.table = table
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "id TEXT PRIMARY KEY, kind TEXT, run_at REAL, payload TEXT, attempts INTEGER, claimed_by TEXT, lease_until REAL)"
+        )
+        # Tables created before jobs were claimed lack the lease columns
+        columns = {row[1] for row in self._db.execute(f"PRAGMA table_info({table})")}
+        for column, kind in (("claimed_by", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {kind}")
+        self._db.commit()
+
+    def upsert(self, jobs: List[ScheduledJob]):
+        self._db.executemany(
+            f"INSERT OR REPLACE INTO {self.table} (id, kind, run_at, payload, attempts, claimed_by, lease_until) "
+            "VALUES (?, ?, ?, ?, ?, NULL, NULL)",
+            [(job.id, job.kind, job.run_at, json.dumps(job.payload, default=str), job.attempts) for job in jobs]
+        )
+        self._db.commit()
+
+    def delete(self, job_ids: List[str]):
+        self._db.executemany(f"DELETE FROM {self.table} WHERE id = ?", [(job_id,) for job_id in job_ids])
+        self._db.commit()
+
+    def claim(self, job_ids: List[str], owner: str, lease_seconds: float) -> List[str]:
+        """Lease due jobs nobody else holds; returns the ids this owner won"""
+
+        now = time.time()
+        claimed = []
+        with self._db:
+            for job_id in job_ids:
+                cursor = self._db.execute(
+                    f"UPDATE {self.table} SET claimed_by = ?, lease_until = ? "
+                    "WHERE id = ? AND run_at <= ? AND (lease_until IS NULL OR lease_until < ?)",
+                    (owner, now + lease_seconds, job_id, now, now)
+                )
+                if cursor.rowcount:
+                    claimed.append(job_id)
+        return claimed
+
+    def load(self) -> List[ScheduledJob]:
+        return [
+            ScheduledJob(id=job_id, kind=kind, run_at=run_at, payload=json.loads(payload), attempts=attempts)
+            for job_id, kind, run_at, payload, attempts in self._db.execute(
+                f"SELECT id, kind, run_at, payload, attempts FROM {self.table}"
+            )
+        ]
+
+    def close(self):
+        self._db.close()
+
+class SupabaseJobStore:
+    """Durable job table in Supabase, shared by several app instances.
+
+    Before a job runs, its instance claims it with a conditional update that only
+    matches rows which are due and not leased, so each job runs on one instance.
+    The table needs `claimed_by` (text) and `lease_until` (float) columns.
+    """
+
+    def __init__(self, supabase_client, table: str = "scheduled_jobs"):
+        self.supabase = supabase_client
+        self.table = table
+
+    def upsert(self, jobs: List[ScheduledJob]):
+        # Writing a job releases any lease on it (a retry can be claimed by any instance)
+        rows = [
+            {"id": job.id, "kind": job.kind, "run_at": job.run_at, "payload": job.payload, "attempts": job.attempts,
+             "claimed_by": None, "lease_until": None}
+            for job in jobs
+        ]
+        self.supabase.table(self.table).upsert(json.loads(json.dumps(rows, default=str))).execute()
+
+    def delete(self, job_ids: List[str]):
+        self.supabase.table(self.table).delete().in_("id", job_ids).execute()
+
+    def claim(self, job_ids: List[str], owner: str, lease_seconds: float) -> List[str]:
+        """Lease due jobs nobody else holds; returns the ids this owner won"""
+
+        now = time.time()
+        response = (
+            self.supabase.table(self.table)
+            .update({"claimed_by": owner, "lease_until": now + lease_seconds})
+            .in_("id", job_ids)
+            .lte("run_at", now)
+            .or_(f"lease_until.is.null,lease_until.lt.{now}")
+            .execute()
+        )
+        return [row["id"] for row in response.data or []]
+
+    def load(self) -> List[ScheduledJob]:
+        response = self.supabase.table(self.table).select("*").execute()
+        return [
+            ScheduledJob(
+                id=row["id"],
+                kind=row["kind"],
+                run_at=float(row["run_at"]),
+                payload=row.get("payload") or {},
+                attempts=row.get("attempts") or 0
+            )
+            for row in response.data or []
+        ]
+
+    def close(self):
+        pass
+
+class JobScheduler:
+    """Runs deferred work at a wall-clock time without a sleeping task per job.
+
+    Jobs live in a min-heap ordered by run time and in a durable store, so they
+    survive restarts. A single dispatcher pops due jobs in batches onto a bounded
+    queue drained by a fixed pool of workers, which call the handler registered for
+    the job's kind. Cancelled and rescheduled jobs leave stale heap entries that are
+    skipped on pop. Delivery is at-least-once: a job is removed from the store only
+    after its handler returns.
+
+    Instances sharing a store each load every pending job, and a due job is claimed
+    in the store (leased for `lease_seconds`) before it is dispatched; an instance
+    that loses the claim, or finds the job cancelled or moved, drops its copy. Jobs
+    scheduled while an instance runs are only seen by other instances when they next
+    start, including those left behind by an instance that stopped mid-run once the
+    lease expires.
+    """
+
+    def __init__(self, store=None, config: Optional[SchedulerConfig] = None):
+        self.config = config or SchedulerConfig()
+        self.store = store or SQLiteJobStore(self.config.sqlite_path, self.config.table)
+        self._handlers: Dict[str, JobHandler] = {}
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._versions: Dict[str, int] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+        self._queue: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running: Dict[str, ScheduledJob] = {}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.stats: Dict[str, int] = {
+            "scheduled": 0, "dispatched": 0, "completed": 0, "failed": 0, "retried": 0, "cancelled": 0, "claim_lost": 0
+        }
+
+    def register(self, kind: str, handler: JobHandler):
+        """Route jobs of a kind to a coroutine function taking the job payload"""
+        self._handlers[kind] = handler
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks) and self._loop is asyncio.get_running_loop()
+
+    async def start(self):
+        """Load pending jobs from the store and start the dispatcher and workers"""
+
+        if self.started:
+            return
+        if self._tasks:
+            # Started on an event loop that has since gone away; reload from the store
+            self._tasks = []
+            self._jobs.clear()
+            self._versions.clear()
+            self._heap.clear()
+            self._running.clear()
+        self._loop = asyncio.get_running_loop()
+        try:
+            for job in self.store.load():
+                self._push(job)
+        except Exception as e:
+            logger.error(f"Error loading scheduled jobs: {str(e)}")
+
+        self._queue = asyncio.Queue(maxsize=self.config.batch_size)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._dispatch())]
+        self._tasks.extend(asyncio.create_task(self._work()) for _ in range(self.config.workers))
+        logger.info(f"Job scheduler started with {len(self._jobs)} pending jobs")
+
+    async def schedule(self, job_id: str, kind: str, run_at: datetime, payload: Optional[Dict[str, Any]] = None) -> ScheduledJob:
+        """Schedule (or replace) a job to run at `run_at`"""
+        job = ScheduledJob(id=job_id, kind=kind, run_at=run_at.timestamp(), payload=payload or {})
+        await self.schedule_many([job])
+        return job
+
+    async def schedule_many(self, jobs: List[ScheduledJob]):
+        """Schedule jobs with one store write"""
+
+        if not jobs:
+            return
+        await self.start()
+        self.store.upsert(jobs)
+        for job in jobs:
+            self._push(job)
+        self.stats["scheduled"] += len(jobs)
+        self._wakeup.set()
+
+    async def cancel(self, job_id: str) -> bool:
+        """Drop a pending job; False if it is unknown or already running"""
+
+        await self.start()
+        if job_id not in self._jobs:
+            return False
+        del self._jobs[job_id]
+        del self._versions[job_id]
+        self.store.delete([job_id])
+        self.stats["cancelled"] += 1
+        return True
+
+    async def reschedule(self, job_id: str, run_at: datetime) -> bool:
+        """Move a pending job to a new time; False if it is unknown or already running"""
+
+        await self.start()
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        job.run_at = run_at.timestamp()
+        self.store.upsert([job])
+        self._push(job)
+        self._wakeup.set()
+        return True
+
+    def get_job(self, job_id: str) -> Optional[ScheduledJob]:
+        return self._jobs.get(job_id)
+
+    def _push(self, job: ScheduledJob):
+        version = next(self._counter)
+        self._jobs[job.id] = job
+        self._versions[job.id] = version
+        heapq.heappush(self._heap, (job.run_at, version, job.id))
+
+    def _pop_due(self, now: float) -> List[ScheduledJob]:
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < self.config.batch_size:
+            _, version, job_id = heapq.heappop(self._heap)
+            if self._versions.get(job_id) != version:
+                continue  # cancelled or rescheduled since this entry was pushed
+            del self._versions[job_id]
+            due.append(self._jobs.pop(job_id))
+        return due
+
+    def _claim(self, jobs: List[ScheduledJob]) -> List[ScheduledJob]:
+        if not jobs:
+            return jobs
+        try:
+            claimed = set(self.store.claim([job.id for job in jobs], self.owner, self.config.lease_seconds))
+        except Exception as e:
+            logger.error(f"Error claiming scheduled jobs: {str(e)}")
+            for job in jobs:
+                job.run_at = time.time() + self.config.retry_delay
+                self._push(job)
+            return []
+        self.stats["claim_lost"] += len(jobs) - len(claimed)
+        return [job for job in jobs if job.id in claimed]
+
+    async def _dispatch(self):
+        while True:
+            due = self._pop_due(time.time())
+            for job in self._claim(due):
+                self._running[job.id] = job
+                self.stats["dispatched"] += 1
+                await self._queue.put(job)
+            if len(due) == self.config.batch_size:
+                continue
+
+            timeout = self.config.max_idle
+            if self._heap:
+                timeout = min(max(self._heap[0][0] - time.time(), 0.0), timeout)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._running.pop(job.id, None)
+                self._queue.task_done()
+
+    async def _run(self, job: ScheduledJob):
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            # Left in the store, unclaimed, so a process that knows this kind can pick it up
+            logger.error(f"No handler registered for scheduled job {job.id} ({job.kind})")
+            self._persist([job])
+            return
+
+        try:
+            await handler(job.payload)
+        except Exception as e:
+            job.attempts += 1
+            if job.id in self._jobs:
+                # Rescheduled under the same id while it ran; the new job supersedes this one
+                logger.error(f"Scheduled job {job.id} failed: {str(e)}")
+            elif job.attempts < self.config.max_attempts:
+                logger.error(f"Scheduled job {job.id} failed (attempt {job.attempts}), retrying: {str(e)}")
+                job.run_at = time.time() + self.config.retry_delay * job.attempts
+                self._persist([job])
+                self._push(job)
+                self._wakeup.set()
+                self.stats["retried"] += 1
+            else:
+                logger.error(f"Scheduled job {job.id} failed after {job.attempts} attempts: {str(e)}")
+                self._discard([job.id])
+                self.stats["failed"] += 1
+            return
+
+        if job.id not in self._jobs:
+            # Not rescheduled under the same id while it ran
+            self._discard([job.id])
+        self.stats["completed"] += 1
+
+    def _persist(self, jobs: List[ScheduledJob]):
+        try:
+            self.store.upsert(jobs)
+        except Exception as e:
+            logger.error(f"Error persisting scheduled jobs: {str(e)}")
+
+    def _discard(self, job_ids: List[str]):
+        try:
+            self.store.delete(job_ids)
+        except Exception as e:
+            logger.error(f"Error removing scheduled jobs: {str(e)}")
+
+    async def drain(self):
+        """Wait until every job dispatched so far has finished (used by tests and shutdown)"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        next_run = self._heap[0][0] if self._heap else None
+        return {**self.stats, "pending": len(self._jobs), "running": len(self._running), "next_run_at": next_run}
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        try:
+            self.store.close()
+        except Exception as e:
+            logger.error(f"Error closing job store: {str(e)}")
+
+_scheduler: Optional[JobScheduler] = None
+
+def get_job_scheduler(supabase_client=None, config: Optional[SchedulerConfig] = None) -> JobScheduler:
+    """Return the process-wide scheduler, creating it on first use"""
+    global _scheduler
+    if _scheduler is None:
+        config = config or SchedulerConfig.from_env()
+        use_supabase = config.store == "supabase" or (config.store == "auto" and supabase_client is not None)
+        store = SupabaseJobStore(supabase_client, config.table) if use_supabase else None
+        _scheduler = JobScheduler(store=store, config=config)
+    return _scheduler
+
+async def close_job_scheduler():
+    """Stop the shared scheduler (call on application shutdown)"""
+    global _scheduler
+    if _scheduler is not None:
+        try:
+            await _scheduler.close()
+        except Exception as e:
+            logger.error(f"Error closing job scheduler: {str(e)}")
+        _scheduler = None
@@ -0,0 +1,191 @@
+# services/lead_dedup.py
+
+import logging
+import re
+import sqlite3
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COMPANY_SUFFIXES = frozenset({
+    "inc", "incorporated", "llc", "llp", "ltd", "limited", "corp", "corporation", "co", "company",
+    "gmbh", "plc", "sa", "ag", "bv", "nv", "pty", "srl", "oy", "ab"
+})
+DOMAIN_SUFFIXES = frozenset({"com", "io", "net", "org", "ai", "co", "app", "dev"})
+GMAIL_DOMAINS = frozenset({"gmail.com", "googlemail.com"})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_MERSENNE_PRIME = (1 << 31) - 1
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """Canonical mailbox: lowercase, no plus-addressing, no dots for Gmail"""
+    email = (email or "").strip().lower()
+    if email.count("@") != 1:
+        return None
+    local, domain = email.split("@")
+    local = local.split("+", 1)[0]
+    if domain in GMAIL_DOMAINS:
+        local = local.replace(".", "")
+        domain = "gmail.com"
+    return f"{local}@{domain}" if local and domain else None
+
+def company_key(company: Optional[str]) -> str:
+    """Blocking key for a company name: 'Acme, Inc.' / 'acme.com' / 'The Acme Corp' -> 'acme'"""
+    tokens = _TOKEN_RE.findall((company or "").lower())
+    if tokens and tokens[0] == "the":
+        tokens = tokens[1:]
+    while len(tokens) > 1 and (tokens[-1] in COMPANY_SUFFIXES or tokens[-1] in DOMAIN_SUFFIXES):
+        tokens = tokens[:-1]
+    return " ".join(tokens)
+
+def person_key(first_name: Optional[str], last_name: Optional[str]) -> str:
+    return " ".join(_TOKEN_RE.findall(f"{first_name or ''} {last_name or ''}".lower()))
+
+class LeadDedupIndex:
+    """Duplicate detection for leads across search tasks.
+
+    A lead is a duplicate when it shares a normalized email, the same person at the
+    same blocked company key, or a MinHash-estimated Jaccard similarity of name+company
+    shingles above `threshold` with either the same company key or the same name
+    (candidates come from LSH band buckets). All lookups are dictionary hits; SQLite,
+    when configured, only persists entries between restarts.
+    """
+
+    def __init__(self,
+                 sqlite_path: Optional[str] = None,
+                 num_perm: int = 128,
+                 bands: int = 32,
+                 threshold: float = 0.65):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+
+        # Fixed seed: signatures must stay comparable with the ones already on disk
+        rng = np.random.RandomState(20240101)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=num_perm).astype(np.int64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=num_perm).astype(np.int64)
+
+        self._email_keys: Dict[str, str] = {}
+        self._person_keys: Dict[str, str] = {}
+        self._blocks: Dict[str, Tuple[str, str]] = {}  # lead id -> (company key, person key)
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = defaultdict(list)
+        self.stats: Dict[str, int] = {"email_matches": 0, "company_matches": 0, "fuzzy_matches": 0, "added": 0}
+
+        self._db: Optional[sqlite3.Connection] = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS lead_dedup ("
+                "lead_id TEXT PRIMARY KEY, email_key TEXT, person_key TEXT, signature BLOB)"
+            )
+            self._db.commit()
+            self._load()
+
+    def find_duplicate(self, lead: Any) -> Optional[str]:
+        """Return the id of an indexed lead that this lead duplicates, if any"""
+
+        email_key = normalize_email(lead.email)
+        if email_key and email_key in self._email_keys:
+            self.stats["email_matches"] += 1
+            return self._email_keys[email_key]
+
+        exact_key, signature = self._person_keys_for(lead)
+        if exact_key is None:
+            return None
+        if exact_key in self._person_keys:
+            self.stats["company_matches"] += 1
+            return self._person_keys[exact_key]
+
+        company, person = exact_key.split("|", 1)
+        candidates: Set[str] = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+        for candidate in candidates:
+            candidate_company, candidate_person = self._blocks[candidate]
+            if candidate_company != company and candidate_person != person:
+                continue
+            if float(np.mean(self._signatures[candidate] == signature)) >= self.threshold:
+                self.stats["fuzzy_matches"] += 1
+                return candidate
+
+        return None
+
+    def add(self, lead: Any):
+        """Index a lead so later duplicates of it are detected"""
+
+        email_key = normalize_email(lead.email)
+        exact_key, signature = self._person_keys_for(lead)
+        self._insert(lead.id, email_key, exact_key, signature)
+        self.stats["added"] += 1
+
+        if self._db is not None:
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO lead_dedup (lead_id, email_key, person_key, signature) VALUES (?, ?, ?, ?)",
+                    (lead.id, email_key, exact_key, signature.tobytes() if signature is not None else None)
+                )
+                self._db.commit()
+            except Exception as e:
+                logger.error(f"Error persisting dedup entry: {str(e)}")
+
+    def check_and_add(self, lead: Any) -> Optional[str]:
+        """find_duplicate, indexing the lead when it is new"""
+        duplicate_of = self.find_duplicate(lead)
+        if duplicate_of is None:
+            self.add(lead)
+        return duplicate_of
+
+    def _insert(self, lead_id: str, email_key: Optional[str], exact_key: Optional[str], signature: Optional[np.ndarray]):
+        if email_key:
+            self._email_keys.setdefault(email_key, lead_id)
+        if exact_key:
+            self._person_keys.setdefault(exact_key, lead_id)
+        if signature is not None and exact_key:
+            self._blocks[lead_id] = tuple(exact_key.split("|", 1))
+            self._signatures[lead_id] = signature
+            for band_key in self._band_keys(signature):
+                self._buckets[band_key].append(lead_id)
+
+    def _person_keys_for(self, lead: Any) -> Tuple[Optional[str], Optional[np.ndarray]]:
+        person = person_key(lead.first_name, lead.last_name)
+        if not person:
+            return None, None
+        company = company_key(lead.company)
+        return f"{company}|{person}", self._signature(f"{person} {company}")
+
+    def _signature(self, text: str) -> np.ndarray:
+        padded = f" {text} "
+        shingles = {padded[i:i + 3] for i in range(len(padded) - 2)}
+        x = np.fromiter((zlib.crc32(s.encode("utf-8")) % _MERSENNE_PRIME for s in shingles), dtype=np.int64)
+        return ((self._a[:, None] * x[None, :] + self._b[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def _load(self):
+        try:
+            for lead_id, email_key, exact_key, blob in self._db.execute(
+                "SELECT lead_id, email_key, person_key, signature FROM lead_dedup"
+            ):
+                signature = np.frombuffer(blob, dtype=np.int64) if blob else None
+                if signature is not None and len(signature) != self.num_perm:
+                    signature = None
+                self._insert(lead_id, email_key, exact_key, signature)
+        except Exception as e:
+            logger.error(f"Error loading dedup index: {str(e)}")
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "email_keys": len(self._email_keys), "person_keys": len(self._person_keys)}
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
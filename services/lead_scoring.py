@@ -0,0 +1,205 @@
+# services/lead_scoring.py
+
+import logging
+import re
+from typing import Any, Dict, FrozenSet, List, Optional, Pattern, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rubric weights, mirroring the LLM scoring prompt
+TITLE_WEIGHT = 40.0
+INDUSTRY_WEIGHT = 25.0
+SIZE_WEIGHT = 15.0
+LOCATION_WEIGHT = 10.0
+KEYWORD_WEIGHT = 10.0
+
+# Abbreviations expanded before title tokens are compared
+TITLE_SYNONYMS: Dict[str, str] = {
+    "vp": "vice president",
+    "svp": "senior vice president",
+    "evp": "executive vice president",
+    "avp": "assistant vice president",
+    "ceo": "chief executive officer",
+    "cto": "chief technology officer",
+    "cmo": "chief marketing officer",
+    "cfo": "chief financial officer",
+    "coo": "chief operating officer",
+    "cio": "chief information officer",
+    "cro": "chief revenue officer",
+    "cpo": "chief product officer",
+    "sr": "senior",
+    "jr": "junior",
+    "mgr": "manager",
+    "dir": "director",
+    "eng": "engineering",
+    "mktg": "marketing",
+    "ops": "operations",
+    "hr": "human resources",
+    "bd": "business development",
+    "biz": "business",
+    "dev": "development",
+    "head": "director",
+}
+
+# Words that set seniority but say nothing about the function of the role
+SENIORITY_TOKENS: FrozenSet[str] = frozenset({
+    "chief", "officer", "president", "vice", "senior", "executive", "assistant",
+    "director", "manager", "lead", "head", "principal", "junior", "associate", "of", "and"
+})
+
+LOCATION_ALIASES: Dict[str, str] = {
+    "usa": "united states",
+    "us": "united states",
+    "u.s.": "united states",
+    "america": "united states",
+    "uk": "united kingdom",
+    "gb": "united kingdom",
+    "great britain": "united kingdom",
+    "england": "united kingdom",
+    "uae": "united arab emirates",
+    "nyc": "new york",
+    "ny": "new york",
+    "sf": "san francisco",
+    "la": "los angeles",
+    "ca": "california",
+    "tx": "texas",
+    "wa": "washington",
+    "ma": "massachusetts",
+    "il": "illinois",
+    "fl": "florida",
+    "co": "colorado",
+    "ga": "georgia",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#.]+")
+_NUMBER_RE = re.compile(r"\d[\d,]*")
+
+def _normalize(text: Optional[str]) -> str:
+    return " ".join(_TOKEN_RE.findall((text or "").lower()))
+
+def _title_tokens(title: Optional[str]) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """Split a job title into (function tokens, seniority tokens) after synonym expansion"""
+    words = []
+    for word in _TOKEN_RE.findall((title or "").lower().replace("&", " and ")):
+        word = word.strip(".")
+        words.extend(TITLE_SYNONYMS.get(word, word).split())
+    function = frozenset(w for w in words if w not in SENIORITY_TOKENS)
+    seniority = frozenset(w for w in words if w in SENIORITY_TOKENS and w not in ("of", "and"))
+    return function, seniority
+
+def parse_size_range(size: Optional[str]) -> Optional[Tuple[int, float]]:
+    """Parse company size text like '51-200', '1000+' or '10,000 employees' into (low, high)"""
+    if not size:
+        return None
+    numbers = [int(n.replace(",", "")) for n in _NUMBER_RE.findall(size)]
+    if not numbers:
+        return None
+    if len(numbers) >= 2:
+        return (min(numbers[:2]), max(numbers[:2]))
+    if "+" in size or "over" in size.lower():
+        return (numbers[0], float("inf"))
+    return (numbers[0], numbers[0])
+
+def _location_parts(location: Optional[str]) -> FrozenSet[str]:
+    parts = set()
+    for part in re.split(r"[,/;|]", (location or "").lower()):
+        part = part.strip().strip(".")
+        if part:
+            parts.add(LOCATION_ALIASES.get(part, part))
+    return frozenset(parts)
+
+class RuleBasedLeadScorer:
+    """Local implementation of the 40/25/15/10/10 lead scoring rubric.
+
+    Matchers are built once per criteria and reused for every lead. Criteria left
+    unset award half of their weight so they neither help nor hurt a lead.
+    """
+
+    def __init__(self, criteria: Any):
+        self._titles = [_title_tokens(title) for title in (criteria.job_titles or []) if title]
+        self._industry = _normalize(criteria.industry)
+        self._industry_tokens = frozenset(self._industry.split())
+        self._size = parse_size_range(criteria.company_size)
+        self._locations = _location_parts(criteria.location)
+        terms = [t for t in (criteria.keywords or []) + (criteria.technologies or []) if t and t.strip()]
+        self._terms: List[Pattern] = [
+            re.compile(r"(?<![a-z0-9])" + re.escape(term.lower().strip()) + r"(?![a-z0-9])") for term in terms
+        ]
+
+    def score(self, lead: Any) -> float:
+        """Return the rubric score (0-100) for a lead"""
+        total = (
+            self._score_title(lead.job_title)
+            + self._score_industry(lead.industry)
+            + self._score_size(lead.company_size)
+            + self._score_location(lead.location)
+            + self._score_keywords(lead)
+        )
+        return round(min(max(total, 0.0), 100.0), 1)
+
+    def _score_title(self, job_title: Optional[str]) -> float:
+        if not self._titles:
+            return TITLE_WEIGHT / 2
+        function, seniority = _title_tokens(job_title)
+        if not function and not seniority:
+            return 0.0
+
+        best = 0.0
+        for target_function, target_seniority in self._titles:
+            if target_function:
+                function_match = len(function & target_function) / len(target_function)
+            else:
+                function_match = 1.0 if function or seniority else 0.0
+            if target_seniority:
+                seniority_match = len(seniority & target_seniority) / len(target_seniority)
+            else:
+                seniority_match = 1.0
+            best = max(best, 0.75 * function_match + 0.25 * seniority_match)
+        return TITLE_WEIGHT * best
+
+    def _score_industry(self, industry: Optional[str]) -> float:
+        if not self._industry:
+            return INDUSTRY_WEIGHT / 2
+        normalized = _normalize(industry)
+        if not normalized:
+            return 0.0
+        if normalized == self._industry or self._industry in normalized or normalized in self._industry:
+            return INDUSTRY_WEIGHT
+        overlap = len(frozenset(normalized.split()) & self._industry_tokens) / len(self._industry_tokens)
+        return INDUSTRY_WEIGHT * overlap * 0.6
+
+    def _score_size(self, company_size: Optional[str]) -> float:
+        if self._size is None:
+            return SIZE_WEIGHT / 2
+        size = parse_size_range(company_size)
+        if size is None:
+            return 0.0
+        low, high = self._size
+        if size[0] <= high and low <= size[1]:
+            return SIZE_WEIGHT
+        # Neighbouring buckets (within a factor of ~4) are a partial fit
+        gap = size[0] / high if size[0] > high else low / max(size[1], 1)
+        return SIZE_WEIGHT / 2 if gap <= 4 else 0.0
+
+    def _score_location(self, location: Optional[str]) -> float:
+        if not self._locations:
+            return LOCATION_WEIGHT / 2
+        parts = _location_parts(location)
+        if not parts:
+            return 0.0
+        if parts & self._locations:
+            return LOCATION_WEIGHT
+        return 0.0
+
+    def _score_keywords(self, lead: Any) -> float:
+        if not self._terms:
+            return KEYWORD_WEIGHT / 2
+        haystack = " ".join(
+            str(value) for value in (
+                lead.job_title, lead.company, lead.industry, lead.notes,
+                " ".join(lead.tags or []),
+                " ".join(str(v) for v in (lead.custom_fields or {}).values())
+            ) if value
+        ).lower()
+        matched = sum(1 for pattern in self._terms if pattern.search(haystack))
+        return KEYWORD_WEIGHT * matched / len(self._terms)
@@ -0,0 +1,138 @@
+# services/llm_cache.py
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from openai.types.chat import ChatCompletion
+
+logger = logging.getLogger(__name__)
+
+def cache_key(request: Dict[str, Any]) -> str:
+    """Content address of a completion request"""
+    material = json.dumps(
+        {
+            "model": request.get("model"),
+            "messages": request.get("messages"),
+            "temperature": request.get("temperature"),
+            "max_tokens": request.get("max_tokens")
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """Two-tier completion cache: in-memory LRU in front of an optional SQLite file.
+
+    Entries carry their own expiry, so each call site chooses its TTL.
+    """
+
+    def __init__(self, max_entries: int = 10000, sqlite_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.stats: Dict[str, int] = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0
+        }
+
+        self._db: Optional[sqlite3.Connection] = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, response TEXT NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a live cached response or None"""
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, response = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                return response
+            del self._memory[key]
+
+        if self._db is not None:
+            response = self._get_from_disk(key, now)
+            if response is not None:
+                self.stats["disk_hits"] += 1
+                return response
+
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, response: Any, ttl: float):
+        """Store a response for ttl seconds"""
+        expires_at = time.time() + ttl
+        self._put_in_memory(key, expires_at, response)
+        self.stats["stores"] += 1
+
+        if self._db is not None and hasattr(response, "model_dump_json"):
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, expires_at, response) VALUES (?, ?, ?)",
+                    (key, expires_at, response.model_dump_json())
+                )
+                self._db.commit()
+            except Exception as e:
+                logger.error(f"Error writing LLM cache entry: {str(e)}")
+
+    def _put_in_memory(self, key: str, expires_at: float, response: Any):
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _get_from_disk(self, key: str, now: float) -> Optional[Any]:
+        try:
+            row = self._db.execute(
+                "SELECT expires_at, response FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            expires_at, payload = row
+            if expires_at <= now:
+                self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+
+            response = ChatCompletion.model_validate_json(payload)
+            self._put_in_memory(key, expires_at, response)
+            return response
+
+        except Exception as e:
+            logger.error(f"Error reading LLM cache entry: {str(e)}")
+            return None
+
+    def purge_expired(self):
+        """Drop expired entries from both tiers"""
+        now = time.time()
+        for key in [k for k, (expires_at, _) in self._memory.items() if expires_at <= now]:
+            del self._memory[key]
+        if self._db is not None:
+            self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] + self.stats["disk_hits"]) / lookups if lookups else 0.0
+        return {**self.stats, "entries": len(self._memory), "hit_rate": round(hit_rate, 4)}
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
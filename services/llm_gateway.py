@@ -0,0 +1,366 @@
+# services/llm_gateway.py
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Dict, List, Optional
+
+import httpx
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+
+from .llm_cache import LLMCache, cache_key
+
+logger = logging.getLogger(__name__)
+
+class Priority(IntEnum):
+    """Scheduling lane for a completion request (lower runs first)"""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+# Priority of the current asyncio context. API requests set INTERACTIVE,
+# background tasks fall back to BACKGROUND.
+current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "llm_priority", default=Priority.BACKGROUND
+)
+
+def set_priority(priority: Priority) -> contextvars.Token:
+    """Set the LLM priority lane for the current context"""
+    return current_priority.set(priority)
+
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+@dataclass
+class GatewayConfig:
+    max_concurrency: int = 16
+    per_agent_concurrency: int = 4
+    requests_per_minute: int = 500
+    tokens_per_minute: int = 80000
+    max_retries: int = 5
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    request_timeout: float = 60.0
+    max_connections: int = 32
+    default_max_tokens: int = 512
+    cache_max_entries: int = 10000
+    cache_path: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "GatewayConfig":
+        """Build config from LLM_* environment variables"""
+        defaults = cls()
+        return cls(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", defaults.max_concurrency)),
+            per_agent_concurrency=int(os.getenv("LLM_PER_AGENT_CONCURRENCY", defaults.per_agent_concurrency)),
+            requests_per_minute=int(os.getenv("LLM_REQUESTS_PER_MINUTE", defaults.requests_per_minute)),
+            tokens_per_minute=int(os.getenv("LLM_TOKENS_PER_MINUTE", defaults.tokens_per_minute)),
+            max_retries=int(os.getenv("LLM_MAX_RETRIES", defaults.max_retries)),
+            request_timeout=float(os.getenv("LLM_REQUEST_TIMEOUT", defaults.request_timeout)),
+            cache_max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", defaults.cache_max_entries)),
+            cache_path=os.getenv("LLM_CACHE_PATH") or None,
+        )
+
+class PrioritySemaphore:
+    """Counting semaphore that wakes waiters in priority order"""
+
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters: List[Any] = []
+        self._counter = itertools.count()
+
+    async def acquire(self, priority: Priority = Priority.BACKGROUND):
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Slot was handed to us just as we were cancelled - pass it on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, f in self._waiters if not f.done())
+
+class MinuteBudget:
+    """Token bucket refilled continuously up to a per-minute allowance (0 = unlimited)"""
+
+    def __init__(self, per_minute: int):
+        self.unlimited = per_minute <= 0
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def consume(self, amount: float):
+        if self.unlimited:
+            return
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.available >= amount:
+                    self.available -= amount
+                    return
+                await asyncio.sleep((amount - self.available) / self.rate)
+
+    def adjust(self, delta: float):
+        """Correct an earlier estimate once the real cost is known"""
+        if self.unlimited:
+            return
+        self._refill()
+        self.available = min(self.capacity, self.available - delta)
+
+class LLMGateway:
+    """Single pooled OpenAI client shared by every agent.
+
+    Requests are admitted through a per-agent and a global priority semaphore,
+    charged against request/token per-minute budgets and retried with
+    jittered exponential backoff on rate limits and transient failures.
+    Call sites that pass ``cache_ttl`` are answered from the response cache
+    when an identical request was seen within that window.
+    """
+
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 config: Optional[GatewayConfig] = None,
+                 client: Optional[AsyncOpenAI] = None,
+                 cache: Optional[LLMCache] = None):
+        self.config = config or GatewayConfig()
+        self.cache = cache or LLMCache(
+            max_entries=self.config.cache_max_entries,
+            sqlite_path=self.config.cache_path
+        )
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=api_key,
+                max_retries=0,  # retries are handled here, with budgets in mind
+                timeout=self.config.request_timeout,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.config.max_connections,
+                        max_keepalive_connections=self.config.max_connections
+                    ),
+                    timeout=self.config.request_timeout
+                )
+            )
+        self.client = client
+
+        self._global_slots = PrioritySemaphore(self.config.max_concurrency)
+        self._agent_slots: Dict[str, PrioritySemaphore] = {}
+        self._request_budget = MinuteBudget(self.config.requests_per_minute)
+        self._token_budget = MinuteBudget(self.config.tokens_per_minute)
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "tokens": 0
+        }
+
+    def for_agent(self, agent_name: str) -> "AgentLLMClient":
+        """Return an OpenAI-style client bound to an agent's concurrency lane"""
+        return AgentLLMClient(self, agent_name)
+
+    async def chat_completion(self,
+                              agent_name: str = "default",
+                              priority: Optional[Priority] = None,
+                              cache_ttl: Optional[float] = None,
+                              **request: Any):
+        """Run a chat completion through the shared limits"""
+
+        if not cache_ttl:
+            return await self._admit_and_send(agent_name, priority, request)
+
+        key = cache_key(request)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # Identical requests already on the wire share one provider call
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The leading request was cancelled - send our own
+                return await self._admit_and_send(agent_name, priority, request)
+
+        pending = asyncio.get_running_loop().create_future()
+        self._inflight[key] = pending
+        try:
+            response = await self._admit_and_send(agent_name, priority, request)
+            self.cache.set(key, response, cache_ttl)
+            pending.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except Exception as e:
+            pending.set_exception(e)
+            pending.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _admit_and_send(self, agent_name: str, priority: Optional[Priority], request: Dict[str, Any]):
+        if priority is None:
+            priority = current_priority.get()
+
+        agent_slots = self._agent_slots.get(agent_name)
+        if agent_slots is None:
+            agent_slots = PrioritySemaphore(self.config.per_agent_concurrency)
+            self._agent_slots[agent_name] = agent_slots
+
+        estimated_tokens = self._estimate_tokens(request)
+
+        # Agent lane first so a busy agent never pins global slots while waiting
+        await agent_slots.acquire(priority)
+        try:
+            await self._global_slots.acquire(priority)
+            try:
+                return await self._send_with_retries(agent_name, estimated_tokens, request)
+            finally:
+                self._global_slots.release()
+        finally:
+            agent_slots.release()
+
+    async def _send_with_retries(self, agent_name: str, estimated_tokens: int, request: Dict[str, Any]):
+        attempt = 0
+        while True:
+            await self._request_budget.consume(1)
+            await self._token_budget.consume(estimated_tokens)
+
+            try:
+                response = await self.client.chat.completions.create(**request)
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.config.max_retries:
+                    self.stats["failures"] += 1
+                    logger.error(f"LLM request for {agent_name} failed after {attempt + 1} attempts: {str(e)}")
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                attempt += 1
+                self.stats["retries"] += 1
+                logger.warning(f"LLM request for {agent_name} retrying in {delay:.2f}s: {type(e).__name__}")
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                self.stats["failures"] += 1
+                raise
+
+            self.stats["requests"] += 1
+            used_tokens = self._used_tokens(response)
+            if used_tokens is not None:
+                self.stats["tokens"] += used_tokens
+                self._token_budget.adjust(used_tokens - estimated_tokens)
+            return response
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when sent"""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.config.backoff_max) + random.uniform(0, self.config.backoff_base)
+            except ValueError:
+                pass
+        ceiling = min(self.config.backoff_max, self.config.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def _estimate_tokens(self, request: Dict[str, Any]) -> int:
+        """Rough prompt + completion token estimate (~4 characters per token)"""
+        prompt_chars = sum(len(str(m.get("content", ""))) for m in request.get("messages", []))
+        return prompt_chars // 4 + int(request.get("max_tokens") or self.config.default_max_tokens)
+
+    @staticmethod
+    def _used_tokens(response: Any) -> Optional[int]:
+        total = getattr(getattr(response, "usage", None), "total_tokens", None)
+        return total if isinstance(total, int) else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Gateway telemetry"""
+        return {
+            **self.stats,
+            "waiting": self._global_slots.waiting,
+            "agents": {name: slots.waiting for name, slots in self._agent_slots.items()},
+            "cache": self.cache.get_stats()
+        }
+
+    async def close(self):
+        """Close the pooled HTTP client and the cache file"""
+        self.cache.close()
+        await self.client.close()
+
+class _Completions:
+    def __init__(self, owner: "AgentLLMClient"):
+        self._owner = owner
+
+    async def create(self, priority: Optional[Priority] = None, cache_ttl: Optional[float] = None, **request: Any):
+        return await self._owner.gateway.chat_completion(
+            agent_name=self._owner.agent_name, priority=priority, cache_ttl=cache_ttl, **request
+        )
+
+class _Chat:
+    def __init__(self, owner: "AgentLLMClient"):
+        self.completions = _Completions(owner)
+
+class AgentLLMClient:
+    """Drop-in for ``AsyncOpenAI`` that routes ``chat.completions.create`` through the gateway"""
+
+    def __init__(self, gateway: LLMGateway, agent_name: str):
+        self.gateway = gateway
+        self.agent_name = agent_name
+        self.chat = _Chat(self)
+
+_gateways: Dict[Optional[str], LLMGateway] = {}
+
+def get_llm_gateway(api_key: Optional[str] = None, config: Optional[GatewayConfig] = None) -> LLMGateway:
+    """Return the process-wide gateway for an API key, creating it on first use"""
+    gateway = _gateways.get(api_key)
+    if gateway is None:
+        gateway = LLMGateway(api_key=api_key, config=config or GatewayConfig.from_env())
+        _gateways[api_key] = gateway
+    return gateway
+
+async def close_llm_gateways():
+    """Close every shared gateway (call on application shutdown)"""
+    for gateway in list(_gateways.values()):
+        try:
+            await gateway.close()
+        except Exception as e:
+            logger.error(f"Error closing LLM gateway: {str(e)}")
+    _gateways.clear()
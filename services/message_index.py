@@ -0,0 +1,188 @@
+# services/message_index.py
+
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class MessageRecord:
+    """What is still known about a message after its object has been evicted"""
+    id: str
+    contact_id: str
+    campaign_id: str
+    status: Hashable
+    sent_at: Optional[datetime] = None
+
+class IndexedMessageStore(dict):
+    """message id -> message dict that keeps secondary indexes up to date.
+
+    Maintains contact_id -> message ids, campaign_id -> message ids and per-contact
+    counts of messages by status, so per-contact engagement is a dictionary lookup
+    instead of a scan of every message. Messages are duck-typed (id, contact_id,
+    campaign_id, status). Status changes must go through `set_status` (or `reindex`
+    after mutating a message directly) for the counters to follow. When `engagement`
+    is set (an EngagementStore), every write is mirrored into its columns, which keep
+    a message's analytics row after the message leaves this store. Callables in
+    `status_listeners` are called with the message after each status change.
+
+    A message whose status enters `evict_statuses` is dropped from the dict once its
+    listeners have run (and its engagement row is written). Its id stays in the
+    contact/campaign indexes and status counters, and `record` returns a small
+    MessageRecord for it, so later status changes (webhook events for sent mail)
+    still move the counters without keeping subject and body in memory.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._by_contact: Dict[str, Set[str]] = defaultdict(set)
+        self._by_campaign: Dict[str, Set[str]] = defaultdict(set)
+        self._contact_counts: Dict[str, Counter] = defaultdict(Counter)
+        self._indexed: Dict[str, tuple] = {}  # message id -> (contact_id, campaign_id, status) as counted
+        self.engagement = None
+        self.status_listeners: List[Callable[[Any], None]] = []
+        self.evict_statuses: Set[Hashable] = set()
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, message_id: str, message: Any):
+        if message_id in self._indexed:
+            self._unindex(message_id)
+        super().__setitem__(message_id, message)
+        self._index(message_id, message)
+
+    def __delitem__(self, message_id: str):
+        super().__delitem__(message_id)
+        self._unindex(message_id)
+
+    def pop(self, message_id: str, *default):
+        if message_id in self._indexed and message_id not in self:
+            # Evicted: forget the id and return what was known about it
+            record = self.record(message_id)
+            self._unindex(message_id)
+            return record
+        if message_id in self:
+            self._unindex(message_id)
+        return super().pop(message_id, *default)
+
+    def popitem(self):
+        message_id, message = super().popitem()
+        self._unindex(message_id)
+        return message_id, message
+
+    def setdefault(self, message_id: str, default: Any = None):
+        if message_id not in self:
+            self[message_id] = default
+        return self[message_id]
+
+    def update(self, *args, **kwargs):
+        for message_id, message in dict(*args, **kwargs).items():
+            self[message_id] = message
+
+    def clear(self):
+        super().clear()
+        self._by_contact.clear()
+        self._by_campaign.clear()
+        self._contact_counts.clear()
+        self._indexed.clear()
+
+    def _index(self, message_id: str, message: Any):
+        contact_id, campaign_id, status = message.contact_id, message.campaign_id, message.status
+        self._by_contact[contact_id].add(message_id)
+        self._by_campaign[campaign_id].add(message_id)
+        self._contact_counts[contact_id][status] += 1
+        self._indexed[message_id] = (contact_id, campaign_id, status)
+        if self.engagement is not None:
+            self.engagement.record_message(message)
+
+    def _unindex(self, message_id: str):
+        contact_id, campaign_id, status = self._indexed.pop(message_id)
+        self._discard(self._by_contact, contact_id, message_id)
+        self._discard(self._by_campaign, campaign_id, message_id)
+        counts = self._contact_counts[contact_id]
+        counts[status] -= 1
+        if counts[status] <= 0:
+            del counts[status]
+        if not counts:
+            del self._contact_counts[contact_id]
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[str]], key: str, message_id: str):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(message_id)
+            if not ids:
+                del index[key]
+
+    def set_status(self, message: Any, status: Hashable):
+        """Change a message's status and move it between the status counters"""
+        changed = message.status != status
+        message.status = status
+        if message.id in self._indexed:
+            self.reindex(message)
+        if changed:
+            for listener in self.status_listeners:
+                try:
+                    listener(message)
+                except Exception as e:
+                    logger.error(f"Status listener error for message {message.id}: {str(e)}")
+        if status in self.evict_statuses:
+            self.evict(message.id)
+
+    def evict(self, message_id: str):
+        """Drop a message object, keeping its id in the indexes and counters"""
+        if message_id in self:
+            super().__delitem__(message_id)
+
+    def record(self, message_id: str) -> Optional[Any]:
+        """The stored message, a MessageRecord if it was evicted, or None if unknown"""
+        message = self.get(message_id)
+        if message is not None or message_id not in self._indexed:
+            return message
+        contact_id, campaign_id, status = self._indexed[message_id]
+        sent_at = self.engagement.sent_at(message_id) if self.engagement is not None else None
+        return MessageRecord(message_id, contact_id, campaign_id, status, sent_at)
+
+    def evicted_count(self) -> int:
+        return len(self._indexed) - len(self)
+
+    def reindex(self, message: Any):
+        """Re-count a stored message after its fields were changed in place"""
+        if self._indexed.get(message.id) != (message.contact_id, message.campaign_id, message.status):
+            self._unindex(message.id)
+            self._index(message.id, message)
+        elif self.engagement is not None:
+            self.engagement.record_message(message)
+
+    def message_ids_for_contact(self, contact_id: str) -> Set[str]:
+        return set(self._by_contact.get(contact_id, ()))
+
+    def message_ids_for_campaign(self, campaign_id: str) -> Set[str]:
+        return set(self._by_campaign.get(campaign_id, ()))
+
+    def messages_for_contact(self, contact_id: str) -> List[Any]:
+        return [self.record(message_id) for message_id in self._by_contact.get(contact_id, ())]
+
+    def messages_for_contacts(self, contact_ids: Iterable[str]) -> List[Any]:
+        return [self.record(message_id) for contact_id in contact_ids for message_id in self._by_contact.get(contact_id, ())]
+
+    def messages_for_campaign(self, campaign_id: str) -> List[Any]:
+        return [self.record(message_id) for message_id in self._by_campaign.get(campaign_id, ())]
+
+    def contact_message_count(self, contact_id: str) -> int:
+        return len(self._by_contact.get(contact_id, ()))
+
+    def contact_status_count(self, contact_id: str, statuses: Optional[Iterable[Hashable]] = None) -> int:
+        """Number of a contact's messages currently in any of `statuses` (all messages when None)"""
+        counts = self._contact_counts.get(contact_id)
+        if not counts:
+            return 0
+        if statuses is None:
+            return sum(counts.values())
+        return sum(counts.get(status, 0) for status in statuses)
+
+    def contact_counts(self, contact_id: str) -> Dict[Hashable, int]:
+        """Running message count per status for a contact"""
+        return dict(self._contact_counts.get(contact_id, {}))
@@ -0,0 +1,96 @@
+# services/parse_pool.py
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .contact_extraction import Contact, extract_contacts
+
+logger = logging.getLogger(__name__)
+
+def gil_disabled() -> bool:
+    """True on a free-threaded interpreter running without the GIL"""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+@dataclass
+class ParseConfig:
+    workers: int = field(default_factory=lambda: max((os.cpu_count() or 2) // 2, 1))
+    queue_size: int = 32              # fetched pages waiting for a parser
+    executor: str = "auto"            # "process", "thread" or "auto" (threads only without a GIL)
+    inline_max_bytes: int = 16 * 1024 # smaller pages parse faster than a round trip to a worker
+
+    @classmethod
+    def from_env(cls) -> "ParseConfig":
+        """Build config from SCRAPER_PARSE_* environment variables"""
+        defaults = cls()
+        return cls(
+            workers=int(os.getenv("SCRAPER_PARSE_WORKERS", defaults.workers)),
+            queue_size=int(os.getenv("SCRAPER_PARSE_QUEUE_SIZE", defaults.queue_size)),
+            executor=os.getenv("SCRAPER_PARSE_EXECUTOR", defaults.executor),
+            inline_max_bytes=int(os.getenv("SCRAPER_PARSE_INLINE_MAX_BYTES", defaults.inline_max_bytes)),
+        )
+
+class ParsePool:
+    """Runs contact extraction off the event loop.
+
+    Workers receive raw page bytes and return (email, name, job_title) tuples, so
+    only compact data crosses the process boundary.
+    """
+
+    def __init__(self, config: Optional[ParseConfig] = None):
+        self.config = config or ParseConfig()
+        self._executor: Optional[Executor] = None
+        self.stats: Dict[str, int] = {"offloaded": 0, "inline": 0, "errors": 0}
+
+    @property
+    def kind(self) -> str:
+        if self.config.executor in ("process", "thread"):
+            return self.config.executor
+        return "thread" if gil_disabled() else "process"
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.config.workers, thread_name_prefix="html-parse")
+            else:
+                # spawn: forking a process that runs an event loop and client threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.config.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+        return self._executor
+
+    async def parse(self, html: bytes) -> List[Contact]:
+        """Extract contacts from a page without blocking the event loop on large pages"""
+
+        if len(html) <= self.config.inline_max_bytes:
+            self.stats["inline"] += 1
+            return extract_contacts(html)
+
+        self.stats["offloaded"] += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), extract_contacts, html)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge page); start a fresh pool next time
+            self.stats["errors"] += 1
+            self.close()
+            raise
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "workers": self.config.workers}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
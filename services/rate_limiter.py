@@ -0,0 +1,271 @@
+# services/rate_limiter.py
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class CallPriority(IntEnum):
+    """Order in which waiting platform calls get tokens (lower goes first)"""
+    PUBLISH = 0
+    FETCH = 1
+    REPLY = 2
+
+@dataclass
+class Quota:
+    requests: int      # calls allowed per window
+    window: float      # seconds
+    burst: Optional[int] = None  # bucket size; defaults to a tenth of the window's calls
+
+    @property
+    def rate(self) -> float:
+        return self.requests / self.window
+
+    @property
+    def capacity(self) -> int:
+        return self.burst or max(1, self.requests // 10)
+
+# Per-account limits from the platforms' published quotas
+DEFAULT_QUOTAS = {
+    "twitter": Quota(180, 900),        # user-context endpoints: 180 requests / 15 minutes
+    "linkedin": Quota(500, 86400),     # member-level daily application limit
+    "facebook": Quota(200, 3600),      # Graph API platform limit: 200 calls / user / hour
+    "instagram": Quota(200, 3600),     # Instagram Graph API: 200 calls / account / hour
+}
+
+@dataclass
+class RateLimitConfig:
+    quotas: Dict[str, Quota] = field(default_factory=lambda: dict(DEFAULT_QUOTAS))
+    default_quota: Quota = field(default_factory=lambda: Quota(60, 60))
+    max_retries: int = 2            # 429 responses retried once the bucket reopens
+    backoff_base: float = 5.0       # seconds to wait after a 429 without Retry-After, doubled per strike
+    backoff_max: float = 900.0
+    usage_threshold: float = 90.0   # Facebook/Instagram usage percent at which calls pause
+    usage_cooldown: float = 300.0   # pause length when the usage headers give no regain time
+
+    @classmethod
+    def from_env(cls) -> "RateLimitConfig":
+        """Build config from SOCIAL_RATE_LIMIT_* environment variables ("<requests>/<seconds>" per platform)"""
+        config = cls()
+        for platform in list(config.quotas):
+            value = os.getenv(f"SOCIAL_RATE_LIMIT_{platform.upper()}")
+            if value:
+                requests, window = value.split("/")
+                config.quotas[platform] = Quota(int(requests), float(window))
+        config.max_retries = int(os.getenv("SOCIAL_RATE_LIMIT_MAX_RETRIES", config.max_retries))
+        return config
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds from a Retry-After header given as a delay or an HTTP date"""
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def usage_pause(headers: Mapping[str, str], threshold: float, cooldown: float) -> Optional[float]:
+    """Pause (seconds) asked for by Graph API usage headers, or None while usage is below `threshold`"""
+
+    percents: List[float] = []
+    regain: List[float] = []
+    for name in ("x-app-usage", "x-ad-account-usage", "x-business-use-case-usage"):
+        if name not in headers:
+            continue
+        try:
+            usage = json.loads(headers[name])
+        except ValueError:
+            continue
+        # x-business-use-case-usage nests lists of usage objects under business ids
+        entries = [entry for value in usage.values() for entry in value] if name == "x-business-use-case-usage" else [usage]
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            percents.extend(float(entry.get(key) or 0) for key in ("call_count", "total_time", "total_cputime", "acc_id_util_pct"))
+            if entry.get("estimated_time_to_regain_access"):
+                regain.append(float(entry["estimated_time_to_regain_access"]) * 60)
+    if not percents or max(percents) < threshold:
+        return None
+    return max(regain) if regain else cooldown
+
+class TokenBucket:
+    """Token bucket whose waiters are served by priority, then arrival.
+
+    Tokens refill at `rate` up to `capacity`. A bucket can also be closed until a
+    time learned from the platform (a reset or Retry-After), during which nobody is
+    served. One timer per bucket wakes the head waiter when it can next be served.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats: Dict[str, Any] = {
+            "granted": {priority.name.lower(): 0 for priority in CallPriority},
+            "throttled": 0,
+            "waited": 0,
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, priority: CallPriority = CallPriority.FETCH):
+        now = time.monotonic()
+        self._refill(now)
+        if not self._waiters and now >= self.blocked_until and self.tokens >= 1:
+            self.tokens -= 1
+            self.stats["granted"][priority.name.lower()] += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._counter), future))
+        self._serve()
+        try:
+            await future
+        finally:
+            waited = time.monotonic() - now
+            self.stats["waited"] += 1
+            self.stats["wait_seconds"] += waited
+            self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], waited)
+        self.stats["granted"][priority.name.lower()] += 1
+
+    def _serve(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters:
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)  # cancelled while waiting
+                continue
+            if now < self.blocked_until or self.tokens < 1:
+                break
+            self.tokens -= 1
+            heapq.heappop(self._waiters)[2].set_result(None)
+
+        if self._waiters and self._timer is None:
+            delay = max(self.blocked_until - now, (1 - self.tokens) / self.rate, 0.0)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._serve)
+
+    def block(self, seconds: float):
+        """Serve nobody for `seconds` (extends, never shortens, an existing block)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        if self._waiters:
+            self._serve()
+
+    def limit_remaining(self, remaining: float):
+        """Never hold more tokens than the platform says are left"""
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, remaining)
+
+    def get_stats(self) -> Dict[str, Any]:
+        self._refill(time.monotonic())
+        return {
+            **self.stats,
+            "granted": dict(self.stats["granted"]),
+            "tokens": round(self.tokens, 2),
+            "capacity": self.capacity,
+            "rate_per_minute": round(self.rate * 60, 2),
+            "waiting": sum(1 for _, _, future in self._waiters if not future.done()),
+            "blocked_for": round(max(0.0, self.blocked_until - time.monotonic()), 2),
+        }
+
+class PlatformRateLimiter:
+    """Token buckets per platform and account, kept in line with the platform's own limit headers.
+
+    Every call takes a token from its account's bucket first, publishes ahead of
+    fetches ahead of replies. Responses then adjust the bucket: Twitter's
+    `x-rate-limit-remaining`/`x-rate-limit-reset` cap the tokens and close the
+    bucket until the reset, `Retry-After` on a 429 closes it for that long (with
+    exponential backoff when absent), and Graph API usage headers close it once
+    usage nears the threshold. 429 responses are retried after the bucket reopens.
+    """
+
+    def __init__(self, config: Optional[RateLimitConfig] = None):
+        self.config = config or RateLimitConfig()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._strikes: Dict[str, int] = {}
+
+    def bucket(self, platform: str, account: str = "") -> TokenBucket:
+        key = f"{platform}:{account}"
+        if key not in self._buckets:
+            quota = self.config.quotas.get(platform, self.config.default_quota)
+            self._buckets[key] = TokenBucket(quota.rate, quota.capacity)
+        return self._buckets[key]
+
+    async def send(self,
+                   platform: str,
+                   account: str,
+                   priority: CallPriority,
+                   request: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `request` (returning an httpx-style response) under the account's limit"""
+
+        bucket = self.bucket(platform, account)
+        for attempt in range(self.config.max_retries + 1):
+            await bucket.acquire(priority)
+            response = await request()
+            self.observe(platform, account, response.status_code, response.headers)
+            if response.status_code != 429 or attempt == self.config.max_retries:
+                return response
+            logger.warning(f"{platform} rate limited; retrying after {bucket.get_stats()['blocked_for']}s")
+        return response
+
+    def observe(self, platform: str, account: str, status_code: int, headers: Mapping[str, str]):
+        """Fold a response's status and rate-limit headers into the account's bucket"""
+
+        key = f"{platform}:{account}"
+        bucket = self.bucket(platform, account)
+        remaining = _header_float(headers, "x-rate-limit-remaining")
+        reset = _header_float(headers, "x-rate-limit-reset")
+        until_reset = max(0.0, reset - time.time()) if reset is not None else None
+        if remaining is not None:
+            bucket.limit_remaining(remaining)
+            if remaining < 1 and until_reset is not None:
+                bucket.block(until_reset)
+
+        pause = usage_pause(headers, self.config.usage_threshold, self.config.usage_cooldown)
+        if pause is not None:
+            bucket.block(pause)
+
+        if status_code == 429:
+            bucket.stats["throttled"] += 1
+            strikes = self._strikes.get(key, 0) + 1
+            self._strikes[key] = strikes
+            delay = retry_after_seconds(headers)
+            if delay is None:
+                delay = until_reset if until_reset else min(self.config.backoff_base * 2 ** (strikes - 1), self.config.backoff_max)
+            bucket.block(delay)
+        elif status_code < 400:
+            self._strikes.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {key: bucket.get_stats() for key, bucket in self._buckets.items()}
@@ -0,0 +1,160 @@
+# services/sendgrid_bulk.py
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .llm_gateway import MinuteBudget
+
+logger = logging.getLogger(__name__)
+
+# SendGrid accepts at most 1000 personalizations per /mail/send request
+MAX_PERSONALIZATIONS = 1000
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+@dataclass
+class BulkRecipient:
+    message_id: str
+    email: str
+    name: str = ""
+    subject: Optional[str] = None                               # overrides the shared subject
+    substitutions: Dict[str, str] = field(default_factory=dict)  # tag ("{{first_name}}") -> value
+
+@dataclass
+class DeliveryResult:
+    accepted: bool
+    sendgrid_message_id: Optional[str] = None  # X-Message-Id of the batch request
+    error: Optional[str] = None
+
+class SendGridBulkSender:
+    """Sends one email body to many recipients with multi-personalization /mail/send requests.
+
+    Recipients are packed up to `batch_size` per request; per-recipient differences
+    travel as substitutions. Batches run concurrently under a concurrency cap and a
+    requests-per-minute budget, and 429/5xx responses are retried with backoff.
+    """
+
+    def __init__(self,
+                 http_client: httpx.AsyncClient,
+                 api_key: Optional[str],
+                 base_url: str = "https://api.sendgrid.com/v3",
+                 batch_size: int = MAX_PERSONALIZATIONS,
+                 max_concurrency: int = 4,
+                 requests_per_minute: int = 600,
+                 max_retries: int = 3,
+                 backoff_base: float = 1.0):
+        self.http_client = http_client
+        self.api_key = api_key
+        self.base_url = base_url
+        self.batch_size = min(max(batch_size, 1), MAX_PERSONALIZATIONS)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._budget = MinuteBudget(requests_per_minute)
+        self.stats: Dict[str, int] = {"requests": 0, "retries": 0, "accepted": 0, "rejected": 0}
+
+    async def send(self,
+                   recipients: List[BulkRecipient],
+                   html: str,
+                   from_email: str,
+                   from_name: str,
+                   subject: str = "",
+                   custom_args: Optional[Dict[str, str]] = None) -> Dict[str, DeliveryResult]:
+        """Send to every recipient and return a result per message id"""
+
+        batches = [recipients[i:i + self.batch_size] for i in range(0, len(recipients), self.batch_size)]
+        base_payload = {
+            "from": {"email": from_email, "name": from_name},
+            "subject": subject,
+            "content": [{"type": "text/html", "value": html}],
+            "tracking_settings": {
+                "click_tracking": {"enable": True},
+                "open_tracking": {"enable": True}
+            }
+        }
+
+        results: Dict[str, DeliveryResult] = {}
+        for batch, outcome in zip(batches, await asyncio.gather(
+            *[self._send_batch(batch, base_payload, custom_args or {}) for batch in batches]
+        )):
+            for recipient in batch:
+                results[recipient.message_id] = outcome
+
+        accepted = sum(1 for result in results.values() if result.accepted)
+        self.stats["accepted"] += accepted
+        self.stats["rejected"] += len(results) - accepted
+        return results
+
+    def _personalization(self, recipient: BulkRecipient, custom_args: Dict[str, str]) -> Dict[str, Any]:
+        personalization: Dict[str, Any] = {
+            "to": [{"email": recipient.email, "name": recipient.name} if recipient.name else {"email": recipient.email}],
+            # Lets delivery events (webhooks) be matched back to the message
+            "custom_args": {**custom_args, "message_id": recipient.message_id}
+        }
+        if recipient.subject is not None:
+            personalization["subject"] = recipient.subject
+        if recipient.substitutions:
+            personalization["substitutions"] = {k: str(v) for k, v in recipient.substitutions.items()}
+        return personalization
+
+    async def _send_batch(self,
+                          batch: List[BulkRecipient],
+                          base_payload: Dict[str, Any],
+                          custom_args: Dict[str, str]) -> DeliveryResult:
+        payload = {
+            **base_payload,
+            "personalizations": [self._personalization(recipient, custom_args) for recipient in batch]
+        }
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+        async with self._slots:
+            for attempt in range(self.max_retries + 1):
+                await self._budget.consume(1)
+                self.stats["requests"] += 1
+                try:
+                    response = await self.http_client.post(f"{self.base_url}/mail/send", headers=headers, json=payload)
+                except httpx.HTTPError as e:
+                    error = f"{type(e).__name__}: {str(e)}"
+                    retry_after = None
+                else:
+                    if response.status_code == 202:
+                        return DeliveryResult(accepted=True, sendgrid_message_id=response.headers.get("x-message-id"))
+                    error = f"HTTP {response.status_code}: {response.text[:200]}"
+                    if response.status_code not in RETRYABLE_STATUSES:
+                        break
+                    retry_after = self._retry_after(response)
+
+                if attempt == self.max_retries:
+                    break
+                self.stats["retries"] += 1
+                delay = retry_after if retry_after is not None else random.uniform(0, self.backoff_base * (2 ** attempt))
+                await asyncio.sleep(delay)
+
+        logger.error(f"SendGrid batch of {len(batch)} failed: {error}")
+        return DeliveryResult(accepted=False, error=error)
+
+    def _retry_after(self, response: httpx.Response) -> Optional[float]:
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        reset = response.headers.get("x-ratelimit-reset")
+        if reset:
+            try:
+                return max(float(reset) - time.time(), 0.0)
+            except ValueError:
+                pass
+        return None
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
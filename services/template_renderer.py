@@ -0,0 +1,119 @@
+# services/template_renderer.py
+
+import logging
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER_RE = re.compile(r"\{\{([^{}]+?)\}\}")
+
+class CompiledTemplate:
+    """A `{{var}}` template parsed once into literal text and variable slots.
+
+    Rendering fills the slots from a value dict and does a single join; placeholders
+    without a value are left as written, as the str.replace loop did.
+    """
+
+    __slots__ = ("source", "variables", "_parts", "_slots")
+
+    def __init__(self, source: str):
+        self.source = source
+        self._parts: List[str] = []
+        self._slots: List[Tuple[int, str]] = []  # (index in _parts, variable name)
+
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(source):
+            if match.start() > position:
+                self._parts.append(source[position:match.start()])
+            self._slots.append((len(self._parts), match.group(1)))
+            self._parts.append(match.group(0))
+            position = match.end()
+        if position < len(source):
+            self._parts.append(source[position:])
+
+        self.variables: Tuple[str, ...] = tuple(dict.fromkeys(name for _, name in self._slots))
+
+    def render(self, values: Dict[str, Any]) -> str:
+        if not self._slots:
+            return self.source
+        parts = self._parts.copy()
+        for index, name in self._slots:
+            value = values.get(name)
+            if value is not None:
+                parts[index] = str(value)
+        return "".join(parts)
+
+    def render_many(self, rows: List[Dict[str, Any]]) -> List[str]:
+        """Render once per value dict"""
+        if not self._slots:
+            return [self.source] * len(rows)
+        template_parts = self._parts
+        slots = self._slots
+        rendered = []
+        for values in rows:
+            parts = template_parts.copy()
+            for index, name in slots:
+                value = values.get(name)
+                if value is not None:
+                    parts[index] = str(value)
+            rendered.append("".join(parts))
+        return rendered
+
+class TemplateRenderer:
+    """Compiled subject and HTML body per email template.
+
+    Templates are duck-typed (id, subject_line, html_content). Compiled forms are
+    cached by template id and recompiled when the template text changes.
+    """
+
+    def __init__(self, max_templates: int = 256):
+        self.max_templates = max_templates
+        self._compiled: "OrderedDict[str, Tuple[CompiledTemplate, CompiledTemplate]]" = OrderedDict()
+        self.stats: Dict[str, int] = {"compiled": 0, "hits": 0}
+
+    def compile(self, template: Any) -> Tuple[CompiledTemplate, CompiledTemplate]:
+        """(subject, html) compiled forms of a template"""
+
+        cached = self._compiled.get(template.id)
+        if (cached is not None
+                and cached[0].source == template.subject_line
+                and cached[1].source == template.html_content):
+            self._compiled.move_to_end(template.id)
+            self.stats["hits"] += 1
+            return cached
+
+        compiled = (CompiledTemplate(template.subject_line or ""), CompiledTemplate(template.html_content or ""))
+        self._compiled[template.id] = compiled
+        self._compiled.move_to_end(template.id)
+        if len(self._compiled) > self.max_templates:
+            self._compiled.popitem(last=False)
+        self.stats["compiled"] += 1
+        return compiled
+
+    def variables(self, template: Any) -> Tuple[str, ...]:
+        """Variable names used by the subject or body"""
+        subject, html = self.compile(template)
+        return tuple(dict.fromkeys(subject.variables + html.variables))
+
+    def render(self, template: Any, values: Dict[str, Any]) -> Dict[str, str]:
+        subject, html = self.compile(template)
+        return {"subject": subject.render(values), "html": html.render(values)}
+
+    def render_many(self, template: Any, rows: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Render a template for many contacts' values in one call"""
+        subject, html = self.compile(template)
+        return [
+            {"subject": rendered_subject, "html": rendered_html}
+            for rendered_subject, rendered_html in zip(subject.render_many(rows), html.render_many(rows))
+        ]
+
+    def invalidate(self, template_id: Optional[str] = None):
+        if template_id is None:
+            self._compiled.clear()
+        else:
+            self._compiled.pop(template_id, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "templates": len(self._compiled)}
@@ -0,0 +1,123 @@
+# services/trigger_index.py
+
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (events the sequence listens to, None meaning any event; tags a contact needs one of, empty meaning none)
+TriggerKeys = Tuple[Iterable[Optional[str]], Iterable[str]]
+
+class IndexedSequenceStore(dict):
+    """sequence id -> sequence dict with a trigger dispatch index.
+
+    `trigger_keys(sequence)` says which events a sequence listens to and which
+    contact tags it requires. Sequences without tags are indexed by event; tagged
+    ones by event and tag. `match(event)` then returns only the sequences that can
+    fire for that event, so dispatch never walks every sequence. Sequences are
+    duck-typed; call `reindex` after changing a stored sequence's trigger in place.
+    """
+
+    def __init__(self, trigger_keys: Callable[[Any], TriggerKeys], *args, **kwargs):
+        super().__init__()
+        self.trigger_keys = trigger_keys
+        self._by_event: Dict[Optional[str], Set[str]] = defaultdict(set)
+        self._by_tag: Dict[Optional[str], Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        self._indexed: Dict[str, Tuple[Tuple[Optional[str], ...], Tuple[str, ...]]] = {}
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, sequence_id: str, sequence: Any):
+        if sequence_id in self:
+            self._unindex(sequence_id)
+        super().__setitem__(sequence_id, sequence)
+        self._index(sequence_id, sequence)
+
+    def __delitem__(self, sequence_id: str):
+        super().__delitem__(sequence_id)
+        self._unindex(sequence_id)
+
+    def pop(self, sequence_id: str, *default):
+        if sequence_id in self:
+            self._unindex(sequence_id)
+        return super().pop(sequence_id, *default)
+
+    def popitem(self):
+        sequence_id, sequence = super().popitem()
+        self._unindex(sequence_id)
+        return sequence_id, sequence
+
+    def setdefault(self, sequence_id: str, default: Any = None):
+        if sequence_id not in self:
+            self[sequence_id] = default
+        return self[sequence_id]
+
+    def update(self, *args, **kwargs):
+        for sequence_id, sequence in dict(*args, **kwargs).items():
+            self[sequence_id] = sequence
+
+    def clear(self):
+        super().clear()
+        self._by_event.clear()
+        self._by_tag.clear()
+        self._indexed.clear()
+
+    def _index(self, sequence_id: str, sequence: Any):
+        events, tags = self.trigger_keys(sequence)
+        events, tags = tuple(dict.fromkeys(events)), tuple(dict.fromkeys(tags))
+        for event in events:
+            if tags:
+                for tag in tags:
+                    self._by_tag[event][tag].add(sequence_id)
+            else:
+                self._by_event[event].add(sequence_id)
+        self._indexed[sequence_id] = (events, tags)
+
+    def _unindex(self, sequence_id: str):
+        events, tags = self._indexed.pop(sequence_id)
+        for event in events:
+            if tags:
+                by_tag = self._by_tag[event]
+                for tag in tags:
+                    by_tag[tag].discard(sequence_id)
+                    if not by_tag[tag]:
+                        del by_tag[tag]
+                if not by_tag:
+                    del self._by_tag[event]
+            else:
+                self._by_event[event].discard(sequence_id)
+                if not self._by_event[event]:
+                    del self._by_event[event]
+
+    def reindex(self, sequence: Any):
+        """Re-read a stored sequence's trigger after it was changed in place"""
+        self._unindex(sequence.id)
+        self._index(sequence.id, sequence)
+
+    def match(self, event: str) -> Tuple[Set[str], Dict[str, Set[str]]]:
+        """(sequences that fire for any contact, tag -> sequences that need the tag) for an event"""
+
+        untagged = self._by_event.get(event, set()) | self._by_event.get(None, set())
+        tagged: Dict[str, Set[str]] = {}
+        for key in (event, None):
+            for tag, sequence_ids in self._by_tag.get(key, {}).items():
+                tagged.setdefault(tag, set()).update(sequence_ids)
+        return untagged, tagged
+
+    def dispatch(self, event: str, contacts: Iterable[Any]) -> Dict[str, List[Any]]:
+        """sequence id -> contacts (duck-typed, with .tags) a sequence may start for"""
+
+        untagged, tagged = self.match(event)
+        plan: Dict[str, List[Any]] = {}
+        if not untagged and not tagged:
+            return plan
+
+        for contact in contacts:
+            matched = untagged
+            if tagged and contact.tags:
+                hits = [tagged[tag] for tag in contact.tags if tag in tagged]
+                if hits:
+                    matched = untagged.union(*hits)
+            for sequence_id in matched:
+                plan.setdefault(sequence_id, []).append(contact)
+        return plan
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi.testclient import TestClient
 from campaign_agent import CampaignAgent, CampaignObjective, TargetAudience, Channel, CampaignStatus
+from services.llm_gateway import LLMGateway, GatewayConfig
 
 # Test fixtures
 @pytest.fixture
@@ -28,15 +29,18 @@ def mock_supabase_client():
 
 @pytest.fixture
 def campaign_agent(mock_openai_client, mock_supabase_client):
-    with patch('campaign_agent.AsyncOpenAI', return_value=mock_openai_client):
-        agent = CampaignAgent(
-            openai_api_key="test_key",
-            integrations={
-                'sendgrid_api_key': 'test_sendgrid',
-                'linkedin_api_key': 'test_linkedin'
-            }
+    agent = CampaignAgent(
+        openai_api_key="test_key",
+        integrations={
+            'sendgrid_api_key': 'test_sendgrid',
+            'linkedin_api_key': 'test_linkedin'
+        },
+        llm_gateway=LLMGateway(
+            client=mock_openai_client,
+            config=GatewayConfig(requests_per_minute=0, tokens_per_minute=0)
         )
-        return agent
+    )
+    return agent
 
 @pytest.fixture
 def sample_campaign_data():
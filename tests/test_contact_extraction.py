@@ -0,0 +1,47 @@
+import pytest
+import os
+from services.contact_extraction import extract_contacts, text_nodes, SelectolaxParser, lxml_html
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+
+BACKENDS = [
+    "stdlib",
+    pytest.param("lxml", marks=pytest.mark.skipif(lxml_html is None, reason="lxml not installed")),
+    pytest.param("selectolax", marks=pytest.mark.skipif(SelectolaxParser is None, reason="selectolax not installed")),
+]
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+@pytest.mark.parametrize("backend", BACKENDS)
+class TestContactExtraction:
+
+    def test_contact_page(self, backend):
+        contacts = extract_contacts(load_fixture("contact.html"), backend=backend)
+
+        assert ("jane.doe@acme-analytics.com", "Jane Doe", "Chief Marketing Officer") in contacts
+        assert ("carlos@acme-analytics.com", "Carlos Garcia", "Director of Partnerships") in contacts
+        # script contents are not page text
+        assert all(email != "noreply@tracking.example.com" for email, _, _ in contacts)
+
+    def test_large_team_page_pairs_each_email_with_its_card(self, backend):
+        contacts = extract_contacts(load_fixture("team_large.html"), backend=backend)
+        members = [c for c in contacts if c[0] != "info@globex-industries.com"]
+
+        assert len(members) == 400
+        for email, name, job_title in members:
+            first, last = name.lower().split()
+            assert email.startswith(f"{first}.{last}")
+            assert job_title is not None
+
+    def test_adjacent_text_nodes_stay_separate(self, backend):
+        html = b"<div><p>Marketing Director</p><a>jane@acme.com</a></div>"
+
+        assert extract_contacts(html, backend=backend) == [("jane@acme.com", None, "Marketing Director")]
+
+    def test_duplicate_emails_reported_once(self, backend):
+        html = b"<p>sales@acme.com</p><footer>sales@acme.com</footer>"
+
+        assert text_nodes(html, backend=backend) == ["sales@acme.com", "sales@acme.com"]
+        assert len(extract_contacts(html, backend=backend)) == 1
@@ -0,0 +1,90 @@
+import pytest
+import io
+import json
+import pandas as pd
+from services.contact_import import (
+    ImportJob, normalize_contacts, contact_records, normalized_chunks, read_contact_frames
+)
+
+CSV = """Email,First Name,last_name,company,tags,plan
+ Ann@Example.com ,Ann,Lee,Acme,vip;beta,pro
+not-an-email,Bob,,,,
+ann@example.com,Ann,Again,,,
+carl@example.org,Carl,,Globex,,
+known@example.com,Kim,,,,
+"""
+
+class TestNormalizeContacts:
+    def test_validates_normalizes_and_dedupes(self):
+        seen = {"known@example.com"}
+        frame = pd.read_csv(io.StringIO(CSV), dtype=str, keep_default_na=False)
+
+        kept, invalid, duplicates = normalize_contacts(frame, seen)
+
+        assert kept["email"].tolist() == ["ann@example.com", "carl@example.org"]
+        assert invalid == 1
+        assert duplicates == 2
+        assert {"ann@example.com", "carl@example.org"} <= seen
+
+    def test_missing_email_column_rejects_chunk(self):
+        kept, invalid, duplicates = normalize_contacts(pd.DataFrame({"name": ["a", "b"]}), set())
+
+        assert len(kept) == 0 and invalid == 2 and duplicates == 0
+
+    def test_records_carry_tags_and_custom_fields(self):
+        frame = pd.read_csv(io.StringIO(CSV), dtype=str, keep_default_na=False)
+        kept, _, _ = normalize_contacts(frame, set())
+
+        records = contact_records(kept)
+
+        assert records[0] == {
+            "email": "ann@example.com",
+            "first_name": "Ann",
+            "last_name": "Lee",
+            "company": "Acme",
+            "tags": ["vip", "beta"],
+            "custom_fields": {"plan": "pro"},
+        }
+        assert records[1]["custom_fields"] == {}
+
+class TestNormalizedChunks:
+    def test_dedupes_across_chunks(self):
+        rows = [{"email": f"user{i % 5}@example.com"} for i in range(12)]
+
+        chunks = list(normalized_chunks(rows, "records", set(), chunk_rows=4))
+
+        assert [chunk[0] for chunk in chunks] == [4, 4, 4]
+        assert sum(len(chunk[1]) for chunk in chunks) == 5
+        assert sum(chunk[3] for chunk in chunks) == 7
+
+    def test_ndjson_keeps_lists_and_nested_fields(self):
+        lines = "\n".join(json.dumps(row) for row in [
+            {"email": "a@x.io", "tags": ["t1", "t2"], "custom_fields": {"k": "v"}},
+            {"email": "b@x.io", "zip": "02139"},
+        ])
+
+        (rows, records, invalid, duplicates), = normalized_chunks(io.StringIO(lines), "ndjson", set())
+
+        assert rows == 2 and invalid == 0 and duplicates == 0
+        assert records[0]["tags"] == ["t1", "t2"] and records[0]["custom_fields"] == {"k": "v"}
+        assert records[1]["custom_fields"] == {"zip": "02139"}
+
+    def test_csv_streams_in_chunks(self):
+        body = "email\n" + "\n".join(f"u{i}@example.com" for i in range(10))
+
+        sizes = [len(frame) for frame in read_contact_frames(io.StringIO(body), "csv", chunk_rows=4)]
+
+        assert sizes == [4, 4, 2]
+
+    def test_unknown_format_rejected(self):
+        with pytest.raises(ValueError):
+            list(read_contact_frames([], "xml", 10))
+
+class TestImportJob:
+    def test_error_list_is_capped(self):
+        job = ImportJob(id="j", source="csv")
+
+        for i in range(5):
+            job.add_error(f"e{i}", limit=3)
+
+        assert job.to_dict()["errors"] == ["e0", "e1", "e2"]
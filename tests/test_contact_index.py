@@ -0,0 +1,110 @@
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from services.contact_index import IndexedContactStore
+
+BASE = datetime(2024, 1, 1)
+
+def make_contact(index, tags=None, company="Acme", subscribed=True, created_at=None):
+    return SimpleNamespace(
+        id=f"c{index}",
+        tags=tags if tags is not None else [],
+        company=company,
+        subscribed=subscribed,
+        created_at=created_at or BASE + timedelta(days=index)
+    )
+
+def scan(contacts, tags=None, company=None, created_after=None):
+    return [
+        c.id for c in contacts
+        if c.subscribed
+        and (tags is None or any(tag in c.tags for tag in tags))
+        and (not company or company.lower() in c.company.lower())
+        and (created_after is None or c.created_at >= created_after)
+    ]
+
+class TestIndexedContactStore:
+    def test_matches_full_scan(self):
+        rng = random.Random(7)
+        tags = ["vip", "trial", "churned", "beta", "partner"]
+        companies = ["Acme Inc", "Globex", "ACME Labs", "Initech", ""]
+        contacts = [
+            make_contact(
+                i,
+                tags=rng.sample(tags, rng.randint(0, 2)),
+                company=rng.choice(companies),
+                subscribed=rng.random() > 0.2,
+                created_at=BASE + timedelta(hours=rng.randint(0, 1000))
+            )
+            for i in range(500)
+        ]
+        store = IndexedContactStore({c.id: c for c in contacts})
+
+        for criteria in (
+            {},
+            {"tags": ["vip"]},
+            {"tags": ["vip", "beta"], "company": "acme"},
+            {"company": "ACME", "created_after": BASE + timedelta(hours=400)},
+            {"tags": [], "company": "globex"},
+            {"tags": ["missing"]},
+        ):
+            assert [c.id for c in store.query(**criteria)] == scan(contacts, **criteria), criteria
+
+    def test_created_after_accepts_iso_string(self):
+        store = IndexedContactStore({f"c{i}": make_contact(i) for i in range(5)})
+
+        result = store.query(created_after=(BASE + timedelta(days=3)).isoformat())
+
+        assert [c.id for c in result] == ["c3", "c4"]
+
+    def test_unsubscribed_only_listed_on_request(self):
+        store = IndexedContactStore()
+        store["c0"] = make_contact(0)
+        store["c1"] = make_contact(1, subscribed=False)
+
+        assert [c.id for c in store.query()] == ["c0"]
+        assert [c.id for c in store.query(subscribed_only=False)] == ["c0", "c1"]
+        assert store.count(subscribed_only=True) == 1
+
+    def test_replacement_keeps_insertion_order(self):
+        store = IndexedContactStore({f"c{i}": make_contact(i, tags=["a"]) for i in range(3)})
+
+        store["c0"] = make_contact(0, tags=["b"])
+
+        assert [c.id for c in store.query(tags=["a"])] == ["c1", "c2"]
+        assert [c.id for c in store.query()] == ["c0", "c1", "c2"]
+
+    def test_removed_contacts_leave_every_index(self):
+        store = IndexedContactStore({f"c{i}": make_contact(i, tags=["a"]) for i in range(3)})
+        store.query(tags=["a"])
+
+        del store["c1"]
+        store.pop("c2")
+
+        assert [c.id for c in store.query(tags=["a"], created_after=BASE)] == ["c0"]
+        assert store.get_stats()["contacts"] == 1
+        store["c1"] = make_contact(1, tags=["a"])
+        assert [c.id for c in store.query(tags=["a"])] == ["c0", "c1"]
+
+    def test_reindex_after_in_place_change(self):
+        contact = make_contact(0, tags=["a"])
+        store = IndexedContactStore({"c0": contact})
+        store.query(tags=["a"])
+
+        contact.subscribed = False
+        store.reindex(contact)
+        assert store.query() == []
+
+        contact.subscribed = True
+        contact.tags.append("b")
+        contact.company = "Globex"
+        store.reindex(contact)
+        assert [c.id for c in store.query(tags=["b"], company="glob")] == ["c0"]
+
+    def test_contact_without_created_at_is_excluded_from_date_filter(self):
+        contact = make_contact(0)
+        contact.created_at = None
+        store = IndexedContactStore({"c0": contact})
+
+        assert store.query(created_after=BASE) == []
+        assert [c.id for c in store.query()] == ["c0"]
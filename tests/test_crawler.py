@@ -0,0 +1,114 @@
+import pytest
+import asyncio
+import time
+import httpx
+from lead_generation_agent import WebScraper, LeadCriteria
+from services.crawler import CrawlScheduler, CrawlConfig
+
+TEAM_PAGE = b"""
+<html><body>
+  <div class="member">
+    <h3>Jane Doe</h3>
+    <p>Marketing Director</p>
+    <a>jane@acme.com</a>
+  </div>
+</body></html>
+"""
+
+class FakeSites:
+    """Mock transport recording per-host request overlap"""
+
+    def __init__(self, robots=None, latency=0.05):
+        self.robots = robots or {}
+        self.latency = latency
+        self.requests = []
+        self.in_flight = {}
+        self.peak_per_host = {}
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.requests.append(str(request.url))
+        if request.url.path == "/robots.txt":
+            if host in self.robots:
+                return httpx.Response(200, text=self.robots[host])
+            return httpx.Response(404)
+
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        self.peak_per_host[host] = max(self.peak_per_host.get(host, 0), self.in_flight[host])
+        await asyncio.sleep(self.latency)
+        self.in_flight[host] -= 1
+
+        if request.url.path == "/team":
+            return httpx.Response(200, content=TEAM_PAGE)
+        return httpx.Response(404)
+
+def make_scheduler(sites, **config):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(sites.handler))
+    return CrawlScheduler(client, CrawlConfig(**config))
+
+class TestCrawlScheduler:
+
+    @pytest.mark.asyncio
+    async def test_hosts_crawl_in_parallel_with_one_request_per_host(self):
+        sites = FakeSites(latency=0.05)
+        scheduler = make_scheduler(sites, per_host_delay=0.0)
+        urls = [f"https://site{h}.com/page{p}" for h in range(10) for p in range(3)]
+
+        start = time.monotonic()
+        results = [result async for result in scheduler.crawl(urls)]
+        elapsed = time.monotonic() - start
+
+        assert len(results) == 30
+        assert set(sites.peak_per_host.values()) == {1}
+        # 3 sequential pages per host, hosts overlapping: ~0.15s rather than ~1.5s
+        assert elapsed < 0.6
+
+    @pytest.mark.asyncio
+    async def test_per_host_delay_spaces_requests(self):
+        sites = FakeSites(latency=0.0)
+        scheduler = make_scheduler(sites, per_host_delay=0.05, respect_robots=False)
+
+        start = time.monotonic()
+        async for _ in scheduler.crawl([f"https://slow.com/{i}" for i in range(4)]):
+            pass
+
+        assert time.monotonic() - start >= 0.15
+
+    @pytest.mark.asyncio
+    async def test_robots_txt_is_cached_and_honoured(self):
+        sites = FakeSites(robots={"acme.com": "User-agent: *\nDisallow: /private"})
+        scheduler = make_scheduler(sites, per_host_delay=0.0)
+
+        results = [r async for r in scheduler.crawl(["https://acme.com/team", "https://acme.com/private", "https://acme.com/about"])]
+
+        blocked = [r for r in results if r.error == "disallowed by robots.txt"]
+        assert [r.url for r in blocked] == ["https://acme.com/private"]
+        assert sites.requests.count("https://acme.com/robots.txt") == 1
+        assert "https://acme.com/private" not in sites.requests
+
+    @pytest.mark.asyncio
+    async def test_closing_stream_cancels_pending_fetches(self):
+        sites = FakeSites(latency=0.05)
+        scheduler = make_scheduler(sites, per_host_delay=0.0, respect_robots=False)
+        stream = scheduler.crawl([f"https://one.com/{i}" for i in range(10)])
+
+        await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0.1)
+
+        assert len(sites.requests) < 10
+
+class TestWebScraperStreaming:
+
+    @pytest.mark.asyncio
+    async def test_stream_leads_across_domains(self):
+        sites = FakeSites(latency=0.01)
+        scraper = WebScraper(CrawlConfig(per_host_delay=0.0))
+        scraper.session = httpx.AsyncClient(transport=httpx.MockTransport(sites.handler))
+        scraper.crawler.client = scraper.session
+
+        batches = [batch async for batch in scraper.stream_leads(["acme.com", "globex.com"], LeadCriteria())]
+
+        emails = sorted(lead.email for batch in batches for lead in batch)
+        assert emails == ["jane@acme.com", "jane@acme.com"]
+        assert {lead.company for batch in batches for lead in batch} == {"Acme", "Globex"}
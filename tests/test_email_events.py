@@ -0,0 +1,106 @@
+import pytest
+import base64
+import json
+import time
+from services.email_events import EmailEventPipeline, EmailEventConfig
+
+def body(*events):
+    return json.dumps(list(events)).encode()
+
+class Recorder:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    async def __call__(self, events):
+        self.batches.append(events)
+        if self.fail:
+            raise RuntimeError("boom")
+
+class TestEmailEventPipeline:
+    @pytest.mark.asyncio
+    async def test_batches_queued_bodies(self):
+        handler = Recorder()
+        pipeline = EmailEventPipeline(handler, EmailEventConfig(batch_size=3, flush_interval=0.01))
+
+        for i in range(4):
+            assert pipeline.submit(body({"event": "open", "message_id": f"m{i}"}, {"event": "click", "message_id": f"m{i}"}))
+        await pipeline.drain()
+
+        events = [event for batch in handler.batches for event in batch]
+        assert [e["message_id"] for e in events] == ["m0", "m0", "m1", "m1", "m2", "m2", "m3", "m3"]
+        assert all(len(batch) <= 3 for batch in handler.batches)
+        assert len(handler.batches) < 8
+        assert pipeline.get_stats()["events"] == 8
+        await pipeline.close()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_reported(self):
+        pipeline = EmailEventPipeline(Recorder(), EmailEventConfig(queue_size=2, flush_interval=0))
+
+        accepted = [pipeline.submit(body({"event": "open"})) for _ in range(3)]
+
+        assert accepted == [True, True, False]
+        assert pipeline.get_stats()["queue_full"] == 1
+        await pipeline.close()
+
+    @pytest.mark.asyncio
+    async def test_malformed_bodies_and_handler_errors_do_not_stop_consumer(self):
+        handler = Recorder(fail=True)
+        pipeline = EmailEventPipeline(handler, EmailEventConfig(flush_interval=0))
+
+        pipeline.submit(b"not json")
+        pipeline.submit(body({"event": "open"}))
+        await pipeline.drain()
+        handler.fail = False
+        pipeline.submit(json.dumps({"event": "click"}).encode())
+        await pipeline.drain()
+
+        stats = pipeline.get_stats()
+        assert stats["malformed"] == 1
+        assert stats["handler_errors"] == 1
+        assert handler.batches[-1] == [{"event": "click"}]
+        await pipeline.close()
+
+    def test_unsigned_requests_rejected_without_key(self):
+        pipeline = EmailEventPipeline(Recorder())
+
+        assert not pipeline.verify(b"[]", None, None)
+        assert pipeline.get_stats()["rejected"] == 1
+
+    def test_unsigned_requests_accepted_when_explicitly_allowed(self, monkeypatch):
+        monkeypatch.setenv("SENDGRID_WEBHOOK_ALLOW_UNSIGNED", "true")
+        pipeline = EmailEventPipeline(Recorder(), EmailEventConfig.from_env())
+
+        assert pipeline.verify(b"[]", None, None)
+
+class TestSignatureVerification:
+    @pytest.fixture
+    def signer(self):
+        pytest.importorskip("cryptography")
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+
+        private_key = ec.generate_private_key(ec.SECP256R1())
+        public_key = private_key.public_key().public_bytes(
+            serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+
+        def sign(payload, timestamp):
+            signature = private_key.sign(timestamp.encode() + payload, ec.ECDSA(hashes.SHA256()))
+            return base64.b64encode(signature).decode()
+
+        return base64.b64encode(public_key).decode(), sign
+
+    def test_accepts_valid_and_rejects_tampered_or_stale(self, signer):
+        public_key, sign = signer
+        pipeline = EmailEventPipeline(Recorder(), EmailEventConfig(public_key=public_key, max_skew=60))
+        payload = body({"event": "open", "message_id": "m1"})
+        now = str(int(time.time()))
+        stale = str(int(time.time()) - 3600)
+
+        assert pipeline.verify(payload, sign(payload, now), now)
+        assert not pipeline.verify(payload + b" ", sign(payload, now), now)
+        assert not pipeline.verify(payload, sign(payload, stale), stale)
+        assert not pipeline.verify(payload, None, now)
+        assert pipeline.get_stats()["rejected"] == 3
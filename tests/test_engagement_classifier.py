@@ -0,0 +1,92 @@
+import pytest
+import asyncio
+import json
+from types import SimpleNamespace
+from services.engagement_classifier import EngagementClassifier, EngagementClassifierConfig, prefilter
+
+class FakeLLM:
+    """OpenAI-style client labelling every item negative and needing a reply"""
+
+    def __init__(self, fail=False, skip=()):
+        self.requests = []
+        self.fail = fail
+        self.skip = set(skip)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **request):
+        self.requests.append(request)
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("provider down")
+        lines = [json.loads(line) for line in request["messages"][1]["content"].splitlines() if line.strip().startswith("{")]
+        labels = [
+            {"id": line["id"], "sentiment": "negative", "requires_response": True}
+            for line in lines if line["text"] not in self.skip
+        ]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps({"labels": labels})))])
+
+def items(count, text="this is broken, can you help?"):
+    return [{"id": f"i{i}", "text": f"{text} {i}", "kind": "comment"} for i in range(count)]
+
+class TestPrefilter:
+    @pytest.mark.parametrize("text,kind,expected", [
+        ("", "like", "positive"),
+        ("😍🔥🔥", "comment", "positive"),
+        ("...", "comment", "neutral"),
+        ("Great post, thanks!", "comment", "positive"),
+        ("love it 👏", "comment", "positive"),
+    ])
+    def test_trivial_items_skip_the_model(self, text, kind, expected):
+        assert prefilter(text, kind) == {"sentiment": expected, "requires_response": False}
+
+    @pytest.mark.parametrize("text", [
+        "great, but how do I cancel?",
+        "not great",
+        "👎",
+        "I ordered three times last week and nothing arrived at all",
+        "Where is my order",
+    ])
+    def test_anything_ambiguous_goes_to_the_model(self, text):
+        assert prefilter(text) is None
+
+class TestEngagementClassifier:
+    @pytest.mark.asyncio
+    async def test_items_are_packed_into_batched_requests(self):
+        llm = FakeLLM()
+        classifier = EngagementClassifier(llm, EngagementClassifierConfig(batch_size=40, workers=2))
+
+        labels = await classifier.classify(items(100) + [{"id": "p", "text": "thanks!", "kind": "comment"}])
+        await classifier.close()
+
+        assert len(llm.requests) == 3
+        assert labels["i7"] == {"sentiment": "negative", "requires_response": True}
+        assert labels["p"] == {"sentiment": "positive", "requires_response": False}
+        assert llm.requests[0]["response_format"]["type"] == "json_schema"
+        assert classifier.get_stats()["prefiltered"] == 1
+
+    @pytest.mark.asyncio
+    async def test_bounded_queue_applies_backpressure_and_completes(self):
+        llm = FakeLLM()
+        classifier = EngagementClassifier(llm, EngagementClassifierConfig(batch_size=10, queue_size=5, workers=1))
+
+        labels = await classifier.classify(items(57))
+        await classifier.close()
+
+        assert len(labels) == 57
+        assert max(len(request["messages"][1]["content"].splitlines()) for request in llm.requests) < 30
+
+    @pytest.mark.asyncio
+    async def test_failed_batches_and_skipped_ids_fall_back_to_neutral(self):
+        classifier = EngagementClassifier(FakeLLM(fail=True))
+        labels = await classifier.classify(items(3))
+        await classifier.close()
+
+        assert set(label["sentiment"] for label in labels.values()) == {"neutral"}
+        assert classifier.get_stats()["failed_batches"] == 1
+
+        classifier = EngagementClassifier(FakeLLM(skip={"this is broken, can you help? 1"}))
+        labels = await classifier.classify(items(3))
+        await classifier.close()
+
+        assert labels["i1"] == {"sentiment": "neutral", "requires_response": False}
+        assert labels["i0"]["sentiment"] == "negative"
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+from services.engagement_cursors import (
+    BloomFilter, SeenSet, EngagementCursors, EngagementCursorConfig, SQLiteCursorStore
+)
+
+def items(*ids):
+    return [SimpleNamespace(id=item_id) for item_id in ids]
+
+class TestSeenSet:
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(1000, 1e-4)
+
+        for i in range(1000):
+            bloom.add(f"id{i}")
+
+        assert all(f"id{i}" in bloom for i in range(1000))
+        assert sum(f"other{i}" in bloom for i in range(10000)) < 10
+
+    def test_recent_ids_are_bounded_and_old_ids_remembered(self):
+        seen = SeenSet(capacity=100, error_rate=1e-6, recent=10)
+
+        seen.update(f"id{i}" for i in range(250))
+
+        assert seen.recent() == [f"id{i}" for i in range(240, 250)]
+        assert "id0" not in seen._recent and "id120" in seen
+        assert "id3" not in seen  # first filter generation was rotated out
+
+class TestEngagementCursors:
+    def test_unseen_skips_committed_and_repeated_ids(self):
+        cursors = EngagementCursors(config=EngagementCursorConfig())
+        cursors.commit({"twitter:me": ["t1"]})
+
+        fresh = cursors.unseen("twitter:me", items("t1", "t2", "t2", "t3"), lambda item: item.id)
+
+        assert [item.id for item in fresh] == ["t2", "t3"]
+        assert cursors.unseen("facebook:page", items("t1"), lambda item: item.id)[0].id == "t1"
+
+    def test_cursor_moves_only_on_commit(self):
+        cursors = EngagementCursors(config=EngagementCursorConfig())
+        cursors.advance("twitter:me", since_id="10", next_token="abc")
+
+        assert cursors.get("twitter:me") == {"since_id": "10", "next_token": "abc"}
+        assert cursors.get_stats()["cursors"] == {}
+
+        cursors.commit({})
+        cursors.advance("twitter:me", since_id="20", next_token=None)
+        cursors.commit({})
+
+        assert cursors.get("twitter:me") == {"since_id": "20"}
+
+    def test_cursors_and_recent_ids_survive_restart(self, tmp_path):
+        path = str(tmp_path / "cursors.db")
+        cursors = EngagementCursors(SQLiteCursorStore(path))
+        cursors.advance("facebook:page", since=1700000000)
+        cursors.commit({"facebook:page": ["f1", "f2"]})
+        cursors.close()
+
+        restored = EngagementCursors(SQLiteCursorStore(path))
+
+        assert restored.get("facebook:page") == {"since": 1700000000}
+        assert [item.id for item in restored.unseen("facebook:page", items("f1", "f3"), lambda item: item.id)] == ["f3"]
+        restored.close()
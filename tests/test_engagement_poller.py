@@ -0,0 +1,81 @@
+import pytest
+import asyncio
+import time
+from types import SimpleNamespace
+from services.engagement_poller import EngagementPoller, EngagementPollConfig
+
+def fetcher(items, delay=0.0, error=None):
+    async def fetch():
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return [SimpleNamespace(id=item, sentiment=None) for item in items]
+    return fetch
+
+class TestEngagementPoller:
+    @pytest.mark.asyncio
+    async def test_platforms_are_fetched_concurrently_and_saved_once(self):
+        saved = []
+
+        async def analyze(items):
+            for item in items:
+                item.sentiment = "neutral"
+
+        async def save(items):
+            saved.append([item.id for item in items])
+
+        poller = EngagementPoller({
+            "twitter": fetcher(["t1", "t2"], delay=0.1),
+            "facebook": fetcher(["f1"], delay=0.1),
+            "instagram": fetcher(["i1"], delay=0.1),
+        }, analyze, save)
+
+        started = time.monotonic()
+        items = await poller.poll()
+
+        assert time.monotonic() - started < 0.25
+        assert sorted(item.id for item in items) == ["f1", "i1", "t1", "t2"]
+        assert all(item.sentiment == "neutral" for item in items)
+        assert len(saved) == 1 and sorted(saved[0]) == ["f1", "i1", "t1", "t2"]
+
+    @pytest.mark.asyncio
+    async def test_slow_and_failing_platforms_are_dropped(self):
+        async def analyze(items):
+            pass
+
+        async def save(items):
+            pass
+
+        poller = EngagementPoller({
+            "twitter": fetcher(["t1"]),
+            "linkedin": fetcher(["l1"], delay=1.0),
+            "facebook": fetcher([], error=RuntimeError("boom")),
+        }, analyze, save, EngagementPollConfig(fetch_timeout=0.05))
+
+        items = await poller.poll()
+        stats = poller.get_stats()
+
+        assert [item.id for item in items] == ["t1"]
+        assert stats["linkedin"]["timeouts"] == 1
+        assert stats["facebook"]["errors"] == 1
+        assert stats["twitter"]["items"] == 1
+
+    @pytest.mark.asyncio
+    async def test_each_platform_is_analyzed_as_one_batch_when_it_arrives(self):
+        batches = []
+
+        async def analyze(items):
+            batches.append(sorted(item.id for item in items))
+
+        async def save(items):
+            pass
+
+        poller = EngagementPoller({
+            "twitter": fetcher(["t1", "t2"]),
+            "facebook": fetcher(["f1"], delay=0.05),
+            "linkedin": fetcher([]),
+        }, analyze, save)
+
+        await poller.poll()
+
+        assert batches == [["t1", "t2"], ["f1"]]
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from services.engagement_store import EngagementStore, wall_clock_seconds, NOT_SENT
+from services.message_index import IndexedMessageStore
+
+GROUPS = {"opened": ["opened", "clicked"], "clicked": ["clicked"]}
+
+def make_message(message_id, campaign_id="camp1", contact_id="c1", status="sent", sent_at=datetime(2024, 1, 1, 9)):
+    return SimpleNamespace(id=message_id, campaign_id=campaign_id, contact_id=contact_id, status=status, sent_at=sent_at)
+
+class TestEngagementStore:
+    def test_campaign_counts_group_by(self):
+        store = EngagementStore(chunk_size=4)
+        for i, (campaign, status, sent) in enumerate([
+            ("a", "sent", True), ("a", "opened", True), ("a", "clicked", True),
+            ("b", "scheduled", False), ("b", "opened", True), ("a", "bounced", False),
+        ]):
+            store.record(f"m{i}", campaign, f"c{i}", status, datetime(2024, 1, 1) if sent else None)
+
+        counts = store.campaign_counts(GROUPS)
+
+        assert counts["a"] == {"messages": 4, "sent": 3, "opened": 2, "clicked": 1}
+        assert counts["b"] == {"messages": 2, "sent": 1, "opened": 1, "clicked": 0}
+        assert len(store) == 6
+        assert store.column_bytes() == 2 * 4 * (4 + 4 + 1 + 8)
+        assert store.memory_bytes() > store.column_bytes() + 6 * len("m0")
+
+    def test_record_updates_existing_row(self):
+        store = EngagementStore()
+        store.record("m1", "a", "c1", "sent", datetime(2024, 1, 1))
+
+        store.record("m1", "a", "c1", "clicked", datetime(2024, 1, 1))
+
+        assert len(store) == 1
+        assert store.campaign_counts(GROUPS)["a"]["clicked"] == 1
+
+    def test_histograms_match_datetime_fields(self):
+        store = EngagementStore(chunk_size=8)
+        moments = [datetime(2024, 3, 4, 9, 30) + timedelta(hours=7 * i) for i in range(30)]
+        for i, moment in enumerate(moments):
+            store.record(f"m{i}", "a", f"c{i % 3}", "opened" if i % 2 else "clicked", moment)
+        store.record("m_unsent", "a", "c0", "opened", None)
+        store.record("m_sent", "a", "c0", "sent", moments[0])
+
+        total, days, hours = store.engagement_histograms(["opened", "clicked"])
+
+        assert total == 32
+        for name, expected in (("day", days), ("hour", hours)):
+            actual = [0] * len(expected)
+            for moment in moments:
+                actual[moment.weekday() if name == "day" else moment.hour] += 1
+            assert list(expected) == actual
+
+    def test_histograms_for_selected_contacts(self):
+        store = EngagementStore()
+        store.record("m1", "a", "c1", "opened", datetime(2024, 1, 1, 10))  # a Monday
+        store.record("m2", "a", "c2", "opened", datetime(2024, 1, 2, 11))
+
+        total, days, hours = store.engagement_histograms(["opened"], contact_ids={"c1", "missing"})
+
+        assert total == 1
+        assert days[0] == 1 and days.sum() == 1
+        assert hours[10] == 1 and hours.sum() == 1
+
+    def test_wall_clock_ignores_timezone(self):
+        aware = datetime(2024, 1, 1, 23, tzinfo=timezone(timedelta(hours=-5)))
+
+        assert wall_clock_seconds(aware) == wall_clock_seconds(datetime(2024, 1, 1, 23))
+        assert wall_clock_seconds(None) == NOT_SENT
+
+class TestMessageStoreMirroring:
+    def test_writes_reach_engagement_columns(self):
+        messages = IndexedMessageStore()
+        messages.engagement = EngagementStore()
+        message = make_message("m1", sent_at=None, status="scheduled")
+        messages["m1"] = message
+
+        message.sent_at = datetime(2024, 1, 1, 8)
+        messages.set_status(message, "opened")
+        messages.pop("m1")
+
+        counts = messages.engagement.campaign_counts(GROUPS)
+        assert counts["camp1"] == {"messages": 1, "sent": 1, "opened": 1, "clicked": 0}
+
+    def test_sent_at_change_without_status_change_is_recorded(self):
+        messages = IndexedMessageStore()
+        messages.engagement = EngagementStore()
+        message = make_message("m1", sent_at=None)
+        messages["m1"] = message
+
+        message.sent_at = datetime(2024, 1, 1, 8)
+        messages.set_status(message, "sent")
+
+        assert messages.engagement.campaign_counts({})["camp1"]["sent"] == 1
@@ -0,0 +1,144 @@
+import numpy as np
+from collections import Counter
+from types import SimpleNamespace
+from services.experiments import ExperimentEngine, ExperimentConfig, SQLiteExperimentStore, stratified_assignment, SENT, OPENED, CLICKED
+
+def simulate(engine, experiment_id, rates, sends, seed=0):
+    """Send `sends` messages per variant, then open them at the given rates until the test stops"""
+    rng = np.random.default_rng(seed)
+    for variant in range(len(rates)):
+        engine.bind(f"camp{variant}", experiment_id, variant)
+        for i in range(sends):
+            engine.record(f"m{variant}_{i}", f"camp{variant}", SENT)
+
+    order = [(variant, i) for variant in range(len(rates)) for i in range(sends)]
+    rng.shuffle(order)
+    experiment = engine.experiments[experiment_id]
+    for variant, i in order:
+        if rng.random() < rates[variant]:
+            due = engine.record(f"m{variant}_{i}", f"camp{variant}", OPENED)
+            if due is not None:
+                engine.evaluate(due)
+                if experiment.status != "running":
+                    break
+    return experiment
+
+class TestStratifiedAssignment:
+    def test_groups_balanced_within_each_stratum(self):
+        items = [(i, ["gmail", "outlook", "corp"][i % 3]) for i in range(900)]
+
+        groups, holdout = stratified_assignment(items, 3, 0.5, stratum=lambda item: item[1], seed=1)
+
+        assert sorted(len(group) for group in groups) == [150, 150, 150]
+        assert len(holdout) == 450
+        for group in groups:
+            assert Counter(item[1] for item in group) == {"gmail": 50, "outlook": 50, "corp": 50}
+        assert {item for group in groups for item in group} | set(holdout) == set(items)
+
+    def test_sample_is_random_not_a_prefix(self):
+        items = list(range(1000))
+
+        groups, _ = stratified_assignment(items, 2, 0.2, stratum=lambda item: 0, seed=3)
+
+        assert max(max(group) for group in groups) > 200
+        assert stratified_assignment(items, 2, 0.2, stratum=lambda item: 0, seed=3)[0] == groups
+
+    def test_small_strata_share_the_sample(self):
+        # One contact per domain: rounding each stratum on its own would sample nobody
+        items = [(i, f"domain{i}.com") for i in range(1000)]
+
+        groups, holdout = stratified_assignment(items, 2, 0.2, stratum=lambda item: item[1], seed=5)
+
+        assert [len(group) for group in groups] == [100, 100]
+        assert len(holdout) == 800
+
+    def test_sample_size_matches_fraction_across_uneven_strata(self):
+        items = [(i, "big") for i in range(97)] + [(i, f"small{i % 7}") for i in range(100, 121)]
+
+        groups, holdout = stratified_assignment(items, 3, 0.3, stratum=lambda item: item[1], seed=2)
+
+        assert sum(len(group) for group in groups) == round(len(items) * 0.3)
+        assert max(len(group) for group in groups) - min(len(group) for group in groups) <= 1
+        assert Counter(item[1] for group in groups for item in group)["big"] in (29, 30)
+        assert len(holdout) + sum(len(group) for group in groups) == len(items)
+
+class TestExperimentEngine:
+    def test_counters_count_each_milestone_once(self):
+        engine = ExperimentEngine()
+        experiment = engine.create("t", ["a", "b"])
+        engine.bind("camp1", "t", 1)
+
+        engine.record("m1", "camp1", SENT)
+        engine.record("m1", "camp1", CLICKED)
+        engine.record("m1", "camp1", OPENED)
+        engine.record("m2", "camp1", OPENED)
+        engine.record("m3", "unbound", OPENED)
+
+        assert experiment.sent.tolist() == [0, 2]
+        assert experiment.opened.tolist() == [0, 2]
+        assert experiment.clicked.tolist() == [0, 1]
+
+    def test_stops_early_on_clear_winner(self):
+        engine = ExperimentEngine(ExperimentConfig(evaluate_every=10), seed=0)
+        engine.create("t", ["weak", "strong"])
+
+        experiment = simulate(engine, "t", rates=[0.1, 0.3], sends=2000)
+
+        assert experiment.status == "decided"
+        assert experiment.winner == 1
+        assert experiment.decided_by == "probability"
+        # Stopped well before every open came in
+        assert experiment.opened.sum() < 0.5 * (0.1 + 0.3) * 2000
+
+    def test_no_decision_before_minimum_sample(self):
+        engine = ExperimentEngine(ExperimentConfig(evaluate_every=1, min_sends_per_variant=500), seed=0)
+        engine.create("t", ["a", "b"])
+
+        experiment = simulate(engine, "t", rates=[0.05, 0.9], sends=100)
+
+        assert experiment.status == "running"
+        assert experiment.last_evaluation["leader"] == 1
+
+    def test_sends_alone_never_trigger_evaluation(self):
+        engine = ExperimentEngine(ExperimentConfig(evaluate_every=1), seed=0)
+        engine.create("t", ["a", "b"])
+        engine.bind("camp", "t", 0)
+
+        due = [engine.record(f"m{i}", "camp", SENT) for i in range(50)]
+
+        assert due == [None] * 50
+
+    def test_summary_reports_winner(self):
+        engine = ExperimentEngine(ExperimentConfig(evaluate_every=10, metric="clicked"), seed=0)
+        experiment = engine.create("t", ["a", "b"])
+        engine.decide(experiment, 0, "deadline")
+
+        summary = engine.summary("t")
+
+        assert summary["winning_subject_line"] == "a"
+        assert summary["metric"] == "clicked"
+        assert engine.summary("missing") is None
+
+    def test_state_survives_restart(self, tmp_path):
+        path = str(tmp_path / "experiments.db")
+        engine = ExperimentEngine(ExperimentConfig(evaluate_every=1), seed=0, store=SQLiteExperimentStore(path))
+        experiment = engine.create("t", ["a", "b"])
+        experiment.holdout = [SimpleNamespace(id="c1"), SimpleNamespace(id="c2")]
+        engine.bind("camp0", "t", 0)
+        engine.bind("camp1", "t", 1)
+        engine.record("m1", "camp1", SENT)
+        engine.evaluate(engine.record("m1", "camp1", OPENED))
+        engine.save(experiment)
+        engine.close()
+
+        restarted = ExperimentEngine(store=SQLiteExperimentStore(path))
+        restored = restarted.get("t")
+
+        assert restored.variants == ["a", "b"]
+        assert restored.sent.tolist() == [0, 1]
+        assert restored.opened.tolist() == [0, 1]
+        assert restored.holdout == ["c1", "c2"]
+        assert restored.config.evaluate_every == 1
+        assert restarted.variant_for("camp1") == ("t", 1)
+        assert restarted.summary("t")["evaluation"]["leader"] == experiment.last_evaluation["leader"]
+        restarted.close()
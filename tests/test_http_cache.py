@@ -0,0 +1,117 @@
+import pytest
+import os
+import httpx
+from services.crawler import CrawlScheduler, CrawlConfig
+from services.http_cache import HTTPCache
+
+PAGE = b"<html><body>jane@acme.com</body></html>"
+
+class Origin:
+    """Mock origin server supporting ETag revalidation"""
+
+    def __init__(self):
+        self.requests = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        path = request.url.path
+        if path == "/robots.txt" or path == "/gone":
+            return httpx.Response(404)
+        if path == "/slow":
+            raise httpx.ReadTimeout("timed out", request=request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=PAGE, headers={"ETag": '"v1"', "Content-Type": "text/html"})
+
+    def page_requests(self):
+        return [r for r in self.requests if r.url.path != "/robots.txt"]
+
+@pytest.fixture
+def origin():
+    return Origin()
+
+def make_scheduler(origin, cache_dir, **config):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(origin.handler))
+    return CrawlScheduler(client, CrawlConfig(per_host_delay=0.0, cache_dir=str(cache_dir), **config))
+
+class TestHTTPCache:
+
+    @pytest.mark.asyncio
+    async def test_fresh_page_served_from_disk(self, origin, tmp_path):
+        scheduler = make_scheduler(origin, tmp_path)
+
+        first = await scheduler.fetch("https://acme.com/team")
+        second = await scheduler.fetch("https://acme.com/team")
+
+        assert first.content == second.content == PAGE
+        assert second.from_cache
+        assert len(origin.page_requests()) == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_page_is_revalidated(self, origin, tmp_path):
+        scheduler = make_scheduler(origin, tmp_path, cache_freshness=0.0)
+
+        await scheduler.fetch("https://acme.com/team")
+        result = await scheduler.fetch("https://acme.com/team")
+
+        assert result.ok and result.from_cache and result.content == PAGE
+        assert origin.page_requests()[-1].headers["if-none-match"] == '"v1"'
+        assert scheduler.cache.stats["revalidated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_not_found_and_timeouts_are_negatively_cached(self, origin, tmp_path):
+        scheduler = make_scheduler(origin, tmp_path)
+
+        for _ in range(2):
+            gone = await scheduler.fetch("https://acme.com/gone")
+            slow = await scheduler.fetch("https://acme.com/slow")
+
+        assert gone.status_code == 404 and not gone.ok
+        assert slow.error.startswith("ReadTimeout")
+        assert len(origin.page_requests()) == 2
+        assert scheduler.cache.stats["negative_hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_transport_error_keeps_stale_page(self, origin, tmp_path):
+        scheduler = make_scheduler(origin, tmp_path, cache_freshness=0.0, error_ttl=3600.0)
+        await scheduler.fetch("https://acme.com/team")
+
+        async def down(request):
+            origin.requests.append(request)
+            raise httpx.ConnectError("connection refused", request=request)
+
+        scheduler.client = httpx.AsyncClient(transport=httpx.MockTransport(down))
+        stale = await scheduler.fetch("https://acme.com/team")
+        again = await scheduler.fetch("https://acme.com/team")
+
+        assert stale.ok and stale.from_cache and stale.content == PAGE
+        assert again.content == PAGE
+        assert len(origin.page_requests()) == 2
+        assert scheduler.cache.stats["revalidation_errors"] == 1
+        assert not scheduler.cache.lookup("https://acme.com/team").negative
+
+    @pytest.mark.asyncio
+    async def test_cache_persists_and_dedupes_bodies(self, origin, tmp_path):
+        scheduler = make_scheduler(origin, tmp_path)
+        await scheduler.fetch("https://acme.com/team")
+        await scheduler.fetch("https://acme.com/about")
+        scheduler.close()
+
+        blobs = [name for _, _, files in os.walk(tmp_path / "bodies") for name in files]
+        assert len(blobs) == 1
+
+        reopened = make_scheduler(origin, tmp_path)
+        result = await reopened.fetch("https://acme.com/about")
+        assert result.from_cache and result.content == PAGE
+        assert len(origin.page_requests()) == 2
+
+    def test_purge_removes_orphaned_bodies(self, tmp_path):
+        cache = HTTPCache(str(tmp_path))
+        cache.store("https://acme.com/team", 200, PAGE, {})
+        cache.store("https://acme.com/team", 200, b"updated", {})
+
+        cache.purge()
+
+        blobs = [name for _, _, files in os.walk(tmp_path / "bodies") for name in files]
+        assert len(blobs) == 1
+        assert cache.load_body(cache.lookup("https://acme.com/team")) == b"updated"
@@ -0,0 +1,115 @@
+import pytest
+import asyncio
+import httpx
+from services.http_transport import (
+    PooledTransport, TransportConfig, _SharedTransport, create_http_client, get_http_transport, close_http_transport
+)
+
+class LocalServer:
+    """Minimal keep-alive HTTP/1.1 server counting the TCP connections it accepts"""
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head:
+                    break
+                self.requests += 1
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nContent-Type: text/plain\r\n\r\nok")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+class TestPooledTransport:
+    @pytest.mark.asyncio
+    async def test_clients_share_keepalive_connections(self):
+        transport = PooledTransport(TransportConfig(http2=False))
+        async with LocalServer() as server:
+            url = f"http://localhost:{server.port}/"
+            first = httpx.AsyncClient(transport=_SharedTransport(transport))
+            second = httpx.AsyncClient(transport=_SharedTransport(transport))
+
+            for _ in range(5):
+                assert (await first.get(url)).text == "ok"
+            await first.aclose()
+            for _ in range(5):
+                assert (await second.get(url)).status_code == 200
+
+            assert server.requests == 10
+            assert server.connections == 1
+            stats = transport.get_stats()
+            assert stats["pools"] == 1
+            assert stats["dns"] == {"hits": 0, "misses": 1}
+            await second.aclose()
+            await transport.close()
+
+    @pytest.mark.asyncio
+    async def test_per_host_connection_limit(self):
+        transport = PooledTransport(TransportConfig(http2=False, max_connections_per_host=3))
+        async with LocalServer() as server:
+            client = httpx.AsyncClient(transport=transport)
+
+            await asyncio.gather(*[client.get(f"http://127.0.0.1:{server.port}/{i}") for i in range(30)])
+
+            assert server.requests == 30
+            assert server.connections <= 3
+            await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_dns_cache_reuses_lookups_for_new_connections(self):
+        transport = PooledTransport(TransportConfig(http2=False, max_keepalive_per_host=0))
+        async with LocalServer() as server:
+            client = httpx.AsyncClient(transport=transport)
+
+            for _ in range(4):
+                await client.get(f"http://localhost:{server.port}/")
+
+            assert server.connections == 4
+            assert transport.dns.stats == {"hits": 3, "misses": 1}
+            await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_unreachable_host_raises_connect_error(self):
+        transport = PooledTransport(TransportConfig(http2=False, retries=0))
+        client = httpx.AsyncClient(transport=transport)
+
+        with pytest.raises(httpx.ConnectError):
+            await client.get("http://127.0.0.1:9/")
+        await client.aclose()
+
+class TestSharedClients:
+    @pytest.mark.asyncio
+    async def test_factory_clients_use_one_transport_until_shutdown(self):
+        async with LocalServer() as server:
+            first = create_http_client(headers={"User-Agent": "bot"})
+            second = create_http_client()
+            shared = get_http_transport()
+
+            await first.get(f"http://localhost:{server.port}/")
+            await first.aclose()
+            await second.get(f"http://localhost:{server.port}/")
+
+            assert first.headers["User-Agent"] == "bot"
+            assert second.timeout.connect == shared.config.connect_timeout
+            assert server.connections == 1
+
+            await second.aclose()
+            await close_http_transport()
+            assert get_http_transport() is not shared
+            await close_http_transport()
@@ -0,0 +1,191 @@
+import pytest
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+from services.job_scheduler import JobScheduler, SchedulerConfig, ScheduledJob, SQLiteJobStore, SupabaseJobStore
+
+def make_scheduler(path=None, **overrides):
+    config = SchedulerConfig(sqlite_path=path, max_idle=0.05, retry_delay=0.0, **overrides)
+    return JobScheduler(config=config)
+
+async def wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+class TestJobScheduler:
+    @pytest.mark.asyncio
+    async def test_runs_due_jobs_and_holds_future_ones(self):
+        scheduler = make_scheduler()
+        ran = []
+
+        async def handler(payload):
+            ran.append(payload["n"])
+
+        scheduler.register("test", handler)
+        await scheduler.schedule("due", "test", datetime.now() - timedelta(seconds=1), {"n": 1})
+        await scheduler.schedule("soon", "test", datetime.now() + timedelta(milliseconds=100), {"n": 2})
+        await scheduler.schedule("later", "test", datetime.now() + timedelta(days=3), {"n": 3})
+
+        await wait_for(lambda: ran == [1, 2])
+        assert scheduler.get_stats()["pending"] == 1
+        assert [job.id for job in scheduler.store.load()] == ["later"]
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_dispatches_large_backlog_in_batches(self):
+        scheduler = make_scheduler(batch_size=50, workers=4)
+        ran = []
+
+        async def handler(payload):
+            ran.append(payload["n"])
+
+        scheduler.register("test", handler)
+        run_at = datetime.now().timestamp()
+        await scheduler.schedule_many([ScheduledJob(id=f"job_{n}", kind="test", run_at=run_at, payload={"n": n}) for n in range(1000)])
+
+        await wait_for(lambda: len(ran) == 1000)
+        assert sorted(ran) == list(range(1000))
+        assert scheduler.store.load() == []
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_cancel_and_reschedule(self):
+        scheduler = make_scheduler()
+        ran = []
+
+        async def handler(payload):
+            ran.append(payload["n"])
+
+        scheduler.register("test", handler)
+        later = datetime.now() + timedelta(days=1)
+        await scheduler.schedule("a", "test", later, {"n": 1})
+        await scheduler.schedule("b", "test", later, {"n": 2})
+
+        assert await scheduler.cancel("a")
+        assert not await scheduler.cancel("a")
+        assert await scheduler.reschedule("b", datetime.now())
+        assert not await scheduler.reschedule("missing", datetime.now())
+
+        await wait_for(lambda: ran == [2])
+        assert scheduler.get_stats()["pending"] == 0
+        assert scheduler.get_stats()["cancelled"] == 1
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_pending_jobs_survive_restart(self, tmp_path):
+        path = str(tmp_path / "jobs.db")
+        first = make_scheduler(path)
+        await first.schedule("email:1", "test", datetime.now() + timedelta(hours=1), {"message_id": "1"})
+        await first.close()
+
+        second = make_scheduler(path)
+        ran = []
+
+        async def handler(payload):
+            ran.append(payload["message_id"])
+
+        second.register("test", handler)
+        await second.start()
+        assert second.get_job("email:1") is not None
+
+        await second.reschedule("email:1", datetime.now())
+        await wait_for(lambda: ran == ["1"])
+        await second.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_job_is_retried_then_dropped(self):
+        scheduler = make_scheduler(max_attempts=2)
+        attempts = []
+
+        async def handler(payload):
+            attempts.append(1)
+            raise RuntimeError("provider down")
+
+        scheduler.register("test", handler)
+        await scheduler.schedule("flaky", "test", datetime.now())
+
+        await wait_for(lambda: scheduler.get_stats()["failed"] == 1)
+        assert len(attempts) == 2
+        assert scheduler.get_stats()["retried"] == 1
+        assert scheduler.store.load() == []
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_job_without_handler_stays_in_store(self):
+        scheduler = make_scheduler()
+        await scheduler.schedule("orphan", "unknown", datetime.now())
+
+        await wait_for(lambda: scheduler.get_stats()["dispatched"] == 1)
+        await scheduler.drain()
+        assert [job.id for job in scheduler.store.load()] == ["orphan"]
+        await scheduler.close()
+
+    @pytest.mark.asyncio
+    async def test_instances_sharing_a_store_run_each_job_once(self, tmp_path):
+        path = str(tmp_path / "jobs.db")
+        setup = make_scheduler(path)
+        for i in range(20):
+            await setup.schedule(f"job{i}", "test", datetime.now() + timedelta(milliseconds=200), {"n": i})
+        await setup.close()
+
+        ran = []
+
+        async def handler(payload):
+            ran.append(payload["n"])
+            await asyncio.sleep(0.01)
+
+        instances = [make_scheduler(path) for _ in range(2)]
+        for scheduler in instances:
+            scheduler.register("test", handler)
+            await scheduler.start()
+
+        await wait_for(lambda: sum(s.get_stats()["completed"] + s.get_stats()["claim_lost"] for s in instances) == 40)
+        assert sorted(ran) == list(range(20))
+        for scheduler in instances:
+            await scheduler.close()
+
+class TestJobStores:
+    def test_sqlite_store_round_trip(self):
+        store = SQLiteJobStore()
+        job = ScheduledJob(id="j", kind="k", run_at=123.0, payload={"a": [1, 2]}, attempts=1)
+
+        store.upsert([job])
+        assert store.load() == [job]
+        store.delete(["j"])
+        assert store.load() == []
+
+    def test_supabase_store_uses_table(self):
+        client = MagicMock()
+        client.table.return_value.select.return_value.execute.return_value.data = [
+            {"id": "j", "kind": "k", "run_at": "12.5", "payload": {"a": 1}, "attempts": 0}
+        ]
+        store = SupabaseJobStore(client, table="scheduled_jobs")
+
+        store.upsert([ScheduledJob(id="j", kind="k", run_at=12.5)])
+        store.delete(["j"])
+
+        assert store.load() == [ScheduledJob(id="j", kind="k", run_at=12.5, payload={"a": 1})]
+        client.table.assert_called_with("scheduled_jobs")
+        client.table.return_value.delete.return_value.in_.assert_called_with("id", ["j"])
+
+    def test_sqlite_claim_skips_leased_and_future_jobs(self):
+        store = SQLiteJobStore()
+        store.upsert([ScheduledJob(id="due", kind="k", run_at=1.0), ScheduledJob(id="future", kind="k", run_at=2e10)])
+
+        assert store.claim(["due", "future", "gone"], "a", 60) == ["due"]
+        assert store.claim(["due"], "b", 60) == []
+        store.upsert([ScheduledJob(id="due", kind="k", run_at=1.0, attempts=1)])
+        assert store.claim(["due"], "b", 60) == ["due"]
+
+    def test_supabase_claim_is_a_conditional_update(self):
+        client = MagicMock()
+        update = client.table.return_value.update
+        update.return_value.in_.return_value.lte.return_value.or_.return_value.execute.return_value.data = [{"id": "j"}]
+        store = SupabaseJobStore(client)
+
+        assert store.claim(["j", "k"], "me", 60) == ["j"]
+        assert update.call_args[0][0]["claimed_by"] == "me"
+        update.return_value.in_.assert_called_with("id", ["j", "k"])
+        assert update.return_value.in_.return_value.lte.return_value.or_.call_args[0][0].startswith("lease_until.is.null,")
@@ -0,0 +1,62 @@
+import pytest
+from types import SimpleNamespace
+from services.lead_dedup import LeadDedupIndex, normalize_email, company_key
+
+def lead(lead_id, first_name="", last_name="", company="", email=None):
+    return SimpleNamespace(id=lead_id, first_name=first_name, last_name=last_name, company=company, email=email)
+
+class TestNormalization:
+
+    def test_email_normalization(self):
+        assert normalize_email("J.ane.Doe+news@GoogleMail.com") == "janedoe@gmail.com"
+        assert normalize_email("jane.doe+crm@acme.com") == "jane.doe@acme.com"
+        assert normalize_email("not-an-email") is None
+        assert normalize_email(None) is None
+
+    def test_company_key(self):
+        assert company_key("Acme, Inc.") == "acme"
+        assert company_key("The Acme Corp") == "acme"
+        assert company_key("acme.com") == "acme"
+        assert company_key("Acme Labs") == "acme labs"
+
+class TestLeadDedupIndex:
+
+    @pytest.fixture
+    def index(self):
+        index = LeadDedupIndex()
+        index.add(lead("lead_1", "John", "Smith", "Acme Inc", "john@acme.com"))
+        index.add(lead("lead_2", "Jane", "Doe", "Globex Corporation", "jane.doe+promo@gmail.com"))
+        return index
+
+    def test_normalized_email_match(self, index):
+        assert index.find_duplicate(lead("x", email="JaneDoe@googlemail.com")) == "lead_2"
+
+    def test_same_person_at_blocked_company(self, index):
+        assert index.find_duplicate(lead("x", "John", "Smith", "ACME")) == "lead_1"
+
+    def test_fuzzy_name_match(self, index):
+        assert index.find_duplicate(lead("x", "Jon", "Smith", "Acme Corp")) == "lead_1"
+        assert index.find_duplicate(lead("x", "Jane", "Dow", "Globex")) == "lead_2"
+        assert index.stats["fuzzy_matches"] == 2
+
+    def test_different_people_are_kept(self, index):
+        assert index.find_duplicate(lead("x", "Mary", "Smith", "Acme")) is None
+        assert index.find_duplicate(lead("x", "John", "Smith", "Apex Systems")) is None
+        assert index.find_duplicate(lead("x", email="sales@acme.com")) is None
+
+    def test_persists_across_restarts(self, tmp_path):
+        path = str(tmp_path / "dedup.sqlite")
+        index = LeadDedupIndex(sqlite_path=path)
+        index.add(lead("lead_1", "John", "Smith", "Acme Inc", "john@acme.com"))
+        index.close()
+
+        reopened = LeadDedupIndex(sqlite_path=path)
+
+        assert reopened.find_duplicate(lead("x", email="john+1@acme.com")) == "lead_1"
+        assert reopened.find_duplicate(lead("x", "Jon", "Smith", "Acme")) == "lead_1"
+
+    def test_check_and_add(self):
+        index = LeadDedupIndex()
+
+        assert index.check_and_add(lead("a", "Priya", "Patel", "Initech")) is None
+        assert index.check_and_add(lead("b", "Priya", "Patel", "Initech LLC")) == "a"
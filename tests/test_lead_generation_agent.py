@@ -0,0 +1,268 @@
+import pytest
+import asyncio
+import json
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from lead_generation_agent import (
+    LeadGenerationAgent, LeadScoringConfig, SourceSearchConfig, Lead, LeadCriteria, LeadStatus, LeadQuality,
+    DataSource, SearchTask
+)
+from services.llm_gateway import LLMGateway, GatewayConfig
+
+def make_response(content):
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    return response
+
+def make_lead(index, **overrides):
+    fields = dict(
+        id=f"lead_{index}",
+        first_name="Jane",
+        last_name=f"Doe{index}",
+        email=f"jane{index}@example{index}.com",
+        phone=None,
+        job_title="VP Marketing",
+        company=f"Example {index}",
+        company_website=None,
+        company_size="51-200",
+        industry="SaaS",
+        location="Austin, TX",
+        linkedin_url=None,
+        source=DataSource.DATABASE,
+        quality_score=0.0,
+        quality_level=LeadQuality.COLD,
+        status=LeadStatus.NEW,
+        notes=None,
+        tags=[],
+        contact_attempts=0,
+        last_contacted=None,
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+        custom_fields={}
+    )
+    fields.update(overrides)
+    return Lead(**fields)
+
+def batch_reply(**kwargs):
+    """Answer batch prompts with a score per lead id found in the prompt"""
+    prompt = kwargs["messages"][0]["content"]
+    if "JSON array" not in prompt:
+        return make_response("55")
+    ids = [line.split("id: ")[1].split(" |")[0] for line in prompt.splitlines() if "- id: " in line]
+    return make_response(json.dumps([{"id": lead_id, "score": 85} for lead_id in ids]))
+
+@pytest.fixture
+def mock_openai_client():
+    client = AsyncMock()
+    client.chat.completions.create.side_effect = batch_reply
+    return client
+
+@pytest.fixture
+def lead_agent(mock_openai_client):
+    return LeadGenerationAgent(
+        openai_api_key="test_key",
+        integrations={},
+        llm_gateway=LLMGateway(
+            client=mock_openai_client,
+            config=GatewayConfig(requests_per_minute=0, tokens_per_minute=0)
+        ),
+        scoring_config=LeadScoringConfig(batch_size=10, batch_concurrency=2)
+    )
+
+class TestBatchedLeadScoring:
+
+    @pytest.mark.asyncio
+    async def test_leads_scored_in_batches(self, lead_agent, mock_openai_client):
+        leads = [make_lead(i) for i in range(25)]
+
+        scores = await lead_agent._score_leads(leads, LeadCriteria(industry="SaaS"))
+
+        assert scores == {lead.id: 85.0 for lead in leads}
+        assert mock_openai_client.chat.completions.create.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_malformed_batch_falls_back_to_per_lead(self, lead_agent, mock_openai_client):
+        mock_openai_client.chat.completions.create.side_effect = None
+        mock_openai_client.chat.completions.create.return_value = make_response("not json, sorry")
+        leads = [make_lead(i) for i in range(3)]
+
+        scores = await lead_agent._score_leads(leads, LeadCriteria())
+
+        # per-lead parsing salvages nothing numeric and uses the neutral default
+        assert scores == {lead.id: 50.0 for lead in leads}
+        assert mock_openai_client.chat.completions.create.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_missing_ids_are_rescored_individually(self, lead_agent, mock_openai_client):
+        leads = [make_lead(i) for i in range(3)]
+        partial = json.dumps([{"id": "lead_0", "score": 91}, {"id": "lead_1", "score": "high"}])
+        mock_openai_client.chat.completions.create.side_effect = [
+            make_response(partial), make_response("40"), make_response("70")
+        ]
+
+        scores = await lead_agent._score_leads(leads, LeadCriteria())
+
+        assert scores["lead_0"] == 91.0
+        assert sorted([scores["lead_1"], scores["lead_2"]]) == [40.0, 70.0]
+        assert mock_openai_client.chat.completions.create.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_search_task_uses_batched_scoring(self, lead_agent, mock_openai_client):
+        leads = [make_lead(i) for i in range(12)]
+        lead_agent._search_source = AsyncMock(return_value=leads)
+        lead_agent._generate_results_summary = AsyncMock(return_value={})
+
+        task = SearchTask(
+            id="search_test", name="test", criteria=LeadCriteria(), sources=[DataSource.DATABASE],
+            max_leads=12, status="pending", progress=0.0, leads_found=0,
+            created_at=datetime.now(), completed_at=None, results_summary={}
+        )
+        lead_agent.search_tasks[task.id] = task
+        await lead_agent._execute_search_task(task.id)
+
+        assert task.status == "completed"
+        assert task.leads_found == 12
+        assert all(lead.quality_level == LeadQuality.HOT for lead in lead_agent.leads.values())
+        assert mock_openai_client.chat.completions.create.await_count == 2
+
+class TestLeadPrescoring:
+
+    @pytest.mark.asyncio
+    async def test_clear_cut_leads_skip_the_llm(self, lead_agent, mock_openai_client):
+        criteria = LeadCriteria(industry="SaaS", company_size="51-200", location="Austin, TX", job_titles=["VP Marketing"])
+        leads = [
+            make_lead(0),
+            make_lead(1, job_title="Intern", industry="Retail", company_size="5000+", location="Paris"),
+            make_lead(2, job_title="Marketing Coordinator", location="Denver, CO")
+        ]
+        stats = {}
+
+        scores = await lead_agent._score_leads(leads, criteria, stats)
+
+        assert scores["lead_0"] >= 80
+        assert scores["lead_1"] < 30
+        assert scores["lead_2"] == 55.0  # ambiguous locally, scored by the LLM
+        assert stats == {"leads_scored_locally": 2, "leads_scored_by_llm": 1, "llm_calls_avoided": 2}
+        assert mock_openai_client.chat.completions.create.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_prescoring_can_be_disabled(self, lead_agent, mock_openai_client):
+        lead_agent.scoring_config = LeadScoringConfig(prescore=False)
+        criteria = LeadCriteria(industry="SaaS", company_size="51-200", location="Austin, TX", job_titles=["VP Marketing"])
+
+        scores = await lead_agent._score_leads([make_lead(0), make_lead(1)], criteria)
+
+        assert scores == {"lead_0": 85.0, "lead_1": 85.0}
+        assert mock_openai_client.chat.completions.create.await_count == 1
+
+class TestSourceFanOut:
+
+    def make_task(self, lead_agent, sources, max_leads=20):
+        task = SearchTask(
+            id="search_fanout", name="fanout", criteria=LeadCriteria(), sources=sources,
+            max_leads=max_leads, status="pending", progress=0.0, leads_found=0,
+            created_at=datetime.now(), completed_at=None, results_summary={}
+        )
+        lead_agent.search_tasks[task.id] = task
+        lead_agent._generate_results_summary = AsyncMock(return_value={})
+        return task
+
+    @pytest.mark.asyncio
+    async def test_sources_run_concurrently_and_dedup_across_sources(self, lead_agent):
+        shared = make_lead(0)
+
+        async def search_source(source, criteria, max_results):
+            await asyncio.sleep(0.1)
+            if source == DataSource.LINKEDIN:
+                return [shared, make_lead(1)]
+            return [make_lead(0), make_lead(2)]
+
+        lead_agent._search_source = search_source
+        task = self.make_task(lead_agent, [DataSource.LINKEDIN, DataSource.DATABASE])
+
+        started = asyncio.get_running_loop().time()
+        await lead_agent._execute_search_task(task.id)
+
+        assert asyncio.get_running_loop().time() - started < 0.19
+        assert task.status == "completed"
+        assert task.leads_found == 3
+        assert task.results_summary["sources"]["linkedin"]["status"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_slow_source_times_out_without_losing_others(self, lead_agent):
+        lead_agent.source_config = SourceSearchConfig(timeouts={"google_search": 0.05})
+
+        async def search_source(source, criteria, max_results):
+            if source == DataSource.GOOGLE_SEARCH:
+                await asyncio.sleep(5)
+            return [make_lead(i) for i in range(3)]
+
+        lead_agent._search_source = search_source
+        task = self.make_task(lead_agent, [DataSource.GOOGLE_SEARCH, DataSource.DATABASE])
+
+        await lead_agent._execute_search_task(task.id)
+
+        assert task.status == "completed"
+        assert task.leads_found == 3
+        assert task.results_summary["sources"]["google_search"]["status"] == "timeout"
+        assert task.results_summary["sources"]["database"] == {
+            "status": "completed", "leads": 3, "elapsed": pytest.approx(0, abs=0.05)
+        }
+
+    @pytest.mark.asyncio
+    async def test_source_quota_caps_results(self, lead_agent):
+        lead_agent.source_config = SourceSearchConfig(quotas={"database": 2})
+        lead_agent._search_source = AsyncMock(return_value=[make_lead(i) for i in range(10)])
+        task = self.make_task(lead_agent, [DataSource.DATABASE])
+
+        await lead_agent._execute_search_task(task.id)
+
+        lead_agent._search_source.assert_awaited_once_with(DataSource.DATABASE, task.criteria, 2)
+        assert task.leads_found == 2
+
+    @pytest.mark.asyncio
+    async def test_databases_queried_concurrently(self, lead_agent):
+        async def slow_search(criteria, max_results):
+            await asyncio.sleep(0.1)
+            return [make_lead(max_results)]
+
+        lead_agent.apollo_client.api_key = "apollo"
+        lead_agent.zoominfo_client.api_key = "zoominfo"
+        lead_agent.apollo_client.search_people = slow_search
+        lead_agent.zoominfo_client.search_contacts = AsyncMock(side_effect=Exception("quota exceeded"))
+
+        started = asyncio.get_running_loop().time()
+        leads = await lead_agent._search_databases(LeadCriteria(), 10)
+
+        assert asyncio.get_running_loop().time() - started < 0.15
+        assert [lead.id for lead in leads] == ["lead_5"]
+
+class TestCrossTaskDedup:
+
+    @pytest.mark.asyncio
+    async def test_leads_stored_by_earlier_tasks_are_not_rescored(self, lead_agent, mock_openai_client):
+        lead_agent._generate_results_summary = AsyncMock(return_value={})
+        lead_agent._search_source = AsyncMock(return_value=[make_lead(i) for i in range(3)])
+
+        for task_id in ("search_1", "search_2"):
+            lead_agent.search_tasks[task_id] = SearchTask(
+                id=task_id, name=task_id, criteria=LeadCriteria(), sources=[DataSource.DATABASE],
+                max_leads=10, status="pending", progress=0.0, leads_found=0,
+                created_at=datetime.now(), completed_at=None, results_summary={}
+            )
+        await lead_agent._execute_search_task("search_1")
+        calls_after_first = mock_openai_client.chat.completions.create.await_count
+
+        # same people again, one with a plus-addressed email and a company suffix
+        lead_agent._search_source.return_value = [
+            make_lead(0, id="lead_new_0", email="jane0+crm@example0.com"),
+            make_lead(1, id="lead_new_1", company="Example 1 Inc"),
+            make_lead(7)
+        ]
+        await lead_agent._execute_search_task("search_2")
+
+        second = lead_agent.search_tasks["search_2"]
+        assert second.leads_found == 1
+        assert second.results_summary["duplicates_dropped"] == 2
+        assert mock_openai_client.chat.completions.create.await_count == calls_after_first + 1
@@ -0,0 +1,61 @@
+import pytest
+from datetime import datetime
+from lead_generation_agent import Lead, LeadCriteria, LeadStatus, LeadQuality, DataSource
+from services.lead_scoring import RuleBasedLeadScorer, parse_size_range
+
+def make_lead(**overrides):
+    fields = dict(
+        id="lead_1", first_name="Jane", last_name="Doe", email="jane@example.com", phone=None,
+        job_title=None, company="Example", company_website=None, company_size=None, industry=None,
+        location=None, linkedin_url=None, source=DataSource.DATABASE, quality_score=0.0,
+        quality_level=LeadQuality.COLD, status=LeadStatus.NEW, notes=None, tags=[], contact_attempts=0,
+        last_contacted=None, created_at=datetime.now(), updated_at=datetime.now(), custom_fields={}
+    )
+    fields.update(overrides)
+    return Lead(**fields)
+
+@pytest.fixture
+def criteria():
+    return LeadCriteria(
+        industry="SaaS",
+        company_size="51-200",
+        location="Austin, TX",
+        job_titles=["VP of Marketing", "CMO"],
+        keywords=["demand generation"],
+        technologies=["HubSpot"]
+    )
+
+class TestRuleBasedLeadScorer:
+
+    def test_perfect_match_scores_full_rubric(self, criteria):
+        lead = make_lead(
+            job_title="Vice President, Marketing", industry="SaaS", company_size="100-150",
+            location="Austin, Texas", tags=["hubspot", "demand generation"]
+        )
+
+        assert RuleBasedLeadScorer(criteria).score(lead) == 100.0
+
+    def test_title_synonyms(self, criteria):
+        scorer = RuleBasedLeadScorer(criteria)
+
+        assert scorer._score_title("Chief Marketing Officer") == 40.0
+        assert scorer._score_title("Sr. Marketing Mgr") == 30.0
+        assert scorer._score_title("Software Engineer") == 0.0
+
+    def test_size_bucket_overlap(self, criteria):
+        scorer = RuleBasedLeadScorer(criteria)
+
+        assert scorer._score_size("101-250") == 15.0
+        assert scorer._score_size("201-1000") == 7.5
+        assert scorer._score_size("10,000+") == 0.0
+        assert parse_size_range("1000+") == (1000, float("inf"))
+
+    def test_mismatch_scores_low(self, criteria):
+        lead = make_lead(job_title="Intern", industry="Retail", company_size="5000+", location="Paris, France")
+
+        assert RuleBasedLeadScorer(criteria).score(lead) < 30
+
+    def test_unset_criteria_are_neutral(self):
+        lead = make_lead(job_title="CEO")
+
+        assert RuleBasedLeadScorer(LeadCriteria()).score(lead) == 50.0
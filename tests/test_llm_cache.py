@@ -0,0 +1,117 @@
+import pytest
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+from openai.types.chat import ChatCompletion
+from services.llm_cache import LLMCache, cache_key
+from services.llm_gateway import LLMGateway, GatewayConfig
+
+REQUEST = {
+    "model": "gpt-4",
+    "messages": [{"role": "user", "content": "Score this lead"}],
+    "temperature": 0.3,
+    "max_tokens": 10
+}
+
+def make_completion(content="72"):
+    return ChatCompletion.model_validate({
+        "id": "chatcmpl-1",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": content}
+        }],
+        "usage": {"prompt_tokens": 5, "completion_tokens": 1, "total_tokens": 6}
+    })
+
+class TestLLMCache:
+
+    def test_key_ignores_unrelated_fields(self):
+        assert cache_key(REQUEST) == cache_key({**REQUEST, "stream": False})
+        assert cache_key(REQUEST) != cache_key({**REQUEST, "temperature": 0.7})
+
+    def test_hit_and_expiry(self):
+        cache = LLMCache()
+        key = cache_key(REQUEST)
+        cache.set(key, "response", ttl=60)
+
+        assert cache.get(key) == "response"
+
+        cache._memory[key] = (time.time() - 1, "response")
+        assert cache.get(key) is None
+        assert cache.stats["hits"] == 1
+        assert cache.stats["misses"] == 1
+
+    def test_lru_eviction(self):
+        cache = LLMCache(max_entries=2)
+        cache.set("a", 1, ttl=60)
+        cache.set("b", 2, ttl=60)
+        cache.get("a")
+        cache.set("c", 3, ttl=60)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats["evictions"] == 1
+
+    def test_sqlite_tier_survives_restart(self, tmp_path):
+        path = str(tmp_path / "llm_cache.sqlite")
+        key = cache_key(REQUEST)
+
+        cache = LLMCache(sqlite_path=path)
+        cache.set(key, make_completion(), ttl=60)
+        cache.close()
+
+        reopened = LLMCache(sqlite_path=path)
+        response = reopened.get(key)
+
+        assert response.choices[0].message.content == "72"
+        assert reopened.stats["disk_hits"] == 1
+
+class TestGatewayCaching:
+
+    @pytest.fixture
+    def mock_openai_client(self):
+        client = AsyncMock()
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        response.choices[0].message.content = "72"
+        client.chat.completions.create.return_value = response
+        return client
+
+    @pytest.mark.asyncio
+    async def test_repeat_call_skips_provider(self, mock_openai_client):
+        gateway = LLMGateway(client=mock_openai_client)
+
+        first = await gateway.chat_completion(cache_ttl=60, **REQUEST)
+        second = await gateway.chat_completion(cache_ttl=60, **REQUEST)
+
+        assert first is second
+        assert mock_openai_client.chat.completions.create.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_uncached_call_sites_always_send(self, mock_openai_client):
+        gateway = LLMGateway(client=mock_openai_client)
+
+        await gateway.chat_completion(**REQUEST)
+        await gateway.chat_completion(**REQUEST)
+
+        assert mock_openai_client.chat.completions.create.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_call(self, mock_openai_client):
+        gateway = LLMGateway(client=mock_openai_client, config=GatewayConfig(requests_per_minute=0, tokens_per_minute=0))
+        response = mock_openai_client.chat.completions.create.return_value
+
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0.01)
+            return response
+
+        mock_openai_client.chat.completions.create.side_effect = slow_create
+
+        results = await asyncio.gather(*[gateway.chat_completion(cache_ttl=60, **REQUEST) for _ in range(5)])
+
+        assert all(r is response for r in results)
+        assert mock_openai_client.chat.completions.create.await_count == 1
@@ -0,0 +1,136 @@
+import pytest
+import asyncio
+import httpx
+from unittest.mock import AsyncMock, MagicMock
+from openai import RateLimitError
+from services.llm_gateway import LLMGateway, GatewayConfig, Priority, PrioritySemaphore
+
+def make_response(content="ok", total_tokens=20):
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    response.usage.total_tokens = total_tokens
+    return response
+
+def rate_limit_error(retry_after=None):
+    headers = {"retry-after": retry_after} if retry_after else {}
+    response = httpx.Response(429, headers=headers, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    return RateLimitError("rate limited", response=response, body=None)
+
+@pytest.fixture
+def mock_openai_client():
+    client = AsyncMock()
+    client.chat.completions.create.return_value = make_response()
+    return client
+
+class TestPrioritySemaphore:
+
+    @pytest.mark.asyncio
+    async def test_interactive_waiters_run_first(self):
+        """Released slots go to interactive waiters before background ones"""
+        semaphore = PrioritySemaphore(1)
+        await semaphore.acquire()
+        order = []
+
+        async def waiter(name, priority):
+            await semaphore.acquire(priority)
+            order.append(name)
+            semaphore.release()
+
+        tasks = [
+            asyncio.create_task(waiter("background", Priority.BACKGROUND)),
+            asyncio.create_task(waiter("interactive", Priority.INTERACTIVE))
+        ]
+        await asyncio.sleep(0)
+        semaphore.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["interactive", "background"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        semaphore = PrioritySemaphore(1)
+        await semaphore.acquire()
+
+        task = asyncio.create_task(semaphore.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        semaphore.release()
+        await asyncio.wait_for(semaphore.acquire(), timeout=1)
+
+class TestLLMGateway:
+
+    @pytest.mark.asyncio
+    async def test_agent_client_routes_through_gateway(self, mock_openai_client):
+        gateway = LLMGateway(client=mock_openai_client)
+        client = gateway.for_agent("content")
+
+        response = await client.chat.completions.create(
+            model="gpt-4",
+            messages=[{"role": "user", "content": "hello"}],
+            max_tokens=10
+        )
+
+        assert response.choices[0].message.content == "ok"
+        mock_openai_client.chat.completions.create.assert_awaited_once_with(
+            model="gpt-4",
+            messages=[{"role": "user", "content": "hello"}],
+            max_tokens=10
+        )
+        assert gateway.get_stats()["requests"] == 1
+        assert gateway.get_stats()["tokens"] == 20
+
+    @pytest.mark.asyncio
+    async def test_per_agent_concurrency_limit(self, mock_openai_client):
+        gateway = LLMGateway(client=mock_openai_client, config=GatewayConfig(per_agent_concurrency=2))
+        in_flight = 0
+        peak = 0
+
+        async def slow_create(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return make_response()
+
+        mock_openai_client.chat.completions.create.side_effect = slow_create
+        client = gateway.for_agent("lead_generation")
+
+        await asyncio.gather(*[
+            client.chat.completions.create(model="gpt-4", messages=[{"role": "user", "content": "x"}])
+            for _ in range(6)
+        ])
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_rate_limit_errors(self, mock_openai_client):
+        gateway = LLMGateway(client=mock_openai_client, config=GatewayConfig(backoff_base=0.001))
+        mock_openai_client.chat.completions.create.side_effect = [rate_limit_error(), make_response("done")]
+
+        response = await gateway.chat_completion(model="gpt-4", messages=[{"role": "user", "content": "x"}])
+
+        assert response.choices[0].message.content == "done"
+        assert gateway.stats["retries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, mock_openai_client):
+        gateway = LLMGateway(client=mock_openai_client, config=GatewayConfig(max_retries=2, backoff_base=0.001))
+        mock_openai_client.chat.completions.create.side_effect = rate_limit_error()
+
+        with pytest.raises(RateLimitError):
+            await gateway.chat_completion(model="gpt-4", messages=[{"role": "user", "content": "x"}])
+
+        assert mock_openai_client.chat.completions.create.await_count == 3
+        assert gateway.stats["failures"] == 1
+
+    def test_backoff_honours_retry_after(self, mock_openai_client):
+        gateway = LLMGateway(client=mock_openai_client, config=GatewayConfig(backoff_base=0.5))
+
+        delay = gateway._backoff_delay(0, rate_limit_error(retry_after="3"))
+
+        assert 3.0 <= delay <= 3.5
@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+from datetime import datetime
+from services.engagement_store import EngagementStore
+from services.message_index import IndexedMessageStore
+
+def make_message(message_id, contact_id="c1", campaign_id="camp1", status="sent"):
+    return SimpleNamespace(id=message_id, contact_id=contact_id, campaign_id=campaign_id, status=status)
+
+class TestIndexedMessageStore:
+    def test_indexes_by_contact_and_campaign(self):
+        store = IndexedMessageStore()
+        store["m1"] = make_message("m1", "c1", "camp1")
+        store["m2"] = make_message("m2", "c1", "camp2")
+        store["m3"] = make_message("m3", "c2", "camp1")
+
+        assert store.message_ids_for_contact("c1") == {"m1", "m2"}
+        assert store.message_ids_for_campaign("camp1") == {"m1", "m3"}
+        assert {m.id for m in store.messages_for_contacts(["c1", "c2"])} == {"m1", "m2", "m3"}
+        assert store.contact_message_count("c1") == 2
+        assert store.contact_message_count("missing") == 0
+
+    def test_status_counters_follow_set_status(self):
+        store = IndexedMessageStore()
+        message = make_message("m1")
+        store["m1"] = message
+        store["m2"] = make_message("m2", status="opened")
+
+        store.set_status(message, "clicked")
+
+        assert message.status == "clicked"
+        assert store.contact_counts("c1") == {"clicked": 1, "opened": 1}
+        assert store.contact_status_count("c1", ["opened", "clicked"]) == 2
+        assert store.contact_status_count("c1") == 2
+
+    def test_reindex_after_in_place_change(self):
+        store = IndexedMessageStore()
+        message = make_message("m1")
+        store["m1"] = message
+
+        message.status = "opened"
+        message.contact_id = "c2"
+        store.reindex(message)
+
+        assert store.contact_counts("c1") == {}
+        assert store.contact_counts("c2") == {"opened": 1}
+
+    def test_removal_and_replacement_unindex(self):
+        store = IndexedMessageStore({"m1": make_message("m1"), "m2": make_message("m2")})
+
+        store["m1"] = make_message("m1", contact_id="c2")
+        del store["m2"]
+        assert store.pop("missing", None) is None
+
+        assert store.message_ids_for_contact("c1") == set()
+        assert store.message_ids_for_contact("c2") == {"m1"}
+        store.pop("m1")
+        assert store.message_ids_for_campaign("camp1") == set()
+        assert len(store) == 0
+
+    def test_set_status_on_unstored_message(self):
+        store = IndexedMessageStore()
+        message = make_message("m1")
+
+        store.set_status(message, "bounced")
+
+        assert message.status == "bounced"
+        assert store.contact_counts("c1") == {}
+
+    def test_clear_resets_indexes(self):
+        store = IndexedMessageStore({"m1": make_message("m1")})
+
+        store.clear()
+
+        assert store.contact_message_count("c1") == 0
+        assert store.messages_for_campaign("camp1") == []
+        store["m1"] = make_message("m1")
+        assert store.contact_message_count("c1") == 1
+
+    def test_status_listeners_called_on_change(self):
+        store = IndexedMessageStore({"m1": make_message("m1")})
+        seen = []
+        store.status_listeners.append(lambda message: seen.append(message.status))
+        store.status_listeners.insert(0, lambda message: 1 / 0)
+
+        store.set_status(store["m1"], "opened")
+        store.set_status(store["m1"], "opened")
+
+        assert seen == ["opened"]
+        assert store.contact_counts("c1") == {"opened": 1}
+
+    def test_evicted_messages_keep_indexes_and_counters(self):
+        store = IndexedMessageStore()
+        store.engagement = EngagementStore()
+        store.evict_statuses = {"sent", "opened"}
+        message = make_message("m1", status="scheduled")
+        message.sent_at = datetime(2024, 1, 1, 9, 30)
+        store["m1"] = message
+
+        store.set_status(message, "sent")
+
+        assert "m1" not in store and store.evicted_count() == 1
+        assert store.message_ids_for_contact("c1") == {"m1"}
+        record = store.record("m1")
+        assert (record.campaign_id, record.status, record.sent_at) == ("camp1", "sent", datetime(2024, 1, 1, 9, 30))
+
+        store.set_status(record, "opened")
+
+        assert store.contact_counts("c1") == {"opened": 1}
+        assert [m.status for m in store.messages_for_campaign("camp1")] == ["opened"]
+        assert store.pop("m1").status == "opened"
+        assert store.record("m1") is None and store.contact_message_count("c1") == 0
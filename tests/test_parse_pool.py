@@ -0,0 +1,68 @@
+import pytest
+import os
+import httpx
+from lead_generation_agent import WebScraper, LeadCriteria
+from services.contact_extraction import extract_contacts
+from services.crawler import CrawlConfig
+from services.parse_pool import ParsePool, ParseConfig
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+class TestParsePool:
+
+    @pytest.mark.asyncio
+    async def test_small_pages_parse_inline(self):
+        pool = ParsePool(ParseConfig(workers=1))
+        html = load_fixture("contact.html")
+
+        contacts = await pool.parse(html)
+
+        assert contacts == extract_contacts(html)
+        assert pool.stats == {"offloaded": 0, "inline": 1, "errors": 0}
+        assert pool._executor is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("executor", ["process", "thread"])
+    async def test_large_pages_are_offloaded(self, executor):
+        pool = ParsePool(ParseConfig(workers=1, executor=executor))
+        html = load_fixture("team_large.html")
+
+        try:
+            contacts = await pool.parse(html)
+        finally:
+            pool.close()
+
+        assert contacts == extract_contacts(html)
+        assert pool.stats["offloaded"] == 1
+
+class TestScraperPipeline:
+
+    @pytest.mark.asyncio
+    async def test_bounded_queue_delivers_every_page(self):
+        team_page = load_fixture("team_large.html")
+
+        async def handler(request):
+            if request.url.path == "/team":
+                return httpx.Response(200, content=team_page)
+            return httpx.Response(404)
+
+        scraper = WebScraper(
+            CrawlConfig(per_host_delay=0.0, respect_robots=False),
+            ParseConfig(workers=2, queue_size=1, executor="thread", inline_max_bytes=0)
+        )
+        scraper.session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scraper.crawler.client = scraper.session
+        domains = [f"site{i}.com" for i in range(6)]
+
+        try:
+            batches = [batch async for batch in scraper.stream_leads(domains, LeadCriteria())]
+        finally:
+            await scraper.close()
+
+        assert len(batches) == 6
+        assert all(len(batch) == 401 for batch in batches)
+        assert scraper.parse_pool.stats["offloaded"] == 6
@@ -0,0 +1,111 @@
+import pytest
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from services.rate_limiter import (
+    CallPriority, PlatformRateLimiter, Quota, RateLimitConfig, TokenBucket, retry_after_seconds, usage_pause
+)
+
+def response(status=200, **headers):
+    return SimpleNamespace(status_code=status, headers={key.replace("_", "-"): value for key, value in headers.items()})
+
+class TestTokenBucket:
+    @pytest.mark.asyncio
+    async def test_waiters_are_served_by_priority(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        await bucket.acquire()
+        order = []
+
+        async def call(name, priority):
+            await bucket.acquire(priority)
+            order.append(name)
+
+        await asyncio.gather(
+            call("reply1", CallPriority.REPLY),
+            call("fetch", CallPriority.FETCH),
+            call("reply2", CallPriority.REPLY),
+            call("publish", CallPriority.PUBLISH),
+        )
+
+        assert order == ["publish", "fetch", "reply1", "reply2"]
+        stats = bucket.get_stats()
+        assert stats["granted"] == {"publish": 1, "fetch": 2, "reply": 2}
+        assert stats["waited"] == 4 and stats["max_wait_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_refill_rate_bounds_throughput(self):
+        bucket = TokenBucket(rate=100, capacity=2)
+        started = time.monotonic()
+
+        await asyncio.gather(*[bucket.acquire() for _ in range(12)])
+
+        assert time.monotonic() - started >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_block_holds_every_waiter(self):
+        bucket = TokenBucket(rate=1000, capacity=10)
+        bucket.block(0.1)
+        started = time.monotonic()
+
+        await bucket.acquire(CallPriority.PUBLISH)
+
+        assert time.monotonic() - started >= 0.09
+
+class TestHeaders:
+    def test_retry_after_accepts_seconds_and_dates(self):
+        assert retry_after_seconds({"retry-after": "30"}) == 30
+        assert retry_after_seconds({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+        assert retry_after_seconds({}) is None
+
+    def test_graph_usage_pauses_near_the_limit(self):
+        assert usage_pause({"x-app-usage": json.dumps({"call_count": 40})}, 90, 300) is None
+        assert usage_pause({"x-app-usage": json.dumps({"call_count": 95})}, 90, 300) == 300
+        business = {"123": [{"call_count": 100, "estimated_time_to_regain_access": 7}]}
+        assert usage_pause({"x-business-use-case-usage": json.dumps(business)}, 90, 300) == 420
+
+class TestPlatformRateLimiter:
+    @pytest.mark.asyncio
+    async def test_buckets_are_per_platform_and_account(self):
+        limiter = PlatformRateLimiter(RateLimitConfig(quotas={"twitter": Quota(10, 1, burst=1)}))
+
+        assert limiter.bucket("twitter", "a") is not limiter.bucket("twitter", "b")
+        assert limiter.bucket("twitter", "a").capacity == 1
+        assert limiter.bucket("unknown", "a").capacity == RateLimitConfig().default_quota.capacity
+
+    @pytest.mark.asyncio
+    async def test_429_is_retried_after_retry_after(self):
+        limiter = PlatformRateLimiter(RateLimitConfig(quotas={"twitter": Quota(1000, 1)}))
+        responses = [response(429, retry_after="0.1"), response(201)]
+        calls = []
+
+        async def request():
+            calls.append(time.monotonic())
+            return responses.pop(0)
+
+        result = await limiter.send("twitter", "me", CallPriority.REPLY, request)
+
+        assert result.status_code == 201
+        assert calls[1] - calls[0] >= 0.09
+        assert limiter.get_stats()["twitter:me"]["throttled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_exhausted_remaining_closes_until_reset(self):
+        limiter = PlatformRateLimiter()
+
+        limiter.observe("twitter", "me", 200, {"x-rate-limit-remaining": "0", "x-rate-limit-reset": str(time.time() + 60)})
+        stats = limiter.get_stats()["twitter:me"]
+
+        assert stats["tokens"] == 0
+        assert 55 < stats["blocked_for"] <= 60
+
+    @pytest.mark.asyncio
+    async def test_429_without_headers_backs_off_exponentially(self):
+        limiter = PlatformRateLimiter(RateLimitConfig(backoff_base=10))
+
+        limiter.observe("facebook", "page", 429, {})
+        first = limiter.get_stats()["facebook:page"]["blocked_for"]
+        limiter.observe("facebook", "page", 429, {})
+        second = limiter.get_stats()["facebook:page"]["blocked_for"]
+
+        assert 9 < first <= 10 and 19 < second <= 20
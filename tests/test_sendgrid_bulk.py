@@ -0,0 +1,100 @@
+import pytest
+import json
+import httpx
+from benchmarks.fake_sendgrid import create_app
+from services.sendgrid_bulk import SendGridBulkSender, BulkRecipient, MAX_PERSONALIZATIONS
+
+BASE_URL = "http://fake-sendgrid/v3"
+
+def make_recipients(count):
+    return [
+        BulkRecipient(
+            message_id=f"msg_{i}",
+            email=f"contact{i}@example.com",
+            name=f"Contact {i}",
+            substitutions={"{{first_name}}": f"Contact{i}"}
+        )
+        for i in range(count)
+    ]
+
+async def send(sender, recipients):
+    return await sender.send(recipients, "<p>Hi {{first_name}}</p>", "noreply@example.com", "Team", subject="News")
+
+class TestSendGridBulkSender:
+    @pytest.mark.asyncio
+    async def test_packs_recipients_into_max_size_batches(self):
+        app = create_app()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as client:
+            sender = SendGridBulkSender(client, "key", base_url=BASE_URL, requests_per_minute=0)
+            results = await send(sender, make_recipients(2500))
+
+        assert app.state.counters["requests"] == 3
+        assert app.state.counters["recipients"] == 2500
+        assert len(results) == 2500
+        assert all(result.accepted for result in results.values())
+
+    @pytest.mark.asyncio
+    async def test_personalizations_carry_substitutions_and_message_id(self):
+        payloads = []
+
+        async def handler(request):
+            payloads.append(json.loads(request.content))
+            return httpx.Response(202, headers={"X-Message-Id": "sg-1"})
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            sender = SendGridBulkSender(client, "key", base_url=BASE_URL, requests_per_minute=0)
+            recipients = make_recipients(2)
+            recipients[1].subject = "Custom subject"
+            results = await send(sender, recipients)
+
+        assert len(payloads) == 1
+        first, second = payloads[0]["personalizations"]
+        assert first["to"] == [{"email": "contact0@example.com", "name": "Contact 0"}]
+        assert first["substitutions"] == {"{{first_name}}": "Contact0"}
+        assert first["custom_args"]["message_id"] == "msg_0"
+        assert "subject" not in first
+        assert second["subject"] == "Custom subject"
+        assert payloads[0]["content"][0]["value"] == "<p>Hi {{first_name}}</p>"
+        assert results["msg_1"].sendgrid_message_id == "sg-1"
+
+    @pytest.mark.asyncio
+    async def test_retries_throttled_batches(self):
+        app = create_app(throttle_every=2)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as client:
+            sender = SendGridBulkSender(client, "key", base_url=BASE_URL, max_concurrency=1, requests_per_minute=0)
+            results = await send(sender, make_recipients(3 * MAX_PERSONALIZATIONS))
+
+        assert all(result.accepted for result in results.values())
+        assert app.state.counters["throttled"] >= 1
+        assert sender.get_stats()["retries"] == app.state.counters["throttled"]
+
+    @pytest.mark.asyncio
+    async def test_rejected_batch_maps_to_every_recipient(self):
+        async def handler(request):
+            return httpx.Response(400, json={"errors": [{"message": "bad from address"}]})
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            sender = SendGridBulkSender(client, "key", base_url=BASE_URL, requests_per_minute=0)
+            results = await send(sender, make_recipients(5))
+
+        assert len(results) == 5
+        assert not any(result.accepted for result in results.values())
+        assert "400" in results["msg_0"].error
+        assert sender.get_stats()["requests"] == 1
+        assert sender.get_stats()["rejected"] == 5
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        calls = []
+
+        async def handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            sender = SendGridBulkSender(client, "key", base_url=BASE_URL, requests_per_minute=0,
+                                        max_retries=2, backoff_base=0.0)
+            results = await send(sender, make_recipients(1))
+
+        assert len(calls) == 3
+        assert not results["msg_0"].accepted
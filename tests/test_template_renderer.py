@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+from services.template_renderer import TemplateRenderer, CompiledTemplate
+
+def make_template(subject="Hi {{first_name}}", html="<p>{{first_name}} at {{company}}</p>", template_id="t1"):
+    return SimpleNamespace(id=template_id, subject_line=subject, html_content=html)
+
+def legacy_render(text, values):
+    for var_name, var_value in values.items():
+        text = text.replace(f"{{{{{var_name}}}}}", str(var_value))
+    return text
+
+class TestCompiledTemplate:
+    def test_matches_str_replace_output(self):
+        source = "{{first_name}}, {{company}} and {{first_name}} again. {{missing}} {{ spaced }} {x} {{"
+        values = {"first_name": "Ana", "company": "Acme", "email": "ana@acme.com"}
+
+        assert CompiledTemplate(source).render(values) == legacy_render(source, values)
+
+    def test_lists_variables_in_order_without_duplicates(self):
+        compiled = CompiledTemplate("{{b}} {{a}} {{b}}")
+
+        assert compiled.variables == ("b", "a")
+
+    def test_values_are_not_rendered_again(self):
+        compiled = CompiledTemplate("{{first_name}} {{last_name}}")
+
+        assert compiled.render({"first_name": "{{last_name}}", "last_name": "Lee"}) == "{{last_name}} Lee"
+
+    def test_template_without_placeholders(self):
+        compiled = CompiledTemplate("plain text")
+
+        assert compiled.render({"a": 1}) == "plain text"
+        assert compiled.render_many([{}, {}]) == ["plain text", "plain text"]
+
+    def test_render_many_matches_render(self):
+        compiled = CompiledTemplate("<p>{{first_name}} / {{count}}</p>")
+        rows = [{"first_name": f"C{i}", "count": i} for i in range(5)]
+
+        assert compiled.render_many(rows) == [compiled.render(row) for row in rows]
+
+class TestTemplateRenderer:
+    def test_renders_subject_and_html(self):
+        renderer = TemplateRenderer()
+
+        rendered = renderer.render(make_template(), {"first_name": "Ana", "company": "Acme"})
+
+        assert rendered == {"subject": "Hi Ana", "html": "<p>Ana at Acme</p>"}
+
+    def test_compiles_once_per_template(self):
+        renderer = TemplateRenderer()
+        template = make_template()
+
+        renderer.render_many(template, [{"first_name": "A"}] * 3)
+        renderer.render(template, {"first_name": "B"})
+
+        assert renderer.get_stats()["compiled"] == 1
+        assert renderer.get_stats()["hits"] == 1
+
+    def test_recompiles_edited_template(self):
+        renderer = TemplateRenderer()
+        template = make_template()
+        renderer.render(template, {"first_name": "Ana"})
+
+        template.subject_line = "Hello {{first_name}}"
+
+        assert renderer.render(template, {"first_name": "Ana"})["subject"] == "Hello Ana"
+        assert renderer.get_stats()["compiled"] == 2
+
+    def test_variables_cover_subject_and_body(self):
+        renderer = TemplateRenderer()
+
+        assert renderer.variables(make_template()) == ("first_name", "company")
+
+    def test_evicts_least_recently_used_template(self):
+        renderer = TemplateRenderer(max_templates=2)
+        for template_id in ("a", "b", "c"):
+            renderer.compile(make_template(template_id=template_id))
+
+        assert renderer.get_stats()["templates"] == 2
+        renderer.compile(make_template(template_id="a"))
+        assert renderer.get_stats()["compiled"] == 4
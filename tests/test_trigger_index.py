@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+from services.trigger_index import IndexedSequenceStore
+
+def make_sequence(sequence_id, event=None, tags=None, any_event=False):
+    return SimpleNamespace(id=sequence_id, event=event, tags=tags or [], any_event=any_event)
+
+def trigger_keys(sequence):
+    return ([None] if sequence.any_event else [sequence.event]), sequence.tags
+
+def make_contact(contact_id, tags=None):
+    return SimpleNamespace(id=contact_id, tags=tags or [])
+
+class TestIndexedSequenceStore:
+    def test_match_only_returns_listening_sequences(self):
+        store = IndexedSequenceStore(trigger_keys, {
+            "welcome": make_sequence("welcome", event="contact_added"),
+            "purchase": make_sequence("purchase", event="purchase"),
+            "vip": make_sequence("vip", tags=["vip"], any_event=True),
+            "trial": make_sequence("trial", event="contact_added", tags=["trial", "beta"]),
+        })
+
+        untagged, tagged = store.match("contact_added")
+
+        assert untagged == {"welcome"}
+        assert tagged == {"vip": {"vip"}, "trial": {"trial"}, "beta": {"trial"}}
+        assert store.match("unknown") == (set(), {"vip": {"vip"}})
+
+    def test_dispatch_fans_out_by_tag(self):
+        store = IndexedSequenceStore(trigger_keys, {
+            "welcome": make_sequence("welcome", event="contact_added"),
+            "vip": make_sequence("vip", event="contact_added", tags=["vip"]),
+        })
+        contacts = [make_contact("c1", ["vip"]), make_contact("c2"), make_contact("c3", ["other"])]
+
+        plan = store.dispatch("contact_added", contacts)
+
+        assert {key: [c.id for c in value] for key, value in plan.items()} == {
+            "welcome": ["c1", "c2", "c3"],
+            "vip": ["c1"],
+        }
+        assert store.dispatch("purchase", contacts) == {}
+
+    def test_replace_remove_and_reindex(self):
+        sequence = make_sequence("s1", event="a")
+        store = IndexedSequenceStore(trigger_keys, {"s1": sequence})
+
+        sequence.event = "b"
+        store.reindex(sequence)
+        assert store.match("a")[0] == set()
+        assert store.match("b")[0] == {"s1"}
+
+        store["s1"] = make_sequence("s1", event="c", tags=["t"])
+        assert store.match("b")[0] == set()
+        assert store.match("c")[1] == {"t": {"s1"}}
+
+        store.pop("s1")
+        assert store.match("c") == (set(), {})
+        assert store._by_event == {} and store._by_tag == {}
+
+    def test_sequences_without_triggers_are_never_matched(self):
+        store = IndexedSequenceStore(lambda sequence: ([], []), {"manual": make_sequence("manual")})
+
+        assert store.dispatch("contact_added", [make_contact("c1")]) == {}
+        assert "manual" in store